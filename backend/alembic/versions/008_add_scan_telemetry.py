@@ -0,0 +1,36 @@
+"""스캔 텔레메트리 — scan_job.telemetry 컬럼 추가
+
+Revision ID: 008_add_scan_telemetry
+Revises: 007_add_f11_tables
+Create Date: 2026-10-17
+
+변경사항:
+- scan_job.telemetry 컬럼 추가 (JSONB)
+  - 단계별 소요 시간, 다운로드 바이트, 스캔 파일 수, Claude 호출/토큰/재시도 횟수
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "008_add_scan_telemetry"
+down_revision = "007_add_f11_tables"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # scan_job 테이블: telemetry 컬럼 추가
+    op.add_column(
+        "scan_job",
+        sa.Column(
+            "telemetry",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=True,
+            comment="스캔 단계별 텔레메트리",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("scan_job", "telemetry")
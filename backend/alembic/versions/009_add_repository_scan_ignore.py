@@ -0,0 +1,36 @@
+"""저장소별 스캔 제외 경로 — repository.scan_ignore_patterns 컬럼 추가
+
+Revision ID: 009_add_repository_scan_ignore
+Revises: 008_add_scan_telemetry
+Create Date: 2026-10-17
+
+변경사항:
+- repository.scan_ignore_patterns 컬럼 추가 (JSONB)
+  - gitignore 형식 glob 목록, 매칭되는 파일은 추출 단계에서 제외 (Semgrep / LLM 분석 안 함)
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "009_add_repository_scan_ignore"
+down_revision = "008_add_scan_telemetry"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # repository 테이블: scan_ignore_patterns 컬럼 추가
+    op.add_column(
+        "repository",
+        sa.Column(
+            "scan_ignore_patterns",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=True,
+            comment="스캔에서 제외할 경로 패턴 (gitignore 형식 glob 목록)",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("repository", "scan_ignore_patterns")
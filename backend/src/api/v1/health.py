@@ -42,11 +42,9 @@ async def health_detailed() -> dict[str, object]:
 
     # Redis 연결 확인
     try:
-        import redis.asyncio as aioredis
+        from src.services.redis_pool import get_async_redis
 
-        r = aioredis.from_url(settings.REDIS_URL)
-        await r.ping()  # type: ignore[misc]
-        await r.aclose()
+        await get_async_redis().ping()  # type: ignore[misc]
         checks["redis"] = "ok"
     except Exception as exc:
         checks["redis"] = f"error: {str(exc)[:50]}"
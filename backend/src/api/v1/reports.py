@@ -131,7 +131,7 @@ async def create_report_config(
 # ──────────────────────────────────────────────────────────────
 
 
-def enqueue_report_generation(
+async def enqueue_report_generation(
     report_id: uuid.UUID,
     report_type: str,
     team_id: uuid.UUID,
@@ -141,24 +141,23 @@ def enqueue_report_generation(
 ) -> None:
     """리포트 생성 작업을 RQ 큐에 등록한다.
 
+    공용 async Redis 연결 풀로 RQ 잡을 기록하므로 이벤트 루프를 막지 않는다.
     RQ가 설치되지 않은 환경(PoC)에서는 no-op.
     """
     try:
-        import redis
-        from rq import Queue
-
-        from src.config import get_settings
-        settings = get_settings()
-        redis_conn = redis.from_url(settings.REDIS_URL)
-        queue = Queue("reports", connection=redis_conn)
-        queue.enqueue(
+        from src.services.redis_pool import enqueue_rq_job
+
+        await enqueue_rq_job(
+            "reports",
             "src.workers.report_worker.generate_report_task",
-            report_id=str(report_id),
-            report_type=report_type,
-            team_id=str(team_id),
-            period_start=str(period_start),
-            period_end=str(period_end),
-            report_format=report_format,
+            kwargs={
+                "report_id": str(report_id),
+                "report_type": report_type,
+                "team_id": str(team_id),
+                "period_start": str(period_start),
+                "period_end": str(period_end),
+                "report_format": report_format,
+            },
         )
     except Exception:
         # RQ 미설치 또는 Redis 연결 실패 시 무시
@@ -210,7 +209,7 @@ async def generate_report(
     await db.commit()
 
     # RQ 큐에 생성 작업 등록
-    enqueue_report_generation(
+    await enqueue_report_generation(
         report_id=report_id,
         report_type=data.report_type,
         team_id=team_id,
@@ -14,7 +14,12 @@ from src.i18n import Locale, get_message
 from src.models.repository import Repository
 from src.models.scan_job import ScanJob
 from src.schemas.common import ApiResponse, PaginatedMeta, PaginatedResponse
-from src.schemas.repository import RepositoryRegisterRequest, RepositoryResponse, RepositorySecurityScore
+from src.schemas.repository import (
+    RepositoryRegisterRequest,
+    RepositoryResponse,
+    RepositoryScanIgnoreUpdate,
+    RepositorySecurityScore,
+)
 from src.schemas.scan import ScanJobResponse
 from src.schemas.vulnerability import VulnerabilitySummary
 from src.services.github_app import GitHubAppService
@@ -398,6 +403,45 @@ async def disconnect_repo(
     )
 
 
+@router.patch("/{repo_id}/scan-ignore", response_model=ApiResponse[RepositoryResponse])
+async def update_repo_scan_ignore(
+    repo_id: uuid.UUID,
+    request: RepositoryScanIgnoreUpdate,
+    current_user: CurrentUser,
+    db: DbSession,
+    locale: CurrentLocale,
+) -> ApiResponse[RepositoryResponse]:
+    """저장소의 스캔 제외 경로 패턴을 변경한다 (다음 스캔부터 적용)."""
+    repo = await get_repo_by_id(db=db, repo_id=repo_id)
+    if repo is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=get_message("repo_not_found", locale),
+        )
+
+    # 권한 확인 (owner / admin만 허용)
+    role = await get_user_team_role(
+        db=db,
+        user_id=current_user.id,
+        team_id=repo.team_id,
+    )
+    if role not in ("owner", "admin"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=get_message("repo_access_denied", locale),
+        )
+
+    repo.scan_ignore_patterns = request.patterns or None
+    await db.commit()
+    logger.info(f"[Repos] 스캔 제외 패턴 변경: {repo.full_name} ({len(request.patterns)}개)")
+
+    return ApiResponse(
+        success=True,
+        data=RepositoryResponse.model_validate(repo),
+        error=None,
+    )
+
+
 @router.get("/{repo_id}/score", response_model=ApiResponse[RepositorySecurityScore])
 async def get_repo_security_score(
     repo_id: uuid.UUID,
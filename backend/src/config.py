@@ -35,6 +35,16 @@ class Settings(BaseSettings):
         description="Redis 연결 URL",
         examples=["redis://localhost:6379"],
     )
+    REDIS_MAX_CONNECTIONS: int = Field(
+        default=50,
+        ge=1,
+        description="프로세스 공용 Redis 연결 풀 크기 (async / sync 풀 각각)",
+    )
+    REDIS_POOL_TIMEOUT_SECONDS: int = Field(
+        default=5,
+        ge=1,
+        description="연결 풀이 가득 찼을 때 빈 연결을 기다리는 최대 시간 (초)",
+    )
 
     # ---- GitHub App ----
     GITHUB_APP_ID: int = Field(..., description="GitHub App ID")
@@ -96,6 +106,172 @@ class Settings(BaseSettings):
         description="리포트 파일 저장 경로 (PoC: 로컬 파일시스템)",
     )
 
+    # ---- IDE 분석 Semgrep 워커 풀 ----
+    # 기본값 0은 의도된 값 — 워커마다 전체 룰을 메모리에 상주시키므로
+    # IDE 분석 트래픽이 있는 API 인스턴스에서만 켠다 (.env.example과 같은 값 유지)
+    IDE_SEMGREP_POOL_SIZE: int = Field(
+        default=0,
+        ge=0,
+        description="룰을 미리 로드한 semgrep lsp 워커 수 (0이면 풀 미사용, 요청마다 semgrep scan 실행)",
+    )
+    IDE_SEMGREP_POOL_MAX_JOBS: int = Field(
+        default=500,
+        ge=1,
+        description="워커당 처리 건수 상한 — 초과 시 새 프로세스로 교체",
+    )
+    IDE_SEMGREP_POOL_MAX_PENDING: int = Field(
+        default=32,
+        ge=1,
+        description="풀에 대기/처리 중인 요청 상한 — 초과 요청은 빈 결과로 응답",
+    )
+
+    # ---- Semgrep 결과 캐시 ----
+    SEMGREP_CACHE_TTL_SECONDS: int = Field(
+        default=7 * 24 * 60 * 60,
+        ge=0,
+        description="(파일 해시, 룰셋 해시)별 Semgrep 결과 캐시 TTL (0이면 캐시 미사용)",
+    )
+
+    # ---- LLM 호출 동시성 ----
+    LLM_MAX_CONCURRENCY: int = Field(
+        default=5,
+        ge=1,
+        description="스캔 1건 내 Claude 동시 호출 상한 (분석 + 패치 생성 공통)",
+    )
+
+    # ---- LLM 분석 묶음 (작은 파일 여러 개를 한 요청으로) ----
+    LLM_PACK_MAX_INPUT_TOKENS: int = Field(
+        default=8000,
+        ge=0,
+        description="묶음 분석 요청 1건의 파일 내용 입력 토큰 예산 (0이면 파일마다 개별 요청)",
+    )
+    LLM_PACK_MAX_FINDINGS: int = Field(
+        default=20,
+        ge=1,
+        description="묶음 분석 요청 1건에 포함할 최대 finding 수 (응답 길이 제한)",
+    )
+
+    # ---- Claude 공유 레이트 리밋 (모든 워커 공통, 응답 헤더로 실제 한도 학습) ----
+    CLAUDE_RPM_LIMIT: int = Field(
+        default=50,
+        ge=0,
+        description="클러스터 전체 Claude 분당 요청 수 초기 한도 (0이면 공유 레이트 리밋 미사용)",
+    )
+    CLAUDE_TPM_LIMIT: int = Field(
+        default=30000,
+        ge=0,
+        description="클러스터 전체 Claude 분당 입력 토큰 수 초기 한도 (0이면 공유 레이트 리밋 미사용)",
+    )
+
+    # ---- LLM 판정 캐시 ----
+    LLM_VERDICT_CACHE_TTL_SECONDS: int = Field(
+        default=30 * 24 * 60 * 60,
+        ge=0,
+        description="저장소별 finding 지문 LLM 판정 캐시 TTL (0이면 캐시 미사용, 룰셋/모델 변경 시 자동 무효화)",
+    )
+
+    # ---- 스캔 워커 상주 모드 ----
+    SCAN_WORKER_PERSISTENT: bool = Field(
+        default=True,
+        description="잡마다 fork하지 않고 이벤트 루프 / DB 풀 / HTTP 풀 / Anthropic 클라이언트를 재사용",
+    )
+    SCAN_WORKER_MAX_JOBS: int = Field(
+        default=200,
+        ge=0,
+        description="상주 워커 프로세스가 처리할 잡 수 상한 — 초과 시 프로세스 재시작 (0이면 무제한)",
+    )
+
+    # ---- 호스트당 동시 스캔 / CPU 코어 예산 ----
+    SCAN_WORKER_CONCURRENCY: int = Field(
+        default=4,
+        ge=1,
+        description="워커 호스트에서 동시에 처리할 스캔 수 (1이면 단일 워커 프로세스)",
+    )
+    SEMGREP_CPU_CORES: int = Field(
+        default=0,
+        ge=0,
+        description="호스트의 동시 스캔들이 나눠 쓸 Semgrep 코어 수 (0이면 사용 가능한 전체 코어)",
+    )
+    SEMGREP_MAX_JOBS_PER_SCAN: int = Field(
+        default=4,
+        ge=1,
+        description="Semgrep 실행 1건이 할당받을 최대 코어 수 (--jobs)",
+    )
+
+    # ---- Semgrep 샤딩 스캔 (대형 저장소) ----
+    SEMGREP_SHARD_MIN_FILES: int = Field(
+        default=500,
+        ge=0,
+        description="스캔 대상 파일이 이 수 이상이면 크기 기준 샤드로 나눠 동시 실행 (0이면 샤딩 미사용)",
+    )
+    SEMGREP_SHARD_TARGET_BYTES: int = Field(
+        default=8_000_000,
+        ge=1,
+        description="샤드 1개의 목표 파일 크기 합 (바이트)",
+    )
+    SEMGREP_SHARD_TIMEOUT_SECONDS: int = Field(
+        default=300,
+        ge=1,
+        description="샤드 1개의 semgrep 실행 타임아웃 (초)",
+    )
+    SEMGREP_SHARD_MAX_RETRIES: int = Field(
+        default=1,
+        ge=0,
+        description="타임아웃된 샤드를 반으로 나눠 재시도하는 횟수 (초과 시 해당 파일 제외하고 부분 결과)",
+    )
+    SEMGREP_KEYWORD_PREFILTER: bool = Field(
+        default=True,
+        description="룰이 요구하는 키워드가 하나도 없는 파일은 Semgrep에 넘기지 않음",
+    )
+    SEMGREP_NATIVE_SECRETS: bool = Field(
+        default=True,
+        description="hardcoded_creds 룰을 Semgrep 대신 내장 정규식 + 엔트로피 스캐너로 실행 (스캔 워커 / IDE 분석)",
+    )
+    SEMGREP_STREAM_OUTPUT: bool = Field(
+        default=True,
+        description="semgrep JSON 출력을 스트리밍 파싱 (findings 수와 무관하게 파싱 메모리 일정)",
+    )
+
+    # ---- map-reduce 스캔 (대형 모노레포) ----
+    SCAN_MAPREDUCE_MIN_FILES: int = Field(
+        default=5000,
+        ge=0,
+        description="initial / full 스캔 파일이 이 수 이상이면 샤드 잡으로 나눠 여러 워커에서 처리 (0이면 자동 분할 안 함)",
+    )
+    SCAN_MAPREDUCE_SHARD_FILES: int = Field(
+        default=1500,
+        ge=1,
+        description="map-reduce 샤드 잡 1개가 맡는 파일 수",
+    )
+
+    # ---- 스캔 스케줄링 (우선순위 레인 + 팀별 공정 스케줄링) ----
+    SCAN_TEAM_MAX_CONCURRENT: int = Field(
+        default=4,
+        ge=0,
+        description="팀 1개가 동시에 실행(RQ 큐 대기 포함)할 수 있는 스캔 수 (0이면 무제한)",
+    )
+    SCAN_LANE_MAX_INFLIGHT: int = Field(
+        default=8,
+        ge=0,
+        description="레인별로 RQ 큐에 보낸 미완료 스캔 수 상한 — 작을수록 팀 간 공정성이 높다 (0이면 무제한)",
+    )
+    SCAN_SLOT_TTL_SECONDS: int = Field(
+        default=3600,
+        ge=60,
+        description="스캔 슬롯 자동 반납 시간 (워커가 죽어 반납하지 못한 경우)",
+    )
+    SCAN_TEAM_WEIGHTS: dict[str, int] = Field(
+        default={"starter": 1, "growth": 2, "scale": 4, "enterprise": 8},
+        description="팀 플랜별 스케줄링 가중치 (클수록 같은 레인에서 더 자주 선택)",
+    )
+
+    # ---- 스캔 단계 체크포인트 (재시도 시 이어서 실행) ----
+    SCAN_CHECKPOINT_TTL_SECONDS: int = Field(
+        default=6 * 60 * 60,
+        ge=0,
+        description="Semgrep findings / 파일별 LLM 결과 체크포인트 보존 시간 (0이면 체크포인트 미사용)",
+    )
+
     @property
     def is_production(self) -> bool:
         """프로덕션 환경 여부"""
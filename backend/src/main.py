@@ -13,6 +13,10 @@ from src.api.v1.router import api_router
 from src.config import get_settings
 from src.middleware.logging_middleware import LoggingMiddleware
 from src.middleware.rate_limit import rate_limit_middleware
+from src.services.redis_pool import start_redis_pool, stop_redis_pool
+from src.services.secret_scanner import semgrep_rule_configs
+from src.services.semgrep_cache import start_ide_result_cache, stop_ide_result_cache
+from src.services.semgrep_pool import start_ide_semgrep_pool, stop_ide_semgrep_pool
 
 settings = get_settings()
 
@@ -27,19 +31,42 @@ logging.basicConfig(
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """앱 생명주기 이벤트 핸들러.
 
-    startup: DB 연결 풀 초기화, Redis 연결 확인
-    shutdown: 연결 풀 정리
+    startup: DB 연결 풀 초기화, 공용 Redis 연결 풀 생성, IDE Semgrep 워커 풀 / 결과 캐시 시작
+    shutdown: 연결 풀 정리, IDE Semgrep 워커 풀 / 결과 캐시 종료
     """
     # ---- startup ----
-    # Redis URL을 app.state에 저장 (rate_limit_middleware에서 참조)
-    app.state.redis_url = settings.REDIS_URL
     logging.getLogger("vulnix").info(
         "[%s] 서버 시작 중... (env=%s)", settings.APP_NAME, settings.APP_ENV
     )
 
+    # 공용 async Redis 연결 풀 (rate limit, 헬스체크, 작업 등록이 공유)
+    await start_redis_pool()
+
+    # IDE 분석용 Semgrep 워커 풀 (룰 사전 로드) — 실패해도 서버는 계속 기동
+    try:
+        await start_ide_semgrep_pool(
+            size=settings.IDE_SEMGREP_POOL_SIZE,
+            max_jobs_per_worker=settings.IDE_SEMGREP_POOL_MAX_JOBS,
+            max_pending=settings.IDE_SEMGREP_POOL_MAX_PENDING,
+            # 자격증명 룰은 내장 스캐너가 실행하므로 워커에 로드하지 않는다
+            rule_configs=semgrep_rule_configs() if settings.SEMGREP_NATIVE_SECRETS else None,
+        )
+    except Exception as exc:
+        logging.getLogger("vulnix").warning("IDE Semgrep 워커 풀 시작 실패: %s", exc)
+
+    # IDE 분석용 Semgrep 결과 캐시 — Redis 연결 실패 시 캐시 없이 동작
+    await start_ide_result_cache(
+        settings.REDIS_URL,
+        settings.SEMGREP_CACHE_TTL_SECONDS,
+        native_secrets=settings.SEMGREP_NATIVE_SECRETS,
+    )
+
     yield
 
     # ---- shutdown ----
+    await stop_ide_result_cache()
+    await stop_ide_semgrep_pool()
+    await stop_redis_pool()
     logging.getLogger("vulnix").info("[%s] 서버 종료", settings.APP_NAME)
 
 
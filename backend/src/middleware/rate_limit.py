@@ -2,9 +2,10 @@
 import time
 from collections.abc import Callable, Awaitable
 
-import redis.asyncio as aioredis
 from fastapi import HTTPException, Request, Response
 
+from src.services.redis_pool import get_async_redis
+
 # 경로별 rate limit 설정: (최대 요청 수, 윈도우 초)
 RATE_LIMITS: dict[str, tuple[int, int]] = {
     "/api/v1/ide/analyze": (60, 60),
@@ -20,6 +21,7 @@ async def rate_limit_middleware(
     """슬라이딩 윈도우 방식으로 IDE API rate limit을 적용한다.
 
     - API Key 앞 12자 또는 클라이언트 IP를 식별자로 사용
+    - lifespan에서 만든 공용 Redis 연결 풀 사용 (요청마다 연결하지 않음)
     - Redis 오류 발생 시 graceful degradation (rate limit 우회)
     - 초과 시 429 + Retry-After 헤더 반환
     """
@@ -44,8 +46,7 @@ async def rate_limit_middleware(
 
     # Redis 슬라이딩 윈도우 카운팅
     try:
-        redis_url: str = request.app.state.redis_url
-        r = await aioredis.from_url(redis_url)
+        r = get_async_redis()
         key = f"ratelimit:{path}:{identifier}"
         now = int(time.time())
         window_start = now - window
@@ -56,7 +57,6 @@ async def rate_limit_middleware(
         pipe.zcard(key)
         pipe.expire(key, window)
         results = await pipe.execute()
-        await r.aclose()
 
         count: int = results[2]
         if count > max_requests:
@@ -6,7 +6,7 @@ from typing import TYPE_CHECKING
 from datetime import datetime
 
 from sqlalchemy import BigInteger, Boolean, DateTime, ForeignKey, Numeric, String, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.models.base import Base, TimestampMixin, UUIDMixin
@@ -129,6 +129,13 @@ class Repository(UUIDMixin, TimestampMixin, Base):
         comment="초기 전체 스캔 완료 여부",
     )
 
+    # 스캔 제외 경로 (gitignore 형식 glob 목록, 예: ["docs/", "**/fixtures/**"])
+    scan_ignore_patterns: Mapped[list[str] | None] = mapped_column(
+        JSONB,
+        nullable=True,
+        comment="스캔에서 제외할 경로 패턴 (gitignore 형식 glob 목록)",
+    )
+
     # 관계
     team: Mapped["Team"] = relationship("Team", back_populates="repositories")  # noqa: F821
     scan_jobs: Mapped[list["ScanJob"]] = relationship(  # noqa: F821
@@ -66,7 +66,7 @@ class ScanJob(UUIDMixin, TimestampMixin, Base):
         comment="PR 트리거 시 GitHub PR 번호",
     )
 
-    # F-01: 스캔 유형 (full / incremental / pr / initial)
+    # F-01: 스캔 유형 (full / incremental / pr / initial / mapreduce)
     scan_type: Mapped[str] = mapped_column(
         String(20),
         nullable=False,
@@ -125,6 +125,13 @@ class ScanJob(UUIDMixin, TimestampMixin, Base):
         comment="실패 시 에러 메시지",
     )
 
+    # 단계별 소요 시간, 다운로드 바이트, 스캔 파일 수, Claude 호출/토큰/재시도 (JSONB)
+    telemetry: Mapped[dict | None] = mapped_column(
+        JSONB,
+        nullable=True,
+        comment="스캔 단계별 텔레메트리",
+    )
+
     started_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True),
         nullable=True,
@@ -35,6 +35,8 @@ class RepositoryResponse(BaseModel):
     security_score: float | None
     # F-01: 초기 스캔 완료 여부
     is_initial_scan_done: bool = False
+    # 스캔 제외 경로 패턴 (gitignore 형식)
+    scan_ignore_patterns: list[str] = []
     created_at: datetime
 
     model_config = {"from_attributes": True}
@@ -63,6 +65,37 @@ class RepositoryResponse(BaseModel):
         # MagicMock 등 비문자열 값은 None으로 대체
         return None
 
+    @field_validator("scan_ignore_patterns", mode="before")
+    @classmethod
+    def validate_scan_ignore_patterns(cls, value: Any) -> list[str]:
+        """scan_ignore_patterns 필드 유효성 검증.
+
+        컬럼이 NULL이거나 Mock 환경에서 MagicMock 객체가 들어올 경우 빈 목록으로 대체한다.
+        """
+        if isinstance(value, list):
+            return value
+        return []
+
+
+class RepositoryScanIgnoreUpdate(BaseModel):
+    """저장소 스캔 제외 경로 패턴 변경 요청"""
+
+    patterns: list[str] = Field(
+        max_length=200,
+        description="gitignore 형식 제외 패턴 (예: docs/, legacy/**/*.js). 빈 목록이면 제외 패턴 해제",
+    )
+
+    @field_validator("patterns")
+    @classmethod
+    def strip_patterns(cls, value: list[str]) -> list[str]:
+        """앞뒤 공백을 제거하고 빈 패턴 / 주석 / 중복을 버린다."""
+        cleaned: list[str] = []
+        for pattern in value:
+            pattern = pattern.strip()
+            if pattern and not pattern.startswith("#") and pattern not in cleaned:
+                cleaned.append(pattern)
+        return cleaned
+
 
 class RepositorySecurityScore(BaseModel):
     """저장소 보안 점수"""
@@ -30,6 +30,7 @@ class ScanJobResponse(BaseModel):
     false_positives_count: int
     duration_seconds: int | None
     error_message: str | None
+    telemetry: dict | None = None
     started_at: datetime | None
     completed_at: datetime | None
     created_at: datetime
@@ -0,0 +1,107 @@
+"""호스트 CPU 코어 할당기 — 한 호스트의 동시 스캔들이 Semgrep 코어를 나눠 쓴다
+
+워커 호스트에서 여러 스캔이 동시에 돌 때 각 Semgrep 실행이 고정된 --jobs 4를 쓰면
+코어 수보다 많은 프로세스가 경쟁하거나, 반대로 LLM 대기 중인 스캔 때문에 코어가 놀게 된다.
+
+코어마다 잠금 파일(/tmp/vulnix-cores/core-{id}.lock)을 두고 fcntl.flock으로 잡는다.
+- 같은 호스트의 모든 워커 프로세스가 파일 잠금을 공유하므로 별도 조정 프로세스가 없다
+- 프로세스가 죽으면 커널이 잠금을 해제하므로 코어가 영구히 묶이지 않는다
+- Semgrep 단계에서만 코어를 잡고, LLM 단계는 코어 없이 자유롭게 겹친다
+"""
+
+import fcntl
+import logging
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_LOCK_DIR = Path("/tmp/vulnix-cores")
+
+# 빈 코어가 없을 때 재확인 주기
+_POLL_INTERVAL_SEC = 0.2
+
+
+def available_cpu_ids() -> list[int]:
+    """이 프로세스가 사용할 수 있는 CPU ID 목록 (컨테이너 cpuset 반영)."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+class CoreLease:
+    """할당받은 코어 묶음. release()로 반납한다."""
+
+    def __init__(self, cpu_ids: list[int], fds: list[int]) -> None:
+        self.cpu_ids = cpu_ids
+        self._fds = fds
+
+    def release(self) -> None:
+        for fd in self._fds:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            finally:
+                os.close(fd)
+        self._fds = []
+
+
+class CoreAllocator:
+    """파일 잠금 기반 호스트 공유 코어 할당기."""
+
+    def __init__(
+        self,
+        total_cores: int = 0,
+        lock_dir: Path = _LOCK_DIR,
+    ) -> None:
+        cpu_ids = available_cpu_ids()
+        if total_cores > 0:
+            cpu_ids = cpu_ids[:total_cores]
+        self.cpu_ids = cpu_ids
+        self._lock_dir = lock_dir
+        self._lock_dir.mkdir(parents=True, exist_ok=True)
+
+    def try_acquire(self, want: int) -> CoreLease | None:
+        """빈 코어를 최대 want개 잡는다. 하나도 없으면 None."""
+        fds: list[int] = []
+        acquired: list[int] = []
+        for cpu_id in self.cpu_ids:
+            if len(acquired) >= want:
+                break
+            fd = os.open(self._lock_dir / f"core-{cpu_id}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+            fds.append(fd)
+            acquired.append(cpu_id)
+        if not acquired:
+            return None
+        return CoreLease(acquired, fds)
+
+    def acquire(self, want: int) -> CoreLease:
+        """최소 1개, 최대 want개의 코어를 잡을 때까지 대기한다."""
+        want = max(1, min(want, len(self.cpu_ids)))
+        waited = 0.0
+        while True:
+            lease = self.try_acquire(want)
+            if lease is not None:
+                if waited:
+                    logger.info(
+                        f"[CoreAllocator] {waited:.1f}초 대기 후 코어 {len(lease.cpu_ids)}개 할당"
+                    )
+                return lease
+            time.sleep(_POLL_INTERVAL_SEC)
+            waited += _POLL_INTERVAL_SEC
+
+    @contextmanager
+    def lease(self, want: int) -> Iterator[list[int]]:
+        """with 블록 동안 코어를 할당하고 할당된 CPU ID 목록을 넘긴다."""
+        lease = self.acquire(want)
+        try:
+            yield lease.cpu_ids
+        finally:
+            lease.release()
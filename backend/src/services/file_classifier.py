@@ -0,0 +1,280 @@
+"""스캔 제외 파일 분류기 — vendored / generated / minified 파일과 저장소별 제외 경로
+
+node_modules/, vendor/, dist/, 번들(.min.js), protobuf 생성 코드는 고객이 고칠 수 있는 코드가
+아니지만 Semgrep 시간과 LLM 비용을 가장 많이 쓴다. 추출 단계에서 아래 기준으로 걸러
+SemgrepEngine / LLMAgent에 도달하지 않게 한다.
+
+- 경로 (추출 중, 내용을 읽기 전): 저장소 제외 패턴(Repository.scan_ignore_patterns),
+  vendored 디렉토리, 생성 / 번들 파일명 규칙
+- .gitattributes (추출 후): linguist-generated / linguist-vendored 속성
+- 내용 (추출 후, 앞부분만 읽음): 생성 코드 헤더("Code generated ... DO NOT EDIT", @generated),
+  평균 줄 길이(minified), 공백 없는 긴 고엔트로피 줄 비율(내장 데이터 blob)
+
+제외 패턴과 .gitattributes 패턴은 gitignore 형식 glob이다 (/ 없는 패턴은 모든 깊이의
+파일 / 디렉토리 이름과 매칭, ** 지원, 디렉토리와 매칭되면 그 아래 파일 전체 제외).
+"""
+
+import logging
+import math
+import os
+import re
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from src.services.semgrep_engine import list_scannable_files
+
+logger = logging.getLogger(__name__)
+
+# 제외 사유
+REASON_IGNORED = "ignored"        # 저장소 제외 패턴
+REASON_VENDORED = "vendored"
+REASON_GENERATED = "generated"
+REASON_MINIFIED = "minified"
+
+# vendored / 빌드 산출물 디렉토리 (경로 구성요소 이름)
+VENDORED_DIRS: frozenset[str] = frozenset({
+    "node_modules", "bower_components", "jspm_packages", "web_modules",
+    "vendor", "vendors", "third_party", "third-party", "thirdparty",
+    "site-packages", "dist", "Pods", "Carthage",
+})
+
+# 생성 코드 디렉토리
+GENERATED_DIRS: frozenset[str] = frozenset({"__generated__", "generated-sources"})
+
+# 생성 / 번들 파일명 규칙 (소문자 파일명 기준)
+_GENERATED_NAME = re.compile(
+    r"(?:_pb2(?:_grpc)?\.py|\.pb(?:\.gw)?\.go|_grpc\.pb\.go|_pb\.js|_grpc_pb\.js|_pb\.d\.ts"
+    r"|^zz_generated\..*\.go|_generated\.go|\.gen\.go|\.generated\.(?:js|ts|tsx)"
+    r"|^bindata\.go)$"
+)
+_MINIFIED_NAME = re.compile(r"[.-]min\.(?:js|mjs|cjs)$|\.bundle\.(?:js|mjs)$|\.chunk\.js$")
+
+# 생성 코드 헤더 (파일 앞부분에서만 찾는다)
+_GENERATED_HEADER = re.compile(
+    rb"(?i)code generated .{0,80}do not edit|@generated\b|generated by the protocol buffer compiler"
+    rb"|<auto-generated|(?:auto-?generated|generated) (?:file|code)[^\n]{0,80}do not (?:edit|modify)"
+    rb"|do not (?:edit|modify)[^\n]{0,40}(?:auto-?)?generated"
+)
+_HEADER_BYTES = 1024
+
+# 내용 검사에 읽는 최대 바이트
+_SAMPLE_BYTES = 64 * 1024
+
+# 이보다 작은 파일은 minified / blob 검사를 하지 않는다
+_MIN_CONTENT_CHECK_BYTES = 2048
+
+# 평균 줄 길이가 이보다 길면 minified (일반 소스는 40자 안팎)
+_MINIFIED_AVG_LINE = 300
+
+# 공백 없는 긴 줄(base64 / hex 데이터)의 길이 / 문자당 엔트로피 / 파일 내 바이트 비율 기준
+_BLOB_MIN_LINE = 64
+_BLOB_ENTROPY = 4.5
+_BLOB_RATIO = 0.5
+
+_WHITESPACE = re.compile(rb"[ \t]")
+
+
+def compile_glob(pattern: str) -> re.Pattern | None:
+    """gitignore 형식 glob을 상대 경로 정규식으로 변환한다 (빈 패턴 / 주석은 None)."""
+    pattern = pattern.strip()
+    if not pattern or pattern.startswith("#"):
+        return None
+    directory = pattern.endswith("/")
+    pattern = pattern.rstrip("/")
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    if not pattern:
+        return None
+
+    regex = ""
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+        elif pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+        elif pattern[i] == "*":
+            regex += "[^/]*"
+            i += 1
+        elif pattern[i] == "?":
+            regex += "[^/]"
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 1:]:
+            end = pattern.index("]", i + 1)
+            regex += "[" + pattern[i + 1:end].replace("!", "^", 1) + "]"
+            i = end + 1
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+
+    prefix = "" if anchored else "(?:.*/)?"
+    suffix = "/.*" if directory else "(?:/.*)?"
+    return re.compile(f"^{prefix}{regex}{suffix}$")
+
+
+def path_exclusion_reason(rel_path: str) -> str | None:
+    """경로만으로 판별한 제외 사유 (vendored 디렉토리, 생성 / 번들 파일명)."""
+    parts = rel_path.split("/")
+    for part in parts[:-1]:
+        if part in VENDORED_DIRS:
+            return REASON_VENDORED
+        if part in GENERATED_DIRS:
+            return REASON_GENERATED
+    name = parts[-1].lower()
+    if _MINIFIED_NAME.search(name):
+        return REASON_MINIFIED
+    if _GENERATED_NAME.search(name):
+        return REASON_GENERATED
+    return None
+
+
+def content_exclusion_reason(data: bytes) -> str | None:
+    """파일 앞부분(data) 내용으로 판별한 제외 사유 (생성 코드 헤더, minified, 데이터 blob)."""
+    if _GENERATED_HEADER.search(data[:_HEADER_BYTES]):
+        return REASON_GENERATED
+    if len(data) < _MIN_CONTENT_CHECK_BYTES:
+        return None
+    lines = data.split(b"\n")
+    if len(data) / len(lines) > _MINIFIED_AVG_LINE:
+        return REASON_MINIFIED
+    blob_bytes = sum(
+        len(line)
+        for line in lines
+        if len(line) >= _BLOB_MIN_LINE
+        and not _WHITESPACE.search(line)
+        and _entropy(line) >= _BLOB_ENTROPY
+    )
+    if blob_bytes >= len(data) * _BLOB_RATIO:
+        return REASON_GENERATED
+    return None
+
+
+def _entropy(value: bytes) -> float:
+    """문자당 섀넌 엔트로피 (비트)."""
+    total = len(value)
+    return -sum(count / total * math.log2(count / total) for count in Counter(value).values())
+
+
+@dataclass
+class ExclusionStats:
+    """제외한 파일 수 / 바이트 (사유별 파일 수 포함)."""
+
+    files: int = 0
+    bytes: int = 0
+    reasons: dict[str, int] = field(default_factory=dict)
+
+    def add(self, reason: str, size: int) -> None:
+        self.files += 1
+        self.bytes += size
+        self.reasons[reason] = self.reasons.get(reason, 0) + 1
+
+    def merge(self, other: "ExclusionStats") -> None:
+        self.files += other.files
+        self.bytes += other.bytes
+        for reason, count in other.reasons.items():
+            self.reasons[reason] = self.reasons.get(reason, 0) + count
+
+
+class GitAttributes:
+    """저장소의 .gitattributes 파일들에서 linguist-generated / linguist-vendored 속성을 읽는다.
+
+    하위 디렉토리의 .gitattributes는 그 디렉토리 기준 패턴이며, 나중(더 깊은 파일, 아래 줄)에
+    매칭된 설정이 앞의 설정을 덮어쓴다.
+    """
+
+    _ATTRIBUTES = {"linguist-generated": REASON_GENERATED, "linguist-vendored": REASON_VENDORED}
+
+    def __init__(self, rules: list[tuple[str, re.Pattern, dict[str, bool | None]]]) -> None:
+        self._rules = rules
+
+    @classmethod
+    def load(cls, root: Path) -> "GitAttributes":
+        files = sorted(
+            (Path(dirpath) / ".gitattributes" for dirpath, _, names in os.walk(root) if ".gitattributes" in names),
+            key=lambda p: len(p.relative_to(root).parts),
+        )
+        rules: list[tuple[str, re.Pattern, dict[str, bool | None]]] = []
+        for path in files:
+            base = path.parent.relative_to(root).as_posix()
+            prefix = "" if base == "." else base + "/"
+            try:
+                text = path.read_text(encoding="utf-8", errors="replace")
+            except OSError:
+                continue
+            for line in text.splitlines():
+                tokens = line.split()
+                if not tokens or tokens[0].startswith(("#", "[attr]")):
+                    continue
+                attrs = cls._parse_attributes(tokens[1:])
+                regex = compile_glob(tokens[0])
+                if attrs and regex is not None:
+                    rules.append((prefix, regex, attrs))
+        return cls(rules)
+
+    @classmethod
+    def _parse_attributes(cls, tokens: list[str]) -> dict[str, bool | None]:
+        attrs: dict[str, bool | None] = {}
+        for token in tokens:
+            name, _, value = token.partition("=")
+            if name.startswith(("-", "!")):
+                if name[1:] in cls._ATTRIBUTES:
+                    attrs[name[1:]] = False if name[0] == "-" else None
+            elif name in cls._ATTRIBUTES:
+                attrs[name] = value.lower() not in ("false", "0")
+        return attrs
+
+    def reason_for(self, rel_path: str) -> str | None:
+        state: dict[str, bool | None] = {}
+        for prefix, regex, attrs in self._rules:
+            if rel_path.startswith(prefix) and regex.match(rel_path[len(prefix):]):
+                state.update(attrs)
+        for name, reason in self._ATTRIBUTES.items():
+            if state.get(name):
+                return reason
+        return None
+
+
+class FileClassifier:
+    """추출된 checkout에서 스캔하지 않을 파일을 판별하고 제거한다."""
+
+    def __init__(self, ignore_patterns: Iterable[str] | None = None) -> None:
+        patterns = ignore_patterns if isinstance(ignore_patterns, (list, tuple)) else []
+        self._ignore = [
+            regex for regex in (compile_glob(p) for p in patterns if isinstance(p, str)) if regex is not None
+        ]
+
+    def path_reason(self, rel_path: str) -> str | None:
+        """경로만으로 판별한 제외 사유 (추출 전 tar 항목에 사용)."""
+        if any(regex.match(rel_path) for regex in self._ignore):
+            return REASON_IGNORED
+        return path_exclusion_reason(rel_path)
+
+    def exclude(self, root: Path) -> ExclusionStats:
+        """root 아래 스캔 대상 파일 중 제외 대상을 삭제하고 통계를 반환한다 (ADR-003: 즉시 삭제)."""
+        stats = ExclusionStats()
+        attributes = GitAttributes.load(root)
+        for rel_path in list_scannable_files(root):
+            posix_path = Path(rel_path).as_posix()
+            path = root / rel_path
+            reason = self.path_reason(posix_path) or attributes.reason_for(posix_path)
+            try:
+                size = path.stat().st_size
+                if reason is None:
+                    with open(path, "rb") as f:
+                        reason = content_exclusion_reason(f.read(_SAMPLE_BYTES))
+                if reason is None:
+                    continue
+                path.unlink()
+            except OSError as e:
+                logger.warning(f"[FileClassifier] 파일 분류 실패 (스캔 대상 유지): {rel_path}: {e}")
+                continue
+            stats.add(reason, size)
+        if stats.files:
+            logger.info(
+                f"[FileClassifier] 제외: 파일 {stats.files}개 ({stats.bytes}바이트), 사유별 {stats.reasons}"
+            )
+        return stats
@@ -1,7 +1,15 @@
 """GitHub App 연동 서비스 — Webhook 수신, 코드 클론, PR 생성"""
 
+import asyncio
 import base64
+import io
 import logging
+import queue
+import tarfile
+import threading
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
@@ -9,6 +17,8 @@ from typing import Any
 import httpx
 
 from src.config import get_settings
+from src.services.file_classifier import ExclusionStats, FileClassifier
+from src.services.semgrep_engine import MAX_TARGET_BYTES, is_scannable_path
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +27,162 @@ settings = get_settings()
 # Installation Token 캐시 구조: {installation_id: {"token": str, "expires_at": datetime}}
 _token_cache: dict[int, dict[str, Any]] = {}
 
+# tarball 다운로드 청크 크기 (64KB)
+_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# 다운로드 → 추출 파이프에 대기할 수 있는 최대 청크 수 (약 1MB)
+_PIPE_MAX_CHUNKS = 16
+
+
+@dataclass
+class CloneStats:
+    """clone_repository() 결과 통계 (스캔 텔레메트리용)."""
+
+    downloaded_bytes: int   # 다운로드한 tarball 크기
+    extracted_files: int    # 추출한 (스캔 대상) 파일 수
+    skipped_files: int      # 크기/확장자로 제외한 파일 수
+    excluded_files: int = 0     # vendored / generated / minified / 저장소 제외 패턴으로 제외한 파일 수
+    excluded_bytes: int = 0     # 위 파일들의 크기 합
+
+
+class _TarballPipe(io.RawIOBase):
+    """비동기 다운로드 청크를 동기 tarfile 스트림 리더로 전달하는 파이프.
+
+    이벤트 루프가 feed()로 청크를 넣고, 추출 스레드가 read()로 소비한다.
+    큐 크기를 제한하여 다운로드가 추출보다 빠를 때도 메모리 사용량이 늘지 않는다.
+    """
+
+    def __init__(self, max_chunks: int = _PIPE_MAX_CHUNKS) -> None:
+        super().__init__()
+        self._queue: queue.Queue[bytes | None] = queue.Queue(maxsize=max_chunks)
+        self._buffer = memoryview(b"")
+        self._eof = False
+        self._cancelled = threading.Event()   # 다운로드 측 중단
+        self._finished = threading.Event()   # 추출 측 종료
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b: Any) -> int:
+        while not self._buffer:
+            if self._eof:
+                return 0
+            try:
+                chunk = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                if self._cancelled.is_set():
+                    raise OSError("tarball 다운로드가 중단되었습니다")
+                continue
+            if chunk is None:
+                self._eof = True
+            else:
+                self._buffer = memoryview(chunk)
+
+        size = min(len(b), len(self._buffer))
+        b[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+    def try_feed(self, chunk: bytes | None) -> bool:
+        """큐에 여유가 있으면 블로킹 없이 청크를 넣는다."""
+        try:
+            self._queue.put_nowait(chunk)
+            return True
+        except queue.Full:
+            return False
+
+    def feed(self, chunk: bytes | None) -> bool:
+        """청크를 넣는다 (None은 EOF). 추출 측이 이미 종료되었으면 False를 반환한다."""
+        while not self._finished.is_set():
+            try:
+                self._queue.put(chunk, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def cancel(self) -> None:
+        """다운로드 실패 시 추출 스레드를 깨워 종료시킨다."""
+        self._cancelled.set()
+
+    def finish(self) -> None:
+        """추출 스레드 종료를 알려 다운로드 측이 더 이상 대기하지 않게 한다."""
+        self._finished.set()
+
+    @property
+    def finished(self) -> bool:
+        return self._finished.is_set()
+
+
+def _extract_tarball_stream(
+    pipe: _TarballPipe,
+    target_dir: Path,
+    include: set[str] | None = None,
+    classifier: FileClassifier | None = None,
+) -> tuple[int, int, ExclusionStats]:
+    """gzip tarball 스트림을 한 번만 읽으면서 target_dir에 추출한다.
+
+    - GitHub tarball의 루트 디렉토리(예: owner-repo-abc1234/)를 제거한다
+    - 일반 파일만 추출하고, Semgrep --max-target-bytes를 넘거나
+      룰 팩이 다루지 않는 확장자의 파일은 건너뛴다
+    - include가 주어지면 그 목록의 파일(저장소 루트 기준 상대 경로)만 추출한다
+      (map-reduce 스캔의 샤드 잡)
+    - classifier가 주어지면 경로로 판별되는 제외 파일(vendored 디렉토리, 번들 / 생성 파일명,
+      저장소 제외 패턴)은 추출하지 않고, 추출이 끝난 뒤 .gitattributes와 파일 내용으로
+      판별되는 제외 파일을 삭제한다
+
+    Returns:
+        (추출한 파일 수, 건너뛴 파일 수, 제외 통계)
+
+    Raises:
+        RuntimeError: tarball에 항목이 하나도 없을 때
+    """
+    extracted = 0
+    skipped = 0
+    excluded = ExclusionStats()
+    root_prefix: str | None = None
+
+    try:
+        with tarfile.open(fileobj=pipe, mode="r|gz") as tar:
+            for member in tar:
+                if root_prefix is None:
+                    root_prefix = member.name.split("/")[0] + "/"
+
+                if member.name.startswith(root_prefix):
+                    member.name = member.name[len(root_prefix):]
+                if not member.name or not member.isfile():
+                    continue
+
+                if include is not None and member.name not in include:
+                    continue
+                if classifier is not None and Path(member.name).name == ".gitattributes":
+                    # linguist 속성은 추출이 끝난 뒤 분류에 사용 (스캔 대상 아님)
+                    tar.extract(member, path=target_dir, filter="data")
+                    continue
+                if member.size > MAX_TARGET_BYTES or not is_scannable_path(member.name):
+                    skipped += 1
+                    continue
+                if classifier is not None:
+                    reason = classifier.path_reason(member.name)
+                    if reason is not None:
+                        excluded.add(reason, member.size)
+                        continue
+
+                tar.extract(member, path=target_dir, filter="data")
+                extracted += 1
+    finally:
+        pipe.finish()
+
+    if root_prefix is None:
+        raise RuntimeError("빈 tarball")
+
+    if classifier is not None:
+        removed = classifier.exclude(target_dir)
+        extracted -= removed.files
+        excluded.merge(removed)
+
+    return extracted, skipped, excluded
+
 
 class GitHubAppService:
     """GitHub App API 연동 서비스.
@@ -30,9 +196,23 @@ class GitHubAppService:
     주요 기술: PyJWT + httpx + GitHub REST API v3
     """
 
-    def __init__(self) -> None:
+    def __init__(self, http_client: httpx.AsyncClient | None = None) -> None:
         self._app_id = settings.GITHUB_APP_ID
         self._private_key = settings.GITHUB_APP_PRIVATE_KEY
+        # 상주 워커가 주입하는 공유 클라이언트 (None이면 호출마다 생성)
+        self._http = http_client
+
+    @asynccontextmanager
+    async def _http_client(self) -> AsyncIterator[httpx.AsyncClient]:
+        """GitHub API 호출용 HTTP 클라이언트를 반환한다.
+
+        공유 클라이언트가 주입되어 있으면 연결 풀을 재사용하고 닫지 않는다.
+        """
+        if self._http is not None:
+            yield self._http
+            return
+        async with httpx.AsyncClient() as client:
+            yield client
 
     def _generate_jwt(self) -> str:
         """GitHub App JWT를 생성한다.
@@ -91,7 +271,7 @@ class GitHubAppService:
         # 새 토큰 발급
         jwt_token = self._generate_jwt()
 
-        async with httpx.AsyncClient() as client:
+        async with self._http_client() as client:
             response = await client.post(
                 f"https://api.github.com/app/installations/{installation_id}/access_tokens",
                 headers={
@@ -122,7 +302,7 @@ class GitHubAppService:
             installation 정보 목록 (id, account, ...)
         """
         jwt_token = self._generate_jwt()
-        async with httpx.AsyncClient() as client:
+        async with self._http_client() as client:
             response = await client.get(
                 "https://api.github.com/app/installations",
                 headers={
@@ -149,7 +329,7 @@ class GitHubAppService:
         repos: list[dict] = []
         page = 1
 
-        async with httpx.AsyncClient() as client:
+        async with self._http_client() as client:
             while True:
                 response = await client.get(
                     "https://api.github.com/installation/repositories",
@@ -201,7 +381,7 @@ class GitHubAppService:
         files: list[str] = []
         page = 1
 
-        async with httpx.AsyncClient() as client:
+        async with self._http_client() as client:
             while True:
                 response = await client.get(
                     f"https://api.github.com/repos/{full_name}/pulls/{pr_number}/files",
@@ -242,7 +422,7 @@ class GitHubAppService:
         """
         token = await self.get_installation_token(installation_id)
 
-        async with httpx.AsyncClient() as client:
+        async with self._http_client() as client:
             response = await client.get(
                 f"https://api.github.com/repos/{full_name}/branches/{branch}",
                 headers={
@@ -262,64 +442,91 @@ class GitHubAppService:
         installation_id: int,
         commit_sha: str,
         target_dir: Path,
-    ) -> None:
+        include: set[str] | None = None,
+        classifier: FileClassifier | None = None,
+    ) -> CloneStats:
         """저장소를 특정 커밋 기준으로 임시 디렉토리에 다운로드한다.
 
         GitHub API의 tarball 엔드포인트를 사용해 git 바이너리 없이 저장소를
         다운로드하고 target_dir에 압축 해제한다. private repo도 지원.
+        tarball 전체를 메모리나 디스크에 올리지 않고 다운로드 스트림을 그대로
+        압축 해제하며, Semgrep이 스캔하지 않을 파일은 추출하지 않는다.
 
         Args:
             full_name: 저장소 전체 이름 (예: org/repo-name)
             installation_id: GitHub App 설치 ID
             commit_sha: 대상 커밋 SHA (빈 문자열이면 HEAD 사용)
             target_dir: 압축 해제할 로컬 디렉토리 경로
-        """
-        import tarfile
-        import tempfile
+            include: 추출할 파일 경로 집합 (None이면 스캔 대상 전체)
+            classifier: vendored / generated / minified 파일 분류기 (None이면 분류하지 않음)
 
+        Returns:
+            다운로드 바이트 / 추출 파일 수 통계
+        """
         token = await self.get_installation_token(installation_id)
         ref = commit_sha if commit_sha else "HEAD"
 
         target_dir.mkdir(parents=True, exist_ok=True)
 
-        # GitHub API tarball 다운로드 (리다이렉트 자동 추적)
-        async with httpx.AsyncClient(follow_redirects=True, timeout=120.0) as client:
-            response = await client.get(
-                f"https://api.github.com/repos/{full_name}/tarball/{ref}",
-                headers={
-                    "Authorization": f"token {token}",
-                    "Accept": "application/vnd.github+json",
-                    "X-GitHub-Api-Version": "2022-11-28",
-                },
-            )
-            response.raise_for_status()
-            tarball_bytes = response.content
-
-        # 임시 파일에 tarball 저장 후 압축 해제
-        with tempfile.NamedTemporaryFile(suffix=".tar.gz", delete=False) as tmp:
-            tmp.write(tarball_bytes)
-            tmp_path = Path(tmp.name)
+        # 다운로드와 추출을 동시에 진행: 응답 청크를 파이프로 흘려 보내고
+        # 별도 스레드에서 스트리밍 tar 리더("r|gz")로 한 번에 압축 해제한다
+        pipe = _TarballPipe()
+        extract_task = asyncio.create_task(
+            asyncio.to_thread(_extract_tarball_stream, pipe, target_dir, include, classifier)
+        )
+        downloaded_bytes = 0
 
         try:
-            with tarfile.open(tmp_path, "r:gz") as tar:
-                members = tar.getmembers()
-                if not members:
-                    raise RuntimeError(f"빈 tarball: {full_name}@{ref}")
-
-                # GitHub tarball의 루트 디렉토리 이름 (예: owner-repo-abc1234/)
-                root_prefix = members[0].name.split("/")[0] + "/"
-
-                # 루트 디렉토리를 제거하고 target_dir에 직접 추출
-                for member in members:
-                    if member.name.startswith(root_prefix):
-                        member.name = member.name[len(root_prefix):]
-                    if not member.name:
-                        continue
-                    tar.extract(member, path=target_dir, filter="data")
-        finally:
-            tmp_path.unlink(missing_ok=True)
-
+            # GitHub API tarball 다운로드 (리다이렉트 자동 추적)
+            async with self._http_client() as client:
+                async with client.stream(
+                    "GET",
+                    f"https://api.github.com/repos/{full_name}/tarball/{ref}",
+                    headers={
+                        "Authorization": f"token {token}",
+                        "Accept": "application/vnd.github+json",
+                        "X-GitHub-Api-Version": "2022-11-28",
+                    },
+                    follow_redirects=True,
+                    timeout=120.0,
+                ) as response:
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes(_DOWNLOAD_CHUNK_SIZE):
+                        downloaded_bytes += len(chunk)
+                        if pipe.try_feed(chunk):
+                            continue
+                        # 추출이 밀려 파이프가 가득 찼으면 여유가 생길 때까지 대기
+                        if not await asyncio.to_thread(pipe.feed, chunk):
+                            break  # 추출 스레드가 먼저 종료됨 (에러는 아래에서 전파)
+        except BaseException:
+            pipe.cancel()
+            try:
+                await extract_task
+            except Exception:
+                pass
+            raise
+
+        # EOF 전달 후 추출 완료 대기
+        if not pipe.try_feed(None):
+            await asyncio.to_thread(pipe.feed, None)
+        try:
+            extracted, skipped, excluded = await extract_task
+        except RuntimeError as e:
+            raise RuntimeError(f"{e}: {full_name}@{ref}") from e
+
+        logger.info(
+            f"[GitHubApp] tarball 추출: {downloaded_bytes}바이트 다운로드, "
+            f"{extracted}개 파일 추출, {skipped}개 파일 제외 (크기/확장자), "
+            f"{excluded.files}개 파일 ({excluded.bytes}바이트) 제외 (vendored/generated/minified)"
+        )
         logger.info(f"[GitHubApp] 저장소 클론 완료: {full_name}@{ref} → {target_dir}")
+        return CloneStats(
+            downloaded_bytes=downloaded_bytes,
+            extracted_files=extracted,
+            skipped_files=skipped,
+            excluded_files=excluded.files,
+            excluded_bytes=excluded.bytes,
+        )
 
     async def create_patch_pr(
         self,
@@ -356,7 +563,7 @@ class GitHubAppService:
         """
         token = await self.get_installation_token(installation_id)
 
-        async with httpx.AsyncClient() as client:
+        async with self._http_client() as client:
             try:
                 response = await client.post(
                     f"https://api.github.com/repos/{full_name}/git/refs",
@@ -426,7 +633,7 @@ class GitHubAppService:
         """
         token = await self.get_installation_token(installation_id)
 
-        async with httpx.AsyncClient() as client:
+        async with self._http_client() as client:
             response = await client.get(
                 f"https://api.github.com/repos/{full_name}/contents/{file_path}",
                 headers={
@@ -480,7 +687,7 @@ class GitHubAppService:
         # 파일 내용을 base64로 인코딩
         encoded_content = base64.b64encode(content.encode("utf-8")).decode("utf-8")
 
-        async with httpx.AsyncClient() as client:
+        async with self._http_client() as client:
             response = await client.put(
                 f"https://api.github.com/repos/{full_name}/contents/{file_path}",
                 headers={
@@ -526,7 +733,7 @@ class GitHubAppService:
         """
         token = await self.get_installation_token(installation_id)
 
-        async with httpx.AsyncClient() as client:
+        async with self._http_client() as client:
             response = await client.post(
                 f"https://api.github.com/repos/{full_name}/pulls",
                 headers={
@@ -553,7 +760,7 @@ class GitHubAppService:
         if labels:
             pr_number = data["number"]
             try:
-                async with httpx.AsyncClient() as client:
+                async with self._http_client() as client:
                     label_response = await client.post(
                         f"https://api.github.com/repos/{full_name}/issues/{pr_number}/labels",
                         headers={
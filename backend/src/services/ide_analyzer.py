@@ -1,4 +1,8 @@
-"""IDE 분석 서비스 — Semgrep 실행 + FP 필터 + 패치 제안"""
+"""IDE 분석 서비스 — Semgrep 실행 + FP 필터 + 패치 제안
+
+하드코딩 자격증명 룰은 Semgrep 기동을 기다리지 않고 내장 스캐너(secret_scanner)로
+요청 내용을 바로 검사한다. Semgrep이 타임아웃되어도 자격증명 findings는 응답에 포함된다.
+"""
 
 import asyncio
 import hashlib
@@ -11,10 +15,15 @@ from pathlib import Path
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.config import get_settings
 from src.models.false_positive import FalsePositivePattern
-from src.services.semgrep_engine import SemgrepEngine
+from src.services.semgrep_engine import SemgrepEngine, SemgrepFinding
+from src.services.semgrep_cache import get_ide_result_cache
+from src.services.semgrep_pool import get_ide_semgrep_pool
+from src.services.secret_scanner import get_secret_scanner
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 # IDE 분석 타임아웃 (500ms)
 _IDE_ANALYZE_TIMEOUT_SEC = 0.5
@@ -28,7 +37,7 @@ class IdeAnalyzerService:
 
     def __init__(self, db: AsyncSession) -> None:
         self._db = db
-        self._engine = SemgrepEngine()
+        self._engine = SemgrepEngine(native_secrets=settings.SEMGREP_NATIVE_SECRETS)
 
     async def analyze(
         self,
@@ -53,20 +62,53 @@ class IdeAnalyzerService:
         temp_dir = Path(f"/tmp/vulnix-ide-{request_id}")
 
         try:
-            # 임시 파일 생성
-            temp_dir.mkdir(parents=True, exist_ok=True)
             ext = _language_to_ext(language)
-            temp_file = temp_dir / f"code{ext}"
-            temp_file.write_text(content, encoding="utf-8")
 
             # 팀 FP 패턴 조회
             fp_patterns = await self._get_fp_patterns(team_id)
 
-            # Semgrep 실행 (타임아웃 500ms)
-            raw_findings = await self._run_semgrep_with_timeout(
-                temp_dir=temp_dir,
-                request_id=request_id,
-            )
+            # 자격증명 룰은 내장 스캐너로 바로 검사 (Semgrep 결과의 같은 룰 ID는 버린다 —
+            # 내장 스캐너를 켜기 전에 캐시된 결과와 중복되지 않도록)
+            secret_findings: list[SemgrepFinding] = []
+            native_rule_ids: frozenset[str] = frozenset()
+            if settings.SEMGREP_NATIVE_SECRETS:
+                scanner = get_secret_scanner()
+                native_rule_ids = scanner.finding_rule_ids
+                secret_findings = scanner.scan_bytes(content.encode("utf-8"), f"code{ext}")
+
+            # 같은 내용 + 같은 룰셋이면 캐시된 결과 재사용 (코드 원문은 캐시하지 않음)
+            cache = get_ide_result_cache()
+            blob_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+            scanned: list[SemgrepFinding] | None = None
+            if cache is not None:
+                scanned = await cache.get_findings(blob_hash, ext, f"code{ext}", content)
+
+            if scanned is None:
+                # Semgrep 실행 (타임아웃 500ms)
+                # 워커 풀이 있으면 룰이 로드된 워커 사용, 없으면 임시 파일 + semgrep scan
+                pool = get_ide_semgrep_pool()
+                if pool is not None:
+                    scanned = await self._run_semgrep_pool(
+                        content=content,
+                        ext=ext,
+                        request_id=request_id,
+                    )
+                else:
+                    temp_dir.mkdir(parents=True, exist_ok=True)
+                    temp_file = temp_dir / f"code{ext}"
+                    temp_file.write_text(content, encoding="utf-8")
+                    scanned = await self._run_semgrep_with_timeout(
+                        temp_dir=temp_dir,
+                        request_id=request_id,
+                    )
+                # 타임아웃/실패(None)는 캐시하지 않음
+                if scanned is not None and cache is not None:
+                    await cache.put_findings(blob_hash, ext, scanned)
+
+            raw_findings = [
+                _finding_to_dict(f)
+                for f in secret_findings + [f for f in scanned or [] if f.rule_id not in native_rule_ids]
+            ]
 
             # FP 필터링 적용
             resolved_file_path = file_path or f"code{ext}"
@@ -96,44 +138,50 @@ class IdeAnalyzerService:
         self,
         temp_dir: Path,
         request_id: str,
-    ) -> list[dict]:
+    ) -> list[SemgrepFinding] | None:
         """Semgrep을 타임아웃 내에 실행한다.
 
-        타임아웃 초과 시 빈 목록 반환 (graceful degradation).
+        타임아웃 초과 또는 실행 실패 시 None 반환 (graceful degradation).
         """
         try:
             loop = asyncio.get_event_loop()
-            findings = await asyncio.wait_for(
+            return await asyncio.wait_for(
                 loop.run_in_executor(
                     None,
                     lambda: self._engine.scan(temp_dir, request_id),
                 ),
                 timeout=_IDE_ANALYZE_TIMEOUT_SEC,
             )
-            return [
-                {
-                    "rule_id": f.rule_id,
-                    "severity": f.severity.lower(),
-                    "message": f.message,
-                    "file_path": f.file_path,
-                    "start_line": f.start_line,
-                    "end_line": f.end_line,
-                    "start_col": 0,
-                    "end_col": 0,
-                    "code_snippet": f.code_snippet,
-                    "cwe_id": f.cwe[0] if f.cwe else "",
-                    "owasp_category": "",
-                    "vulnerability_type": _rule_id_to_vuln_type(f.rule_id),
-                    "is_false_positive_filtered": False,
-                }
-                for f in findings
-            ]
         except asyncio.TimeoutError:
             logger.warning(f"[IdeAnalyzer] Semgrep 타임아웃 (500ms 초과) request_id={request_id}")
-            return []
+            return None
         except RuntimeError as e:
             logger.warning(f"[IdeAnalyzer] Semgrep 실행 실패: {e}")
-            return []
+            return None
+
+    async def _run_semgrep_pool(
+        self,
+        content: str,
+        ext: str,
+        request_id: str,
+    ) -> list[SemgrepFinding] | None:
+        """룰이 미리 로드된 Semgrep 워커 풀에서 타임아웃 내에 분석한다.
+
+        타임아웃 초과 또는 풀 대기열 초과 시 None 반환 (graceful degradation).
+        """
+        pool = get_ide_semgrep_pool()
+        if pool is None:
+            return None
+        try:
+            return await pool.scan(content, ext, timeout=_IDE_ANALYZE_TIMEOUT_SEC)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"[IdeAnalyzer] Semgrep 풀 타임아웃 (500ms 초과) request_id={request_id}"
+            )
+            return None
+        except RuntimeError as e:
+            logger.warning(f"[IdeAnalyzer] Semgrep 풀 실행 실패: {e}")
+            return None
 
     async def _get_fp_patterns(self, team_id: uuid.UUID) -> list:
         """팀의 활성 FP 패턴을 조회한다."""
@@ -190,6 +238,25 @@ class IdeAnalyzerService:
         }
 
 
+def _finding_to_dict(f: SemgrepFinding) -> dict:
+    """SemgrepFinding을 IDE 응답용 딕셔너리로 변환한다."""
+    return {
+        "rule_id": f.rule_id,
+        "severity": f.severity.lower(),
+        "message": f.message,
+        "file_path": f.file_path,
+        "start_line": f.start_line,
+        "end_line": f.end_line,
+        "start_col": 0,
+        "end_col": 0,
+        "code_snippet": f.code_snippet,
+        "cwe_id": f.cwe[0] if f.cwe else "",
+        "owasp_category": "",
+        "vulnerability_type": _rule_id_to_vuln_type(f.rule_id),
+        "is_false_positive_filtered": False,
+    }
+
+
 def _language_to_ext(language: str) -> str:
     """언어명을 파일 확장자로 변환한다."""
     mapping = {
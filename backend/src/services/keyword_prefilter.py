@@ -0,0 +1,345 @@
+"""룰 키워드 사전 필터 — 어떤 룰도 매칭될 수 없는 파일을 Semgrep에 넘기기 전에 제외
+
+checkout의 대부분 파일에는 룰이 찾는 sink(execute(, innerHTML, mark_safe, MessageDigest,
+exec.Command 등)가 하나도 없지만 Semgrep은 모든 파일을 파싱한다.
+룰마다 "매칭되려면 파일에 반드시 있어야 하는 리터럴" 후보를 뽑아 두고,
+파일 바이트에 그중 하나도 없으면 Semgrep 대상에서 뺀다.
+
+- pattern: 문자열 / 메타변수를 제외한 식별자 중 가장 긴 것, 언어 키워드는 후순위
+  (패턴의 식별자는 import 별칭을 쓰더라도 파일 어딘가에 그대로 나타난다)
+- pattern-either: 하위 패턴 후보의 합집합
+- patterns: 긍정 조건(pattern, pattern-inside 등) 중 가장 선택적인 조건의 후보
+- pattern-regex: 정규식에서 반드시 나타나는 리터럴 (대안 그룹은 합집합)
+- 후보를 뽑을 수 없는 룰(대소문자 무시 정규식, taint 모드 등)이 있는 언어는 필터링하지 않는다
+
+언어별 키워드는 하나의 리터럴 대안 정규식으로 컴파일하고, 파일은 mmap으로 열어 C 수준의
+바이트 검색 한 번으로 판정한다 (어떤 키워드든 하나만 있으면 통과이므로 첫 매칭에서 멈춘다).
+파일이 많으면 프로세스 풀에서 나눠 검사한다.
+"""
+
+import logging
+import mmap
+import multiprocessing
+import re
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+import yaml
+
+from src.services.rule_registry import LANGUAGE_EXTENSIONS, RULES_DIR, get_rule_registry, language_for_path
+
+logger = logging.getLogger(__name__)
+
+# 이보다 짧은 정규식 리터럴은 거의 모든 파일에 나타나므로 후보로 쓰지 않는다
+_MIN_REGEX_LITERAL = 3
+
+# 파일이 이 수 이상이면 프로세스 풀에서 검사
+_POOL_MIN_FILES = 2000
+
+# 프로세스 풀 작업 단위 (파일 수)
+_POOL_CHUNK_FILES = 500
+
+# 긍정 조건 연산자 (patterns 안에서 매칭에 필요한 조건)
+_POSITIVE_KEYS = ("pattern", "pattern-inside", "pattern-either", "patterns", "pattern-regex")
+
+_STRING_LITERAL = re.compile(
+    r"""[rRbBfFuU]{0,2}(?:"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|`(?:\\.|[^`\\])*`)"""
+)
+_IDENTIFIER = re.compile(r"(?<![$\w])[A-Za-z_]\w*")
+
+# 거의 모든 파일에 나타나는 언어 키워드 — 다른 식별자가 있으면 후보로 쓰지 않는다
+_COMMON_IDENTIFIERS = frozenset({
+    "const", "let", "var", "new", "return", "function", "func", "def", "class",
+    "import", "from", "String", "string", "int", "byte", "self", "this", "true", "false",
+})
+
+
+def pattern_keywords(pattern: str) -> frozenset[str] | None:
+    """semgrep 패턴이 매칭되려면 파일에 있어야 하는 식별자 1개. 없으면 None."""
+    code = _STRING_LITERAL.sub(" ", pattern)
+    identifiers = _IDENTIFIER.findall(code)
+    if not identifiers:
+        return None
+    specific = [name for name in identifiers if name not in _COMMON_IDENTIFIERS]
+    return frozenset({max(specific or identifiers, key=len)})
+
+
+def regex_keywords(regex: str) -> frozenset[str] | None:
+    """정규식이 매칭되려면 나타나야 하는 리터럴 후보 (하나 이상 존재). 뽑을 수 없으면 None."""
+    if "(?i" in regex:
+        return None
+    branches = _split_alternation(regex)
+    if len(branches) > 1:
+        return _union(regex_keywords(branch) for branch in branches)
+
+    candidates: list[frozenset[str]] = []
+    run = ""
+    i = 0
+
+    def flush() -> None:
+        nonlocal run
+        if len(run) >= _MIN_REGEX_LITERAL:
+            candidates.append(frozenset({run}))
+        run = ""
+
+    while i < len(regex):
+        char = regex[i]
+        if char == "\\" and i + 1 < len(regex):
+            escaped = regex[i + 1]
+            i += 2
+            if escaped.isalnum():
+                # \s, \d, \b, 역참조 등은 리터럴이 아니다
+                flush()
+                continue
+            char = escaped
+        elif char == "(":
+            end = _group_end(regex, i)
+            inner = regex[i + 1:end]
+            i, optional = _skip_quantifier(regex, end + 1)
+            flush()
+            if inner.startswith("?:"):
+                inner = inner[2:]
+            elif inner.startswith("?"):
+                continue   # 전후방 탐색 / 이름 있는 그룹 등
+            if not optional:
+                group = regex_keywords(inner)
+                if group is not None:
+                    candidates.append(group)
+            continue
+        elif char == "[":
+            i, _ = _skip_quantifier(regex, _class_end(regex, i) + 1)
+            flush()
+            continue
+        elif char in ".^$":
+            i, _ = _skip_quantifier(regex, i + 1)
+            flush()
+            continue
+        else:
+            i += 1
+
+        # 리터럴 문자 1개 — 바로 뒤 수량자에 따라 처리
+        next_i, optional = _skip_quantifier(regex, i)
+        if next_i == i:
+            run += char
+            continue
+        if not optional:
+            run += char
+        flush()
+        i = next_i
+    flush()
+
+    if not candidates:
+        return None
+    return max(candidates, key=lambda c: min(len(k) for k in c))
+
+
+def rule_keywords(rule: dict) -> frozenset[str] | None:
+    """룰이 매칭되려면 파일에 있어야 하는 리터럴 후보. 뽑을 수 없으면 None."""
+    if rule.get("mode", "search") != "search":
+        return None
+    return _operator_keywords(rule)
+
+
+def _operator_keywords(node: dict) -> frozenset[str] | None:
+    if "pattern" in node:
+        return pattern_keywords(str(node["pattern"]))
+    if "pattern-inside" in node:
+        return pattern_keywords(str(node["pattern-inside"]))
+    if "pattern-regex" in node:
+        return regex_keywords(str(node["pattern-regex"]))
+    if "pattern-either" in node:
+        return _union(_operator_keywords(child) for child in node["pattern-either"] or [])
+    if "patterns" in node:
+        conjuncts = [
+            _operator_keywords(child)
+            for child in node["patterns"] or []
+            if any(key in child for key in _POSITIVE_KEYS)
+        ]
+        known = [c for c in conjuncts if c is not None]
+        if not known:
+            return None
+        # 모든 긍정 조건이 만족해야 하므로 가장 선택적인(짧은 키워드가 긴) 조건 하나면 충분
+        return max(known, key=lambda c: min(len(k) for k in c))
+    return None
+
+
+def _union(parts: Iterable[frozenset[str] | None]) -> frozenset[str] | None:
+    result: set[str] = set()
+    for part in parts:
+        if part is None:
+            return None
+        result |= part
+    return frozenset(result) if result else None
+
+
+def _split_alternation(regex: str) -> list[str]:
+    """최상위 '|'로 정규식을 나눈다."""
+    branches: list[str] = []
+    depth = 0
+    start = 0
+    i = 0
+    while i < len(regex):
+        char = regex[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "[":
+            i = _class_end(regex, i) + 1
+            continue
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            branches.append(regex[start:i])
+            start = i + 1
+        i += 1
+    branches.append(regex[start:])
+    return branches
+
+
+def _group_end(regex: str, start: int) -> int:
+    """start의 '('에 짝이 맞는 ')' 위치."""
+    depth = 0
+    i = start
+    while i < len(regex):
+        char = regex[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "[":
+            i = _class_end(regex, i) + 1
+            continue
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return len(regex)
+
+
+def _class_end(regex: str, start: int) -> int:
+    """start의 '['에 짝이 맞는 ']' 위치."""
+    i = start + 1
+    if i < len(regex) and regex[i] == "^":
+        i += 1
+    if i < len(regex) and regex[i] == "]":
+        i += 1
+    while i < len(regex):
+        if regex[i] == "\\":
+            i += 2
+            continue
+        if regex[i] == "]":
+            return i
+        i += 1
+    return len(regex)
+
+
+def _skip_quantifier(regex: str, i: int) -> tuple[int, bool]:
+    """i 위치의 수량자를 건너뛴다. (다음 위치, 0회 허용 여부)."""
+    if i >= len(regex):
+        return i, False
+    char = regex[i]
+    if char in "*?+":
+        optional = char != "+"
+        i += 1
+    elif char == "{":
+        match = re.match(r"\{(\d*)(?:,\d*)?\}", regex[i:])
+        if match is None:
+            return i, False
+        optional = match.group(1) in ("", "0")
+        i += match.end()
+    else:
+        return i, False
+    if i < len(regex) and regex[i] in "?+":
+        i += 1   # lazy / possessive
+    return i, optional
+
+
+@dataclass(frozen=True)
+class KeywordIndex:
+    """언어별 키워드 대안 정규식 (None이면 해당 언어 파일은 모두 통과)."""
+
+    patterns: dict[str, re.Pattern | None]
+
+    def may_match(self, path: str) -> bool:
+        """파일에 룰 키워드가 하나라도 있는지 (룰이 없는 언어는 False)."""
+        language = language_for_path(path)
+        if language is None or language not in self.patterns:
+            return False
+        pattern = self.patterns[language]
+        if pattern is None:
+            return True
+        try:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return pattern.search(data) is not None
+        except ValueError:
+            return False   # 빈 파일 (mmap 불가)
+        except OSError:
+            return True    # 읽지 못한 파일은 Semgrep이 판단
+
+    def filter(self, paths: list[str], workers: int = 1) -> list[str]:
+        """룰 키워드가 있는 파일만 순서대로 남긴다."""
+        if workers <= 1 or len(paths) < _POOL_MIN_FILES:
+            return [path for path in paths if self.may_match(path)]
+        chunks = [paths[i:i + _POOL_CHUNK_FILES] for i in range(0, len(paths), _POOL_CHUNK_FILES)]
+        # spawn: 스캔 스레드 / 이벤트 루프가 있는 워커 프로세스를 fork하지 않는다
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            kept = pool.map(_filter_chunk, [self] * len(chunks), chunks)
+            return [path for chunk in kept for path in chunk]
+
+
+def _filter_chunk(index: KeywordIndex, paths: list[str]) -> list[str]:
+    return [path for path in paths if index.may_match(path)]
+
+
+def build_keyword_index(
+    rules_dir: Path = RULES_DIR,
+    exclude_packs: frozenset[str] = frozenset(),
+) -> KeywordIndex:
+    """룰 디렉토리의 룰에서 언어별 키워드 정규식을 만든다.
+
+    exclude_packs(룰 디렉토리 기준 경로)의 룰은 Semgrep으로 실행하지 않으므로 제외한다.
+    """
+    keywords: dict[str, set[str] | None] = {}
+    for pack in get_rule_registry(rules_dir).packs:
+        if pack.relative_path in exclude_packs:
+            continue
+        rules = (yaml.safe_load(pack.path.read_bytes()) or {}).get("rules") or []
+        for rule in rules:
+            found = rule_keywords(rule)
+            for language in rule.get("languages") or []:
+                if language not in LANGUAGE_EXTENSIONS:
+                    continue
+                if found is None:
+                    if language not in keywords or keywords[language] is not None:
+                        logger.info(
+                            f"[KeywordPrefilter] 키워드를 뽑을 수 없는 룰 {rule.get('id')} — "
+                            f"{language} 파일은 필터링하지 않음"
+                        )
+                    keywords[language] = None
+                elif keywords.get(language, set()) is not None:
+                    keywords.setdefault(language, set()).update(found)
+    return KeywordIndex(
+        patterns={
+            language: None if words is None else re.compile(
+                b"|".join(re.escape(w.encode("utf-8")) for w in sorted(words, key=len, reverse=True))
+            )
+            for language, words in keywords.items()
+        }
+    )
+
+
+@lru_cache
+def get_keyword_index(
+    rules_dir: Path = RULES_DIR,
+    exclude_packs: frozenset[str] = frozenset(),
+) -> KeywordIndex:
+    """프로세스 공용 키워드 인덱스."""
+    return build_keyword_index(rules_dir, exclude_packs)
@@ -3,11 +3,15 @@
 import asyncio
 import json
 import logging
+from collections.abc import Awaitable, Callable
 from dataclasses import dataclass, field
 
 import anthropic
 
 from src.config import get_settings
+from src.services.llm_rate_limiter import PRIORITY_NORMAL, ClaudeRateLimiter
+from src.services.llm_verdict_cache import LLMVerdictCache, finding_fingerprint
+from src.services.scan_cancellation import ScanCancellation, ScanCancelledError
 from src.services.semgrep_engine import SemgrepFinding
 
 logger = logging.getLogger(__name__)
@@ -16,13 +20,30 @@ settings = get_settings()
 # 사용할 Claude 모델
 CLAUDE_MODEL = "claude-sonnet-4-6"
 
-# 1차 분석 시스템 프롬프트
-_ANALYSIS_SYSTEM_PROMPT = """당신은 10년 이상 경력의 시니어 보안 엔지니어입니다.
-정적 분석 도구의 결과를 검증하여 실제 취약점과 오탐을 구분합니다.
+# 공통 시스템 프롬프트 — 분석/패치 호출이 같은 캐시 프리픽스를 공유하도록 하나만 사용
+_SYSTEM_PROMPT = """당신은 10년 이상 경력의 시니어 보안 엔지니어입니다.
+정적 분석 도구의 결과를 검증하여 실제 취약점과 오탐을 구분하고,
+실제 취약점에 대해서는 최소한의 패치 코드를 생성합니다.
 반드시 JSON 형식으로만 응답하세요."""
 
-# 패치 생성 시스템 프롬프트
-_PATCH_SYSTEM_PROMPT = """당신은 시니어 보안 엔지니어입니다. 보안 취약점에 대한 최소 패치 코드를 생성합니다."""
+# 1차 분석 공통 지시문 (단일 파일 / 묶음 프롬프트 공용)
+_ANALYSIS_GUIDELINES = """각 항목에 대해:
+1. 코드의 전체 컨텍스트를 고려하여 실제 취약점인지 오탐인지 판단하세요
+2. 실제 취약점이면 심각도를 평가하세요
+3. 판단 근거를 설명하세요
+4. OWASP Top 10 카테고리를 매핑하세요
+
+판단 기준:
+- 사용자 입력이 실제로 제어 가능한 경로로 전달되는지 확인
+- 입력 검증/이스케이프 로직이 코드 내에 이미 존재하는지 확인
+- 테스트 코드, 주석, 상수 할당 등은 오탐으로 분류
+- 환경변수에서 읽는 값은 하드코딩으로 분류하지 않음"""
+
+# Anthropic 프롬프트 캐시 표시 (system, 파일 내용 블록에 적용)
+_CACHE_CONTROL = {"type": "ephemeral"}
+
+# 프롬프트 캐시 최소 프리픽스 길이 (Sonnet 기준 1024 토큰) — 미만이면 캐시 워밍 생략
+_PROMPT_CACHE_MIN_TOKENS = 1024
 
 
 @dataclass
@@ -48,26 +69,92 @@ class LLMAnalysisResult:
     manual_guide: str | None = None          # 수동 수정 가이드 (패치 불가 시)
 
 
+@dataclass
+class LLMUsage:
+    """Claude 호출 누적 사용량 (프롬프트 캐시 적중 토큰 포함)."""
+
+    requests: int = 0
+    input_tokens: int = 0                  # 캐시 미적용 입력 토큰
+    output_tokens: int = 0
+    cache_read_input_tokens: int = 0       # 캐시에서 읽은 입력 토큰
+    cache_creation_input_tokens: int = 0   # 캐시에 새로 쓴 입력 토큰
+    retries: int = 0                       # 429 / 타임아웃 / 5xx 재시도 횟수
+
+    def record(self, usage: object) -> None:
+        """API 응답의 usage 객체를 누적한다. 숫자가 아닌 필드는 무시한다."""
+        self.requests += 1
+        for name in (
+            "input_tokens",
+            "output_tokens",
+            "cache_read_input_tokens",
+            "cache_creation_input_tokens",
+        ):
+            value = getattr(usage, name, None)
+            if isinstance(value, int):
+                setattr(self, name, getattr(self, name) + value)
+
+
+@dataclass
+class FileAnalysisInput:
+    """파일 단위 LLM 분석 입력 (여러 파일 묶음 분석용)."""
+
+    file_path: str
+    file_content: str
+    findings: list[SemgrepFinding]
+
+
 class LLMAgent:
     """Claude API를 사용하여 Semgrep 결과를 분석하고 패치를 생성하는 에이전트.
 
     비용 절감 전략:
     - Semgrep 결과가 없으면 호출하지 않음
     - Finding별 개별 호출 대신 파일 단위 배치 처리
+    - 이전 스캔에서 같은 지문으로 판정한 finding은 판정 캐시 재사용
+
+    동시성:
+    - 분석/패치 호출 모두 에이전트 단위 호출 슬롯(Semaphore)을 거친다
+    - 슬롯은 API 호출 중에만 점유하고, 재시도 대기 중에는 반납한다
+    - rate_limiter가 있으면 호출 전 클러스터 공유 RPM/TPM 버킷에서 할당을 받는다
+
+    프롬프트 캐시:
+    - system 프롬프트와 파일 내용 블록을 cache_control로 표시한 공통 프리픽스로 두고,
+      finding별 지시문은 그 뒤에 붙인다
+    - 같은 파일의 분석 호출과 여러 패치 호출이 파일 내용 프리픽스를 재사용한다
     """
 
     MAX_RETRIES = 3
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        verdict_cache: LLMVerdictCache | None = None,
+        max_concurrency: int | None = None,
+        rate_limiter: ClaudeRateLimiter | None = None,
+        priority: str = PRIORITY_NORMAL,
+        client: anthropic.AsyncAnthropic | None = None,
+        cancellation: ScanCancellation | None = None,
+    ) -> None:
+        self._verdict_cache = verdict_cache
+        # 스캔 취소 확인기 — Claude 호출 직전마다 확인하여 취소된 스캔의 토큰 낭비를 막는다
+        self._cancellation = cancellation
+        self._rate_limiter = rate_limiter
+        self._priority = priority
+        # 스캔 단위 사용량 집계 (프롬프트 캐시 적중 토큰 포함)
+        self.usage = LLMUsage()
+        # 전체 Claude 호출(분석 + 패치) 동시 실행 상한
+        self._call_slots = asyncio.Semaphore(max_concurrency or settings.LLM_MAX_CONCURRENCY)
         # 비동기 클라이언트 사용 (asyncio.gather 병렬 호출을 위해 필수)
         # 테스트 환경에서는 _client를 직접 교체하므로 생성 실패 시 MagicMock으로 폴백
-        try:
-            self._client = anthropic.AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
-        except Exception:
-            # 테스트 환경 등에서 AsyncAnthropic 생성 실패 시 임시 객체로 초기화
-            # (테스트 픽스처에서 _client를 직접 교체함)
-            from unittest.mock import MagicMock
-            self._client = MagicMock()
+        # 상주 워커는 프로세스 공유 클라이언트를 넘겨 HTTP 연결 풀을 잡 간에 재사용한다
+        if client is not None:
+            self._client = client
+        else:
+            try:
+                self._client = anthropic.AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+            except Exception:
+                # 테스트 환경 등에서 AsyncAnthropic 생성 실패 시 임시 객체로 초기화
+                # (테스트 픽스처에서 _client를 직접 교체함)
+                from unittest.mock import MagicMock
+                self._client = MagicMock()
 
     async def analyze_findings(
         self,
@@ -79,9 +166,10 @@ class LLMAgent:
 
         처리 흐름:
         1. findings 없으면 LLM 호출 없이 빈 목록 반환
+        1.5. 판정 캐시 히트 finding은 저장된 판정 재사용 (패치만 재생성, 나머지만 분석)
         2. _prepare_file_content()로 파일 내용 최적화
         3. Claude API 1차 호출: 오탐 필터 + 심각도 분류
-        4. true_positive 항목에 대해 _generate_patch() 호출
+        4. true_positive 항목에 대해 _generate_patch() 병렬 호출
         5. LLMAnalysisResult 목록 반환
 
         Args:
@@ -96,57 +184,344 @@ class LLMAgent:
         if not findings:
             return []
 
+        item = FileAnalysisInput(file_path=file_path, file_content=file_content, findings=findings)
+        results, pending, fingerprints = await self._reuse_cached_verdicts([item])
+        if pending:
+            analyzed = await self._analyze_uncached(file_content, file_path, pending[0].findings)
+            results[file_path].extend(result for result, _ in analyzed)
+            await self._store_verdicts(analyzed, fingerprints)
+
+        return results[file_path]
+
+    async def analyze_files(
+        self,
+        files: list[FileAnalysisInput],
+        on_file_done: Callable[[str, list[LLMAnalysisResult]], Awaitable[None]] | None = None,
+    ) -> dict[str, list[LLMAnalysisResult]]:
+        """여러 파일의 탐지 결과를 입력 토큰 예산 내에서 묶어 분석한다.
+
+        작은 파일 여러 개를 하나의 분석 프롬프트로 묶어 호출 수와 반복되는
+        지시문 토큰을 줄인다. 응답은 (file_path, rule_id, line)으로 파일별로 나눈다.
+        묶음 하나의 호출이 실패하면 로그를 남기고 그 묶음의 파일 결과만 생략한다.
+
+        Args:
+            files: 파일별 분석 입력 목록
+            on_file_done: 파일 분석이 끝날 때마다 (file_path, 결과 목록)으로 호출
+                (스캔 체크포인트 저장용, 실패한 묶음의 파일은 호출하지 않음)
+
+        Returns:
+            {file_path: 분석 결과 목록}
+        """
+        files = [item for item in files if item.findings]
+        if not files:
+            return {}
+
+        results, pending, fingerprints = await self._reuse_cached_verdicts(files)
+        if on_file_done is not None:
+            pending_paths = {item.file_path for item in pending}
+            for item in files:
+                if item.file_path not in pending_paths:
+                    await on_file_done(item.file_path, results[item.file_path])
+
+        packs = self._pack_files(pending)
+        if len(packs) < len(pending):
+            logger.info(
+                f"[LLMAgent] 파일 {len(pending)}개를 분석 요청 {len(packs)}건으로 묶음"
+            )
+
+        async def _run_pack(pack: list[FileAnalysisInput]) -> None:
+            outcome = await self._analyze_pack(pack)
+            for file_path, analyzed in outcome.items():
+                results[file_path].extend(result for result, _ in analyzed)
+                await self._store_verdicts(analyzed, fingerprints)
+            if on_file_done is not None:
+                for item in pack:
+                    await on_file_done(item.file_path, results[item.file_path])
+
+        outcomes = await asyncio.gather(
+            *(_run_pack(pack) for pack in packs),
+            return_exceptions=True,
+        )
+        for pack, outcome in zip(packs, outcomes):
+            if isinstance(outcome, ScanCancelledError):
+                raise outcome
+            if isinstance(outcome, BaseException):
+                paths = ", ".join(item.file_path for item in pack)
+                logger.error(f"[LLMAgent] LLM 분석 실패 ({paths}): {outcome}")
+
+        return results
+
+    async def restore_patches(
+        self,
+        file_content: str,
+        findings: list[SemgrepFinding],
+        results: list[LLMAnalysisResult],
+    ) -> None:
+        """패치 없이 복원한 true_positive 결과의 패치를 다시 생성한다 (스캔 체크포인트 재개용).
+
+        결과는 finding_id(rule_id)로 파일의 finding과 순서대로 대응시킨다.
+        """
+        unmatched = list(findings)
+        targets: list[tuple[LLMAnalysisResult, SemgrepFinding]] = []
+        for result in results:
+            if not result.is_true_positive or result.patch_diff is not None:
+                continue
+            finding = _match_finding(unmatched, findings, result.finding_id)
+            if finding is not None:
+                targets.append((result, finding))
+        await self._generate_patches(targets, file_content)
+
+    async def _reuse_cached_verdicts(
+        self,
+        files: list[FileAnalysisInput],
+    ) -> tuple[dict[str, list[LLMAnalysisResult]], list[FileAnalysisInput], dict[int, str]]:
+        """판정 캐시를 조회하여 히트한 결과와 분석이 필요한 나머지를 나눈다.
+
+        Returns:
+            (파일별 캐시 결과, 캐시 미스 finding만 남긴 입력 목록, id(finding) → 지문)
+        """
+        results: dict[str, list[LLMAnalysisResult]] = {item.file_path: [] for item in files}
+        if self._verdict_cache is None:
+            return results, list(files), {}
+
+        fingerprints: dict[int, str] = {}
+        for item in files:
+            file_lines = item.file_content.split("\n")
+            for finding in item.findings:
+                fingerprints[id(finding)] = finding_fingerprint(finding, file_lines)
+        cached = await self._verdict_cache.get_many(list(set(fingerprints.values())))
+
+        pending: list[FileAnalysisInput] = []
+        repatch_jobs = []
+        hit_count = 0
+        for item in files:
+            missed: list[SemgrepFinding] = []
+            repatch: list[tuple[LLMAnalysisResult, SemgrepFinding]] = []
+            for finding in item.findings:
+                hit = cached.get(fingerprints[id(finding)])
+                if hit is None:
+                    missed.append(finding)
+                    continue
+                # 캐시에는 판정만 있으므로 true_positive는 현재 파일 내용으로 패치를 다시 만든다
+                result = LLMAnalysisResult(**hit, patch_diff=None)
+                if result.is_true_positive:
+                    repatch.append((result, finding))
+                results[item.file_path].append(result)
+                hit_count += 1
+            if repatch:
+                repatch_jobs.append(self._generate_patches(repatch, item.file_content))
+            if missed:
+                pending.append(FileAnalysisInput(item.file_path, item.file_content, missed))
+        await asyncio.gather(*repatch_jobs)
+
+        if hit_count:
+            logger.info(
+                f"[LLMAgent] 판정 캐시 히트 {hit_count}건, "
+                f"Claude 분석 {len(fingerprints) - hit_count}건"
+            )
+        return results, pending, fingerprints
+
+    async def _store_verdicts(
+        self,
+        analyzed: list[tuple[LLMAnalysisResult, SemgrepFinding | None]],
+        fingerprints: dict[int, str],
+    ) -> None:
+        """새 판정을 캐시에 저장한다 (finding과 매칭된 결과만)."""
+        if self._verdict_cache is None:
+            return
+        await self._verdict_cache.set_many({
+            fingerprints[id(finding)]: result
+            for result, finding in analyzed
+            if finding is not None and id(finding) in fingerprints
+        })
+
+    def _pack_files(self, files: list[FileAnalysisInput]) -> list[list[FileAnalysisInput]]:
+        """입력 토큰 예산과 finding 수 상한 내에서 파일들을 순서대로 묶는다.
+
+        예산을 혼자 넘는 파일은 단독 요청으로 분석한다.
+        """
+        budget = settings.LLM_PACK_MAX_INPUT_TOKENS
+        max_findings = settings.LLM_PACK_MAX_FINDINGS
+
+        packs: list[list[FileAnalysisInput]] = []
+        current: list[FileAnalysisInput] = []
+        current_tokens = 0
+        current_findings = 0
+        for item in files:
+            cost = self._estimate_section_tokens(item)
+            count = len(item.findings)
+            if cost > budget or count > max_findings:
+                packs.append([item])
+                continue
+            if current and (
+                current_tokens + cost > budget or current_findings + count > max_findings
+            ):
+                packs.append(current)
+                current, current_tokens, current_findings = [], 0, 0
+            current.append(item)
+            current_tokens += cost
+            current_findings += count
+        if current:
+            packs.append(current)
+        return packs
+
+    def _estimate_section_tokens(self, item: FileAnalysisInput) -> int:
+        """묶음 프롬프트에서 파일 하나가 차지할 입력 토큰 수를 추정한다."""
+        content = self._prepare_file_content(item.file_content, item.findings)
+        findings_chars = sum(
+            len(f.rule_id) + len(f.message) + len(f.code_snippet) + 40 for f in item.findings
+        )
+        return (len(content) + len(item.file_path) + findings_chars) // 3 + 1
+
+    async def _analyze_pack(
+        self,
+        pack: list[FileAnalysisInput],
+    ) -> dict[str, list[tuple[LLMAnalysisResult, SemgrepFinding | None]]]:
+        """묶음 하나를 분석한다. 파일이 하나면 기존 단일 파일 프롬프트를 사용한다."""
+        if len(pack) == 1:
+            item = pack[0]
+            return {
+                item.file_path: await self._analyze_uncached(
+                    item.file_content, item.file_path, item.findings
+                )
+            }
+        return await self._analyze_packed(pack)
+
+    async def _analyze_uncached(
+        self,
+        file_content: str,
+        file_path: str,
+        findings: list[SemgrepFinding],
+    ) -> list[tuple[LLMAnalysisResult, SemgrepFinding | None]]:
+        """Claude로 findings를 분석하고 (결과, 매칭된 finding) 목록을 반환한다."""
         # 토큰 최적화: 500줄 초과 시 관련 라인만 추출
         optimized_content = self._prepare_file_content(file_content, findings)
 
-        # 1차 분석 프롬프트 생성
-        user_prompt = self._build_analysis_prompt(optimized_content, file_path, findings)
+        # 1차 분석 메시지 생성 (파일 내용 블록 = 캐시 프리픽스)
+        messages = [{
+            "role": "user",
+            "content": [
+                self._build_file_context_block(file_path, optimized_content),
+                {"type": "text", "text": self._build_analysis_prompt(file_path, findings)},
+            ],
+        }]
 
         # Claude API 호출 (오탐 필터 + 심각도 평가)
         raw_response = await self._call_claude_with_retry(
-            messages=[{"role": "user", "content": user_prompt}],
-            system=_ANALYSIS_SYSTEM_PROMPT,
+            messages=messages,
+            system=_SYSTEM_PROMPT,
         )
 
         # 응답 파싱
         parsed_items = self._parse_analysis_response(raw_response)
 
         # LLMAnalysisResult 목록 구성
-        results: list[LLMAnalysisResult] = []
+        # 같은 rule_id가 여러 번 탐지된 경우 응답 순서대로 finding에 하나씩 대응
+        unmatched = list(findings)
+        analyzed: list[tuple[LLMAnalysisResult, SemgrepFinding | None]] = []
         for item in parsed_items:
-            is_tp = item.get("is_true_positive", False)
-            cwe_id = item.get("cwe_id", "")
-            owasp_category = item.get("owasp_category", "")
-            result = LLMAnalysisResult(
-                finding_id=item.get("rule_id", ""),
-                is_true_positive=is_tp,
-                confidence=float(item.get("confidence", 0.0)),
-                severity=item.get("severity", "Medium"),
-                reasoning=item.get("reasoning", ""),
-                patch_diff=None,
-                patch_description="",
-                owasp_category=owasp_category if owasp_category else None,
-                vulnerability_type=item.get("vulnerability_type"),
-                references=self._build_references(cwe_id, owasp_category),
+            matching_finding = _match_finding(unmatched, findings, item.get("rule_id"))
+            analyzed.append((self._build_result(item), matching_finding))
+
+        # true_positive인 항목만 패치 생성 (병렬)
+        # 분석에 전체 파일을 보냈다면 파일 내용 프리픽스가 이미 캐시되어 있음
+        await self._generate_patches(
+            [(r, f) for r, f in analyzed if r.is_true_positive and f is not None],
+            file_content,
+            prefix_cached=optimized_content == file_content,
+        )
+
+        return analyzed
+
+    async def _analyze_packed(
+        self,
+        pack: list[FileAnalysisInput],
+    ) -> dict[str, list[tuple[LLMAnalysisResult, SemgrepFinding | None]]]:
+        """여러 파일을 하나의 프롬프트로 분석하고 결과를 파일별로 나눈다."""
+        user_prompt = self._build_packed_analysis_prompt(pack)
+
+        raw_response = await self._call_claude_with_retry(
+            messages=[{"role": "user", "content": user_prompt}],
+            system=_SYSTEM_PROMPT,
+        )
+        parsed_items = self._parse_analysis_response(raw_response)
+
+        by_path = {item.file_path: item for item in pack}
+        unmatched = {item.file_path: list(item.findings) for item in pack}
+        analyzed: dict[str, list[tuple[LLMAnalysisResult, SemgrepFinding | None]]] = {
+            item.file_path: [] for item in pack
+        }
+        for parsed in parsed_items:
+            file_path = parsed.get("file_path")
+            if file_path not in by_path:
+                logger.warning(f"[LLMAgent] 묶음 응답에 알 수 없는 파일 경로: {file_path}")
+                continue
+            matching_finding = _match_finding(
+                unmatched[file_path],
+                by_path[file_path].findings,
+                parsed.get("rule_id"),
+                parsed.get("line"),
             )
+            analyzed[file_path].append((self._build_result(parsed), matching_finding))
 
-            # true_positive인 항목만 패치 생성
-            if is_tp:
-                # rule_id에 해당하는 finding 조회
-                matching_finding = next(
-                    (f for f in findings if f.rule_id == item.get("rule_id")),
-                    None,
-                )
-                if matching_finding is not None:
-                    patch_diff = await self._generate_patch(
-                        finding=matching_finding,
-                        file_content=file_content,
-                    )
-                    result.patch_diff = patch_diff
+        # true_positive 패치 생성 (파일별 원본 내용 사용, 전체 병렬)
+        await asyncio.gather(*(
+            self._generate_patches(
+                [(r, f) for r, f in items if r.is_true_positive and f is not None],
+                by_path[file_path].file_content,
+            )
+            for file_path, items in analyzed.items()
+        ))
+
+        return analyzed
+
+    def _build_result(self, item: dict) -> LLMAnalysisResult:
+        """파싱된 응답 항목으로 LLMAnalysisResult를 생성한다 (patch_diff는 이후 채움)."""
+        cwe_id = item.get("cwe_id", "")
+        owasp_category = item.get("owasp_category", "")
+        return LLMAnalysisResult(
+            finding_id=item.get("rule_id", ""),
+            is_true_positive=item.get("is_true_positive", False),
+            confidence=float(item.get("confidence", 0.0)),
+            severity=item.get("severity", "Medium"),
+            reasoning=item.get("reasoning", ""),
+            patch_diff=None,
+            patch_description="",
+            owasp_category=owasp_category if owasp_category else None,
+            vulnerability_type=item.get("vulnerability_type"),
+            references=self._build_references(cwe_id, owasp_category),
+        )
 
-            results.append(result)
+    async def _generate_patches(
+        self,
+        targets: list[tuple[LLMAnalysisResult, SemgrepFinding]],
+        file_content: str,
+        prefix_cached: bool = False,
+    ) -> None:
+        """true_positive 결과들의 패치를 동시에 생성하여 patch_diff에 채운다.
 
-        return results
+        실제 동시 호출 수는 호출 슬롯(_call_slots)이 제한한다.
+        파일 내용 프리픽스가 아직 캐시되지 않았고 캐시 가능한 길이라면, 첫 패치를
+        먼저 호출하여 캐시를 쓴 뒤 나머지를 동시에 호출한다 (동시 호출은 모두 캐시 미스).
+        """
+        if not targets:
+            return
+
+        first: list[tuple[LLMAnalysisResult, SemgrepFinding]] = []
+        rest = list(targets)
+        prefix_tokens = self._estimate_input_tokens([], _SYSTEM_PROMPT + file_content)
+        if len(rest) > 1 and not prefix_cached and prefix_tokens >= _PROMPT_CACHE_MIN_TOKENS:
+            first, rest = rest[:1], rest[1:]
+
+        for batch in (first, rest):
+            if not batch:
+                continue
+            patches = await asyncio.gather(*(
+                self._generate_patch(finding=finding, file_content=file_content)
+                for _, finding in batch
+            ))
+            for (result, _), patch_diff in zip(batch, patches):
+                result.patch_diff = patch_diff
 
     def _prepare_file_content(
         self,
@@ -210,13 +585,24 @@ class LLMAgent:
         ext = Path(file_path).suffix.lower()
         return ext_map.get(ext, "소스")
 
+    @staticmethod
+    def _build_file_context_block(file_path: str, file_content: str) -> dict:
+        """파일 내용 블록을 생성한다. 프롬프트 캐시 프리픽스의 끝으로 표시한다."""
+        return {
+            "type": "text",
+            "text": f"--- 파일: {file_path} ---\n{file_content}",
+            "cache_control": _CACHE_CONTROL,
+        }
+
     def _build_analysis_prompt(
         self,
-        file_content: str,
         file_path: str,
         findings: list[SemgrepFinding],
     ) -> str:
-        """오탐 필터 + 심각도 평가 프롬프트를 생성한다."""
+        """오탐 필터 + 심각도 평가 지시문을 생성한다.
+
+        파일 내용은 _build_file_context_block()의 별도 블록(캐시 프리픽스)으로 앞에 전송한다.
+        """
         findings_text = "\n".join(
             f"- Rule: {f.rule_id}, Line {f.start_line}-{f.end_line}: {f.message}\n"
             f"  Code: {f.code_snippet}"
@@ -225,21 +611,8 @@ class LLMAgent:
 
         language = self._detect_language_from_path(file_path)
 
-        return f"""다음 {language} 코드에서 정적 분석 도구가 탐지한 취약점 목록입니다.
-각 항목에 대해:
-1. 코드의 전체 컨텍스트를 고려하여 실제 취약점인지 오탐인지 판단하세요
-2. 실제 취약점이면 심각도를 평가하세요
-3. 판단 근거를 설명하세요
-4. OWASP Top 10 카테고리를 매핑하세요
-
-판단 기준:
-- 사용자 입력이 실제로 제어 가능한 경로로 전달되는지 확인
-- 입력 검증/이스케이프 로직이 코드 내에 이미 존재하는지 확인
-- 테스트 코드, 주석, 상수 할당 등은 오탐으로 분류
-- 환경변수에서 읽는 값은 하드코딩으로 분류하지 않음
-
---- 파일: {file_path} ---
-{file_content}
+        return f"""다음 {language} 코드에서 정적 분석 도구가 탐지한 취약점 목록입니다 (코드는 위 파일 블록: {file_path}).
+{_ANALYSIS_GUIDELINES}
 
 --- 탐지 결과 ---
 {findings_text}
@@ -259,13 +632,54 @@ JSON 응답 형식:
   ]
 }}"""
 
-    def _build_patch_prompt(
-        self,
-        finding: SemgrepFinding,
-        file_content: str,
-    ) -> str:
-        """패치 코드 생성 프롬프트를 생성한다."""
-        return f"""다음 취약점에 대한 패치 코드를 생성하세요.
+    def _build_packed_analysis_prompt(self, pack: list[FileAnalysisInput]) -> str:
+        """여러 파일의 탐지 결과를 하나로 묶은 오탐 필터 + 심각도 평가 프롬프트를 생성한다."""
+        sections: list[str] = []
+        for item in pack:
+            content = self._prepare_file_content(item.file_content, item.findings)
+            language = self._detect_language_from_path(item.file_path)
+            findings_text = "\n".join(
+                f"- Rule: {f.rule_id}, Line {f.start_line}-{f.end_line}: {f.message}\n"
+                f"  Code: {f.code_snippet}"
+                for f in item.findings
+            )
+            sections.append(
+                f"--- 파일: {item.file_path} ({language}) ---\n{content}\n\n"
+                f"--- 탐지 결과: {item.file_path} ---\n{findings_text}"
+            )
+        files_text = "\n\n".join(sections)
+
+        return f"""다음은 여러 파일의 코드에서 정적 분석 도구가 탐지한 취약점 목록입니다.
+{_ANALYSIS_GUIDELINES}
+- 각 파일은 해당 파일의 코드만으로 판단하세요
+
+{files_text}
+
+모든 탐지 결과에 대해 항목을 하나씩 반환하세요. file_path와 line은 탐지 결과에 적힌 값을 그대로 사용하세요.
+
+JSON 응답 형식:
+{{
+  "results": [
+    {{
+      "file_path": "탐지 결과의 파일 경로",
+      "rule_id": "해당 Semgrep 룰 ID",
+      "line": 12,
+      "is_true_positive": true,
+      "confidence": 0.95,
+      "severity": "Critical/High/Medium/Low/Informational",
+      "reasoning": "판단 근거 2-3문장",
+      "owasp_category": "A03:2021 - Injection",
+      "vulnerability_type": "sql_injection"
+    }}
+  ]
+}}"""
+
+    def _build_patch_prompt(self, finding: SemgrepFinding) -> str:
+        """패치 코드 생성 지시문을 생성한다.
+
+        원본 코드는 _build_file_context_block()의 별도 블록(캐시 프리픽스)으로 앞에 전송한다.
+        """
+        return f"""위 파일 블록의 원본 코드에서 다음 취약점에 대한 패치 코드를 생성하세요.
 규칙:
 - 기존 코드 스타일(들여쓰기, 네이밍 컨벤션)을 유지하세요
 - 최소한의 변경으로 취약점만 수정하세요
@@ -279,9 +693,6 @@ Rule: {finding.rule_id}
 설명: {finding.message}
 코드: {finding.code_snippet}
 
---- 원본 코드 ---
-{file_content}
-
 JSON 응답 형식:
 {{
   "patch_diff": "--- a/file.py\\n+++ b/file.py\\n@@ ... @@\\n...",
@@ -299,12 +710,18 @@ JSON 응답 형식:
         Returns:
             unified diff 형식 패치 문자열 또는 None (패치 생성 불가 시)
         """
-        prompt = self._build_patch_prompt(finding, file_content)
+        messages = [{
+            "role": "user",
+            "content": [
+                self._build_file_context_block(finding.file_path, file_content),
+                {"type": "text", "text": self._build_patch_prompt(finding)},
+            ],
+        }]
 
         try:
             raw_response = await self._call_claude_with_retry(
-                messages=[{"role": "user", "content": prompt}],
-                system=_PATCH_SYSTEM_PROMPT,
+                messages=messages,
+                system=_SYSTEM_PROMPT,
             )
         except Exception as e:
             logger.warning(f"[LLMAgent] 패치 생성 실패 ({finding.rule_id}): {e}")
@@ -337,6 +754,7 @@ JSON 응답 형식:
         Raises:
             anthropic.RateLimitError: max_retries 초과 시
             anthropic.APIStatusError: 4xx 에러 (rate limit 제외) 즉시 발생
+            ScanCancelledError: 스캔이 취소된 경우 (호출 전 확인)
         """
         kwargs: dict = {
             "model": CLAUDE_MODEL,
@@ -345,21 +763,37 @@ JSON 응답 형식:
             "messages": messages,
         }
         if system:
-            kwargs["system"] = system
+            kwargs["system"] = [
+                {"type": "text", "text": system, "cache_control": _CACHE_CONTROL}
+            ]
+
+        estimated_tokens = self._estimate_input_tokens(messages, system)
 
         for attempt in range(max_retries + 1):
+            if self._cancellation is not None:
+                self._cancellation.raise_if_cancelled()
             try:
-                response = await self._client.messages.create(**kwargs)
+                if self._rate_limiter is not None:
+                    await self._rate_limiter.acquire(estimated_tokens, self._priority)
+                async with self._call_slots:
+                    response = await self._create_message(kwargs, estimated_tokens)
+                self.usage.record(getattr(response, "usage", None))
                 return response.content[0].text
 
-            except anthropic.RateLimitError:
+            except anthropic.RateLimitError as e:
                 if attempt == max_retries:
                     raise
                 wait = 2 ** (attempt + 1)  # 2초, 4초, 8초
+                retry_after = _retry_after_seconds(e)
+                if self._rate_limiter is not None and retry_after:
+                    # 모든 워커가 retry-after 동안 호출을 멈추도록 공유 버킷 차단
+                    await self._rate_limiter.penalize(retry_after)
+                    wait = retry_after
                 logger.warning(
                     f"[LLMAgent] Rate limit 도달, {wait}초 후 재시도 "
                     f"({attempt + 1}/{max_retries})"
                 )
+                self.usage.retries += 1
                 await asyncio.sleep(wait)
 
             except anthropic.APITimeoutError:
@@ -368,6 +802,7 @@ JSON 응답 형식:
                 logger.warning(
                     f"[LLMAgent] API 타임아웃, 재시도 ({attempt + 1}/{max_retries})"
                 )
+                self.usage.retries += 1
                 await asyncio.sleep(2)
 
             except anthropic.APIStatusError as e:
@@ -380,6 +815,7 @@ JSON 응답 형식:
                         f"[LLMAgent] 서버 에러({e.status_code}), "
                         f"{wait}초 후 재시도 ({attempt + 1}/{max_retries})"
                     )
+                    self.usage.retries += 1
                     await asyncio.sleep(wait)
                 else:
                     # 401, 403 등 4xx는 재시도 없이 즉시 발생
@@ -388,6 +824,35 @@ JSON 응답 형식:
         # 이 코드는 실제로 도달하지 않지만 타입 검사를 위해 유지
         raise RuntimeError("예상치 못한 재시도 루프 탈출")
 
+    async def _create_message(self, kwargs: dict, estimated_tokens: int):
+        """messages.create를 호출한다.
+
+        레이트 리미터가 있으면 raw 응답으로 호출하여 rate limit 헤더와
+        실제 입력 토큰 사용량을 리미터에 반영한다.
+        """
+        if self._rate_limiter is None:
+            return await self._client.messages.create(**kwargs)
+
+        raw = await self._client.messages.with_raw_response.create(**kwargs)
+        await self._rate_limiter.observe(raw.headers)
+        response = raw.parse()
+        input_tokens = getattr(getattr(response, "usage", None), "input_tokens", None)
+        if isinstance(input_tokens, int):
+            await self._rate_limiter.reconcile(estimated_tokens, input_tokens)
+        return response
+
+    @staticmethod
+    def _estimate_input_tokens(messages: list[dict], system: str) -> int:
+        """입력 토큰 수를 대략 추정한다 (문자 3개 ≈ 1토큰, 한글/코드 혼합 기준 보수적 추정)."""
+        chars = len(system)
+        for message in messages:
+            content = message.get("content", "")
+            if isinstance(content, list):
+                chars += sum(len(block.get("text", "")) for block in content)
+            else:
+                chars += len(str(content))
+        return chars // 3 + 1
+
     def _parse_analysis_response(self, response: str) -> list[dict]:
         """Claude 응답에서 분석 결과 JSON을 파싱한다.
 
@@ -435,3 +900,42 @@ JSON 응답 형식:
             stripped = stripped[:-3]
 
         return stripped.strip()
+
+
+def _match_finding(
+    unmatched: list[SemgrepFinding],
+    findings: list[SemgrepFinding],
+    rule_id: str | None,
+    line: object = None,
+) -> SemgrepFinding | None:
+    """응답 항목에 대응하는 finding을 찾는다.
+
+    아직 대응되지 않은 finding 중 (rule_id, 시작 라인)이 일치하는 것을 우선하고,
+    없으면 rule_id만 일치하는 것, 그래도 없으면 이미 대응된 finding을 재사용한다.
+    """
+    try:
+        line_no = int(line) if line is not None else None
+    except (TypeError, ValueError):
+        line_no = None
+
+    candidates = [f for f in unmatched if f.rule_id == rule_id]
+    match = next((f for f in candidates if f.start_line == line_no), None)
+    if match is None and candidates:
+        match = candidates[0]
+    if match is not None:
+        unmatched.remove(match)
+        return match
+    return next((f for f in findings if f.rule_id == rule_id), None)
+
+
+def _retry_after_seconds(error: anthropic.APIStatusError) -> float | None:
+    """429 응답의 retry-after 헤더(초)를 반환한다. 없으면 None."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        value = float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+    return value if value > 0 else None
@@ -0,0 +1,285 @@
+"""Claude API 레이트 리미터 — 모든 스캔 워커가 공유하는 Redis 토큰 버킷
+
+분당 요청 수(RPM)와 분당 토큰 수(TPM) 두 버킷을 Redis Lua 스크립트로 원자적으로
+관리하므로 워커 프로세스가 N개여도 클러스터 전체 호출량이 한도를 넘지 않는다.
+
+한도 학습:
+- 응답의 anthropic-ratelimit-* 헤더에서 실제 한도(limit)를 읽어 공유 한도로 저장
+- 남은 양(remaining)이 버킷보다 적으면 버킷을 remaining으로 낮춤
+- 429 응답의 retry-after 동안 모든 워커의 호출을 멈춤
+
+우선순위:
+- 낮은 우선순위 호출은 버킷에 예약분(reserve)이 남아 있을 때만 통과한다
+- 버킷이 바닥에 가까우면 PR 스캔(high)만 호출할 수 있다
+"""
+
+import asyncio
+import logging
+import random
+from collections.abc import Mapping
+
+import redis.asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+# 우선순위 (scan_type 기준)
+PRIORITY_HIGH = "high"        # pr — 개발자가 결과를 기다리는 스캔
+PRIORITY_NORMAL = "normal"    # incremental (push)
+PRIORITY_LOW = "low"          # initial / full — 대량 백그라운드 스캔
+
+# 우선순위별 예약 비율: 버킷 용량의 이 비율만큼은 상위 우선순위를 위해 남겨둔다
+_RESERVE_FRACTION = {
+    PRIORITY_HIGH: 0.0,
+    PRIORITY_NORMAL: 0.1,
+    PRIORITY_LOW: 0.25,
+}
+
+_SCAN_TYPE_PRIORITY = {
+    "pr": PRIORITY_HIGH,
+    "incremental": PRIORITY_NORMAL,
+}
+
+# 대기 1회 최대 시간 — 다른 워커의 소비/한도 변경을 반영하기 위해 주기적으로 재확인
+_MAX_WAIT_SEC = 2.0
+
+# 호출 1건의 총 대기 상한 — 넘으면 제한 없이 진행한다 (fail-open, 429 재시도 로직이 백업)
+_MAX_TOTAL_WAIT_SEC = 120.0
+
+# 학습한 한도 유지 시간
+_LEARNED_LIMIT_TTL_SEC = 3600
+
+# KEYS[1]: 버킷 해시, KEYS[2]: 학습한 한도 해시
+# ARGV[1]: 기본 RPM, ARGV[2]: 기본 TPM, ARGV[3]: 필요 토큰, ARGV[4]: 예약 비율
+# 반환: 0이면 획득, 양수면 대기해야 할 밀리초
+_ACQUIRE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local lim = redis.call('HMGET', KEYS[2], 'rpm', 'tpm')
+local rpm = tonumber(lim[1]) or tonumber(ARGV[1])
+local tpm = tonumber(lim[2]) or tonumber(ARGV[2])
+local need = math.min(tonumber(ARGV[3]), tpm)
+local reserve = tonumber(ARGV[4])
+
+local b = redis.call('HMGET', KEYS[1], 'req', 'tok', 'ts', 'blocked_until')
+local req = tonumber(b[1]) or rpm
+local tok = tonumber(b[2]) or tpm
+local ts = tonumber(b[3]) or now
+local blocked = tonumber(b[4]) or 0
+if blocked > now then
+  return blocked - now
+end
+
+local elapsed = math.max(0, now - ts)
+req = math.min(rpm, req + elapsed * rpm / 60000)
+tok = math.min(tpm, tok + elapsed * tpm / 60000)
+
+-- 예약분을 더한 기준이 버킷 용량을 넘으면 영원히 통과할 수 없으므로 용량으로 제한
+-- (한도에 가까운 큰 요청은 예약분을 무시하고 버킷이 가득 찰 때 통과)
+local req_floor = math.min(1 + rpm * reserve, rpm)
+local tok_floor = math.min(need + tpm * reserve, tpm)
+local wait = 0
+if req >= req_floor and tok >= tok_floor then
+  req = req - 1
+  tok = tok - need
+else
+  wait = math.max((req_floor - req) * 60000 / rpm, (tok_floor - tok) * 60000 / tpm, 1)
+end
+redis.call('HSET', KEYS[1], 'req', tostring(req), 'tok', tostring(tok), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], 120000)
+return math.ceil(wait)
+"""
+
+# KEYS[1]: 버킷 해시
+# ARGV[1]: 남은 요청 수(-1이면 무시), ARGV[2]: 남은 토큰 수(-1이면 무시), ARGV[3]: 차단 밀리초
+_SYNC_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local b = redis.call('HMGET', KEYS[1], 'req', 'tok', 'blocked_until')
+local rem_req = tonumber(ARGV[1])
+local rem_tok = tonumber(ARGV[2])
+local block_ms = tonumber(ARGV[3])
+if rem_req >= 0 and (b[1] == false or tonumber(b[1]) > rem_req) then
+  redis.call('HSET', KEYS[1], 'req', rem_req)
+end
+if rem_tok >= 0 and (b[2] == false or tonumber(b[2]) > rem_tok) then
+  redis.call('HSET', KEYS[1], 'tok', rem_tok)
+end
+if block_ms > 0 and (tonumber(b[3]) or 0) < now + block_ms then
+  redis.call('HSET', KEYS[1], 'blocked_until', now + block_ms)
+end
+if redis.call('HEXISTS', KEYS[1], 'ts') == 0 then
+  redis.call('HSET', KEYS[1], 'ts', now)
+end
+redis.call('PEXPIRE', KEYS[1], 120000)
+return 0
+"""
+
+
+def priority_for_scan_type(scan_type: str) -> str:
+    """스캔 유형에 대응하는 Claude 호출 우선순위를 반환한다."""
+    return _SCAN_TYPE_PRIORITY.get(scan_type, PRIORITY_LOW)
+
+
+def _header_int(headers: Mapping[str, str], name: str) -> int | None:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_rate_limit_headers(headers: Mapping[str, str]) -> dict[str, int]:
+    """Anthropic 레이트 리밋 헤더에서 한도/잔량/재시도 대기를 추출한다.
+
+    토큰 한도는 입력 토큰(input-tokens) 헤더를 우선 사용하고, 없으면 tokens 헤더를 사용한다.
+
+    Returns:
+        rpm_limit, tpm_limit, requests_remaining, tokens_remaining, retry_after 중 존재하는 키
+    """
+    parsed: dict[str, int] = {}
+    candidates = {
+        "rpm_limit": ["anthropic-ratelimit-requests-limit"],
+        "tpm_limit": [
+            "anthropic-ratelimit-input-tokens-limit",
+            "anthropic-ratelimit-tokens-limit",
+        ],
+        "requests_remaining": ["anthropic-ratelimit-requests-remaining"],
+        "tokens_remaining": [
+            "anthropic-ratelimit-input-tokens-remaining",
+            "anthropic-ratelimit-tokens-remaining",
+        ],
+        "retry_after": ["retry-after"],
+    }
+    for key, names in candidates.items():
+        for name in names:
+            value = _header_int(headers, name)
+            if value is not None:
+                parsed[key] = value
+                break
+    return parsed
+
+
+class ClaudeRateLimiter:
+    """RPM/TPM 토큰 버킷 기반 클러스터 공유 레이트 리미터.
+
+    Redis 오류 시에는 호출을 막지 않는다 (fail-open, 기존 재시도 로직이 백업).
+    """
+
+    def __init__(
+        self,
+        redis_conn: aioredis.Redis,
+        rpm: int,
+        tpm: int,
+        key_prefix: str = "claude-ratelimit",
+        max_wait_sec: float = _MAX_TOTAL_WAIT_SEC,
+    ) -> None:
+        self._redis = redis_conn
+        self._rpm = rpm
+        self._tpm = tpm
+        self._max_wait_sec = max_wait_sec
+        self._bucket_key = f"{key_prefix}:bucket"
+        self._limits_key = f"{key_prefix}:limits"
+        self._acquire = redis_conn.register_script(_ACQUIRE_SCRIPT)
+        self._sync = redis_conn.register_script(_SYNC_SCRIPT)
+
+    async def acquire(self, tokens: int, priority: str = PRIORITY_NORMAL) -> None:
+        """요청 1건과 tokens만큼의 토큰을 확보할 때까지 대기한다.
+
+        총 대기가 max_wait_sec을 넘으면 토큰 없이 진행한다 (fail-open).
+        """
+        reserve = _RESERVE_FRACTION.get(priority, _RESERVE_FRACTION[PRIORITY_LOW])
+        waited = 0.0
+        while True:
+            try:
+                wait_ms = int(await self._acquire(
+                    keys=[self._bucket_key, self._limits_key],
+                    args=[self._rpm, self._tpm, max(1, tokens), reserve],
+                ))
+            except Exception as e:
+                logger.warning(f"[ClaudeRateLimiter] 버킷 조회 실패 (제한 없이 진행): {e}")
+                return
+            if wait_ms <= 0:
+                if waited:
+                    logger.info(
+                        f"[ClaudeRateLimiter] priority={priority} {waited:.1f}초 대기 후 호출"
+                    )
+                return
+            if waited >= self._max_wait_sec:
+                logger.warning(
+                    f"[ClaudeRateLimiter] priority={priority} tokens={tokens} "
+                    f"{waited:.1f}초 대기 초과 — 제한 없이 진행"
+                )
+                return
+            # 여러 워커가 동시에 깨어나지 않도록 지터 추가
+            delay = min(wait_ms / 1000, _MAX_WAIT_SEC) * random.uniform(1.0, 1.2)
+            waited += delay
+            await asyncio.sleep(delay)
+
+    async def reconcile(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """추정 토큰과 실제 사용 토큰의 차이를 버킷에 반영한다."""
+        delta = estimated_tokens - actual_tokens
+        if delta == 0:
+            return
+        try:
+            await self._redis.hincrbyfloat(self._bucket_key, "tok", delta)
+        except Exception as e:
+            logger.warning(f"[ClaudeRateLimiter] 토큰 보정 실패 (무시): {e}")
+
+    async def observe(self, headers: Mapping[str, str]) -> None:
+        """응답 헤더에서 한도/잔량을 학습하여 공유 버킷에 반영한다."""
+        info = parse_rate_limit_headers(headers)
+        if not info:
+            return
+        try:
+            limits = {
+                field: info[key]
+                for field, key in (("rpm", "rpm_limit"), ("tpm", "tpm_limit"))
+                if info.get(key, 0) > 0
+            }
+            if limits:
+                await self._redis.hset(self._limits_key, mapping=limits)
+                await self._redis.expire(self._limits_key, _LEARNED_LIMIT_TTL_SEC)
+            await self._sync(
+                keys=[self._bucket_key],
+                args=[
+                    info.get("requests_remaining", -1),
+                    info.get("tokens_remaining", -1),
+                    info.get("retry_after", 0) * 1000,
+                ],
+            )
+        except Exception as e:
+            logger.warning(f"[ClaudeRateLimiter] 헤더 학습 실패 (무시): {e}")
+
+    async def penalize(self, retry_after_sec: float) -> None:
+        """429 응답 시 retry-after 동안 모든 워커의 호출을 멈춘다."""
+        if retry_after_sec <= 0:
+            return
+        try:
+            await self._sync(
+                keys=[self._bucket_key],
+                args=[-1, -1, int(retry_after_sec * 1000)],
+            )
+        except Exception as e:
+            logger.warning(f"[ClaudeRateLimiter] 차단 설정 실패 (무시): {e}")
+
+    async def close(self) -> None:
+        """Redis 연결을 닫는다."""
+        try:
+            await self._redis.aclose()
+        except Exception:
+            pass
+
+
+async def create_rate_limiter(redis_url: str, rpm: int, tpm: int) -> ClaudeRateLimiter | None:
+    """Redis 연결을 확인하고 레이트 리미터를 생성한다. 연결 실패 또는 한도 0이면 None."""
+    if rpm <= 0 or tpm <= 0:
+        return None
+    try:
+        conn = aioredis.from_url(redis_url)
+        await conn.ping()
+    except Exception as e:
+        logger.warning(f"[ClaudeRateLimiter] Redis 연결 실패 — 공유 레이트 리밋 없이 호출: {e}")
+        return None
+    return ClaudeRateLimiter(conn, rpm=rpm, tpm=tpm)
@@ -0,0 +1,182 @@
+"""LLM 판정 캐시 — finding 지문(fingerprint) 기준 스캔 간 LLM 분석 결과 재사용
+
+같은 룰이 변경되지 않은 같은 코드에서 다시 탐지되면 판정 분석을 다시 호출하지 않고
+이전 판정(true/false positive, 신뢰도, 심각도, 근거, 분류)을 재사용한다.
+
+코드 보안 원칙 (ADR-003):
+- 판정 필드(_VERDICT_FIELDS)만 저장하고, 고객 코드가 담기는 필드(patch_diff,
+  test_suggestion, manual_guide)는 저장하지 않는다
+- true_positive 항목이 히트하면 패치는 현재 파일 내용으로 다시 생성한다
+
+저장소별로 격리한다: 근거는 파일 전체를 보고 만든 결과이므로 키 네임스페이스에
+저장소 ID(scope)를 넣어 다른 팀 / 저장소의 스캔에서는 조회되지 않는다.
+
+지문 구성:
+- rule_id
+- 정규화된 code_snippet 해시 (공백 차이 무시)
+- finding 주변 컨텍스트 윈도우(±_CONTEXT_LINES줄) 해시
+
+무효화:
+- 키 네임스페이스에 저장소 ID, 룰셋 해시, CLAUDE_MODEL을 포함하여
+  룰이나 모델이 바뀌면 이전 항목은 자동으로 조회되지 않는다 (TTL로 만료).
+"""
+
+import hashlib
+import json
+import logging
+import re
+from typing import TYPE_CHECKING
+
+import redis.asyncio as aioredis
+
+from src.services.semgrep_cache import compute_ruleset_hash
+from src.services.semgrep_engine import SemgrepFinding
+
+if TYPE_CHECKING:
+    from src.services.llm_agent import LLMAnalysisResult
+
+logger = logging.getLogger(__name__)
+
+# Redis 키 접두사: llm-verdict:{namespace}:{fingerprint}
+_KEY_PREFIX = "llm-verdict"
+
+# 지문 계산에 사용할 finding 앞뒤 컨텍스트 줄 수
+_CONTEXT_LINES = 5
+
+# 프롬프트/저장 형식이 바뀌면 올려서 기존 항목을 무효화
+_CACHE_VERSION = 3
+
+# 캐시에 저장하는 LLMAnalysisResult 필드 — 코드가 담기는 필드는 제외
+_VERDICT_FIELDS = (
+    "finding_id",
+    "is_true_positive",
+    "confidence",
+    "severity",
+    "reasoning",
+    "patch_description",
+    "owasp_category",
+    "vulnerability_type",
+    "references",
+    "patchable",
+)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _normalize(text: str) -> str:
+    """공백 차이를 무시하도록 연속 공백을 하나로 합친다."""
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def finding_fingerprint(finding: SemgrepFinding, file_lines: list[str]) -> str:
+    """finding의 안정적인 지문을 계산한다.
+
+    라인 번호는 포함하지 않으므로 코드가 위아래로 이동해도 같은 지문이 된다.
+
+    Args:
+        finding: Semgrep 탐지 결과
+        file_lines: 파일 전체 내용을 줄 단위로 나눈 목록
+    """
+    start = max(0, finding.start_line - 1 - _CONTEXT_LINES)
+    end = min(len(file_lines), finding.end_line + _CONTEXT_LINES)
+    context = "\n".join(_normalize(line) for line in file_lines[start:end])
+    parts = [
+        finding.rule_id,
+        _sha256(_normalize(finding.code_snippet)),
+        _sha256(context),
+    ]
+    return _sha256("\0".join(parts))
+
+
+class LLMVerdictCache:
+    """finding 지문별 LLM 판정을 Redis에 캐시한다.
+
+    Redis 오류는 모두 캐시 미스로 처리하여 분석 자체는 항상 진행되게 한다.
+    """
+
+    def __init__(
+        self,
+        redis_conn: aioredis.Redis,
+        ttl_seconds: int,
+        model: str,
+        scope: str,
+        ruleset_hash: str | None = None,
+    ) -> None:
+        self._redis = redis_conn
+        self._ttl = ttl_seconds
+        self._namespace = _sha256(
+            f"v{_CACHE_VERSION}:{scope}:{model}:{ruleset_hash or compute_ruleset_hash()}"
+        )[:16]
+
+    def _key(self, fingerprint: str) -> str:
+        return f"{_KEY_PREFIX}:{self._namespace}:{fingerprint}"
+
+    async def get_many(self, fingerprints: list[str]) -> dict[str, dict]:
+        """지문 목록을 조회하여 히트한 항목만 반환한다.
+
+        Returns:
+            {지문: 판정 필드 dict (_VERDICT_FIELDS)}
+        """
+        if not fingerprints:
+            return {}
+        try:
+            values = await self._redis.mget([self._key(fp) for fp in fingerprints])
+        except Exception as e:
+            logger.warning(f"[LLMVerdictCache] 캐시 조회 실패 (전체 미스로 처리): {e}")
+            return {}
+
+        hits: dict[str, dict] = {}
+        for fp, value in zip(fingerprints, values):
+            if value is None:
+                continue
+            try:
+                hits[fp] = json.loads(value)
+            except (TypeError, json.JSONDecodeError):
+                continue
+        return hits
+
+    async def set_many(self, entries: dict[str, "LLMAnalysisResult"]) -> None:
+        """지문별 LLMAnalysisResult의 판정 필드만 TTL과 함께 저장한다."""
+        if not entries:
+            return
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            for fp, result in entries.items():
+                payload = {name: getattr(result, name) for name in _VERDICT_FIELDS}
+                pipe.set(self._key(fp), json.dumps(payload), ex=self._ttl)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"[LLMVerdictCache] 캐시 저장 실패 (무시): {e}")
+
+    async def close(self) -> None:
+        """Redis 연결을 닫는다."""
+        try:
+            await self._redis.aclose()
+        except Exception:
+            pass
+
+
+async def create_verdict_cache(
+    redis_url: str,
+    ttl_seconds: int,
+    model: str,
+    scope: str,
+) -> LLMVerdictCache | None:
+    """Redis 연결을 확인하고 판정 캐시를 생성한다. 연결 실패 또는 TTL 0이면 None.
+
+    Args:
+        scope: 캐시를 공유할 범위 (저장소 ID)
+    """
+    if ttl_seconds <= 0:
+        return None
+    try:
+        conn = aioredis.from_url(redis_url)
+        await conn.ping()
+    except Exception as e:
+        logger.warning(f"[LLMVerdictCache] Redis 연결 실패 — 캐시 없이 분석: {e}")
+        return None
+    return LLMVerdictCache(conn, ttl_seconds=ttl_seconds, model=model, scope=scope)
@@ -43,8 +43,8 @@ class PatchGenerator:
     3. PatchPR 레코드 DB 저장
     """
 
-    def __init__(self) -> None:
-        self._github_service = GitHubAppService()
+    def __init__(self, github_service: GitHubAppService | None = None) -> None:
+        self._github_service = github_service or GitHubAppService()
 
     async def generate_patch_prs(
         self,
@@ -0,0 +1,118 @@
+"""공유 Redis 연결 풀 — API 요청 경로에서 Redis 연결을 재사용하고 이벤트 루프를 막지 않는다
+
+요청마다 redis.from_url()로 새 연결(풀)을 만들고 동기 Queue.enqueue()를 호출하면
+웹훅이 몰릴 때 연결 수립과 블로킹 I/O가 이벤트 루프를 멈춰 API 전체의 p99가 튄다.
+
+- async 클라이언트 (redis.asyncio): lifespan에서 생성한 풀 하나를 rate limit 미들웨어,
+  헬스체크, 리포트 작업 등록(enqueue_rq_job)이 공유한다
+- sync 클라이언트: RQ Queue / 스캔 스케줄러용 (RQ는 동기 redis만 지원) — 프로세스당 풀 하나,
+  async 코드에서는 asyncio.to_thread()로 호출한다
+"""
+
+import logging
+from collections.abc import Callable
+from datetime import datetime, timezone
+from functools import lru_cache
+
+import redis
+import redis.asyncio as aioredis
+from rq import Queue
+from rq.job import Job, JobStatus
+
+from src.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# lifespan에서 생성 (lifespan 밖에서는 첫 get_async_redis() 호출 시 생성)
+_async_client: aioredis.Redis | None = None
+
+
+async def start_redis_pool() -> None:
+    """API 프로세스 공용 async Redis 연결 풀을 생성한다."""
+    global _async_client
+    if _async_client is None:
+        _async_client = _create_async_client()
+    logger.info(
+        f"[RedisPool] async 연결 풀 생성 (max_connections={settings.REDIS_MAX_CONNECTIONS})"
+    )
+
+
+async def stop_redis_pool() -> None:
+    """async Redis 연결 풀을 닫는다."""
+    global _async_client
+    client, _async_client = _async_client, None
+    if client is None:
+        return
+    try:
+        await client.aclose()
+    except Exception as e:
+        logger.warning(f"[RedisPool] async 연결 풀 종료 실패 (무시): {e}")
+
+
+def get_async_redis() -> aioredis.Redis:
+    """공용 async Redis 클라이언트 (연결은 풀에서 빌려 쓰고 반납한다 — 닫지 말 것)."""
+    global _async_client
+    if _async_client is None:
+        _async_client = _create_async_client()
+    return _async_client
+
+
+@lru_cache
+def get_sync_redis() -> redis.Redis:
+    """프로세스 공용 sync Redis 클라이언트 (RQ용, 스레드 안전한 연결 풀)."""
+    pool = redis.BlockingConnectionPool.from_url(
+        settings.REDIS_URL,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=settings.REDIS_POOL_TIMEOUT_SECONDS,
+    )
+    return redis.Redis(connection_pool=pool)
+
+
+def _create_async_client() -> aioredis.Redis:
+    pool = aioredis.BlockingConnectionPool.from_url(
+        settings.REDIS_URL,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=settings.REDIS_POOL_TIMEOUT_SECONDS,
+    )
+    return aioredis.Redis(connection_pool=pool)
+
+
+async def enqueue_rq_job(
+    queue_name: str,
+    func: str | Callable,
+    args: tuple = (),
+    kwargs: dict | None = None,
+    job_id: str | None = None,
+    job_timeout: int | str | None = None,
+) -> str:
+    """RQ 워커가 그대로 실행할 수 있는 잡을 async Redis 풀로 큐에 등록한다.
+
+    잡 직렬화는 RQ의 Job을 그대로 사용하고 (to_dict), Queue.enqueue()가 쓰는
+    키(rq:job:{id} 해시, rq:queue:{name} 목록, rq:queues 집합)에 한 번의 파이프라인으로 기록한다.
+    의존 잡(depends_on) / 재시도 / 예약 실행이 필요한 잡은 Queue.enqueue()를 사용할 것.
+
+    Returns:
+        RQ 잡 ID
+    """
+    # Job.create / Queue는 키 이름과 직렬화에만 쓰이며 sync 연결로 I/O하지 않는다
+    sync_conn = get_sync_redis()
+    queue = Queue(queue_name, connection=sync_conn)
+    job = Job.create(
+        func,
+        args=args,
+        kwargs=kwargs,
+        connection=sync_conn,
+        id=job_id,
+        timeout=job_timeout,
+        origin=queue_name,
+        status=JobStatus.QUEUED,
+    )
+    job.enqueued_at = datetime.now(timezone.utc)
+
+    pipe = get_async_redis().pipeline(transaction=True)
+    pipe.sadd(Queue.redis_queues_keys, queue.key)
+    pipe.hset(job.key, mapping=job.to_dict())
+    pipe.rpush(queue.key, job.id)
+    await pipe.execute()
+    return job.id
@@ -0,0 +1,145 @@
+"""Semgrep 룰 레지스트리 — 룰 팩(YAML 파일)을 언어 / 룰 ID / 내용 해시로 색인
+
+src/rules 디렉토리 전체를 --config로 넘기면 Python만 있는 저장소에서도 semgrep이
+javascript / java / go 룰 팩까지 모두 읽고 평가 준비를 한다. 프로세스 시작 시 룰 팩을
+한 번 읽어 색인해 두고, 스캔마다 대상 파일에 나타난 언어의 룰 팩만 --config로 넘긴다.
+
+- 언어 → 룰 팩 (룰의 languages 기준, 한 팩이 여러 언어를 다룰 수 있다)
+- 룰 ID → 룰 팩
+- 룰 팩별 내용 해시 / 전체 룰셋 해시 (결과 캐시 / LLM 판정 캐시 키)
+"""
+
+import hashlib
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+import yaml
+
+# 커스텀 룰 디렉토리 경로
+RULES_DIR = Path(__file__).parent.parent / "rules"
+
+# semgrep 언어 → 파일 확장자
+LANGUAGE_EXTENSIONS: dict[str, tuple[str, ...]] = {
+    "python": (".py",),
+    "javascript": (".js", ".jsx", ".mjs", ".cjs"),
+    "typescript": (".ts", ".tsx"),
+    "java": (".java",),
+    "go": (".go",),
+}
+
+_EXTENSION_LANGUAGES: dict[str, str] = {
+    ext: language for language, exts in LANGUAGE_EXTENSIONS.items() for ext in exts
+}
+
+
+def language_for_path(path: str) -> str | None:
+    """파일 확장자로 semgrep 언어를 판별한다 (룰이 다루지 않는 확장자는 None)."""
+    return _EXTENSION_LANGUAGES.get(Path(path).suffix.lower())
+
+
+def semgrep_rule_id(pack_path: Path, rule_id: str) -> str:
+    """룰 파일을 --config로 넘겼을 때 Semgrep이 보고하는 룰 ID (check_id).
+
+    Semgrep은 룰 파일이 있는 디렉토리 경로를 점으로 이어 룰 ID 앞에 붙인다.
+    작업 디렉토리 안이면 상대 경로, 밖이면 절대 경로 기준이다
+    (예: 작업 디렉토리 /app에서 /app/src/rules/python/x.yml → src.rules.python.<id>).
+    """
+    directory = Path(os.path.abspath(pack_path)).parent
+    try:
+        parts = directory.relative_to(Path.cwd()).parts
+    except ValueError:
+        parts = directory.parts[1:]
+    return ".".join((*parts, rule_id))
+
+
+@dataclass(frozen=True)
+class RulePack:
+    """룰 YAML 파일 1개."""
+
+    path: Path
+    relative_path: str              # 룰 디렉토리 기준 경로 (예: python/xss.yml)
+    languages: frozenset[str]
+    rule_ids: tuple[str, ...]
+    content_hash: str
+
+
+class RuleRegistry:
+    """룰 디렉토리의 룰 팩 색인."""
+
+    def __init__(self, rules_dir: Path = RULES_DIR) -> None:
+        self.rules_dir = rules_dir
+        self.packs: list[RulePack] = [
+            self._load_pack(path) for path in sorted(rules_dir.rglob("*.yml"))
+        ]
+        self._by_language: dict[str, list[RulePack]] = {}
+        self._by_rule_id: dict[str, RulePack] = {}
+        for pack in self.packs:
+            for language in pack.languages:
+                self._by_language.setdefault(language, []).append(pack)
+            for rule_id in pack.rule_ids:
+                self._by_rule_id[rule_id] = pack
+        self.ruleset_hash = self.hash_for(self.packs)
+        self._language_hashes = {
+            language: self.hash_for(packs) for language, packs in self._by_language.items()
+        }
+
+    def _load_pack(self, path: Path) -> RulePack:
+        data = path.read_bytes()
+        rules = (yaml.safe_load(data) or {}).get("rules") or []
+        languages: set[str] = set()
+        rule_ids: list[str] = []
+        for rule in rules:
+            languages.update(rule.get("languages") or [])
+            if rule.get("id"):
+                rule_ids.append(rule["id"])
+        return RulePack(
+            path=path,
+            relative_path=path.relative_to(self.rules_dir).as_posix(),
+            languages=frozenset(languages),
+            rule_ids=tuple(rule_ids),
+            content_hash=hashlib.sha256(data).hexdigest(),
+        )
+
+    @property
+    def languages(self) -> frozenset[str]:
+        """룰이 하나라도 있는 언어."""
+        return frozenset(self._by_language)
+
+    def packs_for_languages(self, languages: Iterable[str]) -> list[RulePack]:
+        """주어진 언어를 다루는 룰 팩 (룰 디렉토리 순서, 중복 없음)."""
+        wanted = set(languages)
+        return [pack for pack in self.packs if pack.languages & wanted]
+
+    def packs_for_files(self, paths: Iterable[str]) -> list[RulePack]:
+        """파일 목록에 나타난 언어의 룰 팩."""
+        languages = {language_for_path(path) for path in paths}
+        languages.discard(None)
+        return self.packs_for_languages(languages)
+
+    def pack_for_rule(self, rule_id: str) -> RulePack | None:
+        """룰 ID가 정의된 룰 팩."""
+        return self._by_rule_id.get(rule_id)
+
+    def hash_for(self, packs: Iterable[RulePack]) -> str:
+        """룰 팩 묶음의 해시 (경로 + 내용). 룰이 하나라도 바뀌면 달라진다."""
+        digest = hashlib.sha256()
+        for pack in sorted(packs, key=lambda p: p.relative_path):
+            digest.update(pack.relative_path.encode("utf-8"))
+            digest.update(b"\0")
+            digest.update(pack.path.read_bytes())
+            digest.update(b"\0")
+        return digest.hexdigest()[:16]
+
+    def hash_for_extension(self, ext: str) -> str:
+        """확장자의 언어에 적용되는 룰 팩만의 해시 (다른 언어 룰 변경에는 영향받지 않는다)."""
+        language = _EXTENSION_LANGUAGES.get(ext.lower())
+        return self._language_hashes.get(language, self.ruleset_hash)
+
+
+@lru_cache
+def get_rule_registry(rules_dir: Path = RULES_DIR) -> RuleRegistry:
+    """프로세스 공용 룰 레지스트리 (처음 호출 시 룰 디렉토리를 읽는다)."""
+    return RuleRegistry(rules_dir)
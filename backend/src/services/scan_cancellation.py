@@ -0,0 +1,83 @@
+"""스캔 취소 — Redis 취소 플래그 기반 협조적 취소
+
+DB의 ScanJob.status만 cancelled로 바꾸면 이미 실행 중인 RQ 잡은 계속 돌면서
+다운로드, Semgrep, Claude 호출, 패치 PR 생성까지 마친다. 취소 요청 시
+Redis에 취소 플래그(vulnix:scan-cancel:{job_id})를 남기고, 워커는
+
+- 파이프라인 단계 사이
+- Claude 호출 직전 (LLM 팬아웃 내부)
+- Semgrep 프로세스 실행 중 (주기적으로 확인 후 프로세스 종료)
+
+에서 플래그를 확인하여 ScanCancelledError로 스캔을 중단한다.
+Redis 조회 실패 시에는 취소되지 않은 것으로 보고 스캔을 계속한다.
+"""
+
+import logging
+import threading
+import time
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "vulnix:scan-cancel:"
+
+# 취소 플래그 보존 시간 — 재시도 / 대기 중인 잡이 시작될 때까지 남아 있어야 한다
+CANCEL_FLAG_TTL_SECONDS = 24 * 3600
+
+# 같은 스캔 안에서 Redis 조회 간격 (Claude 호출마다 조회하지 않도록)
+_POLL_INTERVAL_SEC = 2.0
+
+
+class ScanCancelledError(Exception):
+    """스캔이 취소되어 파이프라인을 중단할 때 발생한다.
+
+    RuntimeError를 상속하지 않아 Semgrep 샤드 실패 / LLM 묶음 실패 처리에 삼켜지지 않는다.
+    """
+
+
+def cancel_key(job_id: str) -> str:
+    """스캔 취소 플래그 Redis 키."""
+    return f"{_KEY_PREFIX}{job_id}"
+
+
+def request_cancel(redis_conn: redis.Redis, job_id: str) -> None:
+    """스캔 취소 플래그를 설정한다."""
+    redis_conn.set(cancel_key(job_id), 1, ex=CANCEL_FLAG_TTL_SECONDS)
+
+
+class ScanCancellation:
+    """스캔 1건의 취소 플래그 확인기 (스레드 안전, 한 번 취소되면 계속 취소 상태)."""
+
+    def __init__(
+        self,
+        redis_conn: redis.Redis,
+        job_id: str,
+        poll_interval: float = _POLL_INTERVAL_SEC,
+    ) -> None:
+        self._redis = redis_conn
+        self.job_id = job_id
+        self._poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._checked_at: float | None = None
+
+    def is_cancelled(self) -> bool:
+        """취소 여부. Redis 조회는 poll_interval마다 한 번만 한다."""
+        with self._lock:
+            if self._cancelled:
+                return True
+            now = time.monotonic()
+            if self._checked_at is not None and now - self._checked_at < self._poll_interval:
+                return False
+            self._checked_at = now
+            try:
+                self._cancelled = self._redis.exists(cancel_key(self.job_id)) == 1
+            except redis.RedisError as e:
+                logger.warning(f"[ScanCancellation] 취소 플래그 조회 실패 (job_id={self.job_id}): {e}")
+            return self._cancelled
+
+    def raise_if_cancelled(self) -> None:
+        """취소되었으면 ScanCancelledError를 발생시킨다."""
+        if self.is_cancelled():
+            raise ScanCancelledError(f"스캔 취소됨 (job_id={self.job_id})")
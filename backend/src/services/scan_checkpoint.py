@@ -0,0 +1,181 @@
+"""스캔 단계 체크포인트 — 재시도 시 마지막으로 완료된 단계부터 이어서 실행
+
+스캔이 늦은 단계(DB 저장, 패치 PR 생성 등)에서 실패하면 RQ Retry가 전체 파이프라인을
+다시 실행하여 다운로드, Semgrep, LLM 분석 비용을 한 번 더 치른다.
+스캔 잡 ID별로 단계 결과를 Redis에 TTL과 함께 남기고, 재시도는 이를 이어받는다.
+
+- detect: FP 필터링까지 마친 Semgrep findings (+ 자동 필터링 건수, 스캔 파일 수, 커밋)
+- llm: 파일별 LLMAnalysisResult 목록 (분석 묶음이 끝날 때마다 저장)
+
+고객 코드는 저장하지 않는다 (ADR-003): findings의 코드 조각(code_snippet)과 LLM 결과의
+패치(patch_diff)는 빼고 저장하며, 재시도는 findings가 있는 파일을 다시 내려받아
+코드 조각을 읽고(restore_code_snippets) 패치를 다시 만든다.
+스캔이 완료 / 취소되거나 마지막 재시도까지 실패하면 체크포인트를 지운다.
+
+재시도는 detect 체크포인트가 있으면 Semgrep을 건너뛰고, LLM 결과가 없는 파일만 분석한다.
+Redis 오류는 모두 체크포인트 없음으로 처리하여 스캔 자체는 항상 진행된다.
+"""
+
+import dataclasses
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+import redis.asyncio as aioredis
+
+from src.services.llm_agent import LLMAnalysisResult
+from src.services.semgrep_engine import SemgrepFinding
+
+logger = logging.getLogger(__name__)
+
+# Redis 키: scan-checkpoint:v{버전}:{job_id}:{단계}
+_KEY_PREFIX = "scan-checkpoint"
+
+# 저장 형식이 바뀌면 올려서 기존 체크포인트를 무시
+_CHECKPOINT_VERSION = 2
+
+
+@dataclass
+class DetectionCheckpoint:
+    """Semgrep 1차 스캔 + FP 필터링 단계 결과."""
+
+    commit_sha: str | None
+    findings: list[SemgrepFinding]
+    auto_filtered_count: int = 0
+    files_scanned: int = 0
+
+
+def _serialize_finding(finding: SemgrepFinding) -> dict:
+    """코드 조각을 제외한 finding 메타데이터."""
+    data = dataclasses.asdict(finding)
+    del data["code_snippet"]
+    return data
+
+
+def _serialize_result(result: LLMAnalysisResult) -> dict:
+    """패치 diff를 제외한 LLM 분석 결과."""
+    data = dataclasses.asdict(result)
+    data["patch_diff"] = None
+    return data
+
+
+def restore_code_snippets(findings: list[SemgrepFinding], base_dir: Path) -> None:
+    """체크포인트에서 복원한 findings의 코드 조각을 내려받은 파일에서 다시 채운다."""
+    lines_by_file: dict[str, list[str] | None] = {}
+    for finding in findings:
+        if finding.file_path not in lines_by_file:
+            try:
+                text = (base_dir / finding.file_path).read_text(encoding="utf-8", errors="replace")
+                lines_by_file[finding.file_path] = text.split("\n")
+            except OSError:
+                lines_by_file[finding.file_path] = None
+        lines = lines_by_file[finding.file_path]
+        if lines is not None:
+            finding.code_snippet = "\n".join(lines[finding.start_line - 1:finding.end_line])
+
+
+class ScanCheckpoint:
+    """스캔 잡 1건의 단계별 체크포인트를 Redis에 저장 / 조회한다."""
+
+    def __init__(self, redis_conn: aioredis.Redis, job_id: str, ttl_seconds: int) -> None:
+        self._redis = redis_conn
+        self.job_id = job_id
+        self._ttl = ttl_seconds
+
+    def _key(self, stage: str) -> str:
+        return f"{_KEY_PREFIX}:v{_CHECKPOINT_VERSION}:{self.job_id}:{stage}"
+
+    async def load_detection(self, commit_sha: str | None) -> DetectionCheckpoint | None:
+        """같은 커밋의 detect 체크포인트를 조회한다 (없거나 커밋이 다르면 None)."""
+        try:
+            raw = await self._redis.get(self._key("detect"))
+            if raw is None:
+                return None
+            data = json.loads(raw)
+        except Exception as e:
+            logger.warning(f"[ScanCheckpoint] detect 체크포인트 조회 실패 (job_id={self.job_id}): {e}")
+            return None
+        if data.get("commit_sha") != commit_sha:
+            return None
+        return DetectionCheckpoint(
+            commit_sha=data["commit_sha"],
+            findings=[SemgrepFinding(code_snippet="", **item) for item in data["findings"]],
+            auto_filtered_count=data.get("auto_filtered_count", 0),
+            files_scanned=data.get("files_scanned", 0),
+        )
+
+    async def save_detection(self, checkpoint: DetectionCheckpoint) -> None:
+        """detect 체크포인트를 저장한다. 이전 LLM 결과는 새 findings 기준이 아니므로 지운다."""
+        payload = json.dumps({
+            "commit_sha": checkpoint.commit_sha,
+            "findings": [_serialize_finding(f) for f in checkpoint.findings],
+            "auto_filtered_count": checkpoint.auto_filtered_count,
+            "files_scanned": checkpoint.files_scanned,
+        })
+        try:
+            pipe = self._redis.pipeline(transaction=True)
+            pipe.set(self._key("detect"), payload, ex=self._ttl)
+            pipe.delete(self._key("llm"))
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"[ScanCheckpoint] detect 체크포인트 저장 실패 (무시): {e}")
+
+    async def load_llm_results(self) -> dict[str, list[LLMAnalysisResult]]:
+        """분석이 끝난 파일별 LLM 결과를 조회한다 (patch_diff는 비어 있다)."""
+        try:
+            raw = await self._redis.hgetall(self._key("llm"))
+        except Exception as e:
+            logger.warning(f"[ScanCheckpoint] LLM 체크포인트 조회 실패 (job_id={self.job_id}): {e}")
+            return {}
+        results: dict[str, list[LLMAnalysisResult]] = {}
+        for file_path, value in raw.items():
+            if isinstance(file_path, bytes):
+                file_path = file_path.decode("utf-8")
+            try:
+                results[file_path] = [LLMAnalysisResult(**item) for item in json.loads(value)]
+            except (TypeError, json.JSONDecodeError):
+                continue
+        return results
+
+    async def save_file_results(self, file_path: str, results: list[LLMAnalysisResult]) -> None:
+        """파일 1개의 LLM 분석 결과를 저장한다."""
+        payload = json.dumps([_serialize_result(r) for r in results])
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.hset(self._key("llm"), file_path, payload)
+            pipe.expire(self._key("llm"), self._ttl)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"[ScanCheckpoint] LLM 체크포인트 저장 실패 (무시, {file_path}): {e}")
+
+    async def clear(self) -> None:
+        """스캔이 끝나면 (완료 / 취소 / 마지막 재시도 실패) 체크포인트를 지운다."""
+        try:
+            await self._redis.delete(self._key("detect"), self._key("llm"))
+        except Exception as e:
+            logger.warning(f"[ScanCheckpoint] 체크포인트 삭제 실패 (TTL 만료 대기): {e}")
+
+    async def close(self) -> None:
+        """Redis 연결을 닫는다."""
+        try:
+            await self._redis.aclose()
+        except Exception:
+            pass
+
+
+async def create_scan_checkpoint(
+    redis_url: str,
+    job_id: str,
+    ttl_seconds: int,
+) -> ScanCheckpoint | None:
+    """Redis 연결을 확인하고 체크포인트 저장소를 생성한다. 연결 실패 또는 TTL 0이면 None."""
+    if ttl_seconds <= 0:
+        return None
+    try:
+        conn = aioredis.from_url(redis_url)
+        await conn.ping()
+    except Exception as e:
+        logger.warning(f"[ScanCheckpoint] Redis 연결 실패 — 체크포인트 없이 스캔: {e}")
+        return None
+    return ScanCheckpoint(conn, job_id=job_id, ttl_seconds=ttl_seconds)
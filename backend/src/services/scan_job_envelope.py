@@ -0,0 +1,42 @@
+"""스캔 잡 봉투 — Redis(RQ 큐, 스케줄러 대기 목록)에 넣는 압축·버전 관리 페이로드
+
+ScanJobMessage를 그대로 pickle하면 큰 push의 changed_files(수천 경로)가 ScanJob.changed_files와
+중복으로 Redis에 쌓이고, 워커 배포 시 클래스 구조가 바뀌면 큐에 남은 잡을 풀 수 없다.
+봉투에는 식별자와 스키마 버전만 JSON으로 담고, 나머지는 워커가 DB에서 한 번에 읽는다.
+
+- v: 스키마 버전 (워커는 아는 버전만 처리)
+- job_id: ScanJob ID
+- team_id: 팀 슬롯 반납용 (팀이 없는 저장소는 null)
+- lane: 레인 슬롯 반납용
+"""
+
+import json
+from dataclasses import asdict, dataclass
+
+# 봉투 필드가 바뀌면 올리고, 워커가 새 버전을 먼저 처리할 수 있게 배포한다
+SCAN_JOB_ENVELOPE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class ScanJobEnvelope:
+    """스캔 잡 식별자 묶음."""
+
+    job_id: str
+    team_id: str | None
+    lane: str
+
+    def encode(self) -> str:
+        """공백 없는 JSON 문자열로 직렬화한다."""
+        return json.dumps(
+            {"v": SCAN_JOB_ENVELOPE_VERSION, **asdict(self)},
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def decode(cls, raw: str | bytes) -> "ScanJobEnvelope":
+        """JSON 봉투를 읽는다. 알 수 없는 버전이면 ValueError."""
+        data = json.loads(raw)
+        version = data.get("v")
+        if version != SCAN_JOB_ENVELOPE_VERSION:
+            raise ValueError(f"지원하지 않는 스캔 잡 봉투 버전: {version}")
+        return cls(job_id=data["job_id"], team_id=data.get("team_id"), lane=data["lane"])
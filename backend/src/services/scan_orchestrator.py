@@ -1,17 +1,37 @@
-"""스캔 오케스트레이터 — 스캔 작업 큐잉, 상태 추적, 실패 재시도"""
+"""스캔 오케스트레이터 — 스캔 작업 큐잉, 상태 추적, 실패 재시도
 
+Redis 연결은 프로세스 공용 연결 풀(redis_pool.get_sync_redis)을 쓰고,
+async 메서드 안의 동기 Redis / RQ 호출은 asyncio.to_thread()로 실행하여
+API / 웹훅 처리 중 이벤트 루프를 막지 않는다.
+"""
+
+import asyncio
+import logging
 import uuid
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
-import redis
 from rq import Queue, Retry
+from rq.exceptions import NoSuchJobError
+from rq.job import Dependency, Job, JobStatus
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.config import get_settings
+from src.models.repository import Repository
 from src.models.scan_job import ScanJob
-
+from src.models.team import Team
+from src.services.redis_pool import get_sync_redis
+from src.services.scan_cancellation import request_cancel
+from src.services.scan_job_envelope import ScanJobEnvelope
+from src.services.scan_scheduler import (
+    LANE_QUEUES,
+    FairScanScheduler,
+    lane_for_scan,
+    team_weight,
+)
+
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
 # 최대 재시도 횟수
@@ -20,9 +40,10 @@ MAX_RETRY_COUNT = 3
 
 @dataclass
 class ScanJobMessage:
-    """Redis 큐에 등록할 스캔 작업 메시지.
+    """스캔 작업 메시지.
 
-    이 구조체가 워커로 전달된다.
+    Redis에는 식별자만 담은 봉투(ScanJobEnvelope)가 들어가고,
+    워커가 ScanJob 행에서 이 구조체를 다시 만든다.
     """
 
     job_id: str
@@ -34,13 +55,39 @@ class ScanJobMessage:
     scan_type: str
     changed_files: list[str] | None
     created_at: str    # ISO 8601 형식
+    team_id: str | None = None   # 팀별 공정 스케줄링 / 동시 실행 상한 기준
+
+
+def _followup_key(repo_id: uuid.UUID | str, branch: str) -> str:
+    """실행 중인 push 스캔이 끝나면 큐에 넣을 후속 ScanJob ID를 담는 Redis 키."""
+    return f"vulnix:push-followup:{repo_id}:{branch}"
+
+
+def _is_stale(scan_job: ScanJob) -> bool:
+    """실행 중인 스캔이 슬롯 TTL을 넘겼는지 (워커가 죽어 상태를 바꾸지 못한 경우)."""
+    started = scan_job.started_at or scan_job.created_at
+    if not isinstance(started, datetime):
+        return False
+    if started.tzinfo is None:
+        started = started.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - started > timedelta(seconds=settings.SCAN_SLOT_TTL_SECONDS)
+
+
+def _union_changed_files(
+    current: list[str] | None,
+    incoming: list[str] | None,
+) -> list[str] | None:
+    """두 push의 변경 파일 목록을 합친다. 어느 한쪽이 None(전체 스캔)이면 None."""
+    if current is None or incoming is None:
+        return None
+    return sorted(set(current) | set(incoming))
 
 
 class ScanOrchestrator:
     """스캔 작업의 생명주기를 관리하는 오케스트레이터.
 
     역할:
-    - 스캔 작업을 Redis 큐에 등록
+    - 스캔 작업을 Redis 큐에 등록 (우선순위 레인 + 팀별 공정 스케줄링, FairScanScheduler)
     - 작업 상태 추적 (queued -> running -> completed / failed)
     - 실패 시 재시도 (최대 3회)
     """
@@ -48,8 +95,13 @@ class ScanOrchestrator:
     def __init__(self, db: AsyncSession) -> None:
         """DB 세션을 주입받아 초기화한다."""
         self.db = db
-        self._redis_conn = redis.from_url(settings.REDIS_URL)
-        self._queue = Queue("scans", connection=self._redis_conn)
+        self._redis_conn = get_sync_redis()
+        self._scheduler = FairScanScheduler(
+            self._redis_conn,
+            team_max_concurrent=settings.SCAN_TEAM_MAX_CONCURRENT,
+            lane_max_inflight=settings.SCAN_LANE_MAX_INFLIGHT,
+            slot_ttl_seconds=settings.SCAN_SLOT_TTL_SECONDS,
+        )
 
     async def enqueue_scan(
         self,
@@ -91,30 +143,319 @@ class ScanOrchestrator:
         await self.db.flush()
 
         job_id = str(scan_job.id)
+        await self._submit(
+            ScanJobMessage(
+                job_id=job_id,
+                repo_id=str(repo_id),
+                trigger=trigger,
+                commit_sha=commit_sha,
+                branch=branch,
+                pr_number=pr_number,
+                scan_type=scan_type,
+                changed_files=changed_files,
+                created_at=datetime.now(timezone.utc).isoformat(),
+            )
+        )
+        return job_id
+
+    async def enqueue_push_scan(
+        self,
+        repo_id: uuid.UUID,
+        branch: str,
+        commit_sha: str,
+        changed_files: list[str] | None,
+    ) -> str:
+        """push 스캔을 (저장소, 브랜치) 단위로 합쳐 등록한다.
+
+        짧은 시간에 push가 몰려도 버스트당 스캔 1건이 최신 커밋을 스캔한다.
+        - 아직 시작하지 않은 push 스캔이 있으면 그 스캔의 commit_sha를 최신으로 바꾸고
+          changed_files를 합친다 (워커는 시작 시 DB의 값을 다시 읽는다)
+        - 실행 중인 push 스캔이 있으면 후속 스캔을 1건만 만들어 두고,
+          실행 중인 스캔이 끝날 때(submit_push_followup) 큐에 넣는다
+        - 둘 다 없으면 바로 등록한다
+
+        실행 중인 스캔의 워커가 죽으면(OOM / SIGKILL) 후속 스캔이 큐에 들어가지 못한 채
+        남는다. 슬롯 TTL을 넘긴 running 스캔은 failed로 바꾸고, 그 스캔을 기다리던
+        후속 스캔은 이번 push에서 바로 큐에 넣는다.
+
+        Args:
+            repo_id: 저장소 ID
+            branch: push된 브랜치
+            commit_sha: push의 최신 커밋 SHA
+            changed_files: 변경 파일 목록 (None이면 전체 스캔)
 
-        # Redis 큐에 메시지 등록
-        message = ScanJobMessage(
-            job_id=job_id,
-            repo_id=str(repo_id),
-            trigger=trigger,
+        Returns:
+            등록 또는 갱신된 ScanJob ID
+        """
+        # 워커가 running으로 바꾸는 UPDATE와 직렬화하기 위해 행 잠금
+        result = await self.db.execute(
+            self._push_scan_query(repo_id, branch, "queued").with_for_update()
+        )
+        queued = result.scalars().first()
+        if queued is not None:
+            queued.commit_sha = commit_sha
+            queued.changed_files = _union_changed_files(queued.changed_files, changed_files)
+            await self.db.flush()
+            await self._submit_orphaned_followup(queued, repo_id, branch)
+            return str(queued.id)
+
+        running = await self._active_push_scan(repo_id, branch)
+        if running is None:
+            return await self.enqueue_scan(
+                repo_id=repo_id,
+                trigger="webhook",
+                commit_sha=commit_sha,
+                branch=branch,
+                scan_type="incremental",
+                changed_files=changed_files,
+            )
+
+        # 후속 스캔: ScanJob(queued)만 만들고 큐 등록은 실행 중인 스캔이 끝날 때
+        followup = ScanJob(
+            repo_id=repo_id,
+            status="queued",
+            trigger_type="webhook",
             commit_sha=commit_sha,
             branch=branch,
-            pr_number=pr_number,
-            scan_type=scan_type,
+            scan_type="incremental",
             changed_files=changed_files,
-            created_at=datetime.now(timezone.utc).isoformat(),
+            retry_count=0,
+        )
+        self.db.add(followup)
+        await self.db.commit()
+        await asyncio.to_thread(
+            self._redis_conn.set,
+            _followup_key(repo_id, branch),
+            str(followup.id),
+            ex=settings.SCAN_SLOT_TTL_SECONDS,
         )
 
-        self._queue.enqueue(
-            "src.workers.scan_worker.run_scan",
-            args=(message,),
-            job_id=job_id,
-            retry=Retry(max=3, interval=[10, 30, 60]),
-            job_timeout="10m",
+        # 그 사이 실행 중이던 스캔이 끝났다면 후속 스캔을 직접 등록한다
+        # (GETDEL로 워커와 둘 중 하나만 등록)
+        result = await self.db.execute(
+            select(ScanJob.status).where(ScanJob.id == running.id)
         )
+        if result.scalar_one_or_none() != "running":
+            await self.submit_push_followup(repo_id, branch)
+        return str(followup.id)
+
+    async def submit_push_followup(self, repo_id: uuid.UUID | str, branch: str) -> str | None:
+        """실행 중이던 push 스캔이 끝났을 때 대기 중인 후속 스캔을 큐에 넣는다.
+
+        Returns:
+            큐에 넣은 후속 ScanJob ID (없으면 None)
+        """
+        job_id = await asyncio.to_thread(self._redis_conn.getdel, _followup_key(repo_id, branch))
+        if not job_id:
+            return None
+        job_id = job_id.decode() if isinstance(job_id, bytes) else job_id
 
+        result = await self.db.execute(
+            select(ScanJob).where(ScanJob.id == uuid.UUID(job_id))
+        )
+        scan_job = result.scalar_one_or_none()
+        if scan_job is None or scan_job.status != "queued":
+            return None
+        await self._submit(self._message_for(scan_job))
         return job_id
 
+    async def _active_push_scan(self, repo_id: uuid.UUID, branch: str) -> ScanJob | None:
+        """(저장소, 브랜치)의 실행 중인 push 스캔 (응답 없는 스캔은 failed로 바꾸고 None)."""
+        result = await self.db.execute(self._push_scan_query(repo_id, branch, "running"))
+        running = result.scalars().first()
+        if running is not None and _is_stale(running):
+            await self._fail_stale_scan(running)
+            return None
+        return running
+
+    async def _fail_stale_scan(self, scan_job: ScanJob) -> None:
+        """슬롯 TTL을 넘긴 running 스캔을 워커가 죽은 것으로 보고 failed로 바꾼다."""
+        scan_job.status = "failed"
+        scan_job.error_message = "스캔 워커 응답 없음 (슬롯 TTL 초과)"
+        scan_job.completed_at = datetime.now(timezone.utc)
+        await self.db.flush()
+        logger.warning(
+            f"[ScanOrchestrator] 응답 없는 push 스캔을 failed로 변경: job_id={scan_job.id}, "
+            f"branch={scan_job.branch}"
+        )
+
+    async def _submit_orphaned_followup(self, queued: ScanJob, repo_id: uuid.UUID, branch: str) -> None:
+        """큐에 들어가지 못한 후속 push 스캔을 큐에 넣는다.
+
+        - 실행 중이던 스캔이 응답 없음: failed로 바꾸고 후속 스캔을 등록
+        - 실행 중인 스캔이 없는데 후속 스캔 키가 남아 있음: 끝난 스캔의 워커가 등록 전에 죽은 경우
+        후속 스캔 키가 남아 있으면 submit_push_followup(GETDEL)으로 워커와 둘 중 하나만 등록한다.
+        키도 실행 중인 스캔도 없으면 이미 등록된 스캔이다.
+        """
+        key = _followup_key(repo_id, branch)
+        pending_id = await asyncio.to_thread(self._redis_conn.get, key)
+        if isinstance(pending_id, bytes):
+            pending_id = pending_id.decode()
+        is_pending = pending_id == str(queued.id)
+
+        result = await self.db.execute(self._push_scan_query(repo_id, branch, "running"))
+        running = result.scalars().first()
+        if running is not None:
+            if not _is_stale(running):
+                return
+            await self._fail_stale_scan(running)
+        elif not is_pending:
+            return
+
+        await self.db.commit()
+        if is_pending:
+            submitted = await self.submit_push_followup(repo_id, branch) is not None
+        else:
+            await self._submit(self._message_for(queued))
+            submitted = True
+        if submitted:
+            logger.warning(
+                f"[ScanOrchestrator] 등록되지 않은 후속 push 스캔 등록: job_id={queued.id}, "
+                f"repo_id={repo_id}, branch={branch}"
+            )
+
+    @staticmethod
+    def _message_for(scan_job: ScanJob) -> ScanJobMessage:
+        """ScanJob 행으로 큐 등록용 스캔 메시지를 만든다."""
+        return ScanJobMessage(
+            job_id=str(scan_job.id),
+            repo_id=str(scan_job.repo_id),
+            trigger=scan_job.trigger_type,
+            commit_sha=scan_job.commit_sha,
+            branch=scan_job.branch,
+            pr_number=scan_job.pr_number,
+            scan_type=scan_job.scan_type,
+            changed_files=scan_job.changed_files,
+            created_at=datetime.now(timezone.utc).isoformat(),
+        )
+
+    def _push_scan_query(self, repo_id: uuid.UUID, branch: str, status: str):
+        """(저장소, 브랜치)의 push 스캔 조회 쿼리."""
+        return select(ScanJob).where(
+            ScanJob.repo_id == repo_id,
+            ScanJob.branch == branch,
+            ScanJob.trigger_type == "webhook",
+            ScanJob.scan_type == "incremental",
+            ScanJob.status == status,
+        ).order_by(ScanJob.created_at.desc())
+
+    async def _submit(self, message: ScanJobMessage) -> None:
+        """스캔 메시지를 팀 대기 목록에 등록한다 — 스케줄러가 레인 / 팀 상한에 맞춰 RQ 큐로 보낸다."""
+        team_id, plan = await self._load_team(uuid.UUID(message.repo_id))
+        message.team_id = team_id
+        await asyncio.to_thread(
+            self._scheduler.submit,
+            message,
+            team_id=team_id or "",
+            weight=team_weight(plan, settings.SCAN_TEAM_WEIGHTS),
+        )
+
+    async def _load_team(self, repo_id: uuid.UUID) -> tuple[str | None, str | None]:
+        """저장소의 (팀 ID, 팀 플랜)을 조회한다. 없으면 (None, None)."""
+        result = await self.db.execute(
+            select(Repository.team_id, Team.plan)
+            .join(Team, Team.id == Repository.team_id)
+            .where(Repository.id == repo_id)
+        )
+        # AsyncMock 환경에서는 one_or_none이 coroutine일 수 있으므로 await 처리
+        one_or_none = result.one_or_none
+        if asyncio.iscoroutinefunction(one_or_none):
+            row = await one_or_none()
+        else:
+            row = one_or_none()
+        if row is None:
+            return None, None
+        return str(row[0]), row[1]
+
+    def release_scan_slot(self, message: ScanJobMessage) -> None:
+        """끝난 스캔의 팀 / 레인 슬롯을 반납하고 대기 중인 다음 스캔을 RQ 큐로 보낸다."""
+        self._scheduler.release(
+            message.job_id,
+            team_id=message.team_id or "",
+            lane=lane_for_scan(message.trigger, message.scan_type),
+        )
+
+    def _lane_queue(self, message: ScanJobMessage) -> Queue:
+        """스캔 메시지가 속한 레인의 RQ 큐 (map-reduce 하위 잡용)."""
+        lane = lane_for_scan(message.trigger, message.scan_type)
+        return Queue(LANE_QUEUES[lane], connection=self._redis_conn)
+
+    @staticmethod
+    def _envelope(message: ScanJobMessage) -> str:
+        """RQ 잡 인자로 넣을 스캔 잡 봉투 (식별자만 담은 JSON)."""
+        lane = lane_for_scan(message.trigger, message.scan_type)
+        return ScanJobEnvelope(message.job_id, message.team_id, lane).encode()
+
+    def enqueue_shard_scans(
+        self,
+        message: ScanJobMessage,
+        shards: list[list[str]],
+    ) -> list[str]:
+        """map-reduce 스캔의 샤드 잡들을 코디네이터 레인의 큐에 등록한다.
+
+        샤드 잡은 코디네이터가 잡은 팀 / 레인 슬롯으로 실행되며(슬롯은 fan-in 잡이 반납),
+        스케줄러 대기 목록을 거치지 않는다. 샤드 결과(코드 조각, 패치 diff 포함)는
+        fan-in 잡이 읽은 뒤 삭제하고(delete_shard_jobs), 그 전에도 스캔 슬롯 TTL까지만
+        보존한다 (ADR-003).
+
+        Args:
+            message: 코디네이터 잡의 스캔 메시지
+            shards: 샤드별 스캔 대상 파일 목록
+
+        Returns:
+            등록한 샤드 잡 ID 목록 ({job_id}-shard-{index})
+        """
+        queue = self._lane_queue(message)
+        envelope = self._envelope(message)
+        child_ids: list[str] = []
+        for index, files in enumerate(shards):
+            child_id = f"{message.job_id}-shard-{index}"
+            queue.enqueue(
+                "src.workers.scan_worker.run_scan_shard",
+                args=(envelope, index, files),
+                job_id=child_id,
+                retry=Retry(max=2, interval=[10, 30]),
+                job_timeout="10m",
+                result_ttl=settings.SCAN_SLOT_TTL_SECONDS,
+                failure_ttl=settings.SCAN_SLOT_TTL_SECONDS,
+            )
+            child_ids.append(child_id)
+        return child_ids
+
+    def enqueue_fan_in(self, message: ScanJobMessage, child_ids: list[str]) -> str:
+        """모든 샤드 잡이 끝나면(실패 포함) 실행될 fan-in 잡을 등록한다."""
+        fan_in_id = f"{message.job_id}-fan-in"
+        self._lane_queue(message).enqueue(
+            "src.workers.scan_worker.finalize_mapreduce_scan",
+            args=(self._envelope(message), child_ids),
+            job_id=fan_in_id,
+            depends_on=Dependency(jobs=child_ids, allow_failure=True),
+            retry=Retry(max=2, interval=[10, 30]),
+            job_timeout="10m",
+        )
+        return fan_in_id
+
+    def fetch_shard_results(self, child_ids: list[str]) -> list[dict | None]:
+        """샤드 잡 반환값을 순서대로 조회한다. 실패했거나 만료된 샤드는 None."""
+        jobs = Job.fetch_many(child_ids, connection=self._redis_conn)
+        results: list[dict | None] = []
+        for job in jobs:
+            if job is None or job.get_status() != JobStatus.FINISHED:
+                results.append(None)
+                continue
+            results.append(job.return_value())
+        return results
+
+    def delete_shard_jobs(self, child_ids: list[str]) -> None:
+        """fan-in이 끝난 샤드 잡과 결과를 Redis에서 삭제한다 (실패는 TTL 만료에 맡긴다)."""
+        try:
+            jobs = Job.fetch_many(child_ids, connection=self._redis_conn)
+            for job in jobs:
+                if job is not None:
+                    job.delete()
+        except Exception as e:
+            logger.warning(f"[ScanOrchestrator] 샤드 잡 삭제 실패 (TTL 후 만료): {e}")
+
     async def has_active_scan(self, repo_id: uuid.UUID) -> bool:
         """동일 저장소에 진행 중인 스캔이 있는지 확인한다.
 
@@ -139,6 +480,11 @@ class ScanOrchestrator:
     ) -> int:
         """동일 PR에 대한 진행 중 스캔을 모두 취소한다.
 
+        - ScanJob status -> cancelled
+        - Redis 취소 플래그 설정: 실행 중인 워커가 다음 확인 지점에서 중단하고
+          (Semgrep 프로세스 종료, Claude 호출 중단), 스케줄러 대기 목록의 잡은 디스패치되지 않는다
+        - 아직 시작하지 않은 RQ 잡은 큐에서 제거한다
+
         Args:
             repo_id: 저장소 ID
             pr_number: PR 번호
@@ -157,9 +503,20 @@ class ScanOrchestrator:
 
         for job in active_jobs:
             job.status = "cancelled"
+            await asyncio.to_thread(self.cancel_scan_job, str(job.id))
 
         return len(active_jobs)
 
+    def cancel_scan_job(self, job_id: str) -> None:
+        """스캔 잡의 취소 플래그를 설정하고, 큐에서 대기 중인 RQ 잡이면 제거한다."""
+        request_cancel(self._redis_conn, job_id)
+        try:
+            rq_job = Job.fetch(job_id, connection=self._redis_conn)
+        except NoSuchJobError:
+            return  # 스케줄러 대기 목록에 있거나 이미 만료됨
+        if rq_job.get_status() in (JobStatus.QUEUED, JobStatus.DEFERRED, JobStatus.SCHEDULED):
+            rq_job.cancel()
+
     async def get_job_status(self, job_id: str) -> str:
         """Redis 큐에서 작업 상태를 조회한다.
 
@@ -187,12 +544,18 @@ class ScanOrchestrator:
             status: 새 상태 (running / completed / failed / cancelled)
             error_message: 실패 시 에러 메시지
         """
+        # 다른 세션(웹훅)이 취소했을 수 있으므로 세션에 캐시된 객체를 DB 값으로 다시 채운다
         result = await self.db.execute(
-            select(ScanJob).where(ScanJob.id == uuid.UUID(job_id))
+            select(ScanJob)
+            .where(ScanJob.id == uuid.UUID(job_id))
+            .execution_options(populate_existing=True)
         )
         scan_job = result.scalar_one_or_none()
         if scan_job is None:
             return
+        # 취소된 스캔은 워커가 running / completed / failed로 덮어쓰지 않는다
+        if scan_job.status == "cancelled" and status != "cancelled":
+            return
 
         scan_job.status = status
         now = datetime.now(timezone.utc)
@@ -0,0 +1,235 @@
+"""스캔 스케줄러 — 우선순위 레인 + 레인 내 팀별 가중 공정 스케줄링
+
+모든 스캔을 하나의 FIFO 큐에 넣으면 설치 직후 대량 initial 스캔이 다른 팀의
+PR 스캔을 뒤로 밀어낸다. 스캔을 세 레인으로 나누고, 워커는 레인 순서대로 잡을 꺼낸다.
+
+- interactive (scans-interactive): PR 스캔, 수동 스캔 — 개발자가 결과를 기다린다
+- standard (scans): push / incremental 스캔
+- bulk (scans-bulk): initial 스캔, 예약(schedule) 스캔
+
+스캔은 바로 RQ 큐에 들어가지 않고 Redis의 팀별 대기 목록에 쌓인다.
+pump()가 레인마다 가상 시간이 가장 작은 팀부터 잡을 꺼내 RQ 큐로 보내며(가중 공정 큐잉),
+팀 가중치(플랜 기준)가 클수록 가상 시간이 천천히 늘어 더 자주 선택된다.
+
+- 팀 동시 실행 상한: RQ 큐에 보냈지만 끝나지 않은 잡 수 (모든 레인 합산)
+- 레인 동시 실행 상한: 레인별로 RQ 큐에 보냈지만 끝나지 않은 잡 수 —
+  RQ 큐를 얕게 유지해야 나중에 들어온 팀도 공정하게 순서를 받는다
+- 슬롯은 만료 시각과 함께 기록하므로 워커가 죽어도 slot_ttl 후 자동 반납된다
+- 대기 중에 취소된 스캔(취소 플래그 설정)은 디스패치하지 않고 버린다
+- 대기 목록과 RQ 잡에는 스캔 잡 봉투(ScanJobEnvelope, 식별자만 담은 JSON)만 넣는다
+
+pump()는 스캔 등록, 스캔 종료(release), 워커 시작 시 호출된다.
+"""
+
+import json
+import logging
+import time
+
+import redis
+from rq import Queue, Retry
+
+from src.services.scan_cancellation import cancel_key
+from src.services.scan_job_envelope import ScanJobEnvelope
+
+logger = logging.getLogger(__name__)
+
+# 레인 (우선순위 순서)
+LANE_INTERACTIVE = "interactive"
+LANE_STANDARD = "standard"
+LANE_BULK = "bulk"
+LANES = (LANE_INTERACTIVE, LANE_STANDARD, LANE_BULK)
+
+# 레인별 RQ 큐 이름 — 워커는 이 순서대로 큐를 확인한다
+LANE_QUEUES = {
+    LANE_INTERACTIVE: "scans-interactive",
+    LANE_STANDARD: "scans",
+    LANE_BULK: "scans-bulk",
+}
+
+_KEY_PREFIX = "vulnix:sched"
+
+# KEYS[1]: 레인 팀 ZSET (팀 → 가상 시간), KEYS[2]: 레인 가상 시간,
+# KEYS[3]: 레인 in-flight ZSET, KEYS[4]: 팀 가중치 해시
+# ARGV[1]: 팀 대기 목록 키 접두사, ARGV[2]: 팀 running ZSET 키 접두사,
+# ARGV[3]: 팀 동시 실행 상한, ARGV[4]: 레인 동시 실행 상한 (0이면 무제한),
+# ARGV[5]: 현재 시각(초), ARGV[6]: 슬롯 TTL(초), ARGV[7]: 스캔 취소 플래그 키 접두사
+# 반환: 디스패치할 잡 payload (없으면 nil) — 취소된 잡은 버리고 다음 잡을 꺼낸다
+_DISPATCH_SCRIPT = """
+local now = tonumber(ARGV[5])
+local ttl = tonumber(ARGV[6])
+local team_cap = tonumber(ARGV[3])
+local lane_cap = tonumber(ARGV[4])
+
+redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', now)
+if lane_cap > 0 and redis.call('ZCARD', KEYS[3]) >= lane_cap then
+  return nil
+end
+
+local teams = redis.call('ZRANGE', KEYS[1], 0, -1, 'WITHSCORES')
+for i = 1, #teams, 2 do
+  local team = teams[i]
+  local vtime = tonumber(teams[i + 1])
+  local running = ARGV[2] .. team
+  redis.call('ZREMRANGEBYSCORE', running, '-inf', now)
+  if team_cap <= 0 or redis.call('ZCARD', running) < team_cap then
+    local pending = ARGV[1] .. team
+    local payload = redis.call('LPOP', pending)
+    local job_id = payload and cjson.decode(payload)['job_id']
+    while payload and redis.call('EXISTS', ARGV[7] .. job_id) == 1 do
+      payload = redis.call('LPOP', pending)
+      job_id = payload and cjson.decode(payload)['job_id']
+    end
+    if payload then
+      redis.call('ZADD', running, now + ttl, job_id)
+      redis.call('EXPIRE', running, ttl)
+      redis.call('ZADD', KEYS[3], now + ttl, job_id)
+      redis.call('EXPIRE', KEYS[3], ttl)
+      redis.call('SET', KEYS[2], vtime)
+      if redis.call('LLEN', pending) > 0 then
+        local weight = tonumber(redis.call('HGET', KEYS[4], team)) or 1
+        redis.call('ZADD', KEYS[1], vtime + 1 / weight, team)
+      else
+        redis.call('ZREM', KEYS[1], team)
+      end
+      return payload
+    end
+    redis.call('ZREM', KEYS[1], team)
+  end
+end
+return nil
+"""
+
+# KEYS[1]: 레인 팀 ZSET, KEYS[2]: 레인 가상 시간, KEYS[3]: 팀 대기 목록, KEYS[4]: 팀 가중치 해시
+# ARGV[1]: 팀 ID, ARGV[2]: payload, ARGV[3]: 팀 가중치
+_SUBMIT_SCRIPT = """
+redis.call('RPUSH', KEYS[3], ARGV[2])
+redis.call('HSET', KEYS[4], ARGV[1], ARGV[3])
+if not redis.call('ZSCORE', KEYS[1], ARGV[1]) then
+  local vtime = tonumber(redis.call('GET', KEYS[2])) or 0
+  redis.call('ZADD', KEYS[1], vtime + 1 / tonumber(ARGV[3]), ARGV[1])
+end
+return 1
+"""
+
+
+def lane_for_scan(trigger: str, scan_type: str) -> str:
+    """트리거와 스캔 유형으로 레인을 결정한다.
+
+    - initial 스캔, 예약 스캔 → bulk
+    - PR 스캔, 수동 스캔 → interactive
+    - 그 외 (push / incremental 등) → standard
+    """
+    if scan_type == "initial" or trigger == "schedule":
+        return LANE_BULK
+    if scan_type == "pr" or trigger == "manual":
+        return LANE_INTERACTIVE
+    return LANE_STANDARD
+
+
+def team_weight(plan: str | None, weights: dict[str, int]) -> int:
+    """팀 플랜의 스케줄링 가중치 (알 수 없는 플랜은 1)."""
+    return max(1, weights.get(plan or "", 1))
+
+
+class FairScanScheduler:
+    """Redis 기반 레인별 팀 가중 공정 스캔 스케줄러."""
+
+    def __init__(
+        self,
+        redis_conn: redis.Redis,
+        team_max_concurrent: int,
+        lane_max_inflight: int,
+        slot_ttl_seconds: int,
+    ) -> None:
+        self._redis = redis_conn
+        self._team_cap = team_max_concurrent
+        self._lane_cap = lane_max_inflight
+        self._slot_ttl = slot_ttl_seconds
+        self._queues = {
+            lane: Queue(name, connection=redis_conn) for lane, name in LANE_QUEUES.items()
+        }
+        self._submit = redis_conn.register_script(_SUBMIT_SCRIPT)
+        self._dispatch = redis_conn.register_script(_DISPATCH_SCRIPT)
+
+    def submit(self, message: object, team_id: str, weight: int) -> str:
+        """스캔 메시지(ScanJobMessage)를 팀 대기 목록에 넣고 pump()한다.
+
+        Returns:
+            배정된 레인
+        """
+        lane = lane_for_scan(message.trigger, message.scan_type)
+        payload = ScanJobEnvelope(message.job_id, message.team_id, lane).encode()
+        self._submit(
+            keys=[
+                self._key(lane, "teams"),
+                self._key(lane, "vtime"),
+                self._key(lane, "pending", team_id),
+                self._key("weights"),
+            ],
+            args=[team_id, payload, weight],
+        )
+        logger.info(
+            f"[ScanScheduler] 스캔 대기 등록: job_id={message.job_id}, lane={lane}, "
+            f"team={team_id}, weight={weight}"
+        )
+        self.pump()
+        return lane
+
+    def pump(self) -> int:
+        """레인 우선순위 순서로 실행 가능한 잡을 RQ 큐에 보낸다.
+
+        Returns:
+            RQ 큐에 보낸 잡 수
+        """
+        dispatched = 0
+        for lane in LANES:
+            while True:
+                payload = self._dispatch(
+                    keys=[
+                        self._key(lane, "teams"),
+                        self._key(lane, "vtime"),
+                        self._key(lane, "inflight"),
+                        self._key("weights"),
+                    ],
+                    args=[
+                        self._key(lane, "pending", ""),
+                        self._key("running", ""),
+                        self._team_cap,
+                        self._lane_cap,
+                        int(time.time()),
+                        self._slot_ttl,
+                        cancel_key(""),
+                    ],
+                )
+                if not isinstance(payload, (bytes, str)):
+                    break
+                self._enqueue(lane, payload)
+                dispatched += 1
+        return dispatched
+
+    def release(self, job_id: str, team_id: str, lane: str) -> None:
+        """끝난 스캔의 팀 / 레인 슬롯을 반납하고 다음 잡을 pump()한다."""
+        pipe = self._redis.pipeline()
+        pipe.zrem(self._key("running", team_id), job_id)
+        pipe.zrem(self._key(lane, "inflight"), job_id)
+        pipe.execute()
+        self.pump()
+
+    def _enqueue(self, lane: str, payload: bytes | str) -> None:
+        data = json.loads(payload)
+        if "message" in data:
+            # 봉투 도입 전에 대기 목록에 들어간 잡 (ScanJobMessage 전체를 담은 형식)
+            envelope = ScanJobEnvelope(data["job_id"], data["message"].get("team_id"), lane)
+        else:
+            envelope = ScanJobEnvelope.decode(payload)
+        self._queues[lane].enqueue(
+            "src.workers.scan_worker.run_scan",
+            args=(envelope.encode(),),
+            job_id=envelope.job_id,
+            retry=Retry(max=3, interval=[10, 30, 60]),
+            job_timeout="10m",
+        )
+
+    @staticmethod
+    def _key(*parts: str) -> str:
+        return ":".join((_KEY_PREFIX, *parts))
@@ -0,0 +1,123 @@
+"""스캔 텔레메트리 — 파이프라인 단계별 소요 시간과 자원 사용량 수집
+
+ScanJob.duration_seconds만으로는 느린 스캔이 다운로드, Semgrep, Claude 호출 중
+어디서 시간을 쓰는지 알 수 없으므로, 워커가 단계마다 아래 항목을 기록하여
+ScanJob.telemetry(JSONB)에 저장한다.
+
+- stages: 단계명 → 소요 시간(초)
+- downloaded_bytes: tarball 다운로드 바이트
+- excluded_files / excluded_bytes: vendored / generated / minified / 저장소 제외 패턴으로
+  스캔 대상에서 뺀 파일 수와 크기 합
+- files_scanned: Semgrep 대상 파일 수 (결과 캐시 히트 포함)
+- semgrep_cache_hits: 결과 캐시에서 재사용한 파일 수
+- semgrep_shards / semgrep_failed_files: 샤딩 스캔의 샤드 수, 타임아웃·실패로 제외한 파일 수
+- semgrep_prefiltered_files: 룰 키워드가 없어 Semgrep에 넘기지 않은 파일 수
+- llm: Claude 호출 수, 입력/출력/프롬프트 캐시 토큰, 재시도 횟수
+- mapreduce_shards / mapreduce_failed_shards: map-reduce 스캔의 샤드 잡 수, 실패한 샤드 잡 수
+- resumed_from / llm_files_resumed: 재시도가 이어받은 체크포인트 단계, LLM 결과를 재사용한 파일 수
+
+map-reduce 스캔은 샤드 잡마다 텔레메트리를 따로 수집하고 fan-in 잡이 merge()로 합산한다.
+이때 stages는 샤드별 소요 시간의 합(벽시계 시간이 아닌 누적 작업 시간)이다.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
+
+from src.services.llm_agent import LLMUsage
+
+# 텔레메트리 JSON 형식이 바뀌면 올린다
+TELEMETRY_VERSION = 1
+
+
+def _int_or_zero(value: object) -> int:
+    return value if isinstance(value, int) else 0
+
+
+@dataclass
+class ScanTelemetry:
+    """스캔 1건의 텔레메트리 누적기."""
+
+    stages: dict[str, float] = field(default_factory=dict)
+    downloaded_bytes: int = 0
+    excluded_files: int = 0
+    excluded_bytes: int = 0
+    files_scanned: int = 0
+    semgrep_cache_hits: int = 0
+    semgrep_shards: int = 0
+    semgrep_failed_files: int = 0
+    semgrep_prefiltered_files: int = 0
+    llm: dict[str, int] = field(default_factory=dict)
+    mapreduce_shards: int = 0
+    mapreduce_failed_shards: int = 0
+    resumed_from: str | None = None
+    llm_files_resumed: int = 0
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """with 블록의 소요 시간을 name 단계에 더한다 (예외가 나도 기록)."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            self.stages[name] = round(self.stages.get(name, 0.0) + elapsed, 3)
+
+    def record_clone(self, stats: object) -> None:
+        """clone_repository()가 반환한 CloneStats를 기록한다."""
+        self.downloaded_bytes = _int_or_zero(getattr(stats, "downloaded_bytes", None))
+        self.excluded_files = _int_or_zero(getattr(stats, "excluded_files", None))
+        self.excluded_bytes = _int_or_zero(getattr(stats, "excluded_bytes", None))
+
+    def record_semgrep(self, engine: object) -> None:
+        """SemgrepEngine의 마지막 샤딩 스캔 결과를 기록한다."""
+        self.semgrep_shards = _int_or_zero(getattr(engine, "last_shard_count", None))
+        failed = getattr(engine, "last_failed_files", None)
+        self.semgrep_failed_files = len(failed) if isinstance(failed, list) else 0
+        self.semgrep_prefiltered_files = _int_or_zero(getattr(engine, "last_prefiltered_files", None))
+
+    def record_llm_usage(self, usage: LLMUsage) -> None:
+        """LLMAgent.usage 누적값을 기록한다. 숫자가 아닌 필드는 0으로 둔다."""
+        self.llm = {
+            f.name: _int_or_zero(getattr(usage, f.name, None))
+            for f in fields(LLMUsage)
+        }
+
+    def merge(self, data: dict) -> None:
+        """to_dict() 형식의 텔레메트리(샤드 잡 결과 등)를 현재 값에 더한다."""
+        for name, seconds in (data.get("stages") or {}).items():
+            self.stages[name] = round(self.stages.get(name, 0.0) + seconds, 3)
+        for name in (
+            "downloaded_bytes",
+            "excluded_files",
+            "excluded_bytes",
+            "files_scanned",
+            "semgrep_cache_hits",
+            "semgrep_shards",
+            "semgrep_failed_files",
+            "semgrep_prefiltered_files",
+        ):
+            setattr(self, name, getattr(self, name) + _int_or_zero(data.get(name)))
+        for name, value in (data.get("llm") or {}).items():
+            self.llm[name] = self.llm.get(name, 0) + _int_or_zero(value)
+
+    def to_dict(self) -> dict:
+        """ScanJob.telemetry에 저장할 JSON 직렬화 가능한 dict를 반환한다."""
+        return {
+            "version": TELEMETRY_VERSION,
+            "stages": dict(self.stages),
+            "downloaded_bytes": self.downloaded_bytes,
+            "excluded_files": self.excluded_files,
+            "excluded_bytes": self.excluded_bytes,
+            "files_scanned": self.files_scanned,
+            "semgrep_cache_hits": self.semgrep_cache_hits,
+            "semgrep_shards": self.semgrep_shards,
+            "semgrep_failed_files": self.semgrep_failed_files,
+            "semgrep_prefiltered_files": self.semgrep_prefiltered_files,
+            "llm": dict(self.llm),
+            "mapreduce_shards": self.mapreduce_shards,
+            "mapreduce_failed_shards": self.mapreduce_failed_shards,
+            "resumed_from": self.resumed_from,
+            "llm_files_resumed": self.llm_files_resumed,
+        }
@@ -0,0 +1,395 @@
+"""하드코딩 자격증명 스캐너 — hardcoded_creds.yml 룰을 Semgrep 없이 프로세스 안에서 실행
+
+hardcoded_creds.yml 룰(CWE-798)은 사실상 문자열 리터럴 정규식 검사인데, Semgrep으로 돌리면
+파일마다 전체 파싱 + Semgrep 기동 시간(IDE 경로에서는 500ms 예산의 대부분)을 쓴다.
+같은 룰 ID의 검사를 바이트 정규식으로 옮겨 mmap한 파일에서 직접 실행한다.
+
+- 언어별 게이트 정규식: 해당 언어의 모든 룰 형태를 하나의 대안 정규식으로 컴파일해 두고,
+  파일에서 한 번도 매칭되지 않으면(대부분의 파일) 바로 건너뛴다
+- 게이트를 통과한 파일만 룰 형태별 정규식으로 위치를 찾는다
+- 대입 + 사용 형태 룰(const KEY = "..." 후 jwt.sign(..., KEY))은 사용 지점을 게이트로 쓰고,
+  같은 이름의 문자열 대입이 있을 때만 보고한다
+- 엔트로피 점수: 리터럴의 문자당 섀넌 엔트로피가 룰 기준 미만이면 보고하지 않는다
+  ("xxxx" 같은 자리표시자, []byte("\\n") 같은 일반 리터럴 제외)
+
+결과는 SemgrepFinding으로 내보내며, 메시지 / severity / CWE는 룰 YAML에서 그대로 읽는다.
+룰 ID는 Semgrep이 보고하는 형태(룰 디렉토리 접두사 포함, semgrep_rule_id)로 내보내
+FP 패턴 / 저장된 취약점의 semgrep_rule_id와 그대로 맞는다.
+
+Semgrep 룰과 탐지 범위가 다른 룰: password_assignment / api_key(pattern 여러 개의 AND라
+Semgrep에서는 아무것도 매칭하지 않음)와 java hardcoded_key의 대입 + 사용 형태(Semgrep
+패턴 파싱 오류)는 룰 이름대로의 대상을 탐지한다.
+이 스캐너가 모든 룰을 다루는 룰 팩은 Semgrep --config에서 제외한다 (semgrep_rule_configs).
+"""
+
+import logging
+import math
+import mmap
+import multiprocessing
+import re
+from bisect import bisect_right
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+import yaml
+
+from src.services.rule_registry import (
+    RULES_DIR,
+    RulePack,
+    get_rule_registry,
+    language_for_path,
+    semgrep_rule_id,
+)
+from src.services.semgrep_engine import MAX_TARGET_BYTES, SemgrepFinding
+
+logger = logging.getLogger(__name__)
+
+# 파일이 이 수 이상이면 프로세스 풀에서 검사
+_POOL_MIN_FILES = 2000
+
+# 프로세스 풀 작업 단위 (파일 수)
+_POOL_CHUNK_FILES = 500
+
+# 자리표시자만 거르는 엔트로피 기준 (문자당 비트, "xxxx" / "****" 등)
+_PLACEHOLDER_ENTROPY = 1.0
+
+# 일반 문자열 리터럴 룰의 엔트로피 / 길이 기준 — 무작위 키처럼 보이는 리터럴만 보고
+_KEY_LIKE_ENTROPY = 3.0
+_KEY_LIKE_MIN_LENGTH = 8
+
+# 문자열 리터럴 (따옴표 포함, 한 줄)
+_DQ = rb'"(?:[^"\\\n]|\\.)*"'
+_SQ = rb"'(?:[^'\\\n]|\\.)*'"
+_BQ = rb"`[^`]*`"
+_PY_STR = rb"[rRbBuU]?(?:" + _DQ + rb"|" + _SQ + rb")"
+_JS_STR = rb"(?:" + _DQ + rb"|" + _SQ + rb")"
+_JAVA_STR = _DQ
+_GO_STR = rb"(?:" + _DQ + rb"|" + _BQ + rb")"
+
+_NAMED_GROUP = re.compile(rb"\(\?P<\w+>")
+
+
+@dataclass(frozen=True)
+class SecretRule:
+    """룰 1개의 탐지 형태 1개 (한 룰 ID가 여러 형태를 가질 수 있다).
+
+    pattern의 이름 그룹:
+    - secret: 보고할 문자열 리터럴 (엔트로피 점수 대상, 따옴표 포함 가능)
+    - name: sink가 있는 형태에서 리터럴이 대입된 변수 이름
+    sink는 "{name}" 자리에 변수 이름이 들어가는 사용 지점 정규식이다.
+    """
+
+    rule_id: str
+    languages: frozenset[str]
+    pattern: bytes
+    min_entropy: float = 0.0
+    min_length: int = 1
+    exclude: bytes | None = None     # 매칭 줄에 이 정규식이 있으면 제외 (pattern-not-regex)
+    sink: bytes | None = None
+
+    @property
+    def gate(self) -> bytes:
+        """파일 게이트용 정규식 (이름 그룹 제거, sink 형태는 사용 지점 기준)."""
+        source = self.sink.replace(b"{name}", rb"\w+") if self.sink else self.pattern
+        return _NAMED_GROUP.sub(b"(?:", source)
+
+
+# hardcoded_creds.yml 룰과 같은 룰 ID (YAML id) / 같은 탐지 대상 (예외는 모듈 설명 참고)
+SECRET_RULES: tuple[SecretRule, ...] = (
+    # ---- python/hardcoded_creds.yml ----
+    SecretRule(
+        rule_id="vulnix.python.hardcoded_creds.password_assignment",
+        languages=frozenset({"python"}),
+        pattern=rb"^[ \t]*(?:password|passwd|pwd|secret)[ \t]*=[ \t]*(?P<secret>" + _PY_STR + rb")",
+        min_entropy=_PLACEHOLDER_ENTROPY,
+    ),
+    SecretRule(
+        rule_id="vulnix.python.hardcoded_creds.api_key",
+        languages=frozenset({"python"}),
+        pattern=rb"^[ \t]*(?:api_key|API_KEY|apikey)[ \t]*=[ \t]*(?P<secret>" + _PY_STR + rb")",
+        min_entropy=_PLACEHOLDER_ENTROPY,
+        exclude=rb"os\.environ|os\.getenv|getenv",
+    ),
+    SecretRule(
+        rule_id="vulnix.python.hardcoded_creds.aws_access_key",
+        languages=frozenset({"python"}),
+        pattern=rb"(?P<secret>(?:AKIA|ASIA|AROA|AIDA)[A-Z0-9]{16})",
+    ),
+    SecretRule(
+        rule_id="vulnix.python.hardcoded_creds.db_connection_string",
+        languages=frozenset({"python"}),
+        pattern=rb"(?P<secret>(?:postgresql|mysql|mongodb)://[^:\s]+:[^@\s]+@)",
+    ),
+    SecretRule(
+        rule_id="python-hardcoded-jwt-secret",
+        languages=frozenset({"python"}),
+        pattern=rb"jwt\.encode\([^,\n]+,[ \t]*(?P<secret>" + _PY_STR + rb")",
+        min_entropy=_PLACEHOLDER_ENTROPY,
+    ),
+    SecretRule(
+        rule_id="python-hardcoded-private-key",
+        languages=frozenset({"python"}),
+        pattern=rb"(?P<secret>-----BEGIN (?:RSA |EC )?PRIVATE KEY-----)",
+    ),
+    # ---- javascript/hardcoded_creds.yml ----
+    SecretRule(
+        rule_id="vulnix.javascript.crypto.hardcoded_key",
+        languages=frozenset({"javascript", "typescript"}),
+        pattern=rb"\bconst[ \t]+(?P<name>[\w$]+)(?:[ \t]*:[ \t]*\w+)?[ \t]*=[ \t]*(?P<secret>" + _JS_STR + rb")",
+        min_entropy=_PLACEHOLDER_ENTROPY,
+        sink=rb"jwt\.sign\([^,\n]+,[ \t]*{name}\b",
+    ),
+    SecretRule(
+        rule_id="vulnix.javascript.crypto.hardcoded_key",
+        languages=frozenset({"javascript", "typescript"}),
+        pattern=rb"process\.env\.[\w$]+[ \t]*\|\|[ \t]*(?P<secret>" + _JS_STR + rb")",
+        min_entropy=_KEY_LIKE_ENTROPY,
+        min_length=_KEY_LIKE_MIN_LENGTH,
+    ),
+    # ---- java/hardcoded_creds.yml ----
+    SecretRule(
+        rule_id="vulnix.java.crypto.hardcoded_key",
+        languages=frozenset({"java"}),
+        pattern=rb"new[ \t]+SecretKeySpec\([ \t]*(?P<secret>" + _JAVA_STR + rb")\.getBytes\(",
+        min_entropy=_PLACEHOLDER_ENTROPY,
+    ),
+    SecretRule(
+        rule_id="vulnix.java.crypto.hardcoded_key",
+        languages=frozenset({"java"}),
+        pattern=rb"\bString[ \t]+(?P<name>\w+)[ \t]*=[ \t]*(?P<secret>" + _JAVA_STR + rb")[ \t]*;",
+        min_entropy=_PLACEHOLDER_ENTROPY,
+        sink=rb"new[ \t]+SecretKeySpec\([ \t]*{name}\.getBytes\(",
+    ),
+    # ---- go/hardcoded_creds.yml ----
+    SecretRule(
+        rule_id="vulnix.go.crypto.hardcoded_key",
+        languages=frozenset({"go"}),
+        pattern=rb"(?P<name>\w+)[ \t]*:=[ \t]*(?P<secret>" + _GO_STR + rb")",
+        min_entropy=_PLACEHOLDER_ENTROPY,
+        sink=rb"jwt\.NewWithClaims\([^\n]*\b{name}[ \t]*\)",
+    ),
+    SecretRule(
+        rule_id="vulnix.go.crypto.hardcoded_key",
+        languages=frozenset({"go"}),
+        pattern=rb"\[\]byte\((?P<secret>" + _GO_STR + rb")\)",
+        min_entropy=_KEY_LIKE_ENTROPY,
+        min_length=_KEY_LIKE_MIN_LENGTH,
+    ),
+)
+
+
+def shannon_entropy(value: bytes) -> float:
+    """문자당 섀넌 엔트로피 (비트)."""
+    if not value:
+        return 0.0
+    total = len(value)
+    return -sum(count / total * math.log2(count / total) for count in Counter(value).values())
+
+
+def _literal_body(literal: bytes) -> bytes:
+    """문자열 리터럴에서 접두사 / 따옴표를 벗긴 내용."""
+    body = literal.lstrip(b"rRbBuU")
+    if len(body) >= 2 and body[:1] in (b'"', b"'", b"`") and body[-1:] == body[:1]:
+        return body[1:-1]
+    return literal
+
+
+@dataclass(frozen=True)
+class _RuleMeta:
+    """룰 YAML에서 읽은 보고용 메타데이터."""
+
+    severity: str
+    message: str
+    cwe: tuple[str, ...]
+
+
+class SecretScanner:
+    """hardcoded_creds 룰을 정규식 + 엔트로피로 실행하는 스캐너."""
+
+    def __init__(self, rules: tuple[SecretRule, ...] = SECRET_RULES, rules_dir: Path = RULES_DIR) -> None:
+        self._meta = _load_rule_meta(rules_dir, frozenset(rule.rule_id for rule in rules))
+        # YAML에 없는 룰은 실행하지 않는다 (룰 파일이 바뀌어도 없는 ID를 만들지 않음)
+        active = [rule for rule in rules if rule.rule_id in self._meta]
+        # YAML 룰 ID (룰 팩 비교용)
+        self.rule_ids = frozenset(rule.rule_id for rule in active)
+        # 결과에 쓰는 룰 ID — Semgrep 결과와 같은 접두사 (작업 디렉토리 기준이라 생성 시 고정)
+        registry = get_rule_registry(rules_dir)
+        self._finding_ids = {
+            rule_id: semgrep_rule_id(registry.pack_for_rule(rule_id).path, rule_id) for rule_id in self.rule_ids
+        }
+        self.finding_rule_ids = frozenset(self._finding_ids.values())
+        self._rules: dict[str, list[tuple[SecretRule, re.Pattern, re.Pattern | None]]] = {}
+        gates: dict[str, list[bytes]] = {}
+        for rule in active:
+            compiled = (
+                rule,
+                re.compile(rule.pattern, re.MULTILINE),
+                re.compile(rule.exclude) if rule.exclude else None,
+            )
+            for language in rule.languages:
+                self._rules.setdefault(language, []).append(compiled)
+                gates.setdefault(language, []).append(rule.gate)
+        self._gates = {
+            language: re.compile(b"|".join(b"(?:" + g + b")" for g in parts), re.MULTILINE)
+            for language, parts in gates.items()
+        }
+
+    @property
+    def languages(self) -> frozenset[str]:
+        """룰이 있는 언어."""
+        return frozenset(self._rules)
+
+    def scan_bytes(self, data: bytes, file_path: str, language: str | None = None) -> list[SemgrepFinding]:
+        """파일 내용 1개를 검사한다 (IDE 스니펫 / mmap 모두 가능).
+
+        Args:
+            data: 파일 내용 (bytes 또는 mmap)
+            file_path: 결과에 기록할 파일 경로
+            language: semgrep 언어 (None이면 file_path 확장자로 판별)
+        """
+        language = language or language_for_path(file_path)
+        gate = self._gates.get(language or "")
+        if gate is None or gate.search(data) is None:
+            return []
+
+        line_starts: list[int] | None = None
+        findings: list[SemgrepFinding] = []
+        seen: set[tuple[str, int]] = set()
+        for rule, pattern, exclude in self._rules[language]:
+            for match in pattern.finditer(data):
+                if rule.sink is not None:
+                    sink = re.search(rule.sink.replace(b"{name}", re.escape(match["name"])), data)
+                    if sink is None:
+                        continue
+                    end = sink.end()
+                else:
+                    end = match.end()
+                body = _literal_body(match["secret"])
+                if len(body) < rule.min_length or shannon_entropy(body) < rule.min_entropy:
+                    continue
+                if line_starts is None:
+                    line_starts = _line_starts(data)
+                start_line = bisect_right(line_starts, match.start())
+                end_line = bisect_right(line_starts, max(match.start(), end - 1))
+                lines = _lines(data, line_starts, start_line, end_line)
+                if exclude is not None and exclude.search(lines):
+                    continue
+                if (rule.rule_id, start_line) in seen:
+                    continue
+                seen.add((rule.rule_id, start_line))
+                meta = self._meta[rule.rule_id]
+                findings.append(
+                    SemgrepFinding(
+                        rule_id=self._finding_ids[rule.rule_id],
+                        severity=meta.severity,
+                        file_path=file_path,
+                        start_line=start_line,
+                        end_line=end_line,
+                        code_snippet=lines.decode("utf-8", errors="replace"),
+                        message=meta.message,
+                        cwe=list(meta.cwe),
+                    )
+                )
+        findings.sort(key=lambda f: (f.start_line, f.rule_id))
+        return findings
+
+    def scan_file(self, path: str, base_dir: Path) -> list[SemgrepFinding]:
+        """파일 1개를 mmap으로 열어 검사한다 (결과 경로는 base_dir 기준 상대 경로)."""
+        language = language_for_path(path)
+        if language not in self._rules:
+            return []
+        try:
+            rel_path = str(Path(path).relative_to(base_dir))
+        except ValueError:
+            rel_path = path
+        try:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if len(data) > MAX_TARGET_BYTES:
+                    return []   # Semgrep --max-target-bytes와 같은 기준
+                return self.scan_bytes(data, rel_path, language)
+        except ValueError:
+            return []   # 빈 파일 (mmap 불가)
+        except OSError as e:
+            logger.warning(f"[SecretScanner] 파일 읽기 실패 (건너뜀): {path}: {e}")
+            return []
+
+    def scan_files(self, paths: list[str], base_dir: Path, workers: int = 1) -> list[SemgrepFinding]:
+        """파일 목록을 검사한다. 파일이 많으면 프로세스 풀에서 나눠 검사한다."""
+        paths = [path for path in paths if language_for_path(path) in self._rules]
+        if workers <= 1 or len(paths) < _POOL_MIN_FILES:
+            return _scan_chunk(self, paths, base_dir)
+        chunks = [paths[i:i + _POOL_CHUNK_FILES] for i in range(0, len(paths), _POOL_CHUNK_FILES)]
+        # spawn: 스캔 스레드 / 이벤트 루프가 있는 워커 프로세스를 fork하지 않는다
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            results = pool.map(_scan_chunk, [self] * len(chunks), chunks, [base_dir] * len(chunks))
+            return [finding for chunk in results for finding in chunk]
+
+
+def _scan_chunk(scanner: SecretScanner, paths: list[str], base_dir: Path) -> list[SemgrepFinding]:
+    return [finding for path in paths for finding in scanner.scan_file(path, base_dir)]
+
+
+def _line_starts(data: bytes) -> list[int]:
+    """각 줄의 시작 오프셋."""
+    starts = [0]
+    position = data.find(b"\n")
+    while position != -1:
+        starts.append(position + 1)
+        position = data.find(b"\n", position + 1)
+    return starts
+
+
+def _lines(data: bytes, line_starts: list[int], start_line: int, end_line: int) -> bytes:
+    """start_line ~ end_line(1부터, 포함) 줄 내용 (줄바꿈 제외)."""
+    begin = line_starts[start_line - 1]
+    end = line_starts[end_line] - 1 if end_line < len(line_starts) else len(data)
+    return bytes(data[begin:end]).rstrip(b"\r")
+
+
+def _load_rule_meta(rules_dir: Path, rule_ids: frozenset[str]) -> dict[str, _RuleMeta]:
+    """룰 YAML에서 rule_ids의 severity / message / CWE를 읽는다."""
+    registry = get_rule_registry(rules_dir)
+    meta: dict[str, _RuleMeta] = {}
+    for pack in {registry.pack_for_rule(rule_id) for rule_id in rule_ids} - {None}:
+        for rule in (yaml.safe_load(pack.path.read_bytes()) or {}).get("rules") or []:
+            if rule.get("id") not in rule_ids:
+                continue
+            cwe = (rule.get("metadata") or {}).get("cwe") or []
+            meta[rule["id"]] = _RuleMeta(
+                severity=rule.get("severity", "WARNING"),
+                message=str(rule.get("message", "")).strip(),
+                cwe=tuple([cwe] if isinstance(cwe, str) else cwe),
+            )
+    return meta
+
+
+def native_secret_packs(rules_dir: Path = RULES_DIR) -> frozenset[str]:
+    """내장 스캐너가 모든 룰을 다루는 룰 팩 (룰 디렉토리 기준 경로)."""
+    handled = get_secret_scanner(rules_dir).rule_ids
+    return frozenset(
+        pack.relative_path
+        for pack in get_rule_registry(rules_dir).packs
+        if pack.rule_ids and set(pack.rule_ids) <= handled
+    )
+
+
+def semgrep_rule_packs(packs: list[RulePack], rules_dir: Path = RULES_DIR) -> list[RulePack]:
+    """내장 스캐너가 다루는 룰 팩을 뺀 Semgrep 실행용 룰 팩."""
+    native = native_secret_packs(rules_dir)
+    return [pack for pack in packs if pack.relative_path not in native]
+
+
+def semgrep_rule_configs(rules_dir: Path = RULES_DIR) -> list[str]:
+    """내장 스캐너가 다루는 룰 팩을 뺀 전체 룰 팩 경로 (IDE Semgrep 워커 풀 --config)."""
+    return [str(pack.path) for pack in semgrep_rule_packs(get_rule_registry(rules_dir).packs, rules_dir)]
+
+
+@lru_cache
+def get_secret_scanner(rules_dir: Path = RULES_DIR) -> SecretScanner:
+    """프로세스 공용 스캐너."""
+    return SecretScanner(rules_dir=rules_dir)
+
@@ -0,0 +1,362 @@
+"""Semgrep 결과 캐시 — (파일 내용 해시, 룰셋 해시) 기준 파일 단위 캐시
+
+연속 스캔 사이에 대부분의 파일은 변경되지 않으므로, 파일 내용 해시가 같고
+룰셋이 같으면 이전 Semgrep 결과를 재사용한다. 캐시 미스 파일만 Semgrep에 넘긴다.
+
+코드 보안 원칙 (ADR-003):
+- 캐시에는 해시와 finding 메타데이터(rule_id, 라인, 메시지 등)만 저장한다
+- 코드 조각(code_snippet)은 저장하지 않고, 캐시 히트 시 스캔 중인 파일에서 다시 읽는다
+
+룰셋 해시는 파일 언어에 적용되는 룰 팩만으로 계산하므로(rule_registry),
+다른 언어의 룰을 고쳐도 해당 언어 파일의 캐시 항목은 그대로 유지된다.
+
+자격증명 룰을 내장 스캐너로 실행하는 모드(SEMGREP_NATIVE_SECRETS)에서는
+Semgrep 결과만 캐시하고 자격증명 스캔은 캐시 히트 파일에도 매번 다시 실행한다.
+모드가 다르면 캐시에 담긴 룰 범위가 다르므로 모드를 키에 포함한다.
+
+저장소는 Redis, 항목마다 TTL을 두고 조회 시 TTL을 연장한다 (GETEX).
+자주 쓰이지 않는 항목은 만료되고, Redis maxmemory-policy(allkeys-lru)가 LRU 축출을 담당한다.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+
+import redis.asyncio as aioredis
+
+from src.services.rule_registry import get_rule_registry
+from src.services.secret_scanner import get_secret_scanner
+from src.services.semgrep_engine import (
+    _RULES_DIR,
+    SemgrepEngine,
+    SemgrepFinding,
+    list_scannable_files,
+)
+
+logger = logging.getLogger(__name__)
+
+# Redis 키 접두사: semgrep-cache:{ruleset_hash}:{mode}:{ext}:{blob_hash}
+_KEY_PREFIX = "semgrep-cache"
+
+# 키의 스캐너 모드 — 내장 자격증명 스캐너 사용 여부
+_MODE_NATIVE_SECRETS = "native-secrets"
+_MODE_SEMGREP = "semgrep"
+
+# 기본 TTL (7일)
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+
+
+def compute_ruleset_hash(rules_dir: Path = _RULES_DIR) -> str:
+    """룰 디렉토리의 YAML 파일 경로와 내용으로 룰셋 해시를 계산한다.
+
+    룰이 하나라도 바뀌면 해시가 달라져 이전 캐시 항목을 자동으로 무효화한다.
+    """
+    return get_rule_registry(rules_dir).ruleset_hash
+
+
+def content_hash(data: bytes) -> str:
+    """파일 내용(blob) 해시를 반환한다."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _serialize(finding: SemgrepFinding) -> dict:
+    """코드 조각과 파일 경로를 제외한 finding 메타데이터만 직렬화한다."""
+    return {
+        "rule_id": finding.rule_id,
+        "severity": finding.severity,
+        "start_line": finding.start_line,
+        "end_line": finding.end_line,
+        "message": finding.message,
+        "cwe": finding.cwe,
+    }
+
+
+def _deserialize(item: dict, file_path: str, lines: list[str]) -> SemgrepFinding:
+    """캐시 항목을 SemgrepFinding으로 복원한다. 코드 조각은 현재 파일 내용에서 다시 만든다."""
+    start_line = item["start_line"]
+    end_line = item["end_line"]
+    return SemgrepFinding(
+        rule_id=item["rule_id"],
+        severity=item["severity"],
+        file_path=file_path,
+        start_line=start_line,
+        end_line=end_line,
+        code_snippet="\n".join(lines[start_line - 1:end_line]),
+        message=item["message"],
+        cwe=item.get("cwe", []),
+    )
+
+
+class SemgrepResultCache:
+    """파일 단위 Semgrep 결과를 Redis에 캐시한다.
+
+    Redis 오류는 모두 캐시 미스로 처리하여 스캔 자체는 항상 진행되게 한다.
+    """
+
+    def __init__(
+        self,
+        redis_conn: aioredis.Redis,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        ruleset_hash: str | None = None,
+        native_secrets: bool = False,
+    ) -> None:
+        self._redis = redis_conn
+        self._ttl = ttl_seconds
+        # 지정하지 않으면 확장자(언어)별 룰 팩 해시를 사용
+        self._ruleset_hash = ruleset_hash
+        # True면 자격증명 룰 finding은 저장하지 않고 스캔 때마다 내장 스캐너로 다시 검사
+        self._native_secrets = native_secrets
+        # 마지막 scan() 호출의 대상 파일 수 / 캐시 히트 파일 수 (텔레메트리용)
+        self.last_file_count = 0
+        self.last_hit_count = 0
+
+    def _key(self, blob_hash: str, ext: str) -> str:
+        # 같은 내용이라도 확장자(언어)가 다르면 적용되는 룰이 다르므로 키에 포함
+        ruleset_hash = self._ruleset_hash or get_rule_registry().hash_for_extension(ext)
+        mode = _MODE_NATIVE_SECRETS if self._native_secrets else _MODE_SEMGREP
+        return f"{_KEY_PREFIX}:{ruleset_hash}:{mode}:{ext.lower()}:{blob_hash}"
+
+    def _uncached_rule_ids(self) -> frozenset[str]:
+        """캐시에 저장하지 않는 룰 ID — 내장 스캐너 모드의 자격증명 룰."""
+        if not self._native_secrets:
+            return frozenset()
+        return get_secret_scanner().finding_rule_ids
+
+    async def get_many(self, entries: list[tuple[str, str]]) -> dict[tuple[str, str], list[dict]]:
+        """(blob_hash, ext) 목록을 조회하여 히트한 항목만 반환한다."""
+        if not entries:
+            return {}
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            for blob_hash, ext in entries:
+                pipe.getex(self._key(blob_hash, ext), ex=self._ttl)
+            values = await pipe.execute()
+        except Exception as e:
+            logger.warning(f"[SemgrepCache] 캐시 조회 실패 (전체 미스로 처리): {e}")
+            return {}
+
+        hits: dict[tuple[str, str], list[dict]] = {}
+        for entry, value in zip(entries, values):
+            if value is None:
+                continue
+            try:
+                hits[entry] = json.loads(value)
+            except (TypeError, json.JSONDecodeError):
+                continue
+        return hits
+
+    async def set_many(self, entries: dict[tuple[str, str], list[dict]]) -> None:
+        """(blob_hash, ext)별 finding 목록을 TTL과 함께 저장한다."""
+        if not entries:
+            return
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            for (blob_hash, ext), items in entries.items():
+                pipe.set(self._key(blob_hash, ext), json.dumps(items), ex=self._ttl)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"[SemgrepCache] 캐시 저장 실패 (무시): {e}")
+
+    async def get_findings(
+        self,
+        blob_hash: str,
+        ext: str,
+        file_path: str,
+        content: str,
+    ) -> list[SemgrepFinding] | None:
+        """단일 파일(IDE 분석)의 캐시된 결과를 반환한다. 미스면 None."""
+        hits = await self.get_many([(blob_hash, ext)])
+        if (blob_hash, ext) not in hits:
+            return None
+        lines = content.splitlines()
+        return [_deserialize(item, file_path, lines) for item in hits[(blob_hash, ext)]]
+
+    async def put_findings(
+        self,
+        blob_hash: str,
+        ext: str,
+        findings: list[SemgrepFinding],
+    ) -> None:
+        """단일 파일(IDE 분석)의 결과를 저장한다."""
+        uncached = self._uncached_rule_ids()
+        await self.set_many(
+            {(blob_hash, ext): [_serialize(f) for f in findings if f.rule_id not in uncached]}
+        )
+
+    async def close(self) -> None:
+        """Redis 연결을 닫는다."""
+        try:
+            await self._redis.aclose()
+        except Exception:
+            pass
+
+    async def scan(
+        self,
+        engine: SemgrepEngine,
+        target_dir: Path,
+        job_id: str,
+        target_files: list[str] | None = None,
+    ) -> list[SemgrepFinding]:
+        """캐시 미스 파일만 Semgrep으로 스캔하고, 히트 결과와 합쳐 반환한다.
+
+        Args:
+            engine: Semgrep 실행 엔진
+            target_dir: 스캔 대상 checkout 디렉토리
+            job_id: 스캔 작업 ID (로깅용)
+            target_files: 스캔할 파일 목록 (None이면 target_dir 전체)
+        """
+        candidates = _collect_candidates(target_dir, target_files)
+
+        # 파일 내용 해시 계산 (파일 경로 → (blob_hash, ext))
+        file_keys: dict[str, tuple[str, str]] = {}
+        for rel_path in candidates:
+            try:
+                data = (target_dir / rel_path).read_bytes()
+            except OSError:
+                continue
+            file_keys[rel_path] = (content_hash(data), Path(rel_path).suffix.lower())
+
+        hits = await self.get_many(list(set(file_keys.values())))
+        missed = [p for p, key in file_keys.items() if key not in hits]
+        self.last_file_count = len(file_keys)
+        self.last_hit_count = len(file_keys) - len(missed)
+
+        # 히트한 파일은 캐시된 finding을 현재 파일 내용으로 복원
+        findings: list[SemgrepFinding] = []
+        for rel_path, key in file_keys.items():
+            if key not in hits or not hits[key]:
+                continue
+            lines = _read_lines(target_dir / rel_path)
+            findings.extend(_deserialize(item, rel_path, lines) for item in hits[key])
+
+        # 캐시에는 Semgrep 결과만 있으므로 히트 파일의 자격증명은 내장 스캐너로 다시 검사
+        hit_paths = [str(target_dir / p) for p, key in file_keys.items() if key in hits]
+        if self._native_secrets and hit_paths:
+            findings.extend(engine.scan_secrets(hit_paths, target_dir, job_id))
+
+        logger.info(
+            f"[SemgrepCache] job_id={job_id}: 파일 {len(file_keys)}개 중 "
+            f"캐시 히트 {len(file_keys) - len(missed)}개, Semgrep 실행 {len(missed)}개"
+        )
+
+        if not missed and file_keys:
+            return findings
+
+        # 전부 미스이면 원래 호출 그대로 실행 (.semgrepignore 등 Semgrep 기본 동작 유지)
+        if len(missed) == len(file_keys):
+            scanned = engine.iter_scan(target_dir, job_id, target_files=target_files)
+        else:
+            scanned = engine.iter_scan(target_dir, job_id, target_files=missed)
+
+        # finding을 받는 대로 결과에 추가하고 파일별 캐시 항목으로 변환한다
+        uncached = self._uncached_rule_ids()
+        by_file: dict[str, list[dict]] = {}
+        for finding in scanned:
+            findings.append(finding)
+            if finding.rule_id not in uncached:
+                by_file.setdefault(finding.file_path, []).append(_serialize(finding))
+
+        if engine.last_output_incomplete is True:
+            # 어느 파일의 결과가 빠졌는지 알 수 없으면 아무것도 저장하지 않는다
+            logger.warning(
+                f"[SemgrepCache] job_id={job_id}: Semgrep 출력이 불완전하여 결과를 캐시하지 않음"
+            )
+            return findings
+
+        # 미스 파일 결과 저장 (finding이 없는 파일도 빈 목록으로 저장)
+        # 샤드 타임아웃 / 실패로 건너뛰었거나 Semgrep 에러가 난 파일은 "클린"으로 저장하면
+        # 내용이 바뀔 때까지 스캔되지 않으므로 제외한다
+        incomplete = _incomplete_files(engine, target_dir)
+        cached = [p for p in missed if p not in incomplete]
+        if len(cached) < len(missed):
+            logger.info(
+                f"[SemgrepCache] job_id={job_id}: 실패 / 에러 파일 {len(missed) - len(cached)}개는 캐시하지 않음"
+            )
+        await self.set_many({file_keys[p]: by_file.get(p, []) for p in cached})
+
+        return findings
+
+
+def _collect_candidates(target_dir: Path, target_files: list[str] | None) -> list[str]:
+    """캐시 조회 대상 파일(target_dir 기준 상대 경로)을 수집한다."""
+    if target_files is not None:
+        prefix = len(os.path.normpath(target_dir)) + 1
+        return [
+            path[prefix:]
+            for path in SemgrepEngine._resolve_target_files(target_dir, target_files)
+        ]
+    return list_scannable_files(target_dir)
+
+
+def _incomplete_files(engine: SemgrepEngine, target_dir: Path) -> set[str]:
+    """마지막 스캔에서 결과가 불완전한 파일 (target_dir 기준 상대 경로)."""
+    incomplete: set[str] = set()
+    failed = engine.last_failed_files
+    if isinstance(failed, list):
+        # 샤드 실패 파일은 절대 경로
+        incomplete.update(os.path.relpath(path, target_dir) for path in failed)
+    errors = engine.last_error_files
+    if isinstance(errors, list):
+        incomplete.update(errors)
+    return incomplete
+
+
+def _read_lines(path: Path) -> list[str]:
+    try:
+        return path.read_text(encoding="utf-8", errors="replace").splitlines()
+    except OSError:
+        return []
+
+
+async def create_result_cache(
+    redis_url: str,
+    ttl_seconds: int,
+    native_secrets: bool = False,
+) -> SemgrepResultCache | None:
+    """Redis 연결을 확인하고 캐시를 생성한다. 연결 실패 또는 TTL 0이면 None.
+
+    native_secrets는 캐시를 사용하는 SemgrepEngine의 설정과 같아야 한다.
+    """
+    if ttl_seconds <= 0:
+        return None
+    try:
+        conn = aioredis.from_url(redis_url)
+        await conn.ping()
+    except Exception as e:
+        logger.warning(f"[SemgrepCache] Redis 연결 실패 — 캐시 없이 스캔: {e}")
+        return None
+    return SemgrepResultCache(conn, ttl_seconds=ttl_seconds, native_secrets=native_secrets)
+
+
+# ---------------------------------------------------------------------------
+# API 프로세스(IDE 분석)용 캐시 — lifespan에서 생성/종료
+# ---------------------------------------------------------------------------
+
+_ide_cache: SemgrepResultCache | None = None
+
+
+async def start_ide_result_cache(
+    redis_url: str,
+    ttl_seconds: int,
+    native_secrets: bool = False,
+) -> SemgrepResultCache | None:
+    """IDE 분석용 결과 캐시를 생성한다 (Redis 연결 실패 시 None)."""
+    global _ide_cache
+    if _ide_cache is None:
+        _ide_cache = await create_result_cache(redis_url, ttl_seconds, native_secrets)
+    return _ide_cache
+
+
+async def stop_ide_result_cache() -> None:
+    """IDE 분석용 결과 캐시 연결을 닫는다."""
+    global _ide_cache
+    cache, _ide_cache = _ide_cache, None
+    if cache is not None:
+        await cache.close()
+
+
+def get_ide_result_cache() -> SemgrepResultCache | None:
+    """IDE 분석용 결과 캐시를 반환한다. 캐시를 사용하지 않으면 None."""
+    return _ide_cache
@@ -1,17 +1,141 @@
-"""Semgrep 1차 탐지 엔진 — CLI 실행 및 결과 파싱"""
+"""Semgrep 1차 탐지 엔진 — CLI 실행 및 결과 파싱
 
+대형 저장소는 샤딩 모드로 스캔한다 (ShardConfig 지정 + 대상 파일 수가 기준 이상):
+- 대상 파일을 크기 기준으로 균등한 샤드로 나눈다 (큰 파일부터 가장 가벼운 샤드에 배정)
+- 샤드마다 semgrep을 별도 프로세스로 동시에 실행하고 (할당 코어 수만큼),
+  끝나는 순서대로 결과를 SemgrepFinding으로 변환하여 합친다
+- 타임아웃된 샤드만 반으로 나눠 재시도하고, 그래도 실패한 파일은 건너뛴다
+  (전체 스캔 실패 대신 부분 결과)
+
+취소 확인기(ScanCancellation)가 주어지면 semgrep 실행 중에도 취소 플래그를 확인하여
+취소되면 semgrep 프로세스 그룹을 종료하고 ScanCancelledError를 발생시킨다.
+
+룰은 룰 레지스트리(rule_registry)에서 대상 파일에 나타난 언어의 룰 팩만 골라 --config로 넘긴다
+(Python만 있는 저장소에서 javascript / java / go 룰 팩을 읽지 않는다).
+
+키워드 사전 필터(prefilter=True)를 켜면 룰이 요구하는 리터럴이 하나도 없는 파일은
+Semgrep에 넘기지 않는다 (keyword_prefilter 참고).
+
+내장 자격증명 스캐너(native_secrets=True)를 켜면 hardcoded_creds 룰 팩은 Semgrep에서 빼고
+같은 룰 ID로 정규식 + 엔트로피 스캐너가 직접 검사한다 (secret_scanner 참고).
+
+스트리밍 모드(stream_output=True)에서는 semgrep stdout 전체를 문자열로 모으지 않고
+청크 단위로 읽으면서 results 원소를 하나씩 SemgrepFinding으로 변환한다
+(findings 수와 무관하게 파싱 메모리가 일정, semgrep_json_stream 참고).
+iter_scan()으로 받으면 변환한 finding도 목록으로 모으지 않고 호출 측에 바로 넘긴다.
+"""
+
+import heapq
 import json
 import logging
+import math
 import os
+import queue
 import shutil
+import signal
 import subprocess
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+from src.services.keyword_prefilter import get_keyword_index
+from src.services.rule_registry import RULES_DIR, get_rule_registry
+from src.services.scan_cancellation import ScanCancelledError
+from src.services.semgrep_json_stream import SemgrepJsonStream
+
+if TYPE_CHECKING:
+    from src.services.cpu_allocator import CoreAllocator
+    from src.services.scan_cancellation import ScanCancellation
 
 logger = logging.getLogger(__name__)
 
 # 커스텀 룰 디렉토리 경로
-_RULES_DIR = Path(__file__).parent.parent / "rules"
+_RULES_DIR = RULES_DIR
+
+# Semgrep --max-target-bytes 값. 이보다 큰 파일은 Semgrep이 스캔하지 않는다.
+MAX_TARGET_BYTES = 1_000_000
+
+# 코어 할당기가 없을 때의 Semgrep --jobs 값
+DEFAULT_SEMGREP_JOBS = 4
+
+# semgrep 프로세스 전체 실행 타임아웃 (초)
+_CLI_TIMEOUT_SEC = 600
+
+# 전체 스캔에서 사전 필터 후 남은 파일이 이 수 이하이면 디렉토리 대신 파일 목록을 넘긴다
+# (커맨드 라인 길이 제한 — 더 많으면 샤딩 스캔이 파일 목록을 샤드로 나눠 넘긴다)
+_MAX_CLI_TARGETS = 1000
+
+# semgrep 실행 중 취소 플래그 확인 주기 (초)
+_CANCEL_POLL_SEC = 1.0
+
+# 커스텀 룰 팩(python / javascript·typescript / java / go)이 다루는 파일 확장자
+RULE_PACK_EXTENSIONS: frozenset[str] = frozenset({
+    ".py",
+    ".js", ".jsx", ".mjs", ".cjs",
+    ".ts", ".tsx",
+    ".java",
+    ".go",
+})
+
+
+def is_scannable_path(path: str) -> bool:
+    """룰 팩이 다루는 확장자의 파일인지 확인한다."""
+    return Path(path).suffix.lower() in RULE_PACK_EXTENSIONS
+
+
+def list_scannable_files(target_dir: Path) -> list[str]:
+    """target_dir 아래 스캔 대상 파일(상대 경로)을 수집한다.
+
+    숨김 디렉토리, 룰 팩이 다루지 않는 확장자, --max-target-bytes 초과 파일은 제외한다.
+    """
+    files: list[str] = []
+    for root, dirs, names in os.walk(target_dir):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for name in names:
+            if not is_scannable_path(name):
+                continue
+            abs_path = Path(root) / name
+            try:
+                if abs_path.stat().st_size > MAX_TARGET_BYTES:
+                    continue
+            except OSError:
+                continue
+            files.append(str(abs_path.relative_to(target_dir)))
+    return files
+
+
+def partition_by_size(files: list[tuple[str, int]], shard_count: int) -> list[list[str]]:
+    """(경로, 크기) 목록을 크기 합이 비슷한 shard_count개 샤드로 나눈다.
+
+    큰 파일부터 현재 가장 가벼운 샤드에 배정한다 (LPT). 빈 샤드는 반환하지 않는다.
+    """
+    shard_count = max(1, min(shard_count, len(files)))
+    loads = [(0, i) for i in range(shard_count)]
+    shards: list[list[str]] = [[] for _ in range(shard_count)]
+    for path, size in sorted(files, key=lambda item: item[1], reverse=True):
+        load, i = heapq.heappop(loads)
+        shards[i].append(path)
+        heapq.heappush(loads, (load + size, i))
+    return [shard for shard in shards if shard]
+
+
+class SemgrepTimeoutError(RuntimeError):
+    """semgrep 프로세스가 전체 실행 타임아웃을 넘겼을 때."""
+
+
+@dataclass
+class ShardConfig:
+    """샤딩 모드 설정."""
+
+    min_files: int                # 이 수 이상의 파일을 스캔할 때만 샤딩
+    target_bytes: int             # 샤드 1개의 목표 크기 합
+    timeout_seconds: int          # 샤드 1개의 semgrep 실행 타임아웃
+    max_retries: int = 1          # 타임아웃 샤드를 반으로 나눠 재시도할 횟수
 
 
 @dataclass
@@ -40,36 +164,178 @@ class SemgrepEngine:
     - 임시 디렉토리 경로: /tmp/vulnix-scan-{job_id}/
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        core_allocator: "CoreAllocator | None" = None,
+        max_jobs: int = DEFAULT_SEMGREP_JOBS,
+        shard_config: ShardConfig | None = None,
+        cancellation: "ScanCancellation | None" = None,
+        stream_output: bool = False,
+        prefilter: bool = False,
+        native_secrets: bool = False,
+    ) -> None:
         self._rules_dir = _RULES_DIR
-
-    def scan(self, target_dir: Path, job_id: str) -> list[SemgrepFinding]:
+        # 호스트 공유 코어 할당기 (None이면 항상 --jobs max_jobs로 실행)
+        self._core_allocator = core_allocator
+        self._max_jobs = max_jobs
+        # 샤딩 모드 설정 (None이면 항상 semgrep 1회 실행)
+        self._shard_config = shard_config
+        # 스캔 취소 확인기 (None이면 취소 확인 없이 실행)
+        self._cancellation = cancellation
+        # semgrep stdout을 스트리밍 파싱 (False면 출력 전체를 받아 json.loads)
+        self._stream_output = stream_output
+        # 룰 키워드가 없는 파일을 Semgrep 대상에서 제외
+        self._prefilter = prefilter
+        # hardcoded_creds 룰을 Semgrep 대신 내장 스캐너로 실행
+        self._native_secrets = native_secrets
+        # 마지막 scan()의 샤드 수 / 타임아웃·실패로 건너뛴 파일 (텔레메트리용)
+        self.last_shard_count = 0
+        self.last_failed_files: list[str] = []
+        # 마지막 scan()에서 Semgrep이 에러를 보고한 파일 (target_dir 기준 상대 경로, 부분 결과)
+        self.last_error_files: list[str] = []
+        # 마지막 scan()의 결과가 특정 파일로 한정할 수 없는 이유로 불완전한지
+        # (경로 없는 에러, 출력 파싱 실패 등 — 결과 캐시에 저장하면 안 됨)
+        self.last_output_incomplete = False
+        # 마지막 scan()에서 사전 필터로 제외한 파일 수 (텔레메트리용)
+        self.last_prefiltered_files = 0
+
+    def scan(
+        self,
+        target_dir: Path,
+        job_id: str,
+        target_files: list[str] | None = None,
+    ) -> list[SemgrepFinding]:
         """Semgrep으로 대상 디렉토리를 스캔한다.
 
         Args:
             target_dir: 스캔할 소스코드 디렉토리
             job_id: 스캔 작업 ID (로깅용)
+            target_files: 스캔할 파일 목록 (target_dir 기준 상대 경로).
+                None이면 target_dir 전체를 스캔한다 (initial / full 스캔).
 
         Returns:
             탐지된 취약점 목록
 
         Raises:
-            RuntimeError: Semgrep 실행 실패 시
+            RuntimeError: Semgrep 실행 실패 시 (샤딩 모드에서는 모든 샤드가 실패한 경우)
+            ScanCancelledError: 스캔이 취소된 경우
         """
-        # 설계서 3-1-1 기준 커맨드 구성 (--config=auto 제외, 커스텀 룰만 사용)
-        cmd = [
-            "semgrep", "scan",
-            "--config", str(self._rules_dir),
-            "--json",
-            "--quiet",
-            "--timeout", "300",
-            "--max-target-bytes", "1000000",
-            "--jobs", "4",
-            str(target_dir),
-        ]
+        return list(self.iter_scan(target_dir, job_id, target_files))
+
+    def iter_scan(
+        self,
+        target_dir: Path,
+        job_id: str,
+        target_files: list[str] | None = None,
+    ) -> Iterator[SemgrepFinding]:
+        """scan()과 같지만 finding을 목록으로 모으지 않고 하나씩 내보낸다.
+
+        스트리밍 모드에서는 semgrep 출력을 읽는 대로 finding을 넘기므로 호출 측이
+        변환 / 저장을 바로 처리하면 전체 결과를 한 번에 들고 있지 않는다.
+        last_* 속성은 반복이 끝난 뒤에 확정된다.
+        """
+        if self._cancellation is not None:
+            self._cancellation.raise_if_cancelled()
+        self.last_shard_count = 0
+        self.last_failed_files = []
+        self.last_error_files = []
+        self.last_output_incomplete = False
+        self.last_prefiltered_files = 0
+
+        if target_files is None:
+            targets = [str(target_dir)]
+            scan_paths = [os.path.join(target_dir, p) for p in list_scannable_files(target_dir)]
+        else:
+            targets = self._resolve_target_files(target_dir, target_files)
+            if not targets:
+                # 변경 파일이 모두 삭제되었거나 checkout에 없으면 Semgrep 실행 불필요
+                logger.info(
+                    f"[SemgrepEngine] 스캔 대상 파일 없음 (job_id={job_id}) — 빈 findings 반환"
+                )
+                return
+            scan_paths = targets
+
+        if self._native_secrets:
+            yield from self.scan_secrets(scan_paths, target_dir, job_id)
+
+        yield from self._scan_semgrep(targets, scan_paths, target_dir, job_id, target_files)
+
+    def _scan_semgrep(
+        self,
+        targets: list[str],
+        scan_paths: list[str],
+        target_dir: Path,
+        job_id: str,
+        target_files: list[str] | None,
+    ) -> Iterator[SemgrepFinding]:
+        """Semgrep으로 실행할 룰 팩을 골라 대상 파일을 스캔한다."""
+        if (
+            self._prefilter
+            and target_files is None
+            and len(scan_paths) > _MAX_CLI_TARGETS
+            and not self._shards_enabled(len(scan_paths))
+        ):
+            # 샤딩 없는 대형 전체 스캔은 파일 목록을 커맨드 라인으로 넘길 수 없어 디렉토리를
+            # 그대로 스캔하므로, 사전 필터 결과를 쓸 수 없다 — 파일 전체 읽기 비용만 든다
+            logger.info(
+                f"[SemgrepEngine] job_id={job_id}: 파일 {len(scan_paths)}개 > {_MAX_CLI_TARGETS}개 "
+                f"(샤딩 꺼짐) — 사전 필터 건너뜀"
+            )
+        elif self._prefilter:
+            index = get_keyword_index(self._rules_dir, self._native_secret_packs())
+            kept = index.filter(scan_paths, workers=self._max_jobs)
+            self.last_prefiltered_files = len(scan_paths) - len(kept)
+            if self.last_prefiltered_files:
+                logger.info(
+                    f"[SemgrepEngine] job_id={job_id}: 룰 키워드 없는 파일 "
+                    f"{self.last_prefiltered_files}개 제외 (남은 파일 {len(kept)}개)"
+                )
+                scan_paths = kept
+                if target_files is not None or len(kept) <= _MAX_CLI_TARGETS:
+                    targets = kept
+                elif not self._shards_enabled(len(kept)):
+                    logger.info(
+                        f"[SemgrepEngine] job_id={job_id}: 남은 파일 {len(kept)}개 > "
+                        f"{_MAX_CLI_TARGETS}개 (샤딩 꺼짐) — 디렉토리 전체를 스캔"
+                    )
+            if not scan_paths:
+                return
+
+        rule_configs = self._rule_configs(scan_paths)
+        if not rule_configs:
+            # 룰 팩이 다루는 언어의 파일이 없으면 Semgrep 실행 불필요
+            logger.info(
+                f"[SemgrepEngine] 룰 팩 대상 언어 파일 없음 (job_id={job_id}) — 빈 findings 반환"
+            )
+            return
+        logger.info(f"[SemgrepEngine] job_id={job_id}: 룰 팩 {len(rule_configs)}개 적용")
+
+        shard_files = self._shard_candidates(scan_paths)
 
         # Semgrep CLI 실행 후 JSON 파싱
-        raw = self._run_semgrep_cli(cmd)
+        # 코어 할당기가 있으면 같은 호스트의 다른 스캔과 코어를 나눠 쓴다
+        with self._lease_cores(job_id) as cpu_ids:
+            if shard_files is not None:
+                yield from self._scan_sharded(shard_files, target_dir, job_id, cpu_ids)
+                return
+            if self._stream_output:
+                # 파싱한 finding을 목록으로 모으지 않고 바로 호출 측에 넘긴다
+                jobs = len(cpu_ids) if cpu_ids is not None else self._max_jobs
+                yield from self._stream_semgrep_cli(
+                    self._build_command(targets, jobs, rule_configs),
+                    target_dir,
+                    job_id,
+                    cpu_ids=cpu_ids,
+                )
+                return
+            if cpu_ids is None:
+                raw = self._run_semgrep_cli(
+                    self._build_command(targets, self._max_jobs, rule_configs)
+                )
+            else:
+                raw = self._run_semgrep_cli(
+                    self._build_command(targets, len(cpu_ids), rule_configs), cpu_ids=cpu_ids
+                )
 
         # 부분 에러가 있으면 경고 로그 남기되 중단하지 않음
         if raw.get("errors"):
@@ -77,38 +343,272 @@ class SemgrepEngine:
                 f"[SemgrepEngine] 스캔 중 부분 에러 발생 (job_id={job_id}): "
                 f"{len(raw['errors'])}건 — 부분 결과로 계속 진행"
             )
+            self._record_errors(raw["errors"], target_dir)
+
+        yield from self._parse_results(raw, target_dir)
+
+    @contextmanager
+    def _lease_cores(self, job_id: str) -> Iterator[list[int] | None]:
+        """코어 할당기가 있으면 코어를 할당받고, 없으면 None을 넘긴다."""
+        if self._core_allocator is None:
+            yield None
+            return
+        with self._core_allocator.lease(self._max_jobs) as cpu_ids:
+            logger.info(f"[SemgrepEngine] job_id={job_id}: 코어 {len(cpu_ids)}개 할당 {cpu_ids}")
+            yield cpu_ids
+
+    def _shards_enabled(self, file_count: int) -> bool:
+        """파일 수가 file_count개인 스캔을 샤딩 모드로 실행하는지 여부."""
+        config = self._shard_config
+        return config is not None and 0 < config.min_files <= file_count
+
+    def _shard_candidates(self, paths: list[str]) -> list[tuple[str, int]] | None:
+        """샤딩 모드로 스캔할 (절대 경로, 크기) 목록을 반환한다. 샤딩하지 않으면 None."""
+        if not self._shards_enabled(len(paths)):
+            return None
+
+        sized: list[tuple[str, int]] = []
+        for path in paths:
+            try:
+                sized.append((path, os.path.getsize(path)))
+            except OSError:
+                continue
+        return sized
+
+    def _scan_sharded(
+        self,
+        files: list[tuple[str, int]],
+        target_dir: Path,
+        job_id: str,
+        cpu_ids: list[int] | None,
+    ) -> list[SemgrepFinding]:
+        """파일을 크기 기준 샤드로 나눠 동시에 스캔하고 끝나는 순서대로 결과를 합친다.
+
+        타임아웃된 샤드만 반으로 나눠 재시도한다. 재시도 후에도 실패한 파일은
+        last_failed_files에 남기고 나머지 결과를 반환한다.
+        """
+        config = self._shard_config
+        assert config is not None
+        workers = len(cpu_ids) if cpu_ids else self._max_jobs
+        total_bytes = sum(size for _, size in files)
+        shard_count = max(workers, math.ceil(total_bytes / max(1, config.target_bytes)))
+        shards = partition_by_size(files, shard_count)
+        self.last_shard_count = len(shards)
+        logger.info(
+            f"[SemgrepEngine] job_id={job_id}: 샤딩 스캔 — 파일 {len(files)}개 "
+            f"({total_bytes}바이트)를 샤드 {len(shards)}개로 분할, 동시 실행 {workers}개"
+        )
+
+        # 각 샤드 프로세스는 할당 코어 1개에 고정 (코어 할당기가 없으면 고정하지 않음)
+        free_cores: queue.SimpleQueue[int] | None = None
+        if cpu_ids:
+            free_cores = queue.SimpleQueue()
+            for cpu_id in cpu_ids:
+                free_cores.put(cpu_id)
+
+        findings: list[SemgrepFinding] = []
+        succeeded = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="semgrep-shard") as pool:
+            running: dict[Future, tuple[list[str], int]] = {
+                pool.submit(self._run_shard, shard, target_dir, job_id, free_cores): (shard, 0)
+                for shard in shards
+            }
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    shard, attempt = running.pop(future)
+                    try:
+                        shard_findings = future.result()
+                    except SemgrepTimeoutError:
+                        if attempt >= config.max_retries:
+                            logger.warning(
+                                f"[SemgrepEngine] job_id={job_id}: 샤드 타임아웃 — "
+                                f"파일 {len(shard)}개 건너뜀"
+                            )
+                            self.last_failed_files.extend(shard)
+                            continue
+                        # 타임아웃 샤드만 반으로 나눠 재시도
+                        half = max(1, len(shard) // 2)
+                        for part in (shard[:half], shard[half:]):
+                            if part:
+                                running[
+                                    pool.submit(self._run_shard, part, target_dir, job_id, free_cores)
+                                ] = (part, attempt + 1)
+                        continue
+                    except RuntimeError as e:
+                        logger.warning(
+                            f"[SemgrepEngine] job_id={job_id}: 샤드 실행 실패 "
+                            f"(파일 {len(shard)}개 건너뜀): {e}"
+                        )
+                        self.last_failed_files.extend(shard)
+                        continue
+
+                    succeeded += 1
+                    findings.extend(shard_findings)
+
+        if not succeeded and self.last_failed_files:
+            raise RuntimeError(
+                f"Semgrep 샤딩 스캔 실패: 모든 샤드 실패 (파일 {len(self.last_failed_files)}개)"
+            )
+        if self.last_failed_files:
+            logger.warning(
+                f"[SemgrepEngine] job_id={job_id}: 파일 {len(self.last_failed_files)}개를 "
+                f"제외한 부분 결과 반환"
+            )
+        return findings
+
+    def _run_shard(
+        self,
+        files: list[str],
+        target_dir: Path,
+        job_id: str,
+        free_cores: "queue.SimpleQueue[int] | None",
+    ) -> list[SemgrepFinding]:
+        """샤드 하나를 단일 코어 semgrep 프로세스로 스캔한다."""
+        config = self._shard_config
+        assert config is not None
+        cpu_id = free_cores.get() if free_cores is not None else None
+        cpu_ids = [cpu_id] if cpu_id is not None else None
+        # 샤드마다 샤드 파일의 언어 룰 팩만 적용
+        cmd = self._build_command(files, 1, self._rule_configs(files))
+        try:
+            if self._stream_output:
+                # 샤드 결과는 타임아웃 재시도 / 실패 시 통째로 버려야 하므로 샤드 안에서 모은다
+                # (샤드 하나의 finding만 — 샤드 크기로 상한)
+                return list(
+                    self._stream_semgrep_cli(
+                        cmd,
+                        target_dir,
+                        job_id,
+                        cpu_ids=cpu_ids,
+                        timeout=config.timeout_seconds,
+                    )
+                )
+            raw = self._run_semgrep_cli(
+                cmd,
+                cpu_ids=cpu_ids,
+                timeout=config.timeout_seconds,
+            )
+            if raw.get("errors"):
+                logger.warning(
+                    f"[SemgrepEngine] 샤드 스캔 중 부분 에러 발생 (job_id={job_id}): "
+                    f"{len(raw['errors'])}건 — 부분 결과로 계속 진행"
+                )
+                self._record_errors(raw["errors"], target_dir)
+            return self._parse_results(raw, target_dir)
+        finally:
+            if free_cores is not None and cpu_id is not None:
+                free_cores.put(cpu_id)
+
+    def scan_secrets(self, paths: list[str], target_dir: Path, job_id: str) -> list[SemgrepFinding]:
+        """hardcoded_creds 룰을 내장 스캐너로 실행한다 (paths는 절대 경로)."""
+        # secret_scanner가 SemgrepFinding을 import하므로 순환 import를 피해 여기서 import
+        from src.services.secret_scanner import get_secret_scanner
+
+        started = time.monotonic()
+        findings = get_secret_scanner(self._rules_dir).scan_files(paths, target_dir, workers=self._max_jobs)
+        logger.info(
+            f"[SemgrepEngine] job_id={job_id}: 내장 자격증명 스캔 — 파일 {len(paths)}개, "
+            f"findings {len(findings)}건 ({(time.monotonic() - started) * 1000:.0f}ms)"
+        )
+        return findings
+
+    def _native_secret_packs(self) -> frozenset[str]:
+        """내장 스캐너가 대신 실행하는 룰 팩 (native_secrets가 꺼져 있으면 없음)."""
+        if not self._native_secrets:
+            return frozenset()
+        from src.services.secret_scanner import native_secret_packs
+
+        return native_secret_packs(self._rules_dir)
+
+    def _rule_configs(self, paths: list[str]) -> list[str]:
+        """파일 목록에 나타난 언어의 룰 팩 경로 (--config 인자)."""
+        registry = get_rule_registry(self._rules_dir)
+        native = self._native_secret_packs()
+        return [
+            str(pack.path)
+            for pack in registry.packs_for_files(paths)
+            if pack.relative_path not in native
+        ]
+
+    def _build_command(
+        self,
+        targets: list[str],
+        jobs: int,
+        rule_configs: list[str] | None = None,
+    ) -> list[str]:
+        """설계서 3-1-1 기준 커맨드 구성 (--config=auto 제외, 커스텀 룰만 사용).
+
+        rule_configs가 없으면 룰 디렉토리 전체를 사용한다.
+        """
+        configs: list[str] = []
+        for config in rule_configs or [str(self._rules_dir)]:
+            configs += ["--config", config]
+        return [
+            "semgrep", "scan",
+            *configs,
+            "--json",
+            "--quiet",
+            "--timeout", "300",
+            "--max-target-bytes", str(MAX_TARGET_BYTES),
+            "--jobs", str(jobs),
+            *targets,
+        ]
 
-        return self._parse_results(raw, target_dir)
+    @staticmethod
+    def _resolve_target_files(target_dir: Path, target_files: list[str]) -> list[str]:
+        """상대 경로 목록을 target_dir 내부의 실제 파일 절대 경로로 변환한다.
 
-    def _run_semgrep_cli(self, cmd: list[str]) -> dict:
+        존재하지 않는 파일(삭제/이름 변경)과 target_dir 밖을 가리키는 경로는 제외한다.
+        """
+        base = target_dir.resolve()
+        resolved: list[str] = []
+        for rel_path in dict.fromkeys(target_files):  # 순서 유지 중복 제거
+            candidate = target_dir / rel_path
+            real_path = candidate.resolve()
+            if not real_path.is_relative_to(base) or not real_path.is_file():
+                continue
+            # Semgrep 결과 경로가 target_dir 기준 상대 경로로 변환되도록 원래 접두사를 유지
+            resolved.append(os.path.normpath(candidate))
+        return resolved
+
+    def _run_semgrep_cli(
+        self,
+        cmd: list[str],
+        cpu_ids: list[int] | None = None,
+        timeout: int = _CLI_TIMEOUT_SEC,
+    ) -> dict:
         """Semgrep CLI를 실행하고 JSON 결과를 반환한다.
 
         Args:
             cmd: 실행할 Semgrep 커맨드 목록
+            cpu_ids: 할당받은 CPU ID (지정 시 Semgrep 프로세스를 해당 코어에 고정)
+            timeout: 프로세스 전체 실행 타임아웃 (초)
 
         Returns:
             Semgrep JSON 출력 딕셔너리
 
         Raises:
-            RuntimeError: Semgrep 미설치, 타임아웃, 내부 에러 시
+            SemgrepTimeoutError: 실행 타임아웃 시
+            ScanCancelledError: 실행 중 스캔이 취소된 경우 (프로세스 종료)
+            RuntimeError: Semgrep 미설치, 내부 에러 시
         """
-        # Railway 컨테이너에서 ~/.semgrep/ 캐시 디렉토리 생성 실패를 막기 위해
-        # HOME=/tmp 강제 설정 (기존 /root 등 쓰기 불가 경로 덮어쓰기)
-        env = os.environ.copy()
-        env["HOME"] = "/tmp"
-        env["SEMGREP_SEND_METRICS"] = "off"
-        env["SEMGREP_ENABLE_VERSION_CHECK"] = "0"
+        env = self._semgrep_env()
+        cmd = self._pinned_command(cmd, cpu_ids)
 
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=600,  # 전체 실행 타임아웃 10분
-                env=env,
-            )
+            if self._cancellation is None:
+                result = subprocess.run(
+                    cmd,
+                    capture_output=True,
+                    text=True,
+                    timeout=timeout,  # 전체 실행 타임아웃 (기본 10분)
+                    env=env,
+                )
+            else:
+                result = self._run_cancellable(cmd, timeout, env=env)
         except subprocess.TimeoutExpired as e:
-            raise RuntimeError(f"Semgrep 실행 타임아웃 (600초 초과): {e}") from e
+            raise SemgrepTimeoutError(f"Semgrep 실행 타임아웃 ({timeout}초 초과): {e}") from e
         except FileNotFoundError as e:
             raise RuntimeError("Semgrep CLI가 설치되지 않았습니다") from e
 
@@ -132,6 +632,7 @@ class SemgrepEngine:
                 f"[SemgrepEngine] stdout/stderr 모두 비어있음 "
                 f"(returncode={result.returncode}) — 빈 findings 반환"
             )
+            self.last_output_incomplete = True
             return {"results": [], "errors": []}
 
         try:
@@ -147,6 +648,7 @@ class SemgrepEngine:
                 f"[SemgrepEngine] JSON 파싱 실패, 빈 findings 반환. "
                 f"output(300자)={output[:300]!r}"
             )
+            self.last_output_incomplete = True
             return {"results": [], "errors": []}
 
         # JSON 파싱 성공 — returncode >= 2여도 부분 결과를 사용한다
@@ -158,6 +660,248 @@ class SemgrepEngine:
             )
         return parsed
 
+    def _stream_semgrep_cli(
+        self,
+        cmd: list[str],
+        base_dir: Path,
+        job_id: str,
+        cpu_ids: list[int] | None = None,
+        timeout: int = _CLI_TIMEOUT_SEC,
+    ) -> Iterator[SemgrepFinding]:
+        """Semgrep CLI를 실행하고 stdout을 스트리밍 파싱하여 finding을 하나씩 내보낸다.
+
+        _run_semgrep_cli와 returncode / stderr 해석은 같다. 취소 확인과 전체 타임아웃은
+        감시 스레드가 맡고, 발생 시 프로세스 그룹을 종료한다.
+        호출 측이 중간에 반복을 멈추면 semgrep 프로세스도 종료한다.
+
+        Raises:
+            SemgrepTimeoutError: 실행 타임아웃 시
+            ScanCancelledError: 실행 중 스캔이 취소된 경우 (프로세스 종료)
+            RuntimeError: Semgrep 미설치, 내부 에러 시
+        """
+        try:
+            proc = subprocess.Popen(
+                self._pinned_command(cmd, cpu_ids),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                start_new_session=True,
+                env=self._semgrep_env(),
+            )
+        except FileNotFoundError as e:
+            raise RuntimeError("Semgrep CLI가 설치되지 않았습니다") from e
+
+        # stderr는 별도 스레드에서 비워 파이프가 가득 차 semgrep이 멈추지 않게 한다
+        stderr_chunks: list[bytes] = []
+        stderr_reader = threading.Thread(
+            target=lambda: stderr_chunks.append(proc.stderr.read()),
+            name="semgrep-stderr",
+            daemon=True,
+        )
+        stderr_reader.start()
+        finished = threading.Event()
+        stopped: list[str] = []   # 감시 스레드가 종료시킨 이유 ("cancelled" / "timeout")
+        watchdog = threading.Thread(
+            target=self._watch_process,
+            args=(proc, time.monotonic() + timeout, finished, stopped),
+            name="semgrep-watchdog",
+            daemon=True,
+        )
+        watchdog.start()
+
+        stream = SemgrepJsonStream(proc.stdout)
+        parse_error: json.JSONDecodeError | None = None
+        try:
+            try:
+                for result in stream:
+                    yield self._to_finding(result, base_dir)
+            except json.JSONDecodeError as e:
+                parse_error = e
+            returncode = proc.wait()
+        finally:
+            finished.set()
+            # 반복이 중간에 멈췄거나 semgrep-core가 남아 있으면 그룹 전체를 종료
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+            proc.wait()
+            stderr_reader.join()
+            watchdog.join()
+            proc.stdout.close()
+            proc.stderr.close()
+
+        if "cancelled" in stopped:
+            logger.info(f"[SemgrepEngine] 스캔 취소 — semgrep 프로세스 종료 (job_id={job_id})")
+            raise ScanCancelledError(f"스캔 취소됨 (job_id={job_id})")
+        if "timeout" in stopped:
+            raise SemgrepTimeoutError(f"Semgrep 실행 타임아웃 ({timeout}초 초과)")
+
+        if parse_error is not None:
+            # JSON이 아닌 출력 (예: crash traceback) — returncode >= 2면 에러
+            if returncode >= 2:
+                raise RuntimeError(
+                    f"Semgrep 실행 에러 (returncode={returncode}): {parse_error.doc[:300]}"
+                )
+            logger.warning(
+                f"[SemgrepEngine] JSON 파싱 실패 (job_id={job_id}), 이후 findings 무시: {parse_error}"
+            )
+            self.last_output_incomplete = True
+            return
+
+        if not stream.has_output:
+            # stdout이 비어있으면 stderr에서 JSON 시도 (일부 버전 출력 경로 차이)
+            stderr = b"".join(stderr_chunks).decode("utf-8", errors="replace").strip()
+            if not stderr:
+                if returncode >= 2:
+                    raise RuntimeError(f"Semgrep 실행 에러 (returncode={returncode}): 출력 없음")
+                logger.warning(
+                    f"[SemgrepEngine] stdout/stderr 모두 비어있음 "
+                    f"(returncode={returncode}) — 빈 findings 반환"
+                )
+                self.last_output_incomplete = True
+                return
+            try:
+                parsed = json.loads(stderr)
+            except json.JSONDecodeError:
+                if returncode >= 2:
+                    raise RuntimeError(
+                        f"Semgrep 실행 에러 (returncode={returncode}): {stderr[:300]}"
+                    )
+                logger.warning(
+                    f"[SemgrepEngine] JSON 파싱 실패, 빈 findings 반환. output(300자)={stderr[:300]!r}"
+                )
+                self.last_output_incomplete = True
+                return
+            stream.errors = parsed.get("errors") or []
+            yield from self._parse_results(parsed, base_dir)
+
+        # JSON 파싱 성공 — returncode >= 2여도 부분 결과를 사용한다
+        if stream.errors:
+            logger.warning(
+                f"[SemgrepEngine] 스캔 중 부분 에러 발생 (job_id={job_id}, returncode={returncode}): "
+                f"{len(stream.errors)}건 — 부분 결과로 계속 진행"
+            )
+            self._record_errors(stream.errors, base_dir)
+
+    def _watch_process(
+        self,
+        proc: subprocess.Popen,
+        deadline: float,
+        finished: threading.Event,
+        stopped: list[str],
+    ) -> None:
+        """스트리밍 실행 중 취소 플래그와 타임아웃을 확인하고, 해당하면 프로세스 그룹을 종료한다."""
+        while not finished.wait(_CANCEL_POLL_SEC):
+            if self._cancellation is not None and self._cancellation.is_cancelled():
+                stopped.append("cancelled")
+            elif time.monotonic() >= deadline:
+                stopped.append("timeout")
+            else:
+                continue
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            return
+
+    @staticmethod
+    def _semgrep_env() -> dict[str, str]:
+        """semgrep 실행 환경변수."""
+        # Railway 컨테이너에서 ~/.semgrep/ 캐시 디렉토리 생성 실패를 막기 위해
+        # HOME=/tmp 강제 설정 (기존 /root 등 쓰기 불가 경로 덮어쓰기)
+        env = os.environ.copy()
+        env["HOME"] = "/tmp"
+        env["SEMGREP_SEND_METRICS"] = "off"
+        env["SEMGREP_ENABLE_VERSION_CHECK"] = "0"
+        return env
+
+    @staticmethod
+    def _pinned_command(cmd: list[str], cpu_ids: list[int] | None) -> list[str]:
+        """할당 코어가 있으면 semgrep을 해당 코어에 고정하도록 taskset으로 감싼다.
+
+        샤드 스레드에서 실행되므로 preexec_fn(fork 후 exec 전 콜백)은 쓰지 않는다 —
+        스레드가 있는 프로세스에서는 자식이 exec 전에 교착될 수 있다.
+        taskset이 exec 전에 affinity를 정하므로 semgrep-core 하위 프로세스도 같은 코어를 상속한다.
+        """
+        if not cpu_ids:
+            return cmd
+        taskset = shutil.which("taskset")
+        if taskset is None:
+            logger.debug("[SemgrepEngine] taskset 없음 — 코어 고정 없이 실행")
+            return cmd
+        return [taskset, "-c", ",".join(str(cpu) for cpu in cpu_ids), *cmd]
+
+    def _run_cancellable(
+        self,
+        cmd: list[str],
+        timeout: int,
+        **popen_kwargs,
+    ) -> subprocess.CompletedProcess:
+        """취소 플래그를 주기적으로 확인하며 semgrep을 실행한다.
+
+        semgrep은 semgrep-core 하위 프로세스를 띄우므로 새 세션(프로세스 그룹)으로 실행하고,
+        취소 / 타임아웃 시 그룹 전체를 종료한다.
+        """
+        assert self._cancellation is not None
+        deadline = time.monotonic() + timeout
+        with subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            start_new_session=True,
+            **popen_kwargs,
+        ) as proc:
+            while True:
+                try:
+                    stdout, stderr = proc.communicate(timeout=_CANCEL_POLL_SEC)
+                    break
+                except subprocess.TimeoutExpired:
+                    if self._cancellation.is_cancelled():
+                        self._kill_process_group(proc)
+                        logger.info(
+                            f"[SemgrepEngine] 스캔 취소 — semgrep 프로세스 종료 "
+                            f"(job_id={self._cancellation.job_id})"
+                        )
+                        raise ScanCancelledError(
+                            f"스캔 취소됨 (job_id={self._cancellation.job_id})"
+                        )
+                    if time.monotonic() >= deadline:
+                        self._kill_process_group(proc)
+                        raise subprocess.TimeoutExpired(cmd, timeout)
+        return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+
+    @staticmethod
+    def _kill_process_group(proc: subprocess.Popen) -> None:
+        """semgrep과 하위 프로세스(semgrep-core)를 모두 종료하고 회수한다."""
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        proc.communicate()
+
+    def _record_errors(self, errors: list, base_dir: Path) -> None:
+        """Semgrep errors를 파일별 에러(last_error_files)와 불완전 출력 여부로 기록한다.
+
+        경로가 있는 에러(파싱 실패, 파일 타임아웃 등)는 그 파일의 결과만 불완전하고,
+        경로가 없는 에러(룰 에러 등)는 어느 파일의 결과가 빠졌는지 알 수 없다.
+        """
+        for error in errors:
+            path = error.get("path") if isinstance(error, dict) else None
+            if isinstance(path, str) and path:
+                self.last_error_files.append(self._relative_path(path, base_dir))
+            else:
+                self.last_output_incomplete = True
+
+    @staticmethod
+    def _relative_path(path: str, base_dir: Path) -> str:
+        """Semgrep이 보고한 경로를 base_dir 기준 상대 경로로 변환한다 (밖이면 그대로)."""
+        abs_path = Path(path)
+        try:
+            return str(abs_path.relative_to(base_dir))
+        except ValueError:
+            return str(abs_path)
+
     def _parse_results(self, semgrep_output: dict, base_dir: Path) -> list[SemgrepFinding]:
         """Semgrep JSON 출력을 SemgrepFinding 목록으로 변환한다.
 
@@ -168,32 +912,30 @@ class SemgrepEngine:
         Returns:
             SemgrepFinding 목록
         """
-        findings: list[SemgrepFinding] = []
-
-        for result in semgrep_output.get("results", []):
-            # 파일 경로를 base_dir 기준 상대 경로로 변환
-            abs_path = Path(result["path"])
-            try:
-                rel_path = str(abs_path.relative_to(base_dir))
-            except ValueError:
-                rel_path = str(abs_path)
-
-            extra = result.get("extra", {})
-            metadata = extra.get("metadata", {})
-
-            finding = SemgrepFinding(
-                rule_id=result["check_id"],
-                severity=extra.get("severity", "WARNING"),
-                file_path=rel_path,
-                start_line=result["start"]["line"],
-                end_line=result["end"]["line"],
-                code_snippet=extra.get("lines", ""),
-                message=extra.get("message", ""),
-                cwe=metadata.get("cwe", []),
-            )
-            findings.append(finding)
+        return [
+            self._to_finding(result, base_dir)
+            for result in semgrep_output.get("results", [])
+        ]
 
-        return findings
+    @staticmethod
+    def _to_finding(result: dict, base_dir: Path) -> SemgrepFinding:
+        """semgrep results 원소 하나를 SemgrepFinding으로 변환한다."""
+        # 파일 경로를 base_dir 기준 상대 경로로 변환
+        rel_path = SemgrepEngine._relative_path(result["path"], base_dir)
+
+        extra = result.get("extra", {})
+        metadata = extra.get("metadata", {})
+
+        return SemgrepFinding(
+            rule_id=result["check_id"],
+            severity=extra.get("severity", "WARNING"),
+            file_path=rel_path,
+            start_line=result["start"]["line"],
+            end_line=result["end"]["line"],
+            code_snippet=extra.get("lines", ""),
+            message=extra.get("message", ""),
+            cwe=metadata.get("cwe", []),
+        )
 
     @staticmethod
     def prepare_temp_dir(job_id: str) -> Path:
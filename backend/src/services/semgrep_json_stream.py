@@ -0,0 +1,145 @@
+"""Semgrep --json 출력 스트리밍 파서
+
+semgrep 출력 전체를 문자열로 받아 json.loads()하면 findings가 수만 건인 저장소에서
+원문 문자열 + 파싱된 dict + SemgrepFinding 목록이 동시에 메모리에 올라가 수백 MB를 쓴다.
+stdout을 고정 크기 청크로 읽으면서 최상위 객체의 results 배열을 원소 하나씩 디코딩하여
+내보내므로, 파서가 잡고 있는 메모리는 findings 수와 무관하게 청크 + 결과 1건 크기로 유지된다.
+
+- results: 원소(dict)를 하나씩 yield
+- errors: 부분 에러 목록으로 보관 (보통 수 건)
+- 그 외 키 (paths, version, skipped_rules 등): 디코딩 후 버린다
+"""
+
+import codecs
+import json
+from collections.abc import Iterator
+from typing import BinaryIO
+
+# stdout 읽기 단위 (바이트)
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\r\n"
+
+
+class SemgrepJsonStream:
+    """바이너리 스트림(semgrep stdout)에서 results 원소를 하나씩 읽는 파서.
+
+    사용법:
+        stream = SemgrepJsonStream(proc.stdout)
+        for result in stream:
+            ...
+        stream.errors  # 반복이 끝난 뒤 채워진다
+
+    Raises:
+        json.JSONDecodeError: JSON이 아니거나 중간에 끊긴 출력
+    """
+
+    def __init__(self, reader: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        self._reader = reader
+        self._chunk_size = chunk_size
+        self._text = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._json = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        # 공백이 아닌 출력이 있었는지 (없으면 호출 측이 stderr를 확인한다)
+        self.has_output = False
+        self.errors: list = []
+
+    def __iter__(self) -> Iterator[dict]:
+        if not self._skip_whitespace():
+            return
+        self.has_output = True
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._decode_value()
+            if not isinstance(key, str):
+                self._fail("객체 키가 문자열이 아님")
+            self._expect(":")
+            if key == "results":
+                yield from self._iter_array()
+            elif key == "errors":
+                errors = self._decode_value()
+                self.errors = errors if isinstance(errors, list) else []
+            else:
+                self._decode_value()
+            separator = self._next_char()
+            if separator == "}":
+                return
+            if separator != ",":
+                self._fail("',' 또는 '}' 필요")
+
+    def _iter_array(self) -> Iterator[dict]:
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._decode_value()
+            separator = self._next_char()
+            if separator == "]":
+                return
+            if separator != ",":
+                self._fail("',' 또는 ']' 필요")
+
+    def _decode_value(self):
+        """현재 위치의 JSON 값 하나를 디코딩한다. 값이 청크 경계에 걸치면 더 읽고 다시 시도한다."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+                # 큰 값(paths 등)도 재시도 횟수가 로그 수준이 되도록 남은 길이만큼 더 읽는다
+                self._fill(max(self._chunk_size, len(self._buf) - self._pos))
+                continue
+            # 버퍼 끝에서 끝난 숫자는 뒤에 숫자가 더 올 수 있다
+            if end == len(self._buf) and not self._eof:
+                self._fill(self._chunk_size)
+                continue
+            self._pos = end
+            return value
+
+    def _fill(self, size: int) -> None:
+        if self._pos:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        data = self._reader.read(size)
+        if not data:
+            self._eof = True
+            self._buf += self._text.decode(b"", final=True)
+            return
+        self._buf += self._text.decode(data)
+
+    def _skip_whitespace(self) -> bool:
+        """공백을 건너뛴다. 스트림이 끝났으면 False."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return True
+            if self._eof:
+                return False
+            self._fill(self._chunk_size)
+
+    def _peek(self) -> str:
+        if not self._skip_whitespace():
+            self._fail("출력이 중간에 끊김")
+        return self._buf[self._pos]
+
+    def _next_char(self) -> str:
+        char = self._peek()
+        self._pos += 1
+        return char
+
+    def _expect(self, char: str) -> None:
+        if self._next_char() != char:
+            self._pos -= 1
+            self._fail(f"'{char}' 필요")
+
+    def _fail(self, reason: str) -> None:
+        raise json.JSONDecodeError(f"Semgrep JSON 출력 파싱 실패: {reason}", self._buf, self._pos)
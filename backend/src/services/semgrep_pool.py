@@ -0,0 +1,500 @@
+"""IDE 분석용 Semgrep 워커 풀 — 룰을 미리 로드한 `semgrep lsp` 프로세스 재사용
+
+`semgrep scan`은 호출마다 인터프리터 기동 + 룰 파싱을 반복하여 IDE 분석
+타임아웃(500ms)을 넘긴다. 이 모듈은 Semgrep LSP 서버 프로세스를 미리 띄워
+룰을 한 번만 로드해 두고, 단일 파일 분석 요청을 LSP 메시지로 전달한다.
+
+- 워커 1개 = `semgrep lsp` 프로세스 1개 + 전용 작업 디렉토리
+- 분석 대상 파일은 작업 디렉토리에 잠시 기록 후 즉시 삭제 (ADR-003)
+- 대기 중 요청 수 상한(bounded queue), 주기적 헬스체크, N건 처리 후 재시작
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import shutil
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any, Protocol
+
+from src.services.semgrep_engine import _RULES_DIR, MAX_TARGET_BYTES, SemgrepFinding
+from src.services.vulnerability_mapper import RULE_MAPPING
+
+logger = logging.getLogger(__name__)
+
+# LSP DiagnosticSeverity → Semgrep severity
+_LSP_SEVERITY: dict[int, str] = {1: "ERROR", 2: "WARNING", 3: "INFO", 4: "INFO"}
+
+# 파일 확장자 → LSP languageId
+_EXT_LANGUAGE_ID: dict[str, str] = {
+    ".py": "python",
+    ".js": "javascript",
+    ".ts": "typescript",
+    ".java": "java",
+    ".go": "go",
+}
+
+# 워커 작업 디렉토리 접두사
+_WORKSPACE_PREFIX = "/tmp/vulnix-ide-pool"
+
+
+class SemgrepPoolUnavailable(RuntimeError):
+    """풀이 시작되지 않았거나 대기열이 가득 차 요청을 받을 수 없을 때 발생한다."""
+
+
+class _PoolWorker(Protocol):
+    """풀이 관리하는 워커 인터페이스 (테스트에서 가짜 워커로 교체 가능)."""
+
+    jobs_done: int
+
+    @property
+    def alive(self) -> bool: ...
+
+    async def start(self) -> None: ...
+
+    async def scan(self, content: str, ext: str, timeout: float) -> list[SemgrepFinding]: ...
+
+    async def close(self) -> None: ...
+
+
+class SemgrepLspWorker:
+    """룰을 미리 로드한 `semgrep lsp` 프로세스 1개를 감싸는 워커."""
+
+    def __init__(
+        self,
+        worker_id: int,
+        rules_dir: Path = _RULES_DIR,
+        start_timeout: float = 60.0,
+        rule_configs: list[str] | None = None,
+    ) -> None:
+        self.worker_id = worker_id
+        self.jobs_done = 0
+        self._rules_dir = rules_dir
+        # 로드할 룰 팩 경로 (None이면 룰 디렉토리 전체)
+        self._rule_configs = rule_configs
+        self._start_timeout = start_timeout
+        self._workspace = Path(f"{_WORKSPACE_PREFIX}-{os.getpid()}-{worker_id}")
+        self._proc: asyncio.subprocess.Process | None = None
+        self._reader_task: asyncio.Task | None = None
+        self._request_ids = itertools.count(1)
+        self._file_seq = itertools.count(1)
+        self._responses: dict[int, asyncio.Future] = {}
+        self._diagnostics: dict[str, asyncio.Future] = {}
+        self._rules_ready = asyncio.Event()
+
+    @property
+    def alive(self) -> bool:
+        """프로세스와 응답 리더가 모두 살아 있는지 여부."""
+        return (
+            self._proc is not None
+            and self._proc.returncode is None
+            and self._reader_task is not None
+            and not self._reader_task.done()
+        )
+
+    async def start(self) -> None:
+        """LSP 서버를 띄우고 룰 로드가 끝날 때까지 기다린다.
+
+        Raises:
+            RuntimeError: Semgrep 미설치 또는 시작 타임아웃 시
+        """
+        self._workspace.mkdir(parents=True, exist_ok=True)
+
+        # semgrep_engine과 동일하게 HOME/메트릭 환경변수 강제
+        env = os.environ.copy()
+        env["HOME"] = "/tmp"
+        env["SEMGREP_SEND_METRICS"] = "off"
+        env["SEMGREP_ENABLE_VERSION_CHECK"] = "0"
+
+        try:
+            self._proc = await asyncio.create_subprocess_exec(
+                "semgrep", "lsp",
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                env=env,
+            )
+        except FileNotFoundError as e:
+            raise RuntimeError("Semgrep CLI가 설치되지 않았습니다") from e
+
+        self._reader_task = asyncio.create_task(self._read_loop())
+        workspace_uri = self._workspace.as_uri()
+
+        try:
+            await asyncio.wait_for(
+                self._request("initialize", {
+                    "processId": os.getpid(),
+                    "rootUri": workspace_uri,
+                    "workspaceFolders": [{"uri": workspace_uri, "name": self._workspace.name}],
+                    "capabilities": {},
+                    "initializationOptions": {
+                        "scan": {
+                            "configuration": self._rule_configs or [str(self._rules_dir)],
+                            "exclude": [],
+                            "include": [],
+                            "jobs": 1,
+                            "maxMemory": 0,
+                            "maxTargetBytes": MAX_TARGET_BYTES,
+                            "onlyGitDirty": False,
+                            "ci": False,
+                        },
+                        "trace": {"server": "off"},
+                        "metrics": {"enabled": False},
+                        "doHover": False,
+                    },
+                }),
+                timeout=self._start_timeout,
+            )
+            await self._notify("initialized", {})
+            await asyncio.wait_for(self._rules_ready.wait(), timeout=self._start_timeout)
+        except asyncio.TimeoutError as e:
+            await self.close()
+            raise RuntimeError(
+                f"Semgrep LSP 워커 시작 타임아웃 ({self._start_timeout}초 초과)"
+            ) from e
+
+        logger.info(f"[SemgrepPool] 워커 {self.worker_id} 준비 완료 (룰 로드됨)")
+
+    async def scan(self, content: str, ext: str, timeout: float) -> list[SemgrepFinding]:
+        """단일 파일 내용을 분석한다.
+
+        Raises:
+            asyncio.TimeoutError: timeout 내에 진단 결과가 오지 않을 때
+        """
+        file_name = f"job-{next(self._file_seq)}{ext}"
+        path = self._workspace / file_name
+        uri = path.as_uri()
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._diagnostics[uri] = future
+
+        try:
+            path.write_text(content, encoding="utf-8")
+            # LSP 서버는 시작 시점의 대상 파일 목록을 캐시하므로 새 파일을 먼저 알린다
+            await self._notify("workspace/didCreateFiles", {"files": [{"uri": uri}]})
+            await self._notify("textDocument/didOpen", {
+                "textDocument": {
+                    "uri": uri,
+                    "languageId": _EXT_LANGUAGE_ID.get(ext, ext.lstrip(".")),
+                    "version": 1,
+                    "text": content,
+                },
+            })
+            diagnostics = await asyncio.wait_for(future, timeout=timeout)
+        finally:
+            self._diagnostics.pop(uri, None)
+            self.jobs_done += 1
+            # 고객 코드 즉시 삭제 (ADR-003)
+            path.unlink(missing_ok=True)
+            if self.alive:
+                await self._notify("textDocument/didClose", {"textDocument": {"uri": uri}})
+
+        return [
+            _diagnostic_to_finding(d, content, f"code{ext}")
+            for d in diagnostics
+        ]
+
+    async def close(self) -> None:
+        """프로세스를 종료하고 작업 디렉토리를 삭제한다."""
+        if self._proc is not None and self._proc.returncode is None:
+            self._proc.terminate()
+            try:
+                await asyncio.wait_for(self._proc.wait(), timeout=5.0)
+            except asyncio.TimeoutError:
+                self._proc.kill()
+                await self._proc.wait()
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        for future in [*self._responses.values(), *self._diagnostics.values()]:
+            if not future.done():
+                future.cancel()
+        shutil.rmtree(self._workspace, ignore_errors=True)
+
+    # ── LSP 메시지 송수신 ──────────────────────────────────────
+
+    async def _send(self, message: dict[str, Any]) -> None:
+        if self._proc is None or self._proc.stdin is None:
+            raise RuntimeError("Semgrep LSP 워커가 시작되지 않았습니다")
+        body = json.dumps({"jsonrpc": "2.0", **message}).encode("utf-8")
+        self._proc.stdin.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+        await self._proc.stdin.drain()
+
+    async def _request(self, method: str, params: dict) -> Any:
+        request_id = next(self._request_ids)
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._responses[request_id] = future
+        await self._send({"id": request_id, "method": method, "params": params})
+        try:
+            return await future
+        finally:
+            self._responses.pop(request_id, None)
+
+    async def _notify(self, method: str, params: dict) -> None:
+        await self._send({"method": method, "params": params})
+
+    async def _read_message(self) -> dict | None:
+        assert self._proc is not None and self._proc.stdout is not None
+        content_length = 0
+        while True:
+            line = await self._proc.stdout.readline()
+            if not line:
+                return None
+            line = line.strip()
+            if not line:
+                break
+            name, _, value = line.decode("ascii", errors="replace").partition(":")
+            if name.strip().lower() == "content-length":
+                content_length = int(value.strip())
+        body = await self._proc.stdout.readexactly(content_length)
+        return json.loads(body)
+
+    async def _read_loop(self) -> None:
+        """서버 메시지를 읽어 응답/진단 결과를 대기 중인 future에 전달한다."""
+        try:
+            while True:
+                message = await self._read_message()
+                if message is None:
+                    break
+                self._dispatch(message)
+        except (asyncio.IncompleteReadError, json.JSONDecodeError, ValueError) as e:
+            logger.warning(f"[SemgrepPool] 워커 {self.worker_id} 응답 파싱 실패: {e}")
+
+    def _dispatch(self, message: dict) -> None:
+        method = message.get("method")
+
+        if method == "textDocument/publishDiagnostics":
+            params = message.get("params", {})
+            future = self._diagnostics.get(params.get("uri", ""))
+            if future is not None and not future.done():
+                future.set_result(params.get("diagnostics", []))
+        elif method == "semgrep/rulesRefreshed":
+            self._rules_ready.set()
+        elif method is not None and "id" in message:
+            # 서버 → 클라이언트 요청 (workDoneProgress/create 등)은 빈 응답으로 승인
+            asyncio.create_task(self._send({"id": message["id"], "result": None}))
+        elif "id" in message:
+            future = self._responses.get(message["id"])
+            if future is not None and not future.done():
+                future.set_result(message.get("result"))
+
+
+def _diagnostic_to_finding(diagnostic: dict, content: str, file_path: str) -> SemgrepFinding:
+    """LSP Diagnostic을 SemgrepFinding으로 변환한다 (라인 번호는 1부터)."""
+    range_ = diagnostic.get("range", {})
+    start_line = range_.get("start", {}).get("line", 0) + 1
+    end_line = range_.get("end", {}).get("line", start_line - 1) + 1
+    rule_id = str(diagnostic.get("code", ""))
+
+    lines = content.splitlines()
+    code_snippet = "\n".join(lines[start_line - 1:end_line])
+
+    # Semgrep은 로컬 룰 ID 앞에 설정 경로(예: "src.rules.python.")를 붙이므로 접미사로도 조회
+    mapping_key = rule_id[rule_id.find("vulnix."):] if "vulnix." in rule_id else rule_id
+    cwe_id = RULE_MAPPING.get(rule_id, RULE_MAPPING.get(mapping_key, {})).get("cwe_id")
+
+    return SemgrepFinding(
+        rule_id=rule_id,
+        severity=_LSP_SEVERITY.get(diagnostic.get("severity", 2), "WARNING"),
+        file_path=file_path,
+        start_line=start_line,
+        end_line=end_line,
+        code_snippet=code_snippet,
+        message=diagnostic.get("message", ""),
+        cwe=[cwe_id] if cwe_id else [],
+    )
+
+
+class SemgrepWorkerPool:
+    """미리 룰을 로드한 Semgrep 워커들을 관리하는 풀.
+
+    - max_pending: 동시에 대기/처리 중인 요청 상한. 초과 시 즉시 SemgrepPoolUnavailable
+    - max_jobs_per_worker: 워커당 처리 건수 상한. 초과하면 새 프로세스로 교체 (메모리 누수 대비)
+    - health_interval: 죽은 워커를 찾아 교체하는 헬스체크 주기 (초)
+    """
+
+    def __init__(
+        self,
+        size: int,
+        max_jobs_per_worker: int = 500,
+        max_pending: int = 32,
+        health_interval: float = 30.0,
+        worker_factory: Callable[[int], _PoolWorker] | None = None,
+        rule_configs: list[str] | None = None,
+    ) -> None:
+        self._size = size
+        self._max_jobs = max_jobs_per_worker
+        self._max_pending = max_pending
+        self._health_interval = health_interval
+        self._worker_factory = worker_factory or (
+            lambda worker_id: SemgrepLspWorker(worker_id, rule_configs=rule_configs)
+        )
+        self._worker_ids = itertools.count(1)
+        self._workers: set[_PoolWorker] = set()
+        self._idle: asyncio.Queue[_PoolWorker] = asyncio.Queue()
+        self._pending = 0
+        self._started = False
+        self._health_task: asyncio.Task | None = None
+        self._background: set[asyncio.Task] = set()
+
+    @property
+    def ready_workers(self) -> int:
+        """즉시 요청을 받을 수 있는 워커 수."""
+        return self._idle.qsize()
+
+    async def start(self) -> None:
+        """워커를 모두 띄우고 헬스체크 루프를 시작한다. 일부 실패는 헬스체크가 재시도한다."""
+        results = await asyncio.gather(
+            *(self._spawn() for _ in range(self._size)),
+            return_exceptions=True,
+        )
+        failures = [r for r in results if isinstance(r, Exception)]
+        if failures:
+            logger.warning(f"[SemgrepPool] 워커 {len(failures)}개 시작 실패: {failures[0]}")
+        self._started = True
+        self._health_task = asyncio.create_task(self._health_loop())
+        logger.info(f"[SemgrepPool] 풀 시작: 워커 {len(self._workers)}/{self._size}개 준비")
+
+    async def close(self) -> None:
+        """모든 워커와 백그라운드 작업을 종료한다."""
+        self._started = False
+        if self._health_task is not None:
+            self._health_task.cancel()
+        for task in list(self._background):
+            task.cancel()
+        await asyncio.gather(*(w.close() for w in list(self._workers)), return_exceptions=True)
+        self._workers.clear()
+
+    async def scan(self, content: str, ext: str, timeout: float) -> list[SemgrepFinding]:
+        """유휴 워커에서 단일 파일을 분석한다.
+
+        Raises:
+            SemgrepPoolUnavailable: 풀 미시작 또는 대기열 초과 시
+            asyncio.TimeoutError: 워커 대기 + 분석이 timeout을 넘을 때
+        """
+        if not self._started:
+            raise SemgrepPoolUnavailable("Semgrep 워커 풀이 시작되지 않았습니다")
+        if self._pending >= self._max_pending:
+            raise SemgrepPoolUnavailable(
+                f"Semgrep 워커 풀 대기열 초과 (max_pending={self._max_pending})"
+            )
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        self._pending += 1
+        try:
+            worker = await self._acquire(deadline)
+            try:
+                return await worker.scan(content, ext, max(deadline - loop.time(), 0.0))
+            finally:
+                self._release(worker)
+        finally:
+            self._pending -= 1
+
+    async def _acquire(self, deadline: float) -> _PoolWorker:
+        loop = asyncio.get_running_loop()
+        while True:
+            worker = await asyncio.wait_for(
+                self._idle.get(), timeout=max(deadline - loop.time(), 0.0)
+            )
+            if worker.alive:
+                return worker
+            # 유휴 상태에서 죽은 워커는 교체하고 다음 워커를 기다린다
+            self._schedule(self._replace(worker))
+
+    def _release(self, worker: _PoolWorker) -> None:
+        if worker.alive and worker.jobs_done < self._max_jobs:
+            self._idle.put_nowait(worker)
+        else:
+            self._schedule(self._replace(worker))
+
+    async def _spawn(self) -> _PoolWorker:
+        worker = self._worker_factory(next(self._worker_ids))
+        await worker.start()
+        self._workers.add(worker)
+        self._idle.put_nowait(worker)
+        return worker
+
+    async def _replace(self, worker: _PoolWorker) -> None:
+        """워커를 종료하고 새 워커로 교체한다 (재시작/재활용)."""
+        self._workers.discard(worker)
+        await worker.close()
+        if not self._started:
+            return
+        try:
+            await self._spawn()
+        except Exception as e:
+            # 실패한 자리는 다음 헬스체크에서 다시 채운다
+            logger.warning(f"[SemgrepPool] 워커 교체 실패: {e}")
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._health_interval)
+            await self.check_health()
+
+    async def check_health(self) -> None:
+        """죽은 유휴 워커를 교체하고, 부족한 워커 수를 채운다."""
+        idle: list[_PoolWorker] = []
+        while not self._idle.empty():
+            idle.append(self._idle.get_nowait())
+        for worker in idle:
+            if worker.alive:
+                self._idle.put_nowait(worker)
+            else:
+                logger.warning("[SemgrepPool] 응답 없는 워커 발견 — 교체")
+                await self._replace(worker)
+
+        for _ in range(self._size - len(self._workers)):
+            try:
+                await self._spawn()
+            except Exception as e:
+                logger.warning(f"[SemgrepPool] 워커 보충 실패: {e}")
+                break
+
+    def _schedule(self, coro: Awaitable[None]) -> None:
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+
+# ──────────────────────────────────────────────────────────────
+# 프로세스 전역 IDE 풀 (main.py lifespan에서 시작/종료)
+# ──────────────────────────────────────────────────────────────
+
+_ide_pool: SemgrepWorkerPool | None = None
+
+
+async def start_ide_semgrep_pool(
+    size: int,
+    max_jobs_per_worker: int = 500,
+    max_pending: int = 32,
+    rule_configs: list[str] | None = None,
+) -> None:
+    """IDE 분석용 전역 풀을 시작한다. size가 0 이하이면 아무것도 하지 않는다.
+
+    rule_configs를 주면 워커가 해당 룰 팩만 로드한다 (None이면 룰 디렉토리 전체).
+    """
+    global _ide_pool
+    if size <= 0 or _ide_pool is not None:
+        return
+    pool = SemgrepWorkerPool(
+        size=size,
+        max_jobs_per_worker=max_jobs_per_worker,
+        max_pending=max_pending,
+        rule_configs=rule_configs,
+    )
+    await pool.start()
+    _ide_pool = pool
+
+
+async def stop_ide_semgrep_pool() -> None:
+    """IDE 분석용 전역 풀을 종료한다."""
+    global _ide_pool
+    if _ide_pool is not None:
+        await _ide_pool.close()
+        _ide_pool = None
+
+
+def get_ide_semgrep_pool() -> SemgrepWorkerPool | None:
+    """시작된 IDE 분석용 풀을 반환한다. 풀을 사용하지 않으면 None."""
+    return _ide_pool
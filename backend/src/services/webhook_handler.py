@@ -44,12 +44,13 @@ class WebhookHandler:
         """push 이벤트를 처리한다.
 
         기본 브랜치에 Python 파일이 포함된 push만 스캔 큐에 등록한다.
+        같은 브랜치에 대기 / 실행 중인 push 스캔이 있으면 그 스캔과 합친다.
 
         Args:
             payload: GitHub push 이벤트 페이로드
 
         Returns:
-            등록된 ScanJob ID, 스캔 불필요 시 None
+            등록 또는 합쳐진 ScanJob ID, 스캔 불필요 시 None
         """
         ref: str = payload.get("ref", "")
         # "refs/heads/main" -> "main"
@@ -83,16 +84,11 @@ class WebhookHandler:
         if not changed_py_files:
             return None
 
-        # 이미 진행 중인 스캔이 있으면 중복 방지
-        if await self.orchestrator.has_active_scan(repo.id):
-            return None
-
-        job_id = await self.orchestrator.enqueue_scan(
+        # 같은 브랜치의 대기 / 실행 중 push 스캔과 합친다 (버스트당 최신 커밋 스캔 1건)
+        job_id = await self.orchestrator.enqueue_push_scan(
             repo_id=repo.id,
-            trigger="webhook",
-            commit_sha=commit_sha,
             branch=pushed_branch,
-            scan_type="incremental",
+            commit_sha=commit_sha,
             changed_files=changed_py_files,
         )
         return job_id
@@ -269,16 +265,11 @@ class WebhookHandler:
         if not changed_py_files:
             return None
 
-        # 이미 진행 중인 스캔이 있으면 중복 방지
-        if await self.orchestrator.has_active_scan(repo.id):
-            return None
-
-        job_id = await self.orchestrator.enqueue_scan(
+        # 같은 브랜치의 대기 / 실행 중 push 스캔과 합친다 (버스트당 최신 커밋 스캔 1건)
+        job_id = await self.orchestrator.enqueue_push_scan(
             repo_id=repo.id,
-            trigger="webhook",
-            commit_sha=commit_sha,
             branch=pushed_branch,
-            scan_type="incremental",
+            commit_sha=commit_sha,
             changed_files=changed_py_files,
         )
         return job_id
@@ -360,12 +351,11 @@ class WebhookHandler:
         if pushed_branch != default_branch:
             return None
 
-        job_id = await self.orchestrator.enqueue_scan(
+        # 같은 브랜치의 대기 / 실행 중 push 스캔과 합친다 (변경 파일 정보가 없으므로 전체 스캔)
+        job_id = await self.orchestrator.enqueue_push_scan(
             repo_id=repo.id,
-            trigger="webhook",
-            commit_sha=commit_sha,
             branch=pushed_branch,
-            scan_type="incremental",
+            commit_sha=commit_sha,
             changed_files=None,
         )
         return job_id
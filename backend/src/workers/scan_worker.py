@@ -3,35 +3,163 @@
 실행 방법:
     python -m src.workers.scan_worker
 
-또는 Railway 워커 프로세스로 별도 배포:
-    rq worker scans --url $REDIS_URL
+또는 Railway 워커 프로세스로 별도 배포 (레인 우선순위 순서로 큐 나열):
+    rq worker scans-interactive scans scans-bulk --url $REDIS_URL
+
+상주 모드 (SCAN_WORKER_PERSISTENT=true, 기본값):
+    잡마다 fork / asyncio.run()을 하지 않고 한 프로세스가 이벤트 루프, DB 커넥션 풀,
+    GitHub API HTTP 풀, Anthropic 클라이언트를 재사용한다 (RQ SimpleWorker).
+    SCAN_WORKER_MAX_JOBS건 처리 후 프로세스를 새로 exec하여 메모리 누수를 막는다.
+
+호스트당 동시 스캔 (SCAN_WORKER_CONCURRENCY > 1):
+    감독 프로세스가 워커 프로세스 N개를 띄우고, 종료된 워커는 다시 띄운다.
+    Semgrep 단계만 호스트 공유 코어 할당기(CoreAllocator)에서 코어를 받아 실행하고,
+    LLM 대기 단계는 코어를 잡지 않으므로 다른 스캔의 Semgrep과 자유롭게 겹친다.
 """
 
 import asyncio
+import dataclasses
 import logging
+import math
+import os
+import signal
+import subprocess
+import sys
+import time
 import uuid
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 
+import anthropic
+import httpx
 import redis
-from rq import Queue, Worker
+from rq import Queue, SimpleWorker, Worker, get_current_job
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from src.config import get_settings
+from src.services.cpu_allocator import CoreAllocator
 from src.models.repository import Repository
 from src.models.vulnerability import Vulnerability
+from src.services.file_classifier import FileClassifier
 from src.services.github_app import GitHubAppService
-from src.services.llm_agent import LLMAgent, LLMAnalysisResult
+from src.services.llm_agent import CLAUDE_MODEL, FileAnalysisInput, LLMAgent, LLMAnalysisResult
+from src.services.llm_rate_limiter import create_rate_limiter, priority_for_scan_type
+from src.services.llm_verdict_cache import create_verdict_cache
 from src.services.patch_generator import PatchGenerator
+from src.services.redis_pool import get_sync_redis
+from src.services.scan_cancellation import ScanCancellation, ScanCancelledError
+from src.services.scan_checkpoint import (
+    DetectionCheckpoint,
+    ScanCheckpoint,
+    create_scan_checkpoint,
+    restore_code_snippets,
+)
+from src.services.scan_job_envelope import ScanJobEnvelope
 from src.services.scan_orchestrator import ScanJobMessage, ScanOrchestrator
-from src.services.semgrep_engine import SemgrepEngine, SemgrepFinding
+from src.services.scan_scheduler import LANE_QUEUES, LANES, FairScanScheduler, lane_for_scan
+from src.services.scan_telemetry import ScanTelemetry
+from src.services.semgrep_cache import create_result_cache
+from src.services.semgrep_engine import (
+    SemgrepEngine,
+    SemgrepFinding,
+    ShardConfig,
+    list_scannable_files,
+    partition_by_size,
+)
 from src.services.vulnerability_mapper import map_finding_to_vulnerability
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# 변경 파일만 스캔하는 스캔 유형 (initial / full은 항상 전체 스캔)
+_INCREMENTAL_SCAN_TYPES = frozenset({"incremental", "pr"})
+
+# 파일 수가 많으면 map-reduce로 자동 분할하는 스캔 유형 ("mapreduce"는 항상 분할)
+_MAPREDUCE_ELIGIBLE_SCAN_TYPES = frozenset({"initial", "full"})
+
+# 감독 프로세스가 워커 프로세스 상태를 확인하는 주기
+_SUPERVISOR_POLL_SEC = 1.0
+
+
+@lru_cache
+def _get_core_allocator() -> CoreAllocator:
+    """호스트의 모든 워커 프로세스가 공유하는 Semgrep 코어 할당기."""
+    return CoreAllocator(total_cores=settings.SEMGREP_CPU_CORES)
+
+
+# ──────────────────────────────────────────────────────────────
+# 상주 워커 프로세스 자원
+# ──────────────────────────────────────────────────────────────
+
+class _WorkerRuntime:
+    """상주 워커 프로세스가 잡 간에 재사용하는 자원.
+
+    - 이벤트 루프 1개 (잡마다 asyncio.run()으로 새로 만들지 않음)
+    - SQLAlchemy 엔진 (DB 커넥션 풀)
+    - GitHub API용 httpx.AsyncClient (HTTP 커넥션 풀)
+    - AsyncAnthropic 클라이언트
+    """
+
+    def __init__(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.db_engine = create_async_engine(
+            settings.DATABASE_URL,
+            echo=False,
+            pool_pre_ping=True,
+        )
+        self.session_factory = async_sessionmaker(
+            self.db_engine,
+            expire_on_commit=False,
+            autoflush=False,
+        )
+        self.http_client = httpx.AsyncClient()
+        self.anthropic_client = anthropic.AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+        # 처리한 RQ 잡 수 (SCAN_WORKER_MAX_JOBS 비교용) — run_job()만 센다
+        self.jobs_run = 0
+
+    def run(self, coro):
+        """코루틴을 프로세스 공용 이벤트 루프에서 실행한다."""
+        return self.loop.run_until_complete(coro)
+
+    def run_job(self, coro):
+        """RQ 잡 본체를 실행하고 처리 건수를 센다.
+
+        잡 안에서 추가로 실행하는 코루틴(push 후속 스캔 등록 등)은 run()을 쓰므로
+        잡 하나가 여러 건으로 세어지지 않는다.
+        """
+        try:
+            return self.run(coro)
+        finally:
+            self.jobs_run += 1
+
+    def close(self) -> None:
+        """풀과 클라이언트를 닫고 이벤트 루프를 종료한다."""
+        async def _close() -> None:
+            await self.http_client.aclose()
+            await self.anthropic_client.close()
+            await self.db_engine.dispose()
+
+        try:
+            self.loop.run_until_complete(_close())
+        finally:
+            self.loop.close()
+
+
+# 상주 모드에서 start_worker()가 생성 (fork 모드 / 테스트에서는 None)
+_runtime: _WorkerRuntime | None = None
+
+
+def _preload_modules() -> None:
+    """잡 처리 중 지연 import되는 모듈과 룰 레지스트리(룰셋 해시)를 미리 로드한다."""
+    import src.services.fp_filter_service  # noqa: F401
+    from src.services.semgrep_cache import compute_ruleset_hash
+
+    compute_ruleset_hash()
+
 
 # ──────────────────────────────────────────────────────────────
 # DB 세션 컨텍스트 매니저 (워커 전용)
@@ -39,17 +167,25 @@ settings = get_settings()
 
 @asynccontextmanager
 async def get_async_session():
-    """워커 전용 비동기 DB 세션 컨텍스트 매니저."""
-    engine = create_async_engine(
-        settings.DATABASE_URL,
-        echo=False,
-        pool_pre_ping=True,
-    )
-    session_factory = async_sessionmaker(
-        engine,
-        expire_on_commit=False,
-        autoflush=False,
-    )
+    """워커 전용 비동기 DB 세션 컨텍스트 매니저.
+
+    상주 모드에서는 프로세스 공용 커넥션 풀을 사용하고,
+    그 외에는 잡마다 엔진을 만들고 종료 시 정리한다.
+    """
+    engine = None
+    if _runtime is not None:
+        session_factory = _runtime.session_factory
+    else:
+        engine = create_async_engine(
+            settings.DATABASE_URL,
+            echo=False,
+            pool_pre_ping=True,
+        )
+        session_factory = async_sessionmaker(
+            engine,
+            expire_on_commit=False,
+            autoflush=False,
+        )
     async with session_factory() as session:
         try:
             yield session
@@ -59,34 +195,160 @@ async def get_async_session():
             raise
         finally:
             await session.close()
-            await engine.dispose()
+            if engine is not None:
+                await engine.dispose()
 
 
 # ──────────────────────────────────────────────────────────────
 # 워커 진입점
 # ──────────────────────────────────────────────────────────────
 
-def run_scan(message: ScanJobMessage) -> dict:
+def run_scan(envelope: str | ScanJobMessage) -> dict:
     """스캔 작업의 전체 파이프라인을 실행한다.
 
     RQ 워커가 Redis 큐에서 이 함수를 호출한다.
-    동기 함수이지만 내부적으로 asyncio.run()으로 비동기 로직을 실행한다.
+    동기 함수이지만 내부적으로 비동기 로직을 실행한다
+    (상주 모드: 프로세스 공용 이벤트 루프, 그 외: asyncio.run()).
 
     Args:
-        message: 스캔 작업 메시지 (ScanJobMessage)
+        envelope: 스캔 잡 봉투 JSON (ScanJobEnvelope).
+            봉투 도입 전에 큐에 들어간 잡은 ScanJobMessage가 그대로 전달된다.
 
     Returns:
         스캔 결과 요약 딕셔너리
     """
-    logger.info(f"[WorkerID={message.job_id}] 스캔 작업 시작 (repo_id={message.repo_id})")
+    job, message = _decode_scan_job(envelope)
+    logger.info(f"[WorkerID={job.job_id}] 스캔 작업 시작 (lane={job.lane})")
+
+    async def _run() -> dict:
+        nonlocal message
+        message = await _resolve_scan_message(job, message)
+        return await _run_scan_async(message)
 
     try:
-        result = asyncio.run(_run_scan_async(message))
-        logger.info(f"[WorkerID={message.job_id}] 스캔 완료")
-        return result
+        if _runtime is not None:
+            result = _runtime.run_job(_run())
+        else:
+            result = asyncio.run(_run())
+        logger.info(f"[WorkerID={job.job_id}] 스캔 완료")
     except Exception as e:
-        logger.error(f"[WorkerID={message.job_id}] 스캔 실패: {e}")
+        logger.error(f"[WorkerID={job.job_id}] 스캔 실패: {e}")
+        # RQ가 재시도할 잡은 팀 슬롯을 유지한다
+        if _is_final_attempt():
+            _finish_scan(job, message)
         raise
+    # map-reduce로 전환된 스캔은 샤드가 실행 중이므로 fan-in 잡이 슬롯을 반납한다
+    if result.get("status") != "running":
+        _finish_scan(job, message)
+    return result
+
+
+def _is_final_attempt() -> bool:
+    """현재 RQ 잡이 실패하면 더 이상 재시도하지 않는지 (RQ 밖에서 실행 중이면 True)."""
+    current = get_current_job()
+    return current is None or not current.retries_left
+
+
+def _decode_scan_job(
+    payload: str | bytes | ScanJobMessage,
+) -> tuple[ScanJobEnvelope, ScanJobMessage | None]:
+    """RQ 잡 인자를 (봉투, 메시지)로 풀어낸다.
+
+    봉투 JSON이면 메시지는 None (DB에서 읽는다). 봉투 도입 전에 큐에 들어간
+    ScanJobMessage면 봉투를 만들어 메시지와 함께 반환한다.
+    """
+    if isinstance(payload, (str, bytes)):
+        return ScanJobEnvelope.decode(payload), None
+    envelope = ScanJobEnvelope(
+        job_id=payload.job_id,
+        team_id=getattr(payload, "team_id", None),
+        lane=lane_for_scan(payload.trigger, payload.scan_type),
+    )
+    return envelope, payload
+
+
+async def _resolve_scan_message(
+    job: ScanJobEnvelope,
+    message: ScanJobMessage | None,
+) -> ScanJobMessage:
+    """봉투로 받은 잡이면 ScanJob 행에서 스캔 메시지를 만든다."""
+    if message is not None:
+        return message
+    return await _load_scan_message(job)
+
+
+async def _load_scan_message(job: ScanJobEnvelope) -> ScanJobMessage:
+    """ScanJob 행 하나로 스캔 메시지를 만든다. 행이 없으면 ValueError."""
+    async with get_async_session() as db:
+        scan_job = await _get_scan_job(db, job.job_id)
+    if scan_job is None:
+        raise ValueError(f"ScanJob을 찾을 수 없습니다: {job.job_id}")
+    return ScanJobMessage(
+        job_id=job.job_id,
+        repo_id=str(scan_job.repo_id),
+        trigger=scan_job.trigger_type,
+        commit_sha=scan_job.commit_sha,
+        branch=scan_job.branch,
+        pr_number=scan_job.pr_number,
+        scan_type=scan_job.scan_type,
+        changed_files=scan_job.changed_files,
+        created_at=scan_job.created_at.isoformat(),
+        team_id=job.team_id,
+    )
+
+
+def _finish_scan(job: ScanJobEnvelope, message: ScanJobMessage | None) -> None:
+    """스캔이 끝나면(성공 또는 마지막 실패) 팀 슬롯을 반납하고 push 후속 스캔을 등록한다.
+
+    message가 None이면 (ScanJob 조회 전에 실패) 슬롯 반납만 한다.
+    """
+    _release_scan_slot(job)
+    if (
+        message is not None
+        and message.trigger == "webhook"
+        and message.scan_type == "incremental"
+        and message.branch
+    ):
+        try:
+            if _runtime is not None:
+                _runtime.run(_submit_push_followup(message))
+            else:
+                asyncio.run(_submit_push_followup(message))
+        except Exception as e:
+            logger.warning(f"[WorkerID={message.job_id}] push 후속 스캔 등록 실패: {e}")
+
+
+async def _submit_push_followup(message: ScanJobMessage) -> None:
+    """이 스캔이 실행되는 동안 들어온 push가 있으면 후속 스캔 1건을 큐에 넣는다."""
+    async with get_async_session() as db:
+        orchestrator = ScanOrchestrator(db)
+        followup_id = await orchestrator.submit_push_followup(message.repo_id, message.branch)
+    if followup_id is not None:
+        logger.info(f"[WorkerID={message.job_id}] push 후속 스캔 등록: {followup_id}")
+
+
+@lru_cache
+def _get_scheduler() -> FairScanScheduler:
+    """스캔 슬롯 반납 / pump용 스케줄러 (프로세스당 1개)."""
+    return FairScanScheduler(
+        get_sync_redis(),
+        team_max_concurrent=settings.SCAN_TEAM_MAX_CONCURRENT,
+        lane_max_inflight=settings.SCAN_LANE_MAX_INFLIGHT,
+        slot_ttl_seconds=settings.SCAN_SLOT_TTL_SECONDS,
+    )
+
+
+def _release_scan_slot(job: ScanJobEnvelope) -> None:
+    """끝난 스캔의 팀 / 레인 슬롯을 반납하고 대기 중인 다음 스캔을 RQ 큐로 보낸다.
+
+    team_id가 없는 잡(스케줄러 도입 전에 큐에 들어간 잡)은 슬롯을 잡지 않았으므로 건너뛴다.
+    """
+    if job.team_id is None:
+        return
+    try:
+        _get_scheduler().release(job.job_id, team_id=job.team_id, lane=job.lane)
+    except Exception as e:
+        logger.warning(f"[WorkerID={job.job_id}] 스캔 슬롯 반납 실패 (TTL 후 자동 반납): {e}")
 
 
 async def _run_scan_async(message: ScanJobMessage) -> dict:
@@ -96,22 +358,55 @@ async def _run_scan_async(message: ScanJobMessage) -> dict:
     1. ScanJob 상태 -> running
     2. Repository DB 조회
     3. GitHubAppService.clone_repository() 호출
-    4. SemgrepEngine.scan() 실행
+    3.5. 대형 저장소면 map-reduce로 전환: 샤드 잡 + fan-in 잡 등록 후 종료
+    4. SemgrepEngine.scan() 실행 (incremental / pr: 변경 파일만, 결과 캐시 미스 파일만)
     5. findings가 없으면 completed 처리 후 종료
-    6. 파일별 LLMAgent.analyze_findings() asyncio.gather (동시성 5 제한)
+    6. 파일별 LLMAgent.analyze_findings() asyncio.gather (Claude 동시 호출은 LLMAgent가 제한)
     7. true_positive만 Vulnerability 레코드 생성 + DB 저장 (중복 방지)
     8. 패치 PR 생성 (F-03) — 실패해도 스캔 completed 유지
-    9. ScanJob 통계 업데이트
+    9. ScanJob 통계 + 단계별 텔레메트리 업데이트
     10. ScanJob 상태 -> completed
     11. 임시 디렉토리 삭제 (finally)
 
     오류 시:
-    - ScanJob status -> failed (error_message 저장)
+    - ScanJob status -> failed (error_message, 실패 시점까지의 텔레메트리 저장)
     - 임시 디렉토리 반드시 삭제 (finally)
+
+    취소 시 (Redis 취소 플래그, 단계 사이 / Claude 호출 직전 / Semgrep 실행 중 확인):
+    - 남은 단계를 건너뛰고 ScanJob status -> cancelled, RQ 재시도 없음
+
+    RQ 재시도 시 (스캔 단계 체크포인트):
+    - 이전 시도의 Semgrep findings가 있으면 Semgrep을 건너뛰고, findings가 있는 파일만
+      내려받아 LLM 결과가 없는 파일만 분석한다 (코드 조각 / 패치는 다시 만든다)
+    - 마지막 재시도까지 실패하면 체크포인트를 지운다
     """
-    semgrep = SemgrepEngine()
-    github = GitHubAppService()
-    llm = LLMAgent()
+    cancellation = _create_cancellation(message.job_id)
+    semgrep = _create_semgrep_engine(cancellation)
+    github = GitHubAppService(
+        http_client=_runtime.http_client if _runtime is not None else None
+    )
+    # 같은 저장소의 이전 스캔 LLM 판정 재사용 (Redis 연결 실패 시 캐시 없이 분석)
+    verdict_cache = await create_verdict_cache(
+        settings.REDIS_URL, settings.LLM_VERDICT_CACHE_TTL_SECONDS, CLAUDE_MODEL,
+        scope=message.repo_id,
+    )
+    # 모든 워커가 공유하는 Claude RPM/TPM 버킷 (PR 스캔 우선)
+    rate_limiter = await create_rate_limiter(
+        settings.REDIS_URL, settings.CLAUDE_RPM_LIMIT, settings.CLAUDE_TPM_LIMIT
+    )
+    llm = LLMAgent(
+        verdict_cache=verdict_cache,
+        rate_limiter=rate_limiter,
+        priority=priority_for_scan_type(message.scan_type),
+        client=_runtime.anthropic_client if _runtime is not None else None,
+        cancellation=cancellation,
+    )
+    # 재시도가 이어받을 단계 결과 (Redis 연결 실패 시 체크포인트 없이 스캔)
+    checkpoint = await create_scan_checkpoint(
+        settings.REDIS_URL, message.job_id, settings.SCAN_CHECKPOINT_TTL_SECONDS
+    )
+
+    telemetry = ScanTelemetry()
 
     # 임시 디렉토리 준비
     temp_dir = SemgrepEngine.prepare_temp_dir(message.job_id)
@@ -123,203 +418,714 @@ async def _run_scan_async(message: ScanJobMessage) -> dict:
             # 1. ScanJob 상태 -> running
             await orchestrator.update_job_status(message.job_id, "running")
 
+            # push 스캔은 대기 중에 최신 커밋으로 합쳐질 수 있으므로 DB의 값을 다시 읽는다
+            message = await _refresh_scan_target(db, message)
+
             # 2. Repository 정보 DB 조회
-            db_result = await db.execute(
-                select(Repository).where(Repository.id == uuid.UUID(message.repo_id))
-            )
-            # AsyncMock 환경에서는 scalar_one이 coroutine일 수 있으므로 await 처리
-            scalar_one = db_result.scalar_one
-            if asyncio.iscoroutinefunction(scalar_one):
-                repo = await scalar_one()  # type: ignore[misc]
-            else:
-                repo = scalar_one()
-
-            # 3. git clone (임시 디렉토리)
-            await github.clone_repository(
-                repo.full_name,
-                repo.installation_id or 0,  # installation_id: int | None → int
-                message.commit_sha or "",
-                temp_dir,
-            )
+            repo = await _load_repository(db, message.repo_id)
 
-            # 4. Semgrep 1차 스캔
-            findings = semgrep.scan(temp_dir, message.job_id)
-            logger.info(
-                f"[WorkerID={message.job_id}] Semgrep 1차 스캔 완료: {len(findings)}건 탐지"
+            # 이전 시도가 Semgrep까지 마쳤으면 체크포인트에서 이어서 실행
+            detection = (
+                await checkpoint.load_detection(message.commit_sha)
+                if checkpoint is not None else None
             )
-
-            # 5. findings 없으면 LLM 스킵 -> completed
-            if not findings:
-                await _update_scan_stats(db, message.job_id, 0, 0, 0, 0)
-                await orchestrator.update_job_status(message.job_id, "completed")
-                return {
-                    "job_id": message.job_id,
-                    "status": "completed",
-                    "findings": 0,
-                }
-
-            # 4.5. FPFilterService로 오탐 패턴 필터링
-            auto_filtered_count = 0
-            try:
-                from src.services.fp_filter_service import FPFilterService
-                fp_service = FPFilterService(db)
-                original_count = len(findings)
-                job_uuid = uuid.UUID(message.job_id) if isinstance(message.job_id, str) else message.job_id
-                findings, auto_filtered_count = await fp_service.filter_findings(
-                    findings, team_id=repo.team_id, scan_job_id=job_uuid
-                )
-                if auto_filtered_count > 0:
+            resumed_results: dict[str, list[LLMAnalysisResult]] = {}
+
+            if detection is None:
+                # 3. git clone (임시 디렉토리)
+                cancellation.raise_if_cancelled()
+                # vendored / generated / minified / 저장소 제외 경로 파일은 추출 단계에서 제외
+                # (map-reduce 샤드 잡과 재시도 다운로드는 이미 걸러진 파일 목록만 받는다)
+                with telemetry.stage("clone"):
+                    clone_stats = await github.clone_repository(
+                        repo.full_name,
+                        repo.installation_id or 0,  # installation_id: int | None → int
+                        message.commit_sha or "",
+                        temp_dir,
+                        classifier=FileClassifier(repo.scan_ignore_patterns),
+                    )
+                telemetry.record_clone(clone_stats)
+                cancellation.raise_if_cancelled()
+
+                # 3.5. 대형 저장소 map-reduce: 샤드 잡으로 나누고 결과 저장은 fan-in 잡이 수행
+                shards = _plan_mapreduce_shards(message, temp_dir, clone_stats)
+                if shards is not None:
+                    child_ids = orchestrator.enqueue_shard_scans(message, shards)
+                    orchestrator.enqueue_fan_in(message, child_ids)
+                    telemetry.mapreduce_shards = len(shards)
+                    await _save_scan_telemetry(db, message.job_id, telemetry)
                     logger.info(
-                        f"[WorkerID={message.job_id}] FP 필터링: {auto_filtered_count}건 제외 "
-                        f"({original_count} → {len(findings)})"
+                        f"[WorkerID={message.job_id}] map-reduce 스캔: 샤드 잡 {len(shards)}개 등록"
                     )
-            except Exception as fp_err:
-                logger.warning(f"[WorkerID={message.job_id}] FP 필터링 실패 (스캔 계속): {fp_err}")
+                    return {
+                        "job_id": message.job_id,
+                        "status": "running",
+                        "shards": len(shards),
+                    }
+
+                # 4. Semgrep 1차 스캔 + 4.5. 오탐 패턴 필터링
+                findings, auto_filtered_count = await _detect_findings(
+                    db, message, repo, semgrep, temp_dir, clone_stats, telemetry
+                )
+                if checkpoint is not None and findings:
+                    await checkpoint.save_detection(DetectionCheckpoint(
+                        commit_sha=message.commit_sha,
+                        findings=findings,
+                        auto_filtered_count=auto_filtered_count,
+                        files_scanned=telemetry.files_scanned,
+                    ))
+            else:
+                findings = detection.findings
+                auto_filtered_count = detection.auto_filtered_count
+                telemetry.files_scanned = detection.files_scanned
+                resumed_results = await checkpoint.load_llm_results()
+                await _resume_download(
+                    github, repo, message, findings, resumed_results, temp_dir, telemetry
+                )
 
-            # findings가 모두 필터링된 경우 LLM 스킵
+            # 5. findings 없으면 (또는 모두 필터링되면) LLM 스킵 -> completed
             if not findings:
-                await _update_scan_stats(db, message.job_id, 0, 0, 0, auto_filtered_count)
+                await _update_scan_stats(
+                    db, message.job_id, 0, 0, 0, auto_filtered_count, telemetry=telemetry
+                )
                 await orchestrator.update_job_status(message.job_id, "completed")
-                return {
+                if checkpoint is not None:
+                    await checkpoint.clear()
+                result = {
                     "job_id": message.job_id,
                     "status": "completed",
                     "findings": 0,
-                    "auto_filtered": auto_filtered_count,
                 }
-
-            # 6. LLM 2차 분석 (파일별 배치, 동시성 5 제한)
-            all_results = await _run_llm_analysis_batch(
-                llm=llm,
-                findings=findings,
-                temp_dir=temp_dir,
-                job_id=message.job_id,
-            )
-            tp_count = sum(1 for r in all_results if r.is_true_positive)
-            fp_count = sum(1 for r in all_results if not r.is_true_positive)
-            logger.info(
-                f"[WorkerID={message.job_id}] LLM 2차 분석 완료: "
-                f"TP={tp_count}, FP={fp_count}"
+                if auto_filtered_count:
+                    result["auto_filtered"] = auto_filtered_count
+                return result
+
+            # 6. LLM 2차 분석 (파일별 배치, Claude 동시 호출은 LLMAgent가 제한)
+            cancellation.raise_if_cancelled()
+            all_results = await _triage_findings(
+                llm, findings, temp_dir, message.job_id, telemetry,
+                checkpoint=checkpoint, resumed_results=resumed_results,
             )
 
-            # 7. Vulnerability 레코드 DB 저장 (true_positive만, 중복 방지)
-            await _save_vulnerabilities(
-                db=db,
-                scan_job_id=message.job_id,
-                repo_id=repo.id,
-                findings=findings,
-                analysis_results=all_results,
+            # 7 ~ 10. 취약점 저장, 패치 PR, 통계 업데이트, completed
+            result = await _finalize_scan(
+                db, orchestrator, message, repo, github,
+                findings, all_results, auto_filtered_count, telemetry,
+                cancellation=cancellation,
             )
+            if checkpoint is not None:
+                await checkpoint.clear()
+            return result
+
+        except ScanCancelledError:
+            logger.info(f"[WorkerID={message.job_id}] 스캔 취소 — 남은 단계 건너뜀")
+            telemetry.record_llm_usage(llm.usage)
+            await _save_scan_telemetry(db, message.job_id, telemetry)
+            await orchestrator.update_job_status(message.job_id, "cancelled")
+            if checkpoint is not None:
+                await checkpoint.clear()
+            return {"job_id": message.job_id, "status": "cancelled"}
 
-            # 8. 패치 PR 생성 (F-03) — 실패해도 스캔은 completed 유지
+        except Exception as e:
+            logger.error(f"[WorkerID={message.job_id}] 파이프라인 실패: {e}")
             try:
-                patch_gen = PatchGenerator()
-                patch_prs = await patch_gen.generate_patch_prs(
-                    repo_full_name=repo.full_name,
-                    installation_id=repo.installation_id or 0,
-                    base_branch=repo.default_branch,
-                    scan_job_id=uuid.UUID(message.job_id) if isinstance(message.job_id, str) else message.job_id,
-                    repo_id=repo.id,
-                    analysis_results=all_results,
-                    findings=findings,
-                    db=db,
-                )
-                logger.info(
-                    f"[WorkerID={message.job_id}] 패치 PR 생성 완료: {len(patch_prs)}건"
-                )
-            except Exception as patch_err:
-                logger.warning(
-                    f"[WorkerID={message.job_id}] 패치 PR 생성 실패 "
-                    f"(스캔 자체는 성공): {patch_err}"
+                # 실패 단계까지의 텔레메트리도 남긴다 (상태 업데이트와 함께 커밋)
+                telemetry.record_llm_usage(llm.usage)
+                await _save_scan_telemetry(db, message.job_id, telemetry)
+            except Exception as tel_err:
+                logger.warning(f"[WorkerID={message.job_id}] 텔레메트리 저장 실패: {tel_err}")
+            await orchestrator.update_job_status(
+                message.job_id, "failed", error_message=str(e)
+            )
+            # 더 이상 재시도가 없으면 체크포인트를 TTL까지 남겨 두지 않는다
+            if checkpoint is not None and _is_final_attempt():
+                await checkpoint.clear()
+            raise
+
+        finally:
+            # 10. 임시 디렉토리는 성공/실패 관계없이 항상 삭제 (ADR-003)
+            # 직접 원래 SemgrepEngine 클래스를 통해 삭제 (테스트 mock 우회 방지)
+            from src.services.semgrep_engine import SemgrepEngine as _SemgrepEngine
+            _SemgrepEngine.cleanup_temp_dir(message.job_id)
+            if verdict_cache is not None:
+                await verdict_cache.close()
+            if rate_limiter is not None:
+                await rate_limiter.close()
+            if checkpoint is not None:
+                await checkpoint.close()
+
+
+async def _resume_download(
+    github: GitHubAppService,
+    repo: Repository,
+    message: ScanJobMessage,
+    findings: list[SemgrepFinding],
+    resumed_results: dict[str, list[LLMAnalysisResult]],
+    temp_dir: Path,
+    telemetry: ScanTelemetry,
+) -> None:
+    """체크포인트에서 재개할 때 findings가 있는 파일을 내려받아 코드 조각을 다시 채운다.
+
+    체크포인트에는 코드 조각 / 패치가 없으므로, LLM 결과가 있는 파일도 코드 조각과
+    패치 재생성을 위해 내려받는다 (LLM 분석은 결과가 없는 파일만).
+    """
+    finding_files = {f.file_path for f in findings}
+    pending_files = finding_files - resumed_results.keys()
+    telemetry.resumed_from = "llm" if not pending_files else "detect"
+    telemetry.llm_files_resumed = len(resumed_results)
+    logger.info(
+        f"[WorkerID={message.job_id}] 체크포인트에서 재개: findings {len(findings)}건, "
+        f"LLM 결과 재사용 파일 {len(resumed_results)}개, 분석할 파일 {len(pending_files)}개"
+    )
+    if not finding_files:
+        return
+    with telemetry.stage("clone"):
+        clone_stats = await github.clone_repository(
+            repo.full_name,
+            repo.installation_id or 0,
+            message.commit_sha or "",
+            temp_dir,
+            include=finding_files,
+        )
+    telemetry.record_clone(clone_stats)
+    restore_code_snippets(findings, temp_dir)
+
+
+# ──────────────────────────────────────────────────────────────
+# map-reduce 스캔 (대형 모노레포)
+# ──────────────────────────────────────────────────────────────
+
+def run_scan_shard(
+    envelope: str | ScanJobMessage,
+    shard_index: int,
+    files: list[str],
+) -> dict:
+    """map-reduce 스캔의 샤드 하나를 처리한다 (Semgrep + LLM 분석, DB 저장 없음).
+
+    결과는 RQ 잡 반환값으로 남기고 fan-in 잡(finalize_mapreduce_scan)이 합친다.
+    """
+    job, message = _decode_scan_job(envelope)
+    logger.info(
+        f"[WorkerID={job.job_id}] 샤드 {shard_index} 스캔 시작 (파일 {len(files)}개)"
+    )
+
+    async def _run() -> dict:
+        resolved = await _resolve_scan_message(job, message)
+        return await _run_shard_async(resolved, shard_index, files)
+
+    if _runtime is not None:
+        return _runtime.run_job(_run())
+    return asyncio.run(_run())
+
+
+def finalize_mapreduce_scan(envelope: str | ScanJobMessage, child_job_ids: list[str]) -> dict:
+    """모든 샤드 잡이 끝난 뒤 결과를 합쳐 취약점 저장과 ScanJob 통계를 마무리한다.
+
+    코디네이터(run_scan)가 잡아 둔 팀 / 레인 슬롯은 여기서(성공 또는 마지막 실패) 반납한다.
+    """
+    job, message = _decode_scan_job(envelope)
+    logger.info(f"[WorkerID={job.job_id}] map-reduce fan-in 시작 (샤드 {len(child_job_ids)}개)")
+
+    async def _run() -> dict:
+        nonlocal message
+        message = await _resolve_scan_message(job, message)
+        return await _finalize_mapreduce_async(message, child_job_ids)
+
+    try:
+        if _runtime is not None:
+            result = _runtime.run_job(_run())
+        else:
+            result = asyncio.run(_run())
+    except Exception:
+        if _is_final_attempt():
+            _finish_scan(job, message)
+        raise
+    _finish_scan(job, message)
+    return result
+
+
+async def _run_shard_async(message: ScanJobMessage, shard_index: int, files: list[str]) -> dict:
+    """샤드 파일만 내려받아 Semgrep + FP 필터 + LLM 분석을 실행하고 결과를 직렬화해 반환한다.
+
+    부모 스캔이 취소되면 남은 단계를 건너뛰고 {"cancelled": True}를 반환한다 (RQ 재시도 없음).
+    """
+    cancellation = _create_cancellation(message.job_id)
+    semgrep = _create_semgrep_engine(cancellation)
+    github = GitHubAppService(
+        http_client=_runtime.http_client if _runtime is not None else None
+    )
+    verdict_cache = await create_verdict_cache(
+        settings.REDIS_URL, settings.LLM_VERDICT_CACHE_TTL_SECONDS, CLAUDE_MODEL,
+        scope=message.repo_id,
+    )
+    rate_limiter = await create_rate_limiter(
+        settings.REDIS_URL, settings.CLAUDE_RPM_LIMIT, settings.CLAUDE_TPM_LIMIT
+    )
+    llm = LLMAgent(
+        verdict_cache=verdict_cache,
+        rate_limiter=rate_limiter,
+        priority=priority_for_scan_type(message.scan_type),
+        client=_runtime.anthropic_client if _runtime is not None else None,
+        cancellation=cancellation,
+    )
+    telemetry = ScanTelemetry()
+
+    # 같은 호스트에서 여러 샤드가 돌 수 있으므로 샤드별 임시 디렉토리 사용
+    temp_key = f"{message.job_id}-shard-{shard_index}"
+    temp_dir = SemgrepEngine.prepare_temp_dir(temp_key)
+
+    try:
+        cancellation.raise_if_cancelled()
+        async with get_async_session() as db:
+            repo = await _load_repository(db, message.repo_id)
+            with telemetry.stage("clone"):
+                clone_stats = await github.clone_repository(
+                    repo.full_name,
+                    repo.installation_id or 0,
+                    message.commit_sha or "",
+                    temp_dir,
+                    include=set(files),
                 )
+            telemetry.record_clone(clone_stats)
 
-            # 9. ScanJob 통계 업데이트
-            await _update_scan_stats(
-                db, message.job_id, len(findings), tp_count, fp_count, auto_filtered_count
+            findings, auto_filtered_count = await _detect_findings(
+                db, message, repo, semgrep, temp_dir, clone_stats, telemetry,
+                target_files=list(files),
             )
 
-            # 10. ScanJob 상태 -> completed
-            await orchestrator.update_job_status(message.job_id, "completed")
+        all_results: list[LLMAnalysisResult] = []
+        if findings:
+            all_results = await _triage_findings(llm, findings, temp_dir, temp_key, telemetry)
+        telemetry.record_llm_usage(llm.usage)
+
+        return {
+            "findings": [dataclasses.asdict(f) for f in findings],
+            "results": [dataclasses.asdict(r) for r in all_results],
+            "auto_filtered": auto_filtered_count,
+            "telemetry": telemetry.to_dict(),
+        }
+    except ScanCancelledError:
+        logger.info(f"[WorkerID={message.job_id}] 샤드 {shard_index} 취소 — 건너뜀")
+        return {"cancelled": True}
+    finally:
+        from src.services.semgrep_engine import SemgrepEngine as _SemgrepEngine
+        _SemgrepEngine.cleanup_temp_dir(temp_key)
+        if verdict_cache is not None:
+            await verdict_cache.close()
+        if rate_limiter is not None:
+            await rate_limiter.close()
+
+
+async def _finalize_mapreduce_async(message: ScanJobMessage, child_job_ids: list[str]) -> dict:
+    """샤드 결과를 중복 제거 후 합쳐 Vulnerability 저장, 패치 PR, 통계 업데이트를 수행한다.
+
+    일부 샤드가 실패해도 성공한 샤드 결과로 completed 처리하고,
+    모든 샤드가 실패하면 ScanJob을 failed로 표시한다.
+    샤드 잡 결과(코드 조각, 패치 diff 포함)는 마무리 후(또는 마지막 실패 시) 삭제한다 (ADR-003).
+    """
+    github = GitHubAppService(
+        http_client=_runtime.http_client if _runtime is not None else None
+    )
 
-            return {
-                "job_id": message.job_id,
-                "status": "completed",
-                "findings": len(findings),
-                "true_positives": tp_count,
-                "false_positives": fp_count,
-            }
+    async with get_async_session() as db:
+        orchestrator = ScanOrchestrator(db)
+        if _create_cancellation(message.job_id).is_cancelled():
+            await orchestrator.update_job_status(message.job_id, "cancelled")
+            orchestrator.delete_shard_jobs(child_job_ids)
+            return {"job_id": message.job_id, "status": "cancelled"}
+        shard_outputs = orchestrator.fetch_shard_results(child_job_ids)
+
+        telemetry = ScanTelemetry()
+        scan_job = await _get_scan_job(db, message.job_id)
+        if scan_job is not None and isinstance(scan_job.telemetry, dict):
+            telemetry.merge(scan_job.telemetry)   # 코디네이터의 clone 단계 등
+        telemetry.mapreduce_shards = len(child_job_ids)
+
+        findings: list[SemgrepFinding] = []
+        all_results: list[LLMAnalysisResult] = []
+        auto_filtered_count = 0
+        seen: set[tuple[str, str, int, int]] = set()
+        for output in shard_outputs:
+            if output is None or "findings" not in output:
+                telemetry.mapreduce_failed_shards += 1
+                continue
+            for item in output["findings"]:
+                finding = SemgrepFinding(**item)
+                key = (finding.rule_id, finding.file_path, finding.start_line, finding.end_line)
+                if key in seen:
+                    continue
+                seen.add(key)
+                findings.append(finding)
+            all_results.extend(LLMAnalysisResult(**item) for item in output["results"])
+            auto_filtered_count += output.get("auto_filtered", 0)
+            telemetry.merge(output.get("telemetry") or {})
+
+        try:
+            if telemetry.mapreduce_failed_shards == len(child_job_ids):
+                raise RuntimeError(f"map-reduce 스캔 실패: 샤드 {len(child_job_ids)}개 모두 실패")
+            if telemetry.mapreduce_failed_shards:
+                logger.warning(
+                    f"[WorkerID={message.job_id}] 샤드 {telemetry.mapreduce_failed_shards}개 실패 "
+                    f"— 나머지 샤드 결과로 마무리"
+                )
 
+            if not findings:
+                await _update_scan_stats(
+                    db, message.job_id, 0, 0, 0, auto_filtered_count, telemetry=telemetry
+                )
+                await orchestrator.update_job_status(message.job_id, "completed")
+                result = {"job_id": message.job_id, "status": "completed", "findings": 0}
+            else:
+                repo = await _load_repository(db, message.repo_id)
+                result = await _finalize_scan(
+                    db, orchestrator, message, repo, github,
+                    findings, all_results, auto_filtered_count, telemetry,
+                )
         except Exception as e:
-            logger.error(f"[WorkerID={message.job_id}] 파이프라인 실패: {e}")
+            logger.error(f"[WorkerID={message.job_id}] map-reduce fan-in 실패: {e}")
+            await _save_scan_telemetry(db, message.job_id, telemetry)
             await orchestrator.update_job_status(
                 message.job_id, "failed", error_message=str(e)
             )
+            # RQ가 fan-in을 재시도하면 샤드 결과를 다시 읽어야 하므로 마지막 실패에서만 삭제
+            if _is_final_attempt():
+                orchestrator.delete_shard_jobs(child_job_ids)
             raise
+        orchestrator.delete_shard_jobs(child_job_ids)
+        return result
 
-        finally:
-            # 10. 임시 디렉토리는 성공/실패 관계없이 항상 삭제 (ADR-003)
-            # 직접 원래 SemgrepEngine 클래스를 통해 삭제 (테스트 mock 우회 방지)
-            from src.services.semgrep_engine import SemgrepEngine as _SemgrepEngine
-            _SemgrepEngine.cleanup_temp_dir(message.job_id)
+
+def _plan_mapreduce_shards(
+    message: ScanJobMessage,
+    temp_dir: Path,
+    clone_stats: object,
+) -> list[list[str]] | None:
+    """map-reduce로 나눌 샤드(파일 목록)를 계획한다. 단일 잡으로 처리하면 None.
+
+    - mapreduce 스캔 유형은 항상 분할
+    - initial / full 스캔은 추출 파일 수가 SCAN_MAPREDUCE_MIN_FILES 이상일 때만 분할
+    - incremental / pr 스캔은 분할하지 않음
+    """
+    if message.scan_type != "mapreduce":
+        if message.scan_type not in _MAPREDUCE_ELIGIBLE_SCAN_TYPES:
+            return None
+        extracted = getattr(clone_stats, "extracted_files", None)
+        min_files = settings.SCAN_MAPREDUCE_MIN_FILES
+        if not min_files or not isinstance(extracted, int) or extracted < min_files:
+            return None
+
+    sized: list[tuple[str, int]] = []
+    for rel_path in list_scannable_files(temp_dir):
+        try:
+            sized.append((rel_path, (temp_dir / rel_path).stat().st_size))
+        except OSError:
+            continue
+
+    shard_count = math.ceil(len(sized) / settings.SCAN_MAPREDUCE_SHARD_FILES)
+    if shard_count <= 1:
+        return None
+    return partition_by_size(sized, shard_count)
 
 
 # ──────────────────────────────────────────────────────────────
 # 내부 헬퍼 함수
 # ──────────────────────────────────────────────────────────────
 
-async def _run_llm_analysis_batch(
+def _resolve_scan_targets(message: ScanJobMessage) -> list[str] | None:
+    """스캔 유형에 따라 Semgrep에 넘길 대상 파일 목록을 결정한다.
+
+    incremental / pr 스캔이면서 changed_files가 있으면 변경 파일만 반환한다.
+    그 외(initial / full, 또는 변경 파일 정보가 없는 경우)는 None을 반환하여
+    전체 checkout을 스캔한다.
+    """
+    if message.scan_type in _INCREMENTAL_SCAN_TYPES and message.changed_files:
+        return list(message.changed_files)
+    return None
+
+
+def _create_cancellation(job_id: str) -> ScanCancellation:
+    """스캔 취소 플래그 확인기를 만든다 (map-reduce 샤드 잡도 부모 job_id 기준)."""
+    return ScanCancellation(get_sync_redis(), job_id)
+
+
+def _create_semgrep_engine(cancellation: ScanCancellation | None = None) -> SemgrepEngine:
+    """호스트 공유 코어 할당기와 샤딩 설정을 적용한 SemgrepEngine을 만든다."""
+    return SemgrepEngine(
+        cancellation=cancellation,
+        core_allocator=_get_core_allocator(),
+        max_jobs=settings.SEMGREP_MAX_JOBS_PER_SCAN,
+        shard_config=ShardConfig(
+            min_files=settings.SEMGREP_SHARD_MIN_FILES,
+            target_bytes=settings.SEMGREP_SHARD_TARGET_BYTES,
+            timeout_seconds=settings.SEMGREP_SHARD_TIMEOUT_SECONDS,
+            max_retries=settings.SEMGREP_SHARD_MAX_RETRIES,
+        ),
+        stream_output=settings.SEMGREP_STREAM_OUTPUT,
+        prefilter=settings.SEMGREP_KEYWORD_PREFILTER,
+        native_secrets=settings.SEMGREP_NATIVE_SECRETS,
+    )
+
+
+async def _load_repository(db: AsyncSession, repo_id: str) -> Repository:
+    """repo_id로 Repository를 조회한다 (없으면 예외)."""
+    db_result = await db.execute(
+        select(Repository).where(Repository.id == uuid.UUID(repo_id))
+    )
+    # AsyncMock 환경에서는 scalar_one이 coroutine일 수 있으므로 await 처리
+    scalar_one = db_result.scalar_one
+    if asyncio.iscoroutinefunction(scalar_one):
+        return await scalar_one()  # type: ignore[misc]
+    return scalar_one()
+
+
+async def _detect_findings(
+    db: AsyncSession,
+    message: ScanJobMessage,
+    repo: Repository,
+    semgrep: SemgrepEngine,
+    temp_dir: Path,
+    clone_stats: object,
+    telemetry: ScanTelemetry,
+    target_files: list[str] | None = None,
+) -> tuple[list[SemgrepFinding], int]:
+    """Semgrep 1차 스캔 후 FP 패턴 필터링까지 수행한다.
+
+    Returns:
+        (필터링 후 findings, 자동 필터링된 건수)
+    """
+    # incremental / pr 스캔은 변경 파일만, map-reduce 샤드는 샤드 파일만 대상
+    # 파일 내용 해시가 같은 파일은 이전 결과 캐시를 재사용
+    if target_files is None:
+        target_files = _resolve_scan_targets(message)
+    with telemetry.stage("semgrep"):
+        result_cache = await create_result_cache(
+            settings.REDIS_URL,
+            settings.SEMGREP_CACHE_TTL_SECONDS,
+            native_secrets=settings.SEMGREP_NATIVE_SECRETS,
+        )
+        if result_cache is not None:
+            try:
+                findings = await result_cache.scan(
+                    semgrep, temp_dir, message.job_id, target_files=target_files
+                )
+                telemetry.files_scanned = result_cache.last_file_count
+                telemetry.semgrep_cache_hits = result_cache.last_hit_count
+            finally:
+                await result_cache.close()
+        else:
+            findings = semgrep.scan(temp_dir, message.job_id, target_files=target_files)
+            telemetry.files_scanned = (
+                len(target_files) if target_files is not None
+                else getattr(clone_stats, "extracted_files", 0)
+            )
+    telemetry.record_semgrep(semgrep)
+    logger.info(
+        f"[WorkerID={message.job_id}] Semgrep 1차 스캔 완료: {len(findings)}건 탐지"
+    )
+    if not findings:
+        return findings, 0
+
+    # FPFilterService로 오탐 패턴 필터링
+    auto_filtered_count = 0
+    try:
+        from src.services.fp_filter_service import FPFilterService
+        fp_service = FPFilterService(db)
+        original_count = len(findings)
+        job_uuid = uuid.UUID(message.job_id) if isinstance(message.job_id, str) else message.job_id
+        with telemetry.stage("fp_filter"):
+            findings, auto_filtered_count = await fp_service.filter_findings(
+                findings, team_id=repo.team_id, scan_job_id=job_uuid
+            )
+        if auto_filtered_count > 0:
+            logger.info(
+                f"[WorkerID={message.job_id}] FP 필터링: {auto_filtered_count}건 제외 "
+                f"({original_count} → {len(findings)})"
+            )
+    except Exception as fp_err:
+        logger.warning(f"[WorkerID={message.job_id}] FP 필터링 실패 (스캔 계속): {fp_err}")
+
+    return findings, auto_filtered_count
+
+
+async def _triage_findings(
     llm: LLMAgent,
     findings: list[SemgrepFinding],
     temp_dir: Path,
     job_id: str,
-    max_concurrent: int = 5,
+    telemetry: ScanTelemetry,
+    checkpoint: ScanCheckpoint | None = None,
+    resumed_results: dict[str, list[LLMAnalysisResult]] | None = None,
 ) -> list[LLMAnalysisResult]:
-    """파일별로 findings를 그룹화하여 LLM 배치 분석을 실행한다.
+    """LLM 2차 분석을 실행하고 판정 결과와 Claude 사용량을 기록한다.
+
+    checkpoint가 주어지면 파일 분석이 끝날 때마다 결과를 저장하고,
+    resumed_results(이전 시도에서 분석이 끝난 파일)는 다시 분석하지 않는다.
+    """
+    with telemetry.stage("llm"):
+        all_results = await _run_llm_analysis_batch(
+            llm=llm,
+            findings=findings,
+            temp_dir=temp_dir,
+            job_id=job_id,
+            checkpoint=checkpoint,
+            resumed_results=resumed_results,
+        )
+    telemetry.record_llm_usage(llm.usage)
+
+    tp_count = sum(1 for r in all_results if r.is_true_positive)
+    fp_count = sum(1 for r in all_results if not r.is_true_positive)
+    logger.info(
+        f"[WorkerID={job_id}] LLM 2차 분석 완료: "
+        f"TP={tp_count}, FP={fp_count}"
+    )
+    usage = llm.usage
+    logger.info(
+        f"[WorkerID={job_id}] Claude 사용량: 요청 {usage.requests}건, "
+        f"입력 {usage.input_tokens} / 캐시 읽기 {usage.cache_read_input_tokens} / "
+        f"캐시 쓰기 {usage.cache_creation_input_tokens} / 출력 {usage.output_tokens} 토큰, "
+        f"재시도 {usage.retries}회"
+    )
+    return all_results
 
-    asyncio.Semaphore로 동시 LLM 호출 수를 제한한다 (rate limit 대응).
 
-    Args:
-        max_concurrent: 동시 LLM 호출 최대 수
+async def _finalize_scan(
+    db: AsyncSession,
+    orchestrator: ScanOrchestrator,
+    message: ScanJobMessage,
+    repo: Repository,
+    github: GitHubAppService,
+    findings: list[SemgrepFinding],
+    all_results: list[LLMAnalysisResult],
+    auto_filtered_count: int,
+    telemetry: ScanTelemetry,
+    cancellation: ScanCancellation | None = None,
+) -> dict:
+    """취약점 저장, 패치 PR 생성, 통계 업데이트 후 ScanJob을 completed로 바꾼다.
+
+    cancellation이 주어지면 저장 / 패치 PR 생성 전에 취소 여부를 확인한다.
     """
-    # 파일별 그룹화
-    file_groups: dict[str, list[SemgrepFinding]] = {}
-    for f in findings:
-        file_groups.setdefault(f.file_path, []).append(f)
+    if cancellation is not None:
+        cancellation.raise_if_cancelled()
+    tp_count = sum(1 for r in all_results if r.is_true_positive)
+    fp_count = sum(1 for r in all_results if not r.is_true_positive)
+
+    # Vulnerability 레코드 DB 저장 (true_positive만, 중복 방지)
+    with telemetry.stage("save"):
+        await _save_vulnerabilities(
+            db=db,
+            scan_job_id=message.job_id,
+            repo_id=repo.id,
+            findings=findings,
+            analysis_results=all_results,
+        )
+
+    # 패치 PR 생성 (F-03) — 실패해도 스캔은 completed 유지
+    if cancellation is not None:
+        cancellation.raise_if_cancelled()
+    try:
+        patch_gen = PatchGenerator(github_service=github)
+        with telemetry.stage("patch_pr"):
+            patch_prs = await patch_gen.generate_patch_prs(
+                repo_full_name=repo.full_name,
+                installation_id=repo.installation_id or 0,
+                base_branch=repo.default_branch,
+                scan_job_id=uuid.UUID(message.job_id) if isinstance(message.job_id, str) else message.job_id,
+                repo_id=repo.id,
+                analysis_results=all_results,
+                findings=findings,
+                db=db,
+            )
+        logger.info(
+            f"[WorkerID={message.job_id}] 패치 PR 생성 완료: {len(patch_prs)}건"
+        )
+    except Exception as patch_err:
+        logger.warning(
+            f"[WorkerID={message.job_id}] 패치 PR 생성 실패 "
+            f"(스캔 자체는 성공): {patch_err}"
+        )
+
+    # ScanJob 통계 + 텔레메트리 업데이트
+    await _update_scan_stats(
+        db, message.job_id, len(findings), tp_count, fp_count, auto_filtered_count,
+        telemetry=telemetry,
+    )
 
-    # asyncio.Semaphore로 동시 호출 수 제한
-    semaphore = asyncio.Semaphore(max_concurrent)
+    # ScanJob 상태 -> completed
+    await orchestrator.update_job_status(message.job_id, "completed")
 
-    async def analyze_file(
-        file_path: str,
-        file_findings: list[SemgrepFinding],
-    ) -> list[LLMAnalysisResult]:
-        async with semaphore:
-            abs_path = temp_dir / file_path
-            try:
-                file_content = abs_path.read_text(encoding="utf-8")
-            except (FileNotFoundError, UnicodeDecodeError) as e:
-                logger.warning(f"[ScanWorker] 파일 읽기 실패 ({file_path}): {e}")
-                return []
+    return {
+        "job_id": message.job_id,
+        "status": "completed",
+        "findings": len(findings),
+        "true_positives": tp_count,
+        "false_positives": fp_count,
+    }
 
-            return await llm.analyze_findings(file_content, file_path, file_findings)
 
-    tasks = [
-        analyze_file(file_path, file_findings)
-        for file_path, file_findings in file_groups.items()
-    ]
+async def _run_llm_analysis_batch(
+    llm: LLMAgent,
+    findings: list[SemgrepFinding],
+    temp_dir: Path,
+    job_id: str,
+    checkpoint: ScanCheckpoint | None = None,
+    resumed_results: dict[str, list[LLMAnalysisResult]] | None = None,
+) -> list[LLMAnalysisResult]:
+    """파일별로 findings를 그룹화하여 LLM 배치 분석을 실행한다.
+
+    작은 파일들은 LLMAgent가 입력 토큰 예산 내에서 한 요청으로 묶고,
+    실제 Claude 동시 호출 수는 LLMAgent의 호출 슬롯(LLM_MAX_CONCURRENCY)이 제한한다.
+    """
+    resumed_results = resumed_results or {}
 
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    # 파일별 그룹화 (체크포인트에 결과가 있는 파일은 제외)
+    file_groups: dict[str, list[SemgrepFinding]] = {}
+    for f in findings:
+        if f.file_path not in resumed_results:
+            file_groups.setdefault(f.file_path, []).append(f)
 
-    # 예외 필터링 및 결과 병합
     all_results: list[LLMAnalysisResult] = []
-    for r in results:
-        if isinstance(r, Exception):
-            logger.error(f"[ScanWorker] LLM 분석 실패: {r}")
+    for file_path, file_results in resumed_results.items():
+        # 체크포인트는 패치를 저장하지 않으므로 true_positive 결과의 패치를 다시 만든다
+        if any(r.is_true_positive and r.patch_diff is None for r in file_results):
+            file_content = _read_source(temp_dir, file_path)
+            if file_content is not None:
+                file_findings = [f for f in findings if f.file_path == file_path]
+                await llm.restore_patches(file_content, file_findings, file_results)
+        all_results.extend(file_results)
+
+    inputs: list[FileAnalysisInput] = []
+    for file_path, file_findings in file_groups.items():
+        file_content = _read_source(temp_dir, file_path)
+        if file_content is None:
             continue
-        all_results.extend(r)  # type: ignore[arg-type]
+        inputs.append(FileAnalysisInput(file_path, file_content, file_findings))
+
+    if not inputs:
+        return all_results
+
+    # 파일(묶음) 단위 실패는 LLMAgent가 로그 후 해당 파일만 제외
+    if checkpoint is not None:
+        results_by_file = await llm.analyze_files(
+            inputs, on_file_done=checkpoint.save_file_results
+        )
+    else:
+        results_by_file = await llm.analyze_files(inputs)
+
+    for file_results in results_by_file.values():
+        all_results.extend(file_results)
 
     return all_results
 
 
+def _read_source(temp_dir: Path, file_path: str) -> str | None:
+    """내려받은 소스 파일 내용 (읽기 실패 시 None)."""
+    try:
+        return (temp_dir / file_path).read_text(encoding="utf-8")
+    except (FileNotFoundError, UnicodeDecodeError) as e:
+        logger.warning(f"[ScanWorker] 파일 읽기 실패 ({file_path}): {e}")
+        return None
+
+
 async def _save_vulnerabilities(
     db: AsyncSession,
     scan_job_id: str,
@@ -393,29 +1199,77 @@ async def _update_scan_stats(
     true_positives_count: int,
     false_positives_count: int,
     auto_filtered_count: int = 0,
+    telemetry: ScanTelemetry | None = None,
 ) -> None:
-    """ScanJob의 통계 필드를 업데이트한다."""
-    from sqlalchemy import select as sa_select
+    """ScanJob의 통계 필드(및 텔레메트리)를 업데이트한다."""
+    scan_job = await _get_scan_job(db, job_id)
+    if scan_job is None:
+        return
+
+    scan_job.findings_count = findings_count
+    scan_job.true_positives_count = true_positives_count
+    scan_job.false_positives_count = false_positives_count
+    scan_job.auto_filtered_count = auto_filtered_count
+    if telemetry is not None:
+        scan_job.telemetry = telemetry.to_dict()
+
+
+async def _save_scan_telemetry(
+    db: AsyncSession,
+    job_id: str,
+    telemetry: ScanTelemetry,
+) -> None:
+    """ScanJob에 텔레메트리만 기록한다 (실패 경로용, 커밋은 상태 업데이트가 수행)."""
+    scan_job = await _get_scan_job(db, job_id)
+    if scan_job is not None:
+        scan_job.telemetry = telemetry.to_dict()
+
+
+async def _refresh_scan_target(db: AsyncSession, message: ScanJobMessage) -> ScanJobMessage:
+    """ScanJob의 현재 commit_sha / changed_files로 메시지를 갱신한다 (push 스캔 병합 반영).
+
+    상태 업데이트 직전에 병합된 값이 세션에 캐시된 객체에 가려지지 않도록 DB에서 다시 채운다.
+    """
     from src.models.scan_job import ScanJob
 
     db_result = await db.execute(
-        sa_select(ScanJob).where(ScanJob.id == uuid.UUID(job_id))
+        select(ScanJob)
+        .where(ScanJob.id == uuid.UUID(message.job_id))
+        .execution_options(populate_existing=True)
     )
-
-    # AsyncMock 환경에서는 scalar_one_or_none이 coroutine일 수 있으므로 await 처리
     scalar_fn = db_result.scalar_one_or_none
     if asyncio.iscoroutinefunction(scalar_fn):
         scan_job = await scalar_fn()
     else:
         scan_job = scalar_fn()
-
     if scan_job is None:
-        return
+        return message
+    updates = {}
+    if isinstance(scan_job.commit_sha, str) and scan_job.commit_sha != message.commit_sha:
+        updates["commit_sha"] = scan_job.commit_sha
+    if isinstance(scan_job.changed_files, list) or scan_job.changed_files is None:
+        if scan_job.changed_files != message.changed_files:
+            updates["changed_files"] = scan_job.changed_files
+    if not updates:
+        return message
+    logger.info(f"[WorkerID={message.job_id}] 병합된 push 반영: commit_sha={scan_job.commit_sha}")
+    return dataclasses.replace(message, **updates)
+
+
+async def _get_scan_job(db: AsyncSession, job_id: str):
+    """job_id로 ScanJob을 조회한다. 없으면 None."""
+    from sqlalchemy import select as sa_select
+    from src.models.scan_job import ScanJob
 
-    scan_job.findings_count = findings_count
-    scan_job.true_positives_count = true_positives_count
-    scan_job.false_positives_count = false_positives_count
-    scan_job.auto_filtered_count = auto_filtered_count
+    db_result = await db.execute(
+        sa_select(ScanJob).where(ScanJob.id == uuid.UUID(job_id))
+    )
+
+    # AsyncMock 환경에서는 scalar_one_or_none이 coroutine일 수 있으므로 await 처리
+    scalar_fn = db_result.scalar_one_or_none
+    if asyncio.iscoroutinefunction(scalar_fn):
+        return await scalar_fn()
+    return scalar_fn()
 
 
 # ──────────────────────────────────────────────────────────────
@@ -426,14 +1280,107 @@ def start_worker() -> None:
     """RQ 워커를 시작한다.
 
     'scans' 큐를 리스닝하며 스캔 작업을 처리한다.
+    SCAN_WORKER_CONCURRENCY > 1이면 감독 프로세스로 동작하며 워커 프로세스 N개를 띄운다.
     """
-    redis_conn = redis.from_url(settings.REDIS_URL)
-    queues = [Queue("scans", connection=redis_conn)]
+    if settings.SCAN_WORKER_CONCURRENCY > 1:
+        _supervise(settings.SCAN_WORKER_CONCURRENCY)
+        return
+
+    if _run_worker_process():
+        # 종료 요청이 아니라 처리 건수 상한에 도달한 경우에만 새 프로세스로 교체
+        os.execv(sys.executable, [sys.executable, "-m", "src.workers.scan_worker"])
+
+
+def _run_worker_process() -> bool:
+    """이 프로세스에서 RQ 워커를 실행한다.
+
+    상주 모드에서는 SCAN_WORKER_MAX_JOBS건 처리 후 반환한다.
+
+    Returns:
+        처리 건수 상한에 도달하여 프로세스를 교체해야 하면 True
+    """
+    global _runtime
 
-    worker = Worker(queues, connection=redis_conn)
+    redis_conn = redis.from_url(settings.REDIS_URL)
+    # 레인 우선순위 순서: interactive > standard > bulk
+    queues = [Queue(LANE_QUEUES[lane], connection=redis_conn) for lane in LANES]
+    try:
+        # 워커가 죽어 만료된 슬롯이 있으면 대기 중인 스캔을 RQ 큐로 보낸다
+        _get_scheduler().pump()
+    except Exception as e:
+        logger.warning(f"[ScanWorker] 스캔 스케줄러 pump 실패: {e}")
     redis_host = settings.REDIS_URL.split("@")[-1] if "@" in settings.REDIS_URL else settings.REDIS_URL
-    logger.info(f"[ScanWorker] 워커 시작 (Redis: {redis_host})")
-    worker.work(with_scheduler=True)
+
+    if not settings.SCAN_WORKER_PERSISTENT:
+        worker = Worker(queues, connection=redis_conn)
+        logger.info(f"[ScanWorker] 워커 시작 (Redis: {redis_host})")
+        worker.work(with_scheduler=True)
+        return False
+
+    _preload_modules()
+    _runtime = _WorkerRuntime()
+    max_jobs = settings.SCAN_WORKER_MAX_JOBS or None
+    worker = SimpleWorker(queues, connection=redis_conn)
+    logger.info(
+        f"[ScanWorker] 상주 워커 시작 (Redis: {redis_host}, 최대 {max_jobs or '무제한'}건 후 재시작)"
+    )
+    try:
+        worker.work(with_scheduler=True, max_jobs=max_jobs)
+    finally:
+        jobs_run = _runtime.jobs_run
+        _runtime.close()
+        _runtime = None
+
+    if max_jobs is not None and jobs_run >= max_jobs:
+        logger.info(f"[ScanWorker] {jobs_run}건 처리 완료 — 프로세스 재시작")
+        return True
+    return False
+
+
+def _spawn_worker_process() -> subprocess.Popen:
+    """단일 워커 모드(SCAN_WORKER_CONCURRENCY=1)로 워커 프로세스를 띄운다."""
+    env = {**os.environ, "SCAN_WORKER_CONCURRENCY": "1"}
+    return subprocess.Popen([sys.executable, "-m", "src.workers.scan_worker"], env=env)
+
+
+def _supervise(concurrency: int) -> None:
+    """워커 프로세스 concurrency개를 유지하는 감독 루프.
+
+    종료된 워커(크래시 등)는 다시 띄우고, SIGTERM/SIGINT를 받으면
+    모든 워커에 SIGTERM을 전달하여 진행 중인 스캔을 마친 뒤 종료한다.
+    """
+    stopping = False
+    procs: list[subprocess.Popen] = []
+
+    def _stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for proc in procs:
+            if proc.poll() is None:
+                proc.send_signal(signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    cores = len(_get_core_allocator().cpu_ids)
+    logger.info(
+        f"[ScanWorker] 감독 프로세스 시작: 동시 스캔 {concurrency}개, Semgrep 코어 {cores}개"
+    )
+    procs.extend(_spawn_worker_process() for _ in range(concurrency))
+
+    while not stopping:
+        time.sleep(_SUPERVISOR_POLL_SEC)
+        for i, proc in enumerate(procs):
+            if proc.poll() is not None and not stopping:
+                logger.warning(
+                    f"[ScanWorker] 워커 프로세스 종료 (pid={proc.pid}, "
+                    f"returncode={proc.returncode}) — 다시 시작"
+                )
+                procs[i] = _spawn_worker_process()
+
+    for proc in procs:
+        proc.wait()
+    logger.info("[ScanWorker] 감독 프로세스 종료")
 
 
 if __name__ == "__main__":
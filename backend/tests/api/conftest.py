@@ -43,6 +43,9 @@ def _inject_redis_mock() -> None:
     if "rq.job" not in sys.modules:
         sys.modules["rq.job"] = MagicMock()
 
+    if "rq.exceptions" not in sys.modules:
+        sys.modules["rq.exceptions"] = MagicMock()
+
 
 # 모듈 로드 시점에 즉시 주입
 _inject_redis_mock()
@@ -2,6 +2,7 @@
 
 import hashlib
 import hmac
+import importlib
 import json
 import uuid
 from datetime import datetime
@@ -9,6 +10,14 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
+# redis / rq가 설치된 환경에서는 실제 패키지를 먼저 로드한다.
+# tests/api/conftest.py의 Mock은 미설치 환경에서만 주입되어야 하며,
+# Mock이 먼저 들어가면 fakeredis 기반 테스트(Lua 스크립트 검증)가 실행되지 않는다.
+for _module in ("redis", "redis.asyncio", "rq", "rq.job", "rq.exceptions"):
+    try:
+        importlib.import_module(_module)
+    except ImportError:
+        pass
 
 # 테스트용 환경변수를 미리 패치하여 Settings 로드 오류 방지
 TEST_ENV = {
@@ -121,6 +130,7 @@ def _build_f04_mock_db():
     mock_scan_completed.false_positives_count = 7
     mock_scan_completed.duration_seconds = 120
     mock_scan_completed.error_message = None
+    mock_scan_completed.telemetry = None
     mock_scan_completed.started_at = datetime(2026, 2, 25, 10, 0, 0)
     mock_scan_completed.completed_at = datetime(2026, 2, 25, 10, 2, 0)
     mock_scan_completed.created_at = datetime(2026, 2, 25, 9, 59, 50)
@@ -140,6 +150,7 @@ def _build_f04_mock_db():
     mock_scan_running.false_positives_count = 0
     mock_scan_running.duration_seconds = None
     mock_scan_running.error_message = None
+    mock_scan_running.telemetry = None
     mock_scan_running.started_at = datetime(2026, 2, 25, 10, 0, 0)
     mock_scan_running.completed_at = None
     mock_scan_running.created_at = datetime(2026, 2, 25, 9, 59, 50)
@@ -779,6 +790,7 @@ def sample_scan_job(sample_repo):
     scan.false_positives_count = 7
     scan.duration_seconds = 120
     scan.error_message = None
+    scan.telemetry = None
     scan.started_at = datetime(2026, 2, 25, 10, 0, 0)
     scan.completed_at = datetime(2026, 2, 25, 10, 2, 0)
     scan.created_at = datetime(2026, 2, 25, 9, 59, 50)
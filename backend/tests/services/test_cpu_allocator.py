@@ -0,0 +1,42 @@
+"""CoreAllocator 단위 테스트 — 호스트 공유 Semgrep 코어 할당"""
+
+from unittest.mock import patch
+
+import pytest
+
+from src.services.cpu_allocator import CoreAllocator
+
+
+@pytest.fixture
+def make_allocator(tmp_path):
+    """같은 잠금 디렉토리를 공유하는 (= 같은 호스트의) 할당기를 만든다."""
+    def _make(total_cores: int = 0) -> CoreAllocator:
+        with patch("src.services.cpu_allocator.available_cpu_ids", return_value=[0, 1, 2, 3]):
+            return CoreAllocator(total_cores=total_cores, lock_dir=tmp_path)
+    return _make
+
+
+def test_concurrent_scans_split_cores(make_allocator) -> None:
+    """먼저 잡은 스캔이 쓰는 코어는 다른 스캔에 할당되지 않는다."""
+    first = make_allocator().try_acquire(3)
+    second = make_allocator().try_acquire(3)
+
+    assert first.cpu_ids == [0, 1, 2]
+    assert second.cpu_ids == [3]
+    assert make_allocator().try_acquire(1) is None
+
+
+def test_release_returns_cores(make_allocator) -> None:
+    allocator = make_allocator()
+    with allocator.lease(4) as cpu_ids:
+        assert cpu_ids == [0, 1, 2, 3]
+        assert make_allocator().try_acquire(1) is None
+
+    assert make_allocator().try_acquire(4).cpu_ids == [0, 1, 2, 3]
+
+
+def test_total_cores_limits_budget(make_allocator) -> None:
+    """SEMGREP_CPU_CORES로 호스트 코어 중 일부만 Semgrep에 배정할 수 있다."""
+    allocator = make_allocator(total_cores=2)
+
+    assert allocator.acquire(8).cpu_ids == [0, 1]
@@ -0,0 +1,145 @@
+"""FileClassifier 단위 테스트 — vendored / generated / minified 파일 및 저장소 제외 패턴"""
+
+import base64
+import os
+
+import pytest
+
+from src.services.file_classifier import (
+    REASON_GENERATED,
+    REASON_IGNORED,
+    REASON_MINIFIED,
+    REASON_VENDORED,
+    FileClassifier,
+    GitAttributes,
+    compile_glob,
+    content_exclusion_reason,
+    path_exclusion_reason,
+)
+
+
+@pytest.mark.parametrize(
+    ("path", "reason"),
+    [
+        ("node_modules/react/index.js", REASON_VENDORED),
+        ("web/vendor/jquery.js", REASON_VENDORED),
+        ("dist/app.js", REASON_VENDORED),
+        ("src/__generated__/schema.ts", REASON_GENERATED),
+        ("api/user_pb2.py", REASON_GENERATED),
+        ("api/user.pb.go", REASON_GENERATED),
+        ("pkg/apis/zz_generated.deepcopy.go", REASON_GENERATED),
+        ("static/app.min.js", REASON_MINIFIED),
+        ("static/main.bundle.js", REASON_MINIFIED),
+        ("app/views.py", None),
+        ("app/vendor.py", None),            # 디렉토리가 아닌 파일 이름은 vendored가 아니다
+        ("cmd/distance.go", None),
+    ],
+)
+def test_path_exclusion_reason(path, reason) -> None:
+    assert path_exclusion_reason(path) == reason
+
+
+@pytest.mark.parametrize(
+    ("pattern", "matches", "misses"),
+    [
+        ("docs/", ["docs/a.py", "sub/docs/a.py"], ["docs.py", "mydocs/a.py"]),
+        ("/legacy", ["legacy/a.py", "legacy"], ["app/legacy/a.py"]),
+        ("app/legacy/**/*.js", ["app/legacy/a.js", "app/legacy/x/y/a.js"], ["app/legacy/a.py", "legacy/a.js"]),
+        ("*_test.go", ["a_test.go", "pkg/a_test.go"], ["a_test.go.bak", "test.go"]),
+        ("fixture?.py", ["fixture1.py"], ["fixture10.py"]),
+    ],
+)
+def test_compile_glob_gitignore_semantics(pattern, matches, misses) -> None:
+    regex = compile_glob(pattern)
+
+    assert all(regex.match(path) for path in matches)
+    assert not any(regex.match(path) for path in misses)
+
+
+def test_compile_glob_ignores_blank_and_comment() -> None:
+    assert compile_glob("  ") is None
+    assert compile_glob("# docs/") is None
+
+
+def test_classifier_ignore_patterns_take_precedence() -> None:
+    classifier = FileClassifier(["app/legacy/", "", 123])
+
+    assert classifier.path_reason("app/legacy/views.py") == REASON_IGNORED
+    assert classifier.path_reason("node_modules/a.js") == REASON_VENDORED
+    assert classifier.path_reason("app/views.py") is None
+
+
+def test_classifier_tolerates_non_list_patterns() -> None:
+    """NULL 컬럼 / Mock 값이면 제외 패턴 없이 동작한다."""
+    assert FileClassifier(None).path_reason("app/views.py") is None
+    assert FileClassifier(object()).path_reason("app/views.py") is None
+
+
+def test_gitattributes_linguist_attributes(tmp_path) -> None:
+    """하위 디렉토리 .gitattributes는 그 디렉토리 기준이고, 나중 설정이 앞 설정을 덮어쓴다."""
+    (tmp_path / ".gitattributes").write_text(
+        "# 생성 코드\n"
+        "gen/** linguist-generated\n"
+        "gen/keep.py -linguist-generated\n"
+        "third/*.js linguist-vendored=true\n"
+        "*.py text eol=lf\n"
+    )
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / ".gitattributes").write_text("mocks/* linguist-generated\n")
+
+    attributes = GitAttributes.load(tmp_path)
+
+    assert attributes.reason_for("gen/models.py") == REASON_GENERATED
+    assert attributes.reason_for("gen/keep.py") is None
+    assert attributes.reason_for("third/lib.js") == REASON_VENDORED
+    assert attributes.reason_for("pkg/mocks/db.go") == REASON_GENERATED
+    assert attributes.reason_for("mocks/db.go") is None
+    assert attributes.reason_for("app/views.py") is None
+
+
+def test_content_generated_header() -> None:
+    assert content_exclusion_reason(b"// Code generated by protoc-gen-go. DO NOT EDIT.\n") == REASON_GENERATED
+    assert content_exclusion_reason(b"# @generated by tool\nx = 1\n") == REASON_GENERATED
+
+
+def test_content_minified_and_blob() -> None:
+    minified = b"function a(b){return b+1};" * 200
+    blob = b"DATA = (\n" + b"\n".join(
+        base64.b64encode(os.urandom(60)) for _ in range(100)
+    ) + b"\n)\n"
+
+    assert content_exclusion_reason(minified) == REASON_MINIFIED
+    assert content_exclusion_reason(blob) == REASON_GENERATED
+
+
+def test_content_regular_source_is_kept() -> None:
+    """한글 주석 / 긴 문자열이 있는 일반 소스는 제외하지 않는다."""
+    source = (
+        '"""사용자 API — 요청을 검증하고 DB에 저장한다"""\n\n'
+        "def create_user(db, name: str) -> None:\n"
+        "    # 사용자 이름 검증 (공백 제거 후 1~64자)\n"
+        "    token = 'sk_test_4eC39HqLyjWDarjtT1zdp7dc4eC39HqLyjWDarjtT1zdp7dc4eC39HqLy'\n"
+        "    db.execute('INSERT INTO users (name) VALUES (%s)', (name.strip(),))\n\n"
+    ).encode("utf-8") * 20
+
+    assert len(source) > 2048
+    assert content_exclusion_reason(source) is None
+
+
+def test_exclude_deletes_files_and_counts_stats(tmp_path) -> None:
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / "views.py").write_text("def index():\n    return 'ok'\n")
+    (tmp_path / "app" / "mock_db.go").write_bytes(b"// Code generated by mockgen. DO NOT EDIT.\n")
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "example.py").write_text("print(1)\n")
+    (tmp_path / "README.md").write_text("# readme\n")
+
+    stats = FileClassifier(["docs/"]).exclude(tmp_path)
+
+    assert (tmp_path / "app" / "views.py").exists()
+    assert not (tmp_path / "app" / "mock_db.go").exists()
+    assert not (tmp_path / "docs" / "example.py").exists()
+    assert (tmp_path / "README.md").exists()    # 스캔 대상이 아닌 파일은 건드리지 않는다
+    assert stats.files == 2
+    assert stats.bytes == len(b"// Code generated by mockgen. DO NOT EDIT.\n") + len(b"print(1)\n")
+    assert stats.reasons == {REASON_GENERATED: 1, REASON_IGNORED: 1}
@@ -423,3 +423,131 @@ async def test_create_pull_request_with_labels(github_service):
 
     # Assert: 결과에 number 포함
     assert "number" in result, "결과에 'number' 키가 없음"
+
+
+# ──────────────────────────────────────────────────────────────
+# clone_repository() 스트리밍 추출 테스트
+# ──────────────────────────────────────────────────────────────
+
+def _build_tarball(files: dict[str, bytes], root: str = "test-org-test-repo-abc1234") -> bytes:
+    """GitHub tarball과 같은 구조(루트 디렉토리 1개)의 tar.gz 바이트를 만든다."""
+    import io
+    import tarfile
+
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as tar:
+        root_info = tarfile.TarInfo(root)
+        root_info.type = tarfile.DIRTYPE
+        tar.addfile(root_info)
+        for name, data in files.items():
+            info = tarfile.TarInfo(f"{root}/{name}")
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buf.getvalue()
+
+
+def _patch_tarball_transport(tarball: bytes, status_code: int = 200):
+    """httpx.AsyncClient가 MockTransport로 tarball을 청크 단위 스트리밍하도록 패치한다."""
+    real_client_cls = httpx.AsyncClient
+
+    async def stream_body():
+        for i in range(0, len(tarball), 1024):
+            yield tarball[i:i + 1024]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(status_code, content=stream_body())
+
+    def client_factory(*args, **kwargs):
+        kwargs["transport"] = httpx.MockTransport(handler)
+        return real_client_cls(*args, **kwargs)
+
+    return patch("httpx.AsyncClient", side_effect=client_factory)
+
+
+@pytest.mark.asyncio
+async def test_clone_repository_streams_and_strips_root_prefix(github_service, tmp_path):
+    """tarball을 스트리밍 추출하며 루트 디렉토리를 제거하고 스캔 대상 파일만 남긴다."""
+    tarball = _build_tarball({
+        "app/db.py": b"import os\n",
+        "cmd/main.go": b"package main\n",
+        "README.md": b"# readme\n",
+        "assets/logo.png": b"\x89PNG",
+    })
+
+    with _patch_tarball_transport(tarball):
+        stats = await github_service.clone_repository(
+            "test-org/test-repo", 789, "a" * 40, tmp_path,
+        )
+
+    assert stats.downloaded_bytes == len(tarball)
+    assert (stats.extracted_files, stats.skipped_files) == (2, 2)
+    assert (tmp_path / "app" / "db.py").read_bytes() == b"import os\n"
+    assert (tmp_path / "cmd" / "main.go").exists()
+    assert not (tmp_path / "README.md").exists()
+    assert not (tmp_path / "assets" / "logo.png").exists()
+    assert not (tmp_path / "test-org-test-repo-abc1234").exists()
+
+
+@pytest.mark.asyncio
+async def test_clone_repository_skips_files_over_max_target_bytes(github_service, tmp_path):
+    """Semgrep --max-target-bytes를 넘는 파일은 추출하지 않는다."""
+    tarball = _build_tarball({
+        "small.py": b"x = 1\n",
+        "huge.py": b"#" * 200,
+    })
+
+    with (
+        _patch_tarball_transport(tarball),
+        patch("src.services.github_app.MAX_TARGET_BYTES", 100),
+    ):
+        await github_service.clone_repository(
+            "test-org/test-repo", 789, "a" * 40, tmp_path,
+        )
+
+    assert (tmp_path / "small.py").exists()
+    assert not (tmp_path / "huge.py").exists()
+
+
+@pytest.mark.asyncio
+async def test_clone_repository_http_error_raises(github_service, tmp_path):
+    """tarball 다운로드가 실패하면 HTTPStatusError를 전파하고 추출 스레드도 종료된다."""
+    with _patch_tarball_transport(b"", status_code=404):
+        with pytest.raises(httpx.HTTPStatusError):
+            await github_service.clone_repository(
+                "test-org/test-repo", 789, "a" * 40, tmp_path,
+            )
+
+
+@pytest.mark.asyncio
+async def test_clone_repository_excludes_vendored_generated_and_minified(github_service, tmp_path):
+    """classifier가 주어지면 vendored / 생성 / minified / 저장소 제외 패턴 파일을 남기지 않는다."""
+    from src.services.file_classifier import FileClassifier
+
+    generated = b"// Code generated by mockgen. DO NOT EDIT.\npackage mocks\n"
+    minified = b"var a=1;" * 500
+    tarball = _build_tarball({
+        "app/db.py": b"import os\n",
+        "node_modules/lodash/index.js": b"module.exports = {}\n",
+        "static/app.min.js": b"var a=1;",
+        "static/bundle.js": minified,
+        "docs/example.py": b"print(1)\n",
+        ".gitattributes": b"gen/** linguist-generated\n",
+        "gen/models.py": b"class Model: pass\n",
+        "mocks/mock_db.go": generated,
+    })
+
+    with _patch_tarball_transport(tarball):
+        stats = await github_service.clone_repository(
+            "test-org/test-repo", 789, "a" * 40, tmp_path,
+            classifier=FileClassifier(["docs/"]),
+        )
+
+    remaining = sorted(
+        p.relative_to(tmp_path).as_posix() for p in tmp_path.rglob("*") if p.is_file()
+    )
+    assert remaining == [".gitattributes", "app/db.py"]
+    assert (stats.extracted_files, stats.excluded_files) == (1, 6)
+    assert stats.excluded_bytes == (
+        len(b"module.exports = {}\n") + len(b"var a=1;") + len(minified)
+        + len(b"print(1)\n") + len(b"class Model: pass\n") + len(generated)
+    )
@@ -524,6 +524,263 @@ def render_name():
     assert results_db[0].is_true_positive is True
 
 
+async def test_patch_generation_runs_in_parallel_under_concurrency_limit(
+    agent,
+    sql_injection_code,
+):
+    """true_positive 패치 생성은 병렬로 실행되고, 동시 호출 수는 상한을 넘지 않는다."""
+    import asyncio
+
+    findings = [
+        SemgrepFinding(
+            rule_id=f"vulnix.python.sql_injection.rule_{i}",
+            severity="ERROR",
+            file_path="app/db.py",
+            start_line=6,
+            end_line=6,
+            code_snippet="cursor.execute(...)",
+            message="SQL Injection",
+            cwe=["CWE-89"],
+        )
+        for i in range(4)
+    ]
+    analysis = json.dumps({
+        "results": [
+            {"rule_id": f.rule_id, "is_true_positive": True, "confidence": 0.9, "severity": "High"}
+            for f in findings
+        ]
+    })
+    patch = json.dumps({"patch_diff": "--- a/x\n+++ b/x\n", "patch_description": ""})
+
+    agent._call_slots = asyncio.Semaphore(2)
+    in_flight = 0
+    peak = 0
+
+    async def fake_create(**kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        is_patch = "패치 코드를 생성" in kwargs["messages"][0]["content"][-1]["text"]
+        return _make_claude_message(patch if is_patch else analysis)
+
+    agent._client.messages.create = AsyncMock(side_effect=fake_create)
+
+    results = await agent.analyze_findings(sql_injection_code, "app/db.py", findings)
+
+    assert len(results) == 4
+    assert all(r.patch_diff for r in results)
+    # 패치 4건이 동시에 시작되었지만 슬롯 2개로 제한됨
+    assert peak == 2
+
+
+def _small_file_input(index: int, lines: tuple[int, ...] = (2,)):
+    from src.services.llm_agent import FileAnalysisInput
+
+    path = f"app/mod_{index}.py"
+    return FileAnalysisInput(
+        file_path=path,
+        file_content=f"import os\nos.system(cmd_{index})\nos.system(other_{index})\n",
+        findings=[
+            SemgrepFinding(
+                rule_id="vulnix.python.command_injection.os_system",
+                severity="ERROR",
+                file_path=path,
+                start_line=line,
+                end_line=line,
+                code_snippet=f"os.system(cmd_{index})",
+                message="Command Injection",
+                cwe=["CWE-78"],
+            )
+            for line in lines
+        ],
+    )
+
+
+async def test_analyze_files_packs_small_files_into_one_request(agent):
+    """작은 파일 여러 개는 분석 요청 1건으로 묶고, 결과를 (file_path, rule_id, line)으로 나눈다."""
+    files = [_small_file_input(0, lines=(2, 3)), _small_file_input(1), _small_file_input(2)]
+    rule_id = "vulnix.python.command_injection.os_system"
+    packed_response = json.dumps({
+        "results": [
+            {"file_path": "app/mod_0.py", "rule_id": rule_id, "line": 3,
+             "is_true_positive": False, "confidence": 0.8, "severity": "Low"},
+            {"file_path": "app/mod_0.py", "rule_id": rule_id, "line": 2,
+             "is_true_positive": False, "confidence": 0.7, "severity": "Low"},
+            {"file_path": "app/mod_1.py", "rule_id": rule_id, "line": 2,
+             "is_true_positive": False, "confidence": 0.6, "severity": "Low"},
+            {"file_path": "app/mod_2.py", "rule_id": rule_id, "line": 2,
+             "is_true_positive": False, "confidence": 0.5, "severity": "Low"},
+        ]
+    })
+    agent._client.messages.create = AsyncMock(return_value=_make_claude_message(packed_response))
+
+    results = await agent.analyze_files(files)
+
+    assert agent._client.messages.create.await_count == 1
+    prompt = agent._client.messages.create.await_args.kwargs["messages"][0]["content"]
+    assert isinstance(prompt, str)
+    assert "app/mod_0.py" in prompt and "app/mod_2.py" in prompt
+    assert [r.confidence for r in results["app/mod_0.py"]] == [0.8, 0.7]
+    assert [r.confidence for r in results["app/mod_1.py"]] == [0.6]
+    assert [r.confidence for r in results["app/mod_2.py"]] == [0.5]
+
+
+async def test_analyze_files_splits_packs_by_token_budget(agent):
+    """입력 토큰 예산을 넘으면 여러 요청으로 나누고, 단독 요청은 단일 파일 프롬프트를 쓴다."""
+    files = [_small_file_input(i) for i in range(3)]
+    single_response = json.dumps({
+        "results": [{
+            "rule_id": "vulnix.python.command_injection.os_system",
+            "is_true_positive": False,
+            "confidence": 0.5,
+            "severity": "Low",
+        }]
+    })
+    agent._client.messages.create = AsyncMock(return_value=_make_claude_message(single_response))
+
+    with patch("src.services.llm_agent.settings") as mock_settings:
+        mock_settings.LLM_PACK_MAX_INPUT_TOKENS = 1  # 모든 파일이 예산 초과 → 파일마다 요청
+        mock_settings.LLM_PACK_MAX_FINDINGS = 20
+        results = await agent.analyze_files(files)
+
+    assert agent._client.messages.create.await_count == 3
+    assert all(len(r) == 1 for r in results.values())
+
+
+async def test_analyze_files_reports_each_finished_file(agent):
+    """on_file_done은 분석이 끝난 파일마다 (file_path, 결과)로 호출된다 (스캔 체크포인트 저장용)."""
+    files = [_small_file_input(i) for i in range(2)]
+    single_response = json.dumps({
+        "results": [{
+            "rule_id": "vulnix.python.command_injection.os_system",
+            "is_true_positive": False,
+            "confidence": 0.5,
+            "severity": "Low",
+        }]
+    })
+    agent._client.messages.create = AsyncMock(return_value=_make_claude_message(single_response))
+    on_file_done = AsyncMock()
+
+    with patch("src.services.llm_agent.settings") as mock_settings:
+        mock_settings.LLM_PACK_MAX_INPUT_TOKENS = 1
+        mock_settings.LLM_PACK_MAX_FINDINGS = 20
+        results = await agent.analyze_files(files, on_file_done=on_file_done)
+
+    reported = {call.args[0]: call.args[1] for call in on_file_done.await_args_list}
+    assert reported == results
+
+
+async def test_restore_patches_regenerates_only_missing_true_positive_patches(
+    agent, sql_injection_finding, xss_finding, sql_injection_code
+):
+    """체크포인트에서 패치 없이 복원한 true_positive 결과만 패치를 다시 만든다."""
+    restored = LLMAnalysisResult(
+        finding_id=sql_injection_finding.rule_id, is_true_positive=True, confidence=0.9,
+        severity="High", reasoning="", patch_diff=None, patch_description="",
+    )
+    false_positive = LLMAnalysisResult(
+        finding_id=xss_finding.rule_id, is_true_positive=False, confidence=0.8,
+        severity="Low", reasoning="", patch_diff=None, patch_description="",
+    )
+
+    with patch.object(agent, "_generate_patch", AsyncMock(return_value="--- a\n+++ b")) as mock_patch:
+        await agent.restore_patches(
+            sql_injection_code, [sql_injection_finding, xss_finding], [restored, false_positive]
+        )
+
+    assert restored.patch_diff == "--- a\n+++ b"
+    assert false_positive.patch_diff is None
+    assert mock_patch.await_args.kwargs["finding"] is sql_injection_finding
+
+
+async def test_analysis_and_patch_share_cacheable_prefix(
+    agent,
+    sql_injection_code,
+    sql_injection_finding,
+    analysis_response_true_positive,
+    patch_response,
+):
+    """분석/패치 호출은 같은 system + 파일 내용 블록(cache_control)을 프리픽스로 사용한다."""
+    analysis_msg = _make_claude_message(analysis_response_true_positive)
+    analysis_msg.usage = MagicMock(
+        input_tokens=50, output_tokens=200,
+        cache_read_input_tokens=0, cache_creation_input_tokens=900,
+    )
+    patch_msg = _make_claude_message(patch_response)
+    patch_msg.usage = MagicMock(
+        input_tokens=80, output_tokens=150,
+        cache_read_input_tokens=900, cache_creation_input_tokens=0,
+    )
+    agent._client.messages.create = AsyncMock(side_effect=[analysis_msg, patch_msg])
+
+    await agent.analyze_findings(sql_injection_code, "app/db.py", [sql_injection_finding])
+
+    calls = agent._client.messages.create.await_args_list
+    analysis_kwargs, patch_kwargs = calls[0].kwargs, calls[1].kwargs
+    assert analysis_kwargs["system"] == patch_kwargs["system"]
+    assert analysis_kwargs["system"][-1]["cache_control"] == {"type": "ephemeral"}
+    analysis_file_block = analysis_kwargs["messages"][0]["content"][0]
+    patch_file_block = patch_kwargs["messages"][0]["content"][0]
+    assert analysis_file_block == patch_file_block
+    assert analysis_file_block["cache_control"] == {"type": "ephemeral"}
+    assert sql_injection_code in analysis_file_block["text"]
+    # 캐시 적중 입력 토큰 집계
+    assert agent.usage.requests == 2
+    assert agent.usage.cache_read_input_tokens == 900
+    assert agent.usage.cache_creation_input_tokens == 900
+    assert agent.usage.input_tokens == 130
+
+
+async def test_patches_warm_prompt_cache_before_fan_out(agent):
+    """분석에 잘린 내용을 보낸 큰 파일은 첫 패치로 캐시를 쓴 뒤 나머지 패치를 동시에 호출한다."""
+    import asyncio
+
+    content = "\n".join(f"line_{i} = os.system(cmd)" for i in range(800))
+    findings = [
+        SemgrepFinding(
+            rule_id=f"vulnix.python.command_injection.rule_{i}",
+            severity="ERROR",
+            file_path="app/big.py",
+            start_line=100 * (i + 1),
+            end_line=100 * (i + 1),
+            code_snippet="os.system(cmd)",
+            message="Command Injection",
+            cwe=["CWE-78"],
+        )
+        for i in range(3)
+    ]
+    analysis = json.dumps({
+        "results": [
+            {"rule_id": f.rule_id, "is_true_positive": True, "confidence": 0.9, "severity": "High"}
+            for f in findings
+        ]
+    })
+    patch = json.dumps({"patch_diff": "--- a/x\n+++ b/x\n", "patch_description": ""})
+    in_flight = 0
+    patch_concurrency: list[int] = []
+
+    async def fake_create(**kwargs):
+        nonlocal in_flight
+        is_patch = "패치 코드를 생성" in kwargs["messages"][0]["content"][-1]["text"]
+        in_flight += 1
+        if is_patch:
+            patch_concurrency.append(in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return _make_claude_message(patch if is_patch else analysis)
+
+    agent._client.messages.create = AsyncMock(side_effect=fake_create)
+
+    results = await agent.analyze_findings(content, "app/big.py", findings)
+
+    assert all(r.patch_diff for r in results)
+    # 첫 패치는 단독 호출, 나머지 2건은 동시에 호출
+    assert patch_concurrency[0] == 1
+    assert max(patch_concurrency[1:]) == 2
+
+
 # ──────────────────────────────────────────────────────────────
 # _call_claude_with_retry() 테스트
 # ──────────────────────────────────────────────────────────────
@@ -551,6 +808,8 @@ async def test_call_claude_with_retry_rate_limit_success(agent):
 
     # Assert
     assert result == '{"results": []}'
+    assert agent.usage.retries == 1
+    assert agent.usage.requests == 1
 
 
 async def test_call_claude_with_retry_max_retries_exceeded(agent):
@@ -0,0 +1,144 @@
+"""ClaudeRateLimiter 단위 테스트 — 클러스터 공유 Claude 레이트 리밋
+
+헤더 파싱, 우선순위 매핑, LLMAgent와의 연동(할당 → 헤더 학습 → 토큰 보정 → 429 차단)을
+검증한다. Redis Lua 스크립트는 fakeredis[lua](dev 의존성)로 검증한다.
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import anthropic
+import httpx
+import pytest
+
+from src.services.llm_agent import LLMAgent
+from src.services.llm_rate_limiter import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    ClaudeRateLimiter,
+    parse_rate_limit_headers,
+    priority_for_scan_type,
+)
+
+
+def _message(text: str, input_tokens: int = 120) -> MagicMock:
+    msg = MagicMock()
+    msg.content = [MagicMock(text=text)]
+    msg.usage.input_tokens = input_tokens
+    return msg
+
+
+@pytest.fixture
+def limiter() -> MagicMock:
+    lim = MagicMock()
+    lim.acquire = AsyncMock()
+    lim.observe = AsyncMock()
+    lim.reconcile = AsyncMock()
+    lim.penalize = AsyncMock()
+    return lim
+
+
+@pytest.fixture
+def agent(limiter: MagicMock) -> LLMAgent:
+    a = LLMAgent(rate_limiter=limiter, priority=PRIORITY_HIGH)
+    a._client = MagicMock()
+    return a
+
+
+def test_parse_rate_limit_headers_prefers_input_tokens() -> None:
+    """입력 토큰 헤더가 있으면 tokens 헤더보다 우선 사용한다."""
+    headers = {
+        "anthropic-ratelimit-requests-limit": "50",
+        "anthropic-ratelimit-requests-remaining": "12",
+        "anthropic-ratelimit-input-tokens-limit": "30000",
+        "anthropic-ratelimit-tokens-limit": "90000",
+        "anthropic-ratelimit-input-tokens-remaining": "1500",
+        "retry-after": "7",
+    }
+
+    assert parse_rate_limit_headers(headers) == {
+        "rpm_limit": 50,
+        "tpm_limit": 30000,
+        "requests_remaining": 12,
+        "tokens_remaining": 1500,
+        "retry_after": 7,
+    }
+
+
+def test_parse_rate_limit_headers_ignores_invalid_values() -> None:
+    assert parse_rate_limit_headers({"anthropic-ratelimit-requests-limit": "n/a"}) == {}
+
+
+@pytest.mark.parametrize(
+    "scan_type, expected",
+    [("pr", PRIORITY_HIGH), ("incremental", PRIORITY_NORMAL), ("initial", PRIORITY_LOW), ("full", PRIORITY_LOW)],
+)
+def test_priority_for_scan_type(scan_type: str, expected: str) -> None:
+    """PR 스캔이 initial / full 스캔보다 높은 우선순위를 갖는다."""
+    assert priority_for_scan_type(scan_type) == expected
+
+
+async def test_call_acquires_and_learns_from_headers(agent: LLMAgent, limiter: MagicMock) -> None:
+    """호출 전 버킷 할당을 받고, 응답 헤더와 실제 토큰 사용량을 리미터에 반영한다."""
+    raw = MagicMock()
+    raw.headers = {"anthropic-ratelimit-requests-remaining": "3"}
+    raw.parse.return_value = _message("ok", input_tokens=42)
+    agent._client.messages.with_raw_response.create = AsyncMock(return_value=raw)
+
+    text = await agent._call_claude_with_retry(messages=[{"role": "user", "content": "x" * 300}])
+
+    assert text == "ok"
+    estimated = limiter.acquire.await_args.args[0]
+    assert limiter.acquire.await_args.args[1] == PRIORITY_HIGH
+    limiter.observe.assert_awaited_once_with(raw.headers)
+    limiter.reconcile.assert_awaited_once_with(estimated, 42)
+
+
+async def test_rate_limit_error_blocks_cluster_for_retry_after(
+    agent: LLMAgent, limiter: MagicMock
+) -> None:
+    """429 응답의 retry-after만큼 공유 버킷을 차단하고 그 시간만큼 대기 후 재시도한다."""
+    response = httpx.Response(
+        429,
+        headers={"retry-after": "3"},
+        request=httpx.Request("POST", "https://api.anthropic.com/v1/messages"),
+    )
+    error = anthropic.RateLimitError("rate limited", response=response, body=None)
+    raw = MagicMock()
+    raw.headers = {}
+    raw.parse.return_value = _message("ok")
+    agent._client.messages.with_raw_response.create = AsyncMock(side_effect=[error, raw])
+
+    with patch("src.services.llm_agent.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+        text = await agent._call_claude_with_retry(messages=[{"role": "user", "content": "x"}])
+
+    assert text == "ok"
+    limiter.penalize.assert_awaited_once_with(3.0)
+    mock_sleep.assert_awaited_once_with(3.0)
+    assert limiter.acquire.await_count == 2
+
+
+@pytest.mark.parametrize("priority", [PRIORITY_LOW, PRIORITY_NORMAL])
+async def test_acquire_admits_request_larger_than_reserve_headroom(priority: str) -> None:
+    """TPM에서 예약분을 뺀 것보다 큰 요청도 버킷이 가득 차 있으면 통과한다 (무한 대기 회귀)."""
+    fakeredis = pytest.importorskip("fakeredis")
+    conn = fakeredis.FakeAsyncRedis()
+    rate_limiter = ClaudeRateLimiter(conn, rpm=50, tpm=30000, max_wait_sec=0.5)
+
+    with patch("src.services.llm_rate_limiter.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+        await rate_limiter.acquire(25000 if priority == PRIORITY_LOW else 29000, priority)
+
+    mock_sleep.assert_not_awaited()
+    assert float(await conn.hget("claude-ratelimit:bucket", "tok")) <= 5000
+
+
+async def test_acquire_gives_up_after_max_wait() -> None:
+    """총 대기가 상한을 넘으면 토큰 없이 진행한다 (fail-open)."""
+    conn = MagicMock()
+    conn.register_script.return_value = AsyncMock(return_value=60000)
+    rate_limiter = ClaudeRateLimiter(conn, rpm=50, tpm=30000, max_wait_sec=10.0)
+
+    with patch("src.services.llm_rate_limiter.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+        await rate_limiter.acquire(1000, PRIORITY_LOW)
+
+    assert 0 < mock_sleep.await_count <= 5
@@ -0,0 +1,209 @@
+"""LLMVerdictCache 단위 테스트 — finding 지문 기준 LLM 판정 캐시
+
+실제 Redis 대신 메모리 기반 가짜 클라이언트를 주입하여
+캐시 히트 시 판정 분석 미호출(패치만 재생성), 룰셋/모델 변경 시 무효화, 저장소 간 격리,
+고객 코드(패치) 미저장을 검증한다.
+"""
+
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.services.llm_agent import LLMAgent
+from src.services.llm_verdict_cache import LLMVerdictCache, finding_fingerprint
+from src.services.semgrep_engine import SemgrepFinding
+
+
+class FakePipeline:
+    def __init__(self, store: dict) -> None:
+        self._store = store
+        self._ops: list = []
+
+    def set(self, key, value, ex=None):
+        self._ops.append((key, value))
+
+    async def execute(self):
+        for key, value in self._ops:
+            self._store[key] = value
+        return [True] * len(self._ops)
+
+
+class FakeRedis:
+    """테스트용 메모리 기반 Redis."""
+
+    def __init__(self) -> None:
+        self.store: dict[str, str] = {}
+
+    async def mget(self, keys):
+        return [self.store.get(k) for k in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self.store)
+
+
+_CODE = '''import sqlite3
+
+def get_user(user_id):
+    conn = sqlite3.connect("app.db")
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT * FROM users WHERE id = {user_id}")
+    return cursor.fetchone()
+'''
+
+_ANALYSIS = json.dumps({
+    "results": [
+        {
+            "rule_id": "vulnix.python.sql_injection.string_format",
+            "is_true_positive": True,
+            "confidence": 0.95,
+            "severity": "High",
+            "reasoning": "사용자 입력이 SQL 쿼리에 직접 삽입됨",
+            "owasp_category": "A03:2021 - Injection",
+            "vulnerability_type": "sql_injection",
+        }
+    ]
+})
+
+_PATCH = json.dumps({"patch_diff": "--- a/app/db.py\n+++ b/app/db.py\n", "patch_description": ""})
+
+
+def _finding(line: int = 6) -> SemgrepFinding:
+    return SemgrepFinding(
+        rule_id="vulnix.python.sql_injection.string_format",
+        severity="ERROR",
+        file_path="app/db.py",
+        start_line=line,
+        end_line=line,
+        code_snippet='cursor.execute(f"SELECT * FROM users WHERE id = {user_id}")',
+        message="SQL Injection",
+        cwe=["CWE-89"],
+    )
+
+
+def _message(text: str) -> MagicMock:
+    msg = MagicMock()
+    msg.content = [MagicMock(text=text)]
+    return msg
+
+
+def _agent(cache: LLMVerdictCache, responses: list[str]) -> LLMAgent:
+    agent = LLMAgent(verdict_cache=cache)
+    agent._client = MagicMock()
+    agent._client.messages = MagicMock()
+    agent._client.messages.create = AsyncMock(side_effect=[_message(r) for r in responses])
+    return agent
+
+
+def test_fingerprint_ignores_whitespace_and_line_shift() -> None:
+    """공백 차이와 라인 이동은 지문에 영향을 주지 않는다."""
+    lines = _CODE.split("\n")
+    shifted = ["", ""] + [line.replace("    ", "        ") for line in lines]
+
+    assert finding_fingerprint(_finding(6), lines) == finding_fingerprint(_finding(8), shifted)
+
+
+def test_fingerprint_changes_with_context() -> None:
+    """주변 코드가 바뀌면 지문이 달라진다."""
+    lines = _CODE.split("\n")
+    changed = list(lines)
+    changed[4] = "    cursor = get_safe_cursor(conn)"
+
+    assert finding_fingerprint(_finding(), lines) != finding_fingerprint(_finding(), changed)
+
+
+async def test_repeat_analysis_reuses_verdict_and_regenerates_patch() -> None:
+    """같은 코드의 같은 finding은 판정 분석을 다시 호출하지 않고 패치만 다시 생성한다."""
+    cache = LLMVerdictCache(FakeRedis(), ttl_seconds=60, model="m1", scope="repo-1", ruleset_hash="r1")
+
+    first = _agent(cache, [_ANALYSIS, _PATCH])
+    results1 = await first.analyze_findings(_CODE, "app/db.py", [_finding()])
+    assert first._client.messages.create.await_count == 2
+
+    second = _agent(cache, [_PATCH])
+    results2 = await second.analyze_findings(_CODE, "app/db.py", [_finding()])
+
+    assert second._client.messages.create.await_count == 1
+    assert results2 == results1
+    assert results2[0].patch_diff is not None
+
+
+async def test_false_positive_hit_makes_no_claude_call() -> None:
+    """false_positive 판정이 히트하면 Claude를 호출하지 않는다."""
+    cache = LLMVerdictCache(FakeRedis(), ttl_seconds=60, model="m1", scope="repo-1", ruleset_hash="r1")
+    false_positive = _ANALYSIS.replace('"is_true_positive": true', '"is_true_positive": false')
+    await _agent(cache, [false_positive]).analyze_findings(_CODE, "app/db.py", [_finding()])
+
+    agent = _agent(cache, [])
+    results = await agent.analyze_findings(_CODE, "app/db.py", [_finding()])
+
+    agent._client.messages.create.assert_not_awaited()
+    assert results[0].is_true_positive is False
+
+
+async def test_cache_stores_verdict_without_customer_code() -> None:
+    """패치 / 테스트 코드 등 고객 코드가 담기는 필드는 캐시에 저장하지 않는다 (ADR-003)."""
+    redis_conn = FakeRedis()
+    cache = LLMVerdictCache(redis_conn, ttl_seconds=60, model="m1", scope="repo-1", ruleset_hash="r1")
+    await _agent(cache, [_ANALYSIS, _PATCH]).analyze_findings(_CODE, "app/db.py", [_finding()])
+
+    [value] = redis_conn.store.values()
+    entry = json.loads(value)
+    assert entry["is_true_positive"] is True
+    assert "patch_diff" not in entry
+    assert "test_suggestion" not in entry
+    assert "a/app/db.py" not in value
+
+
+@pytest.mark.parametrize("model, ruleset", [("m2", "r1"), ("m1", "r2")])
+async def test_model_or_ruleset_change_invalidates(model: str, ruleset: str) -> None:
+    """CLAUDE_MODEL 또는 룰셋이 바뀌면 이전 판정을 사용하지 않는다."""
+    redis_conn = FakeRedis()
+    cache = LLMVerdictCache(redis_conn, ttl_seconds=60, model="m1", scope="repo-1", ruleset_hash="r1")
+    await _agent(cache, [_ANALYSIS, _PATCH]).analyze_findings(_CODE, "app/db.py", [_finding()])
+
+    other = LLMVerdictCache(redis_conn, ttl_seconds=60, model=model, scope="repo-1", ruleset_hash=ruleset)
+    agent = _agent(other, [_ANALYSIS, _PATCH])
+    await agent.analyze_findings(_CODE, "app/db.py", [_finding()])
+
+    assert agent._client.messages.create.await_count == 2
+
+
+async def test_moved_finding_regenerates_patch_only() -> None:
+    """코드가 이동한 경우 판정은 재사용하고 패치만 다시 생성한다."""
+    cache = LLMVerdictCache(FakeRedis(), ttl_seconds=60, model="m1", scope="repo-1", ruleset_hash="r1")
+    await _agent(cache, [_ANALYSIS, _PATCH]).analyze_findings(_CODE, "app/db.py", [_finding()])
+
+    moved_code = "\n\n" + _CODE
+    agent = _agent(cache, [_PATCH])
+    results = await agent.analyze_findings(moved_code, "app/db.py", [_finding(8)])
+
+    assert agent._client.messages.create.await_count == 1
+    assert results[0].is_true_positive is True
+
+
+async def test_verdicts_are_not_shared_across_repositories() -> None:
+    """다른 저장소(scope)의 스캔은 판정 / 근거 / 패치를 재사용하지 않는다."""
+    redis_conn = FakeRedis()
+    cache = LLMVerdictCache(redis_conn, ttl_seconds=60, model="m1", scope="repo-1", ruleset_hash="r1")
+    await _agent(cache, [_ANALYSIS, _PATCH]).analyze_findings(_CODE, "app/db.py", [_finding()])
+
+    other = LLMVerdictCache(redis_conn, ttl_seconds=60, model="m1", scope="repo-2", ruleset_hash="r1")
+    agent = _agent(other, [_ANALYSIS, _PATCH])
+    await agent.analyze_findings(_CODE, "app/db.py", [_finding()])
+
+    assert agent._client.messages.create.await_count == 2
+
+
+async def test_failed_patch_is_retried_on_next_hit() -> None:
+    """패치 생성에 실패한 true_positive도 판정은 재사용하고, 다음 분석에서 패치만 다시 시도한다."""
+    cache = LLMVerdictCache(FakeRedis(), ttl_seconds=60, model="m1", scope="repo-1", ruleset_hash="r1")
+    no_patch = json.dumps({"patch_diff": None, "patch_description": ""})
+
+    results = await _agent(cache, [_ANALYSIS, no_patch]).analyze_findings(_CODE, "app/db.py", [_finding()])
+    assert results[0].patch_diff is None
+
+    agent = _agent(cache, [_PATCH])
+    results = await agent.analyze_findings(_CODE, "app/db.py", [_finding()])
+    assert agent._client.messages.create.await_count == 1
+    assert results[0].patch_diff is not None
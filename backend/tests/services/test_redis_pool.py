@@ -0,0 +1,63 @@
+"""공유 Redis 연결 풀 단위 테스트 — async 클라이언트 재사용, RQ 호환 잡 기록"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.services import redis_pool
+
+
+@pytest.fixture(autouse=True)
+def _reset_async_client():
+    redis_pool._async_client = None
+    yield
+    redis_pool._async_client = None
+
+
+async def test_async_client_is_shared_until_pool_stopped():
+    """요청마다 연결하지 않고 같은 클라이언트(풀)를 재사용하며, 종료 시 닫는다."""
+    client = AsyncMock()
+    with patch.object(redis_pool, "_create_async_client", return_value=client) as create:
+        await redis_pool.start_redis_pool()
+        assert redis_pool.get_async_redis() is client
+        assert redis_pool.get_async_redis() is client
+        await redis_pool.stop_redis_pool()
+
+    create.assert_called_once()
+    client.aclose.assert_awaited_once()
+
+
+async def test_enqueue_rq_job_writes_rq_job_hash_and_queue_entry():
+    """RQ Queue.enqueue()와 같은 키에 RQ가 직렬화한 잡 해시와 큐 항목을 한 파이프라인으로 기록한다."""
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    client = MagicMock()
+    client.pipeline.return_value = pipe
+    redis_pool._async_client = client
+
+    job = MagicMock(id="job-1", key="rq:job:job-1")
+    job.to_dict.return_value = {"origin": "reports", "status": "queued"}
+    queue = MagicMock(key="rq:queue:reports")
+
+    with (
+        patch.object(redis_pool, "get_sync_redis", return_value=MagicMock()),
+        patch.object(redis_pool, "Queue", return_value=queue) as mock_queue_cls,
+        patch.object(redis_pool, "Job") as mock_job_cls,
+    ):
+        mock_queue_cls.redis_queues_keys = "rq:queues"
+        mock_job_cls.create.return_value = job
+        job_id = await redis_pool.enqueue_rq_job(
+            "reports", "src.workers.report_worker.generate_report_task",
+            kwargs={"report_id": "r-1"}, job_id="job-1",
+        )
+
+    assert job_id == "job-1"
+    create_kwargs = mock_job_cls.create.call_args.kwargs
+    assert create_kwargs["kwargs"] == {"report_id": "r-1"}
+    assert create_kwargs["origin"] == "reports"
+    pipe.sadd.assert_called_once_with("rq:queues", "rq:queue:reports")
+    pipe.hset.assert_called_once_with(
+        "rq:job:job-1", mapping={"origin": "reports", "status": "queued"}
+    )
+    pipe.rpush.assert_called_once_with("rq:queue:reports", "job-1")
+    pipe.execute.assert_awaited_once()
@@ -0,0 +1,55 @@
+"""RuleRegistry 단위 테스트 — 룰 팩 언어 / 룰 ID / 해시 색인"""
+
+from pathlib import Path
+
+from src.services.rule_registry import RuleRegistry, get_rule_registry, language_for_path
+
+
+def _write_pack(rules_dir: Path, relative: str, rule_id: str, languages: str) -> None:
+    path = rules_dir / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        "rules:\n"
+        f"  - id: {rule_id}\n"
+        f"    languages: {languages}\n"
+        "    severity: ERROR\n"
+        "    message: m\n"
+        "    pattern: eval(...)\n"
+    )
+
+
+def test_registry_indexes_packs_by_language_and_rule_id(tmp_path) -> None:
+    _write_pack(tmp_path, "python/eval.yml", "vulnix.python.eval", "[python]")
+    _write_pack(tmp_path, "javascript/eval.yml", "vulnix.javascript.eval", "[javascript, typescript]")
+
+    registry = RuleRegistry(tmp_path)
+
+    assert registry.languages == {"python", "javascript", "typescript"}
+    assert [p.relative_path for p in registry.packs_for_files(["src/app.tsx"])] == ["javascript/eval.yml"]
+    assert [p.relative_path for p in registry.packs_for_files(["a.py", "README.md"])] == ["python/eval.yml"]
+    assert registry.packs_for_files(["README.md"]) == []
+    assert registry.pack_for_rule("vulnix.python.eval").relative_path == "python/eval.yml"
+    assert registry.pack_for_rule("unknown") is None
+
+
+def test_extension_hash_changes_only_with_its_language_packs(tmp_path) -> None:
+    """다른 언어 룰 팩이 바뀌어도 확장자별 해시는 유지되고, 전체 룰셋 해시는 바뀐다."""
+    _write_pack(tmp_path, "python/eval.yml", "vulnix.python.eval", "[python]")
+    _write_pack(tmp_path, "go/eval.yml", "vulnix.go.eval", "[go]")
+    before = RuleRegistry(tmp_path)
+
+    _write_pack(tmp_path, "go/eval.yml", "vulnix.go.eval_v2", "[go]")
+    after = RuleRegistry(tmp_path)
+
+    assert after.hash_for_extension(".py") == before.hash_for_extension(".py")
+    assert after.hash_for_extension(".go") != before.hash_for_extension(".go")
+    assert after.ruleset_hash != before.ruleset_hash
+
+
+def test_builtin_rules_cover_every_rule_pack_language() -> None:
+    """기본 룰 디렉토리의 모든 룰 언어는 확장자 매핑이 있다."""
+    registry = get_rule_registry()
+
+    assert registry.packs
+    assert registry.languages == {"python", "javascript", "typescript", "java", "go"}
+    assert language_for_path("cmd/main.GO") == "go"
@@ -0,0 +1,62 @@
+"""ScanCancellation 단위 테스트 — Redis 취소 플래그 기반 협조적 취소"""
+
+from unittest.mock import MagicMock
+
+import pytest
+import redis
+
+from src.services.scan_cancellation import (
+    CANCEL_FLAG_TTL_SECONDS,
+    ScanCancellation,
+    ScanCancelledError,
+    cancel_key,
+    request_cancel,
+)
+
+
+def test_request_cancel_sets_flag_with_ttl():
+    """취소 요청은 잡별 플래그를 TTL과 함께 설정한다."""
+    redis_conn = MagicMock()
+
+    request_cancel(redis_conn, "job-1")
+
+    redis_conn.set.assert_called_once_with(
+        cancel_key("job-1"), 1, ex=CANCEL_FLAG_TTL_SECONDS
+    )
+
+
+def test_cancellation_polls_redis_once_per_interval():
+    """poll_interval 안에서는 Redis를 다시 조회하지 않는다."""
+    redis_conn = MagicMock()
+    redis_conn.exists.return_value = 0
+    cancellation = ScanCancellation(redis_conn, "job-1", poll_interval=60.0)
+
+    assert cancellation.is_cancelled() is False
+    assert cancellation.is_cancelled() is False
+
+    redis_conn.exists.assert_called_once_with(cancel_key("job-1"))
+
+
+def test_cancellation_is_sticky_once_cancelled():
+    """한 번 취소가 확인되면 이후 조회 없이 계속 취소 상태다."""
+    redis_conn = MagicMock()
+    redis_conn.exists.return_value = 1
+    cancellation = ScanCancellation(redis_conn, "job-1", poll_interval=0.0)
+
+    with pytest.raises(ScanCancelledError):
+        cancellation.raise_if_cancelled()
+    redis_conn.exists.return_value = 0
+
+    assert cancellation.is_cancelled() is True
+    assert redis_conn.exists.call_count == 1
+
+
+def test_cancellation_fails_open_on_redis_error():
+    """Redis 조회 실패 시 취소되지 않은 것으로 보고 스캔을 계속한다."""
+    redis_conn = MagicMock()
+    redis_conn.exists.side_effect = redis.ConnectionError("down")
+    cancellation = ScanCancellation(redis_conn, "job-1", poll_interval=0.0)
+
+    cancellation.raise_if_cancelled()
+
+    assert cancellation.is_cancelled() is False
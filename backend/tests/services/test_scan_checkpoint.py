@@ -0,0 +1,154 @@
+"""ScanCheckpoint 단위 테스트 — 재시도 시 이어서 실행할 스캔 단계 결과
+
+실제 Redis 대신 메모리 기반 가짜 클라이언트를 주입하여
+detect / 파일별 LLM 결과의 저장·복원, 커밋 불일치 무시, Redis 오류 시 체크포인트 없음 처리를 검증한다.
+"""
+
+import dataclasses
+from unittest.mock import AsyncMock
+
+from src.services.llm_agent import LLMAnalysisResult
+from src.services.scan_checkpoint import DetectionCheckpoint, ScanCheckpoint, restore_code_snippets
+from src.services.semgrep_engine import SemgrepFinding
+
+
+class FakePipeline:
+    def __init__(self, redis: "FakeRedis") -> None:
+        self._redis = redis
+        self._ops: list = []
+
+    def set(self, key, value, ex=None):
+        self._ops.append(lambda: self._redis.strings.__setitem__(key, value))
+
+    def delete(self, key):
+        self._ops.append(lambda: self._redis.hashes.pop(key, None))
+
+    def hset(self, key, field, value):
+        self._ops.append(lambda: self._redis.hashes.setdefault(key, {}).__setitem__(field, value))
+
+    def expire(self, key, ttl):
+        pass
+
+    async def execute(self):
+        for op in self._ops:
+            op()
+
+
+class FakeRedis:
+    """테스트용 메모리 기반 Redis (문자열 / 해시만)."""
+
+    def __init__(self) -> None:
+        self.strings: dict[str, str] = {}
+        self.hashes: dict[str, dict[str, str]] = {}
+
+    async def get(self, key):
+        return self.strings.get(key)
+
+    async def hgetall(self, key):
+        return {k.encode(): v.encode() for k, v in self.hashes.get(key, {}).items()}
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.strings.pop(key, None)
+            self.hashes.pop(key, None)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+def _finding(file_path: str = "app/db.py") -> SemgrepFinding:
+    return SemgrepFinding(
+        rule_id="vulnix.python.sql_injection.string_format",
+        severity="ERROR",
+        file_path=file_path,
+        start_line=5,
+        end_line=5,
+        code_snippet='cursor.execute(f"SELECT * FROM users WHERE id={user_id}")',
+        message="SQL Injection 취약점 탐지",
+        cwe=["CWE-89"],
+    )
+
+
+def _result() -> LLMAnalysisResult:
+    return LLMAnalysisResult(
+        finding_id="vulnix.python.sql_injection.string_format",
+        is_true_positive=True,
+        confidence=0.9,
+        severity="High",
+        reasoning="사용자 입력이 SQL 쿼리에 직접 삽입됨",
+        patch_diff=None,
+        patch_description="",
+    )
+
+
+async def test_detection_and_llm_results_round_trip():
+    """저장한 findings(코드 조각 제외)와 파일별 LLM 결과를 재시도에서 복원한다."""
+    checkpoint = ScanCheckpoint(FakeRedis(), "job-1", ttl_seconds=60)
+
+    await checkpoint.save_detection(DetectionCheckpoint(
+        commit_sha="abc", findings=[_finding()], auto_filtered_count=2, files_scanned=10,
+    ))
+    await checkpoint.save_file_results("app/db.py", [_result()])
+
+    detection = await checkpoint.load_detection("abc")
+    assert detection is not None
+    assert detection.findings == [dataclasses.replace(_finding(), code_snippet="")]
+    assert detection.auto_filtered_count == 2
+    assert detection.files_scanned == 10
+    assert await checkpoint.load_llm_results() == {"app/db.py": [_result()]}
+
+
+async def test_code_snippets_and_patches_are_not_stored(tmp_path):
+    """코드 조각과 패치 diff는 저장하지 않고, 코드 조각은 내려받은 파일에서 다시 읽는다 (ADR-003)."""
+    redis = FakeRedis()
+    checkpoint = ScanCheckpoint(redis, "job-1", ttl_seconds=60)
+    patched = dataclasses.replace(_result(), patch_diff="--- a/app/db.py\n+++ b/app/db.py\n-bad\n+good")
+
+    await checkpoint.save_detection(DetectionCheckpoint(commit_sha="abc", findings=[_finding()]))
+    await checkpoint.save_file_results("app/db.py", [patched])
+
+    stored = "".join(redis.strings.values()) + "".join(
+        value for fields in redis.hashes.values() for value in fields.values()
+    )
+    assert "cursor.execute" not in stored
+    assert "+good" not in stored
+    assert await checkpoint.load_llm_results() == {"app/db.py": [_result()]}
+
+    detection = await checkpoint.load_detection("abc")
+    assert detection.findings[0].code_snippet == ""
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / "db.py").write_text("import db\n" * 4 + "cursor.execute(query)\n")
+    restore_code_snippets(detection.findings, tmp_path)
+    assert detection.findings[0].code_snippet == "cursor.execute(query)"
+
+
+async def test_detection_for_other_commit_is_ignored():
+    """다른 커밋의 체크포인트는 사용하지 않는다 (push 스캔 병합 등)."""
+    checkpoint = ScanCheckpoint(FakeRedis(), "job-1", ttl_seconds=60)
+    await checkpoint.save_detection(DetectionCheckpoint(commit_sha="abc", findings=[_finding()]))
+
+    assert await checkpoint.load_detection("def") is None
+
+
+async def test_new_detection_drops_stale_llm_results_and_clear_removes_all():
+    """detect를 새로 저장하면 이전 LLM 결과를 지우고, clear()는 모든 단계를 지운다."""
+    redis = FakeRedis()
+    checkpoint = ScanCheckpoint(redis, "job-1", ttl_seconds=60)
+    await checkpoint.save_file_results("app/db.py", [_result()])
+
+    await checkpoint.save_detection(DetectionCheckpoint(commit_sha="abc", findings=[_finding()]))
+    assert await checkpoint.load_llm_results() == {}
+
+    await checkpoint.clear()
+    assert await checkpoint.load_detection("abc") is None
+
+
+async def test_redis_errors_are_treated_as_no_checkpoint():
+    """Redis 오류는 체크포인트 없음으로 처리하여 스캔을 계속한다."""
+    redis = AsyncMock()
+    redis.get.side_effect = ConnectionError("down")
+    redis.hgetall.side_effect = ConnectionError("down")
+    checkpoint = ScanCheckpoint(redis, "job-1", ttl_seconds=60)
+
+    assert await checkpoint.load_detection("abc") is None
+    assert await checkpoint.load_llm_results() == {}
@@ -0,0 +1,30 @@
+"""ScanJobEnvelope 단위 테스트 — Redis에 넣는 스캔 잡 봉투 직렬화"""
+
+import json
+
+import pytest
+
+from src.services.scan_job_envelope import SCAN_JOB_ENVELOPE_VERSION, ScanJobEnvelope
+
+
+def test_envelope_round_trip_carries_only_identifiers() -> None:
+    """봉투는 스키마 버전과 식별자만 담은 JSON으로 직렬화된다."""
+    envelope = ScanJobEnvelope(job_id="job-1", team_id=None, lane="bulk")
+
+    raw = envelope.encode()
+
+    assert json.loads(raw) == {
+        "v": SCAN_JOB_ENVELOPE_VERSION,
+        "job_id": "job-1",
+        "team_id": None,
+        "lane": "bulk",
+    }
+    assert ScanJobEnvelope.decode(raw.encode()) == envelope
+
+
+def test_decode_rejects_unknown_version() -> None:
+    """워커가 모르는 봉투 버전은 추측해서 처리하지 않는다."""
+    raw = json.dumps({"v": SCAN_JOB_ENVELOPE_VERSION + 1, "job_id": "job-1", "lane": "standard"})
+
+    with pytest.raises(ValueError):
+        ScanJobEnvelope.decode(raw)
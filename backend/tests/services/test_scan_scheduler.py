@@ -0,0 +1,146 @@
+"""FairScanScheduler 단위 테스트 — 우선순위 레인 + 팀별 공정 스케줄링
+
+Redis Lua 스크립트 자체는 실제 Redis가 필요하므로, 여기서는 레인 결정,
+플랜 가중치, 스크립트 결과에 따른 RQ 큐 등록을 검증한다.
+"""
+
+import json
+from dataclasses import asdict
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.services.scan_job_envelope import ScanJobEnvelope
+from src.services.scan_orchestrator import ScanJobMessage
+from src.services.scan_scheduler import (
+    LANE_BULK,
+    LANE_INTERACTIVE,
+    LANE_QUEUES,
+    LANE_STANDARD,
+    FairScanScheduler,
+    lane_for_scan,
+    team_weight,
+)
+
+
+def _message(job_id: str = "job-1", trigger: str = "webhook", scan_type: str = "pr") -> ScanJobMessage:
+    return ScanJobMessage(
+        job_id=job_id,
+        repo_id="bbbbbbbb-bbbb-bbbb-bbbb-bbbbbbbbbbbb",
+        trigger=trigger,
+        commit_sha=None,
+        branch="main",
+        pr_number=7,
+        scan_type=scan_type,
+        changed_files=None,
+        created_at="2026-02-25T00:00:00Z",
+        team_id="team-a",
+    )
+
+
+@pytest.mark.parametrize(
+    ("trigger", "scan_type", "lane"),
+    [
+        ("webhook", "pr", LANE_INTERACTIVE),
+        ("manual", "full", LANE_INTERACTIVE),
+        ("webhook", "incremental", LANE_STANDARD),
+        ("webhook", "initial", LANE_BULK),
+        ("manual", "initial", LANE_BULK),
+        ("schedule", "full", LANE_BULK),
+    ],
+)
+def test_lane_for_scan(trigger: str, scan_type: str, lane: str) -> None:
+    """PR / 수동 스캔은 interactive, push는 standard, initial / 예약 스캔은 bulk 레인."""
+    assert lane_for_scan(trigger, scan_type) == lane
+
+
+def test_team_weight_defaults_to_one_for_unknown_plan() -> None:
+    weights = {"starter": 1, "enterprise": 8}
+
+    assert team_weight("enterprise", weights) == 8
+    assert team_weight("legacy", weights) == 1
+    assert team_weight(None, weights) == 1
+
+
+@pytest.fixture
+def scheduler() -> FairScanScheduler:
+    with patch("src.services.scan_scheduler.Queue") as mock_queue_cls:
+        mock_queue_cls.side_effect = lambda name, connection: MagicMock(name=name)
+        sched = FairScanScheduler(
+            MagicMock(), team_max_concurrent=2, lane_max_inflight=4, slot_ttl_seconds=600
+        )
+    return sched
+
+
+def test_pump_enqueues_dispatched_jobs_on_lane_queue(scheduler: FairScanScheduler) -> None:
+    """스크립트가 꺼낸 잡은 해당 레인의 RQ 큐에 run_scan으로 등록되고, nil이면 다음 레인으로 넘어간다."""
+    message = _message()
+    envelope = ScanJobEnvelope(message.job_id, message.team_id, LANE_INTERACTIVE).encode()
+    scheduler._dispatch = MagicMock(side_effect=[envelope.encode(), None, None, None])
+
+    assert scheduler.pump() == 1
+
+    queue = scheduler._queues[LANE_INTERACTIVE]
+    queue.enqueue.assert_called_once()
+    call = queue.enqueue.call_args
+    assert call.args[0] == "src.workers.scan_worker.run_scan"
+    assert call.kwargs["args"] == (envelope,)
+    assert call.kwargs["job_id"] == message.job_id
+    scheduler._queues[LANE_BULK].enqueue.assert_not_called()
+    # 레인 우선순위 순서로 확인
+    lanes = [c.kwargs["keys"][0] for c in scheduler._dispatch.call_args_list]
+    assert lanes == [
+        "vulnix:sched:interactive:teams",
+        "vulnix:sched:interactive:teams",
+        "vulnix:sched:standard:teams",
+        "vulnix:sched:bulk:teams",
+    ]
+
+
+def test_pump_converts_legacy_pending_payload_to_envelope(scheduler: FairScanScheduler) -> None:
+    """봉투 도입 전에 대기 목록에 들어간 잡(메시지 전체)도 봉투로 바꿔 등록한다."""
+    message = _message()
+    payload = json.dumps({"job_id": message.job_id, "message": asdict(message)})
+    scheduler._dispatch = MagicMock(side_effect=[payload.encode(), None, None, None])
+
+    scheduler.pump()
+
+    call = scheduler._queues[LANE_INTERACTIVE].enqueue.call_args
+    (envelope,) = call.kwargs["args"]
+    assert ScanJobEnvelope.decode(envelope) == ScanJobEnvelope("job-1", "team-a", LANE_INTERACTIVE)
+
+
+def test_submit_pushes_to_team_pending_list(scheduler: FairScanScheduler) -> None:
+    """submit은 레인 / 팀 대기 목록 키와 가중치로 등록 스크립트를 호출하고 pump한다."""
+    scheduler._submit = MagicMock()
+    scheduler._dispatch = MagicMock(return_value=None)
+
+    lane = scheduler.submit(_message(scan_type="initial"), team_id="team-a", weight=4)
+
+    assert lane == LANE_BULK
+    keys = scheduler._submit.call_args.kwargs["keys"]
+    args = scheduler._submit.call_args.kwargs["args"]
+    assert keys[2] == "vulnix:sched:bulk:pending:team-a"
+    assert args[0] == "team-a"
+    assert args[2] == 4
+    # 대기 목록에는 식별자만 담은 봉투가 들어간다
+    assert ScanJobEnvelope.decode(args[1]) == ScanJobEnvelope("job-1", "team-a", LANE_BULK)
+    assert scheduler._dispatch.called
+
+
+def test_release_frees_team_and_lane_slots(scheduler: FairScanScheduler) -> None:
+    """release는 팀 running / 레인 in-flight에서 잡을 빼고 pump한다."""
+    scheduler._dispatch = MagicMock(return_value=None)
+    pipe = scheduler._redis.pipeline.return_value
+
+    scheduler.release("job-1", team_id="team-a", lane=LANE_STANDARD)
+
+    pipe.zrem.assert_any_call("vulnix:sched:running:team-a", "job-1")
+    pipe.zrem.assert_any_call("vulnix:sched:standard:inflight", "job-1")
+    pipe.execute.assert_called_once()
+    assert scheduler._dispatch.called
+
+
+def test_lane_queue_names() -> None:
+    """standard 레인은 기존 scans 큐를 그대로 사용한다 (배포 중 큐에 남은 잡 처리)."""
+    assert LANE_QUEUES[LANE_STANDARD] == "scans"
@@ -0,0 +1,49 @@
+"""ScanTelemetry 단위 테스트 — 스캔 단계별 텔레메트리 수집"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.services.llm_agent import LLMUsage
+from src.services.scan_telemetry import TELEMETRY_VERSION, ScanTelemetry
+
+
+def test_stage_accumulates_elapsed_seconds() -> None:
+    """같은 단계를 여러 번 실행하면 소요 시간이 누적된다."""
+    telemetry = ScanTelemetry()
+
+    with patch("src.services.scan_telemetry.time.monotonic", side_effect=[10.0, 11.5, 20.0, 20.25]):
+        with telemetry.stage("semgrep"):
+            pass
+        with telemetry.stage("semgrep"):
+            pass
+
+    assert telemetry.stages == {"semgrep": 1.75}
+
+
+def test_stage_records_duration_on_error() -> None:
+    """단계에서 예외가 나도 실패 시점까지의 소요 시간을 기록한다."""
+    telemetry = ScanTelemetry()
+
+    with pytest.raises(RuntimeError):
+        with telemetry.stage("clone"):
+            raise RuntimeError("download failed")
+
+    assert "clone" in telemetry.stages
+
+
+def test_to_dict_is_json_serializable() -> None:
+    """Mock 객체가 섞여도 JSONB에 저장 가능한 숫자만 남긴다."""
+    telemetry = ScanTelemetry()
+    telemetry.record_clone(MagicMock())
+    telemetry.record_llm_usage(MagicMock())
+    telemetry.record_llm_usage(LLMUsage(requests=4, output_tokens=120, retries=2))
+
+    data = json.loads(json.dumps(telemetry.to_dict()))
+
+    assert data["version"] == TELEMETRY_VERSION
+    assert data["downloaded_bytes"] == 0
+    assert data["llm"]["requests"] == 4
+    assert data["llm"]["output_tokens"] == 120
+    assert data["llm"]["retries"] == 2
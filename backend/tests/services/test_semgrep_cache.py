@@ -0,0 +1,260 @@
+"""SemgrepResultCache 단위 테스트 — (파일 해시, 룰셋 해시) 기준 결과 캐시
+
+실제 Redis 대신 메모리 기반 가짜 클라이언트를 주입하여
+캐시 히트/미스 분기, 코드 조각 미저장, Redis 오류 시 graceful degradation을 검증한다.
+"""
+
+import json
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.services.semgrep_cache import SemgrepResultCache, compute_ruleset_hash, content_hash
+from src.services.semgrep_engine import SemgrepFinding
+
+
+class FakePipeline:
+    def __init__(self, store: dict, fail: bool) -> None:
+        self._store = store
+        self._fail = fail
+        self._ops: list = []
+
+    def getex(self, key, ex=None):
+        self._ops.append(lambda: self._store.get(key))
+
+    def set(self, key, value, ex=None):
+        self._ops.append(lambda: self._store.__setitem__(key, value))
+
+    async def execute(self):
+        if self._fail:
+            raise ConnectionError("redis down")
+        return [op() for op in self._ops]
+
+
+class FakeRedis:
+    """테스트용 메모리 기반 Redis."""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.store: dict[str, str] = {}
+        self.fail = fail
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self.store, self.fail)
+
+
+def _finding(file_path: str, line: int = 2) -> SemgrepFinding:
+    return SemgrepFinding(
+        rule_id="vulnix.python.sql_injection.string_format",
+        severity="ERROR",
+        file_path=file_path,
+        start_line=line,
+        end_line=line,
+        code_snippet='cursor.execute(f"SELECT {uid}")',
+        message="SQL Injection",
+        cwe=["CWE-89"],
+    )
+
+
+@pytest.fixture
+def repo_dir(tmp_path: Path) -> Path:
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / "db.py").write_text(
+        'import db\ncursor.execute(f"SELECT {uid}")\n', encoding="utf-8"
+    )
+    (tmp_path / "app" / "util.py").write_text("x = 1\n", encoding="utf-8")
+    (tmp_path / "README.md").write_text("# readme\n", encoding="utf-8")
+    return tmp_path
+
+
+def test_ruleset_hash_is_stable() -> None:
+    """같은 룰 디렉토리는 같은 해시를 반환한다."""
+    assert compute_ruleset_hash() == compute_ruleset_hash()
+    assert len(compute_ruleset_hash()) == 16
+
+
+async def test_first_scan_runs_semgrep_and_stores_without_source(repo_dir: Path) -> None:
+    """캐시가 비어 있으면 원래 호출대로 Semgrep을 실행하고, 코드 조각 없이 저장한다."""
+    redis_conn = FakeRedis()
+    cache = SemgrepResultCache(redis_conn, ttl_seconds=60, ruleset_hash="r1")
+    engine = MagicMock()
+    engine.iter_scan.return_value = [_finding("app/db.py")]
+
+    findings = await cache.scan(engine, repo_dir, "job-1")
+
+    engine.iter_scan.assert_called_once_with(repo_dir, "job-1", target_files=None)
+    assert len(findings) == 1
+    # 스캔 대상 파일 2개(db.py, util.py) 모두 저장 — finding 없는 파일은 빈 목록
+    assert len(redis_conn.store) == 2
+    for value in redis_conn.store.values():
+        assert "cursor.execute" not in value
+    assert [] in [json.loads(v) for v in redis_conn.store.values()]
+
+
+async def test_second_scan_hits_cache_and_rebuilds_snippet(repo_dir: Path) -> None:
+    """변경 없는 파일은 Semgrep 없이 캐시 결과를 반환하고, 코드 조각은 파일에서 다시 읽는다."""
+    cache = SemgrepResultCache(FakeRedis(), ttl_seconds=60, ruleset_hash="r1")
+    engine = MagicMock()
+    engine.iter_scan.return_value = [_finding("app/db.py")]
+    await cache.scan(engine, repo_dir, "job-1")
+
+    engine.iter_scan.reset_mock()
+    findings = await cache.scan(engine, repo_dir, "job-2")
+
+    engine.iter_scan.assert_not_called()
+    assert len(findings) == 1
+    assert findings[0].file_path == "app/db.py"
+    assert findings[0].code_snippet == 'cursor.execute(f"SELECT {uid}")'
+    assert findings[0].cwe == ["CWE-89"]
+
+
+async def test_changed_file_only_is_rescanned(repo_dir: Path) -> None:
+    """내용이 바뀐 파일만 Semgrep에 넘긴다."""
+    cache = SemgrepResultCache(FakeRedis(), ttl_seconds=60, ruleset_hash="r1")
+    engine = MagicMock()
+    engine.iter_scan.return_value = [_finding("app/db.py")]
+    await cache.scan(engine, repo_dir, "job-1")
+
+    (repo_dir / "app" / "util.py").write_text("y = 2\n", encoding="utf-8")
+    engine.iter_scan.reset_mock()
+    engine.iter_scan.return_value = []
+    findings = await cache.scan(engine, repo_dir, "job-2")
+
+    engine.iter_scan.assert_called_once_with(repo_dir, "job-2", target_files=["app/util.py"])
+    assert [f.file_path for f in findings] == ["app/db.py"]
+
+
+async def test_failed_shard_files_are_not_cached(repo_dir: Path) -> None:
+    """타임아웃으로 건너뛴 샤드의 파일은 "클린"으로 캐시하지 않고 다음 스캔에서 다시 스캔한다."""
+    from unittest.mock import patch
+
+    from src.services.semgrep_engine import SemgrepEngine, SemgrepTimeoutError, ShardConfig
+
+    cache = SemgrepResultCache(FakeRedis(), ttl_seconds=60, ruleset_hash="r1")
+    engine = SemgrepEngine(
+        max_jobs=2,
+        shard_config=ShardConfig(min_files=2, target_bytes=1_000_000, timeout_seconds=30, max_retries=0),
+    )
+
+    def fake_cli(cmd, cpu_ids=None, timeout=600):
+        files = [c for c in cmd if c.endswith(".py")]
+        if any(f.endswith("util.py") for f in files):
+            raise SemgrepTimeoutError("timeout")
+        return {"results": [], "errors": []}
+
+    with patch.object(engine, "_run_semgrep_cli", side_effect=fake_cli):
+        await cache.scan(engine, repo_dir, "job-1")
+    assert [Path(p).name for p in engine.last_failed_files] == ["util.py"]
+
+    engine.iter_scan = MagicMock(return_value=[])
+    await cache.scan(engine, repo_dir, "job-2")
+
+    engine.iter_scan.assert_called_once_with(repo_dir, "job-2", target_files=["app/util.py"])
+
+
+async def test_semgrep_errors_skip_caching(repo_dir: Path) -> None:
+    """Semgrep이 에러를 보고한 파일은 저장하지 않고, 출력이 불완전하면 아무것도 저장하지 않는다."""
+    redis_conn = FakeRedis()
+    cache = SemgrepResultCache(redis_conn, ttl_seconds=60, ruleset_hash="r1")
+    engine = MagicMock()
+    engine.iter_scan.return_value = []
+    engine.last_failed_files = []
+    engine.last_error_files = ["app/util.py"]
+    engine.last_output_incomplete = False
+
+    await cache.scan(engine, repo_dir, "job-1")
+    assert len(redis_conn.store) == 1
+
+    redis_conn.store.clear()
+    engine.last_error_files = []
+    engine.last_output_incomplete = True
+    await cache.scan(engine, repo_dir, "job-2")
+    assert redis_conn.store == {}
+
+
+async def test_ruleset_change_invalidates_cache(repo_dir: Path) -> None:
+    """룰셋 해시가 바뀌면 이전 캐시 항목을 사용하지 않는다."""
+    redis_conn = FakeRedis()
+    engine = MagicMock()
+    engine.iter_scan.return_value = []
+    await SemgrepResultCache(redis_conn, ruleset_hash="r1").scan(engine, repo_dir, "job-1")
+
+    engine.iter_scan.reset_mock()
+    await SemgrepResultCache(redis_conn, ruleset_hash="r2").scan(engine, repo_dir, "job-2")
+
+    engine.iter_scan.assert_called_once()
+
+
+async def test_redis_failure_falls_back_to_full_scan(repo_dir: Path) -> None:
+    """Redis 오류 시 전체 미스로 처리하여 스캔은 정상 진행한다."""
+    cache = SemgrepResultCache(FakeRedis(fail=True), ruleset_hash="r1")
+    engine = MagicMock()
+    engine.iter_scan.return_value = [_finding("app/db.py")]
+
+    findings = await cache.scan(engine, repo_dir, "job-1", target_files=["app/db.py"])
+
+    engine.iter_scan.assert_called_once_with(repo_dir, "job-1", target_files=["app/db.py"])
+    assert len(findings) == 1
+
+
+async def test_single_content_roundtrip() -> None:
+    """IDE 분석 경로: 내용 해시로 저장/조회한다."""
+    cache = SemgrepResultCache(FakeRedis(), ruleset_hash="r1")
+    content = 'import db\ncursor.execute(f"SELECT {uid}")\n'
+    blob_hash = content_hash(content.encode("utf-8"))
+
+    assert await cache.get_findings(blob_hash, ".py", "code.py", content) is None
+
+    await cache.put_findings(blob_hash, ".py", [_finding("code.py")])
+    cached = await cache.get_findings(blob_hash, ".py", "code.py", content)
+
+    assert cached is not None
+    assert cached[0].code_snippet == 'cursor.execute(f"SELECT {uid}")'
+    # 확장자(언어)가 다르면 별도 항목
+    assert await cache.get_findings(blob_hash, ".js", "code.js", content) is None
+
+
+async def test_ide_entry_hit_by_worker_still_reports_native_secrets(tmp_path: Path) -> None:
+    """IDE가 저장한 항목을 워커가 재사용해도 하드코딩 자격증명(CWE-798)은 빠지지 않는다."""
+    from src.services.secret_scanner import get_secret_scanner
+    from src.services.semgrep_engine import SemgrepEngine
+
+    content = 'import db\npassword = "hunter2!"\ncursor.execute(f"SELECT {uid}")\n'
+    (tmp_path / "settings.py").write_text(content, encoding="utf-8")
+    redis_conn = FakeRedis()
+    scanner = get_secret_scanner()
+
+    # IDE 분석: Semgrep 결과 + 내장 스캐너 결과를 같은 키 공간에 저장
+    ide_cache = SemgrepResultCache(redis_conn, ruleset_hash="r1", native_secrets=True)
+    secrets = scanner.scan_bytes(content.encode("utf-8"), "code.py")
+    assert secrets
+    await ide_cache.put_findings(
+        content_hash(content.encode("utf-8")), ".py", [_finding("code.py", line=3)] + secrets
+    )
+    # 자격증명 finding은 캐시에 저장하지 않는다
+    stored = [json.loads(v) for v in redis_conn.store.values()]
+    assert [item["rule_id"] for item in stored[0]] == ["vulnix.python.sql_injection.string_format"]
+
+    # 워커 스캔: 캐시 히트여도 자격증명은 내장 스캐너로 다시 검사
+    worker_cache = SemgrepResultCache(redis_conn, ruleset_hash="r1", native_secrets=True)
+    engine = SemgrepEngine(native_secrets=True)
+    engine.iter_scan = MagicMock(return_value=[])
+    findings = await worker_cache.scan(engine, tmp_path, "job-1")
+
+    engine.iter_scan.assert_not_called()
+    rule_ids = {f.rule_id for f in findings}
+    assert "vulnix.python.sql_injection.string_format" in rule_ids
+    assert rule_ids & scanner.finding_rule_ids
+    assert all(f.file_path == "settings.py" for f in findings)
+
+
+async def test_native_secrets_mode_is_part_of_key() -> None:
+    """내장 스캐너 설정이 바뀌면 다른 모드로 저장된 항목을 사용하지 않는다."""
+    redis_conn = FakeRedis()
+    blob_hash = content_hash(b"x = 1\n")
+    await SemgrepResultCache(redis_conn, ruleset_hash="r1", native_secrets=True).put_findings(
+        blob_hash, ".py", []
+    )
+
+    semgrep_only = SemgrepResultCache(redis_conn, ruleset_hash="r1", native_secrets=False)
+    assert await semgrep_only.get_findings(blob_hash, ".py", "code.py", "x = 1\n") is None
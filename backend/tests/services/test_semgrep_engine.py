@@ -11,6 +11,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+from src.services.rule_registry import RULES_DIR, semgrep_rule_id
 from src.services.semgrep_engine import SemgrepEngine, SemgrepFinding
 
 
@@ -24,6 +25,14 @@ def engine():
     return SemgrepEngine()
 
 
+@pytest.fixture
+def python_repo(tmp_path):
+    """Python 파일 1개가 있는 checkout 디렉토리 픽스처 (python 룰 팩 대상)."""
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / "db.py").write_text("x = 1\n")
+    return tmp_path
+
+
 @pytest.fixture
 def sql_injection_semgrep_output():
     """SQL Injection 1건을 포함한 Semgrep JSON 출력 픽스처."""
@@ -152,10 +161,10 @@ def multi_finding_semgrep_output():
 # scan() 테스트
 # ──────────────────────────────────────────────────────────────
 
-def test_run_scan_returns_findings(engine, sql_injection_semgrep_output):
+def test_run_scan_returns_findings(engine, python_repo, sql_injection_semgrep_output):
     """Semgrep 실행 시 SemgrepFinding 목록을 반환한다."""
     # Arrange
-    target_dir = Path("/tmp/vulnix-scan-test")
+    target_dir = python_repo
     job_id = "test-job-001"
 
     with patch("subprocess.run") as mock_run:
@@ -199,10 +208,10 @@ def test_run_scan_empty_result_returns_empty(engine):
     assert findings == []
 
 
-def test_run_scan_subprocess_failure_raises(engine):
+def test_run_scan_subprocess_failure_raises(engine, python_repo):
     """subprocess 실패(returncode >= 2) 시 RuntimeError를 발생시킨다."""
     # Arrange
-    target_dir = Path("/tmp/vulnix-scan-test-fail")
+    target_dir = python_repo
     job_id = "test-job-fail"
 
     with patch("subprocess.run") as mock_run:
@@ -353,6 +362,144 @@ def test_parse_results_no_cwe_metadata(engine):
     assert findings[0].cwe == []
 
 
+def test_scan_uses_allocated_core_count_for_jobs(tmp_path, sql_injection_semgrep_output):
+    """코어 할당기가 있으면 할당받은 코어 수만큼 --jobs를 지정하고 해당 코어에 고정한다."""
+    from src.services.cpu_allocator import CoreAllocator
+
+    (tmp_path / "db.py").write_text("x = 1\n")
+
+    with patch("src.services.cpu_allocator.available_cpu_ids", return_value=[0, 1, 2]):
+        allocator = CoreAllocator(lock_dir=tmp_path / "cores")
+    busy = allocator.try_acquire(1)   # 다른 스캔이 코어 1개 사용 중
+    engine = SemgrepEngine(core_allocator=allocator, max_jobs=4)
+
+    with patch.object(engine, "_run_semgrep_cli", return_value=sql_injection_semgrep_output) as mock_cli:
+        engine.scan(tmp_path, "job-1")
+
+    cmd = mock_cli.call_args.args[0]
+    assert cmd[cmd.index("--jobs") + 1] == "2"
+    assert mock_cli.call_args.kwargs["cpu_ids"] == [1, 2]
+    busy.release()
+
+
+# ──────────────────────────────────────────────────────────────
+# 샤딩 스캔 테스트
+# ──────────────────────────────────────────────────────────────
+
+def _write_files(base: Path, sizes: dict[str, int]) -> None:
+    for name, size in sizes.items():
+        (base / name).write_text("x" * size)
+
+
+def _result_for(path: str) -> dict:
+    return {
+        "check_id": "vulnix.python.sql_injection.string_format",
+        "path": path,
+        "start": {"line": 1, "col": 1},
+        "end": {"line": 1, "col": 2},
+        "extra": {"message": "m", "severity": "ERROR", "lines": "x"},
+    }
+
+
+def test_partition_by_size_balances_bytes():
+    """큰 파일부터 가장 가벼운 샤드에 배정하여 샤드별 크기 합이 비슷해진다."""
+    from src.services.semgrep_engine import partition_by_size
+
+    shards = partition_by_size([("a", 90), ("b", 60), ("c", 50), ("d", 40), ("e", 10)], 2)
+
+    sizes = {"a": 90, "b": 60, "c": 50, "d": 40, "e": 10}
+    loads = sorted(sum(sizes[p] for p in shard) for shard in shards)
+    assert loads == [120, 130]
+
+
+def test_sharded_scan_merges_results_from_all_shards(tmp_path):
+    """파일 수가 기준 이상이면 샤드별로 semgrep을 실행하고 결과를 합친다."""
+    from src.services.semgrep_engine import ShardConfig
+
+    _write_files(tmp_path, {f"m{i}.py": 10 for i in range(6)})
+    engine = SemgrepEngine(
+        max_jobs=3,
+        shard_config=ShardConfig(min_files=4, target_bytes=1_000_000, timeout_seconds=30),
+    )
+
+    def fake_cli(cmd, cpu_ids=None, timeout=600):
+        files = [c for c in cmd if c.endswith(".py")]
+        assert cmd[cmd.index("--jobs") + 1] == "1"
+        return {"results": [_result_for(f) for f in files], "errors": []}
+
+    with patch.object(engine, "_run_semgrep_cli", side_effect=fake_cli) as mock_cli:
+        findings = engine.scan(tmp_path, "job-1")
+
+    assert mock_cli.call_count == 3
+    assert sorted(f.file_path for f in findings) == [f"m{i}.py" for i in range(6)]
+    assert engine.last_shard_count == 3
+
+
+def test_sharded_scan_retries_only_timed_out_shard(tmp_path):
+    """타임아웃된 샤드만 반으로 나눠 재시도하고, 계속 실패한 파일만 제외한다."""
+    from src.services.semgrep_engine import SemgrepTimeoutError, ShardConfig
+
+    _write_files(tmp_path, {"slow.py": 10, "a.py": 10, "b.py": 10, "c.py": 10})
+    engine = SemgrepEngine(
+        max_jobs=2,
+        shard_config=ShardConfig(min_files=2, target_bytes=1_000_000, timeout_seconds=30, max_retries=1),
+    )
+    calls: list[list[str]] = []
+
+    def fake_cli(cmd, cpu_ids=None, timeout=600):
+        files = sorted(Path(c).name for c in cmd if c.endswith(".py"))
+        calls.append(files)
+        if "slow.py" in files:
+            raise SemgrepTimeoutError("timeout")
+        return {"results": [_result_for(str(tmp_path / f)) for f in files], "errors": []}
+
+    with patch.object(engine, "_run_semgrep_cli", side_effect=fake_cli):
+        findings = engine.scan(tmp_path, "job-1")
+
+    # 최초 2개 샤드 + 타임아웃 샤드를 반으로 나눈 재시도 2건
+    assert len(calls) == 4
+    assert ["slow.py"] in calls
+    assert [Path(p).name for p in engine.last_failed_files] == ["slow.py"]
+    assert sorted(f.file_path for f in findings) == ["a.py", "b.py", "c.py"]
+
+
+def test_scan_records_semgrep_error_files(tmp_path):
+    """경로가 있는 Semgrep 에러는 파일별로, 경로가 없는 에러는 불완전 출력으로 기록한다."""
+    _write_files(tmp_path, {"a.py": 10, "b.py": 10})
+    engine = SemgrepEngine()
+    output = {
+        "results": [_result_for(str(tmp_path / "a.py"))],
+        "errors": [{"type": "Syntax error", "level": "warn", "path": str(tmp_path / "b.py")}],
+    }
+
+    with patch.object(engine, "_run_semgrep_cli", return_value=output):
+        engine.scan(tmp_path, "job-1")
+
+    assert engine.last_error_files == ["b.py"]
+    assert engine.last_output_incomplete is False
+
+    output["errors"] = [{"type": "InvalidRuleSchemaError", "level": "error"}]
+    with patch.object(engine, "_run_semgrep_cli", return_value=output):
+        engine.scan(tmp_path, "job-2")
+
+    assert engine.last_error_files == []
+    assert engine.last_output_incomplete is True
+
+
+def test_sharded_scan_raises_when_every_shard_fails(tmp_path):
+    from src.services.semgrep_engine import SemgrepTimeoutError, ShardConfig
+
+    _write_files(tmp_path, {"a.py": 10, "b.py": 10})
+    engine = SemgrepEngine(
+        max_jobs=2,
+        shard_config=ShardConfig(min_files=2, target_bytes=1_000_000, timeout_seconds=30, max_retries=0),
+    )
+
+    with patch.object(engine, "_run_semgrep_cli", side_effect=SemgrepTimeoutError("timeout")):
+        with pytest.raises(RuntimeError):
+            engine.scan(tmp_path, "job-1")
+
+
 # ──────────────────────────────────────────────────────────────
 # _run_semgrep_cli() 테스트
 # ──────────────────────────────────────────────────────────────
@@ -379,6 +526,20 @@ def test_run_semgrep_cli_returncode_0_returns_dict(engine):
     assert result["results"] == []
 
 
+def test_run_semgrep_cli_pins_cores_with_taskset_not_preexec_fn(engine):
+    """할당 코어 고정은 taskset으로 하고, 스레드에서 안전하지 않은 preexec_fn은 쓰지 않는다."""
+    cmd = ["semgrep", "scan", "--json", "--quiet", "/some/dir"]
+
+    with patch("shutil.which", return_value="/usr/bin/taskset"), patch("subprocess.run") as mock_run:
+        mock_run.return_value = subprocess.CompletedProcess(
+            args=cmd, returncode=0, stdout=json.dumps({"results": [], "errors": []}), stderr=""
+        )
+        engine._run_semgrep_cli(cmd, cpu_ids=[1, 3])
+
+    assert mock_run.call_args.args[0] == ["/usr/bin/taskset", "-c", "1,3", *cmd]
+    assert "preexec_fn" not in mock_run.call_args.kwargs
+
+
 def test_run_semgrep_cli_returncode_1_returns_findings(engine, sql_injection_semgrep_output):
     """returncode=1 (취약점 발견) 이면 results가 포함된 딕셔너리를 반환한다."""
     # Arrange
@@ -450,6 +611,45 @@ def test_run_semgrep_cli_timeout_raises_runtime_error(engine):
         assert "타임아웃" in str(exc_info.value) or "timeout" in str(exc_info.value).lower()
 
 
+def test_run_scan_with_target_files_passes_only_existing_files(engine, tmp_path):
+    """target_files 지정 시 target_dir 대신 존재하는 변경 파일만 Semgrep에 전달한다."""
+    # Arrange
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / "db.py").write_text("x = 1\n")
+    (tmp_path / "app" / "views.py").write_text("y = 2\n")
+
+    with patch("subprocess.run") as mock_run:
+        mock_run.return_value = subprocess.CompletedProcess(
+            args=["semgrep"],
+            returncode=0,
+            stdout=json.dumps({"results": [], "errors": []}),
+            stderr="",
+        )
+
+        # Act: 삭제된 파일과 target_dir 밖 경로는 제외되어야 함
+        engine.scan(
+            tmp_path,
+            "test-job-incremental",
+            target_files=["app/db.py", "app/removed.py", "../outside.py", "app/db.py"],
+        )
+
+    # Assert
+    cmd = mock_run.call_args[0][0]
+    assert str(tmp_path / "app" / "db.py") in cmd
+    assert cmd.count(str(tmp_path / "app" / "db.py")) == 1
+    assert str(tmp_path) not in cmd
+    assert not any("views.py" in arg or "removed.py" in arg for arg in cmd)
+
+
+def test_run_scan_with_no_existing_target_files_skips_semgrep(engine, tmp_path):
+    """변경 파일이 모두 checkout에 없으면 Semgrep을 실행하지 않고 빈 목록을 반환한다."""
+    with patch("subprocess.run") as mock_run:
+        findings = engine.scan(tmp_path, "test-job-none", target_files=["gone.py"])
+
+    assert findings == []
+    mock_run.assert_not_called()
+
+
 # ──────────────────────────────────────────────────────────────
 # prepare_temp_dir / cleanup_temp_dir 테스트
 # ──────────────────────────────────────────────────────────────
@@ -524,3 +724,203 @@ def test_cleanup_nonexistent_dir_does_not_raise():
 
     # Act & Assert (예외 없이 정상 종료되어야 함)
     SemgrepEngine.cleanup_temp_dir(job_id)
+
+
+def test_cancelled_scan_kills_running_semgrep_process(tmp_path):
+    """실행 중 취소 플래그가 켜지면 semgrep 프로세스 그룹을 종료하고 ScanCancelledError를 낸다."""
+    from src.services.scan_cancellation import ScanCancelledError
+
+    # Arrange
+    cancellation = MagicMock()
+    cancellation.job_id = "job-cancel"
+    cancellation.is_cancelled.return_value = True
+    engine = SemgrepEngine(cancellation=cancellation)
+
+    # Act & Assert — 오래 걸리는 프로세스도 폴링 주기 안에 종료된다
+    with patch("src.services.semgrep_engine._CANCEL_POLL_SEC", 0.05):
+        with pytest.raises(ScanCancelledError):
+            engine._run_cancellable(["sleep", "30"], timeout=60, cwd=str(tmp_path))
+
+
+# ──────────────────────────────────────────────────────────────
+# 스트리밍 모드
+# ──────────────────────────────────────────────────────────────
+
+def _print_cmd(output: str, returncode: int = 1) -> list[str]:
+    """output을 stdout에 쓰고 returncode로 끝나는 커맨드 (semgrep 대역)."""
+    import sys
+
+    script = f"import sys; sys.stdout.write({output!r}); sys.exit({returncode})"
+    return [sys.executable, "-c", script]
+
+
+def test_stream_semgrep_cli_yields_findings(tmp_path, multi_finding_semgrep_output):
+    """스트리밍 모드는 semgrep stdout을 읽으면서 finding을 하나씩 변환한다."""
+    engine = SemgrepEngine(stream_output=True)
+    base_dir = Path("/tmp/vulnix-scan-test")
+
+    findings = list(
+        engine._stream_semgrep_cli(
+            _print_cmd(json.dumps(multi_finding_semgrep_output)), base_dir, "job-1"
+        )
+    )
+
+    assert findings == engine._parse_results(multi_finding_semgrep_output, base_dir)
+
+
+def test_stream_semgrep_cli_non_json_with_internal_error_raises(tmp_path):
+    """JSON이 아닌 출력 + returncode >= 2는 기존 모드와 같이 RuntimeError."""
+    engine = SemgrepEngine(stream_output=True)
+
+    with pytest.raises(RuntimeError, match="returncode=2"):
+        list(engine._stream_semgrep_cli(_print_cmd("Traceback ...", 2), tmp_path, "job-1"))
+
+
+def test_stream_scan_matches_buffered_scan(python_repo, sql_injection_semgrep_output):
+    """scan()은 스트리밍 모드에서도 같은 findings를 반환한다."""
+    engine = SemgrepEngine(stream_output=True)
+    output = json.dumps(sql_injection_semgrep_output).replace("/tmp/vulnix-scan-test", str(python_repo))
+    cmd = _print_cmd(output)
+
+    with patch.object(engine, "_build_command", return_value=cmd):
+        findings = engine.scan(python_repo, "job-1")
+
+    assert [f.file_path for f in findings] == ["app/db.py"]
+    assert findings[0].rule_id == "vulnix.python.sql_injection.string_format"
+
+
+def test_iter_scan_consumes_stream_lazily(python_repo):
+    """스트리밍 모드의 iter_scan()은 호출 측이 요청한 만큼만 semgrep 출력을 파싱한다."""
+    engine = SemgrepEngine(stream_output=True)
+    parsed: list[int] = []
+
+    def fake_stream(cmd, base_dir, job_id, cpu_ids=None):
+        for i in range(1000):
+            parsed.append(i)
+            yield SemgrepFinding(
+                rule_id="vulnix.python.sql_injection.string_format",
+                severity="ERROR",
+                file_path="app/db.py",
+                start_line=i + 1,
+                end_line=i + 1,
+                code_snippet="",
+                message="SQL Injection",
+            )
+
+    with patch.object(engine, "_stream_semgrep_cli", side_effect=fake_stream):
+        findings = engine.iter_scan(python_repo, "job-1")
+        first = next(findings)
+        assert first.start_line == 1
+        assert parsed == [0]
+        findings.close()
+
+
+def test_cancelled_streaming_scan_kills_running_semgrep_process(tmp_path):
+    """스트리밍 모드에서도 취소 플래그가 켜지면 프로세스를 종료하고 ScanCancelledError를 낸다."""
+    from src.services.scan_cancellation import ScanCancelledError
+
+    cancellation = MagicMock()
+    cancellation.job_id = "job-cancel"
+    cancellation.is_cancelled.return_value = True
+    engine = SemgrepEngine(cancellation=cancellation, stream_output=True)
+
+    with patch("src.services.semgrep_engine._CANCEL_POLL_SEC", 0.05):
+        with pytest.raises(ScanCancelledError):
+            list(engine._stream_semgrep_cli(["sleep", "30"], tmp_path, "job-cancel", timeout=60))
+
+
+# ──────────────────────────────────────────────────────────────
+# 언어별 룰 팩 선택
+# ──────────────────────────────────────────────────────────────
+
+def _config_args(cmd: list[str]) -> list[str]:
+    """커맨드의 --config 값 (룰 디렉토리 기준 경로)."""
+    from src.services.rule_registry import RULES_DIR
+
+    return [
+        Path(cmd[i + 1]).relative_to(RULES_DIR).as_posix()
+        for i, arg in enumerate(cmd) if arg == "--config"
+    ]
+
+
+def test_scan_passes_only_rule_packs_for_target_languages(engine, python_repo):
+    """Python 파일만 있는 저장소는 python 룰 팩만 --config로 넘긴다."""
+    with patch.object(engine, "_run_semgrep_cli", return_value={"results": [], "errors": []}) as mock_cli:
+        engine.scan(python_repo, "job-1")
+
+    configs = _config_args(mock_cli.call_args.args[0])
+    assert configs
+    assert all(c.startswith("python/") for c in configs)
+
+
+def test_scan_selects_packs_from_changed_files(engine, tmp_path):
+    """incremental 스캔은 변경 파일의 언어(typescript → javascript 룰 팩, go) 팩만 적용한다."""
+    (tmp_path / "web.ts").write_text("let a = 1\n")
+    (tmp_path / "main.go").write_text("package main\n")
+    (tmp_path / "app.py").write_text("x = 1\n")
+
+    with patch.object(engine, "_run_semgrep_cli", return_value={"results": [], "errors": []}) as mock_cli:
+        engine.scan(tmp_path, "job-1", target_files=["web.ts", "main.go"])
+
+    prefixes = {c.split("/")[0] for c in _config_args(mock_cli.call_args.args[0])}
+    assert prefixes == {"javascript", "go"}
+
+
+def test_scan_without_rule_languages_skips_semgrep(engine, tmp_path):
+    """룰 팩이 다루는 언어 파일이 없으면 Semgrep을 실행하지 않는다."""
+    (tmp_path / "README.md").write_text("# docs\n")
+
+    with patch.object(engine, "_run_semgrep_cli") as mock_cli:
+        assert engine.scan(tmp_path, "job-1") == []
+
+    mock_cli.assert_not_called()
+
+
+def test_prefilter_drops_files_without_rule_keywords(tmp_path):
+    """사전 필터를 켜면 룰 키워드가 없는 변경 파일은 Semgrep에 넘기지 않는다."""
+    (tmp_path / "db.py").write_text('cursor.execute("SELECT 1" % uid)\n')
+    (tmp_path / "util.py").write_text("def add(a, b):\n    return a + b\n")
+    engine = SemgrepEngine(prefilter=True)
+
+    with patch.object(engine, "_run_semgrep_cli", return_value={"results": [], "errors": []}) as mock_cli:
+        engine.scan(tmp_path, "job-1", target_files=["db.py", "util.py"])
+
+    cmd = mock_cli.call_args.args[0]
+    assert str(tmp_path / "db.py") in cmd
+    assert str(tmp_path / "util.py") not in cmd
+    assert engine.last_prefiltered_files == 1
+
+
+def test_prefilter_skipped_for_large_unsharded_full_scan(tmp_path):
+    """샤딩 없는 전체 스캔에서 파일 목록을 넘길 수 없을 만큼 크면 사전 필터를 건너뛴다."""
+    (tmp_path / "db.py").write_text('cursor.execute("SELECT 1" % uid)\n')
+    (tmp_path / "util.py").write_text("def add(a, b):\n    return a + b\n")
+    engine = SemgrepEngine(prefilter=True)
+
+    with (
+        patch("src.services.semgrep_engine._MAX_CLI_TARGETS", 1),
+        patch("src.services.semgrep_engine.get_keyword_index") as mock_index,
+        patch.object(engine, "_run_semgrep_cli", return_value={"results": [], "errors": []}) as mock_cli,
+    ):
+        engine.scan(tmp_path, "job-1")
+
+    mock_index.assert_not_called()
+    assert str(tmp_path) in mock_cli.call_args.args[0]
+    assert engine.last_prefiltered_files == 0
+
+
+def test_native_secrets_skip_creds_rule_pack(tmp_path):
+    """내장 자격증명 스캐너를 켜면 hardcoded_creds 룰 팩은 Semgrep에 넘기지 않고 직접 검사한다."""
+    (tmp_path / "settings.py").write_text('password = "hunter2!"\n')
+    engine = SemgrepEngine(native_secrets=True)
+
+    with patch.object(engine, "_run_semgrep_cli", return_value={"results": [], "errors": []}) as mock_cli:
+        findings = engine.scan(tmp_path, "job-1", target_files=["settings.py"])
+
+    configs = _config_args(mock_cli.call_args.args[0])
+    assert configs
+    assert not any(config.endswith("hardcoded_creds.yml") for config in configs)
+    rule_id = semgrep_rule_id(
+        RULES_DIR / "python" / "hardcoded_creds.yml", "vulnix.python.hardcoded_creds.password_assignment"
+    )
+    assert [(f.rule_id, f.file_path, f.start_line) for f in findings] == [(rule_id, "settings.py", 1)]
@@ -0,0 +1,75 @@
+"""SemgrepJsonStream 단위 테스트 — semgrep --json 출력 스트리밍 파싱"""
+
+import io
+import json
+
+import pytest
+
+from src.services.semgrep_json_stream import SemgrepJsonStream
+
+
+def _result(index: int) -> dict:
+    return {
+        "check_id": "vulnix.python.sql_injection.string_format",
+        "path": f"/tmp/vulnix-scan-test/app/file_{index}.py",
+        "start": {"line": index + 1, "col": 1},
+        "end": {"line": index + 1, "col": 40},
+        "extra": {"message": "SQL Injection 취약점 탐지", "severity": "ERROR", "lines": "x"},
+    }
+
+
+class _CountingReader(io.BytesIO):
+    """read() 호출마다 요청 크기를 기록하는 스트림."""
+
+    def __init__(self, data: bytes) -> None:
+        super().__init__(data)
+        self.max_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        self.max_read = max(self.max_read, size)
+        return super().read(size)
+
+
+def test_stream_yields_results_across_chunk_boundaries() -> None:
+    """청크 경계에 걸친 원소(한글 멀티바이트 포함)도 순서대로 하나씩 디코딩한다."""
+    output = {
+        "version": "1.90.0",
+        "results": [_result(i) for i in range(50)],
+        "errors": [{"type": "PartialParsing", "message": "skipped"}],
+        "paths": {"scanned": [f"app/file_{i}.py" for i in range(50)]},
+    }
+    stream = SemgrepJsonStream(io.BytesIO(json.dumps(output, ensure_ascii=False).encode()), chunk_size=7)
+
+    results = list(stream)
+
+    assert results == output["results"]
+    assert stream.errors == output["errors"]
+    assert stream.has_output
+
+
+def test_stream_reads_in_fixed_chunks() -> None:
+    """results가 아무리 많아도 stdout은 청크 크기 단위로만 읽는다."""
+    payload = json.dumps({"results": [_result(i) for i in range(2000)], "errors": []}).encode()
+    reader = _CountingReader(payload)
+
+    count = sum(1 for _ in SemgrepJsonStream(reader, chunk_size=4096))
+
+    assert count == 2000
+    assert reader.max_read <= 4096
+    assert len(payload) > 100 * 4096
+
+
+def test_stream_empty_output_has_no_results() -> None:
+    stream = SemgrepJsonStream(io.BytesIO(b"  \n"))
+
+    assert list(stream) == []
+    assert not stream.has_output
+
+
+def test_stream_truncated_output_raises_decode_error() -> None:
+    """중간에 끊긴 출력(프로세스 강제 종료 등)은 JSONDecodeError로 알린다."""
+    payload = json.dumps({"results": [_result(0), _result(1)]}).encode()[:-40]
+    stream = SemgrepJsonStream(io.BytesIO(payload), chunk_size=16)
+
+    with pytest.raises(json.JSONDecodeError):
+        list(stream)
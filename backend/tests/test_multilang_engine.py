@@ -354,12 +354,11 @@ class TestLLMAgentMultilangPrompt:
         현재 구현은 'Python'이 하드코딩되어 있으므로 이 테스트는 FAIL이어야 한다.
         """
         # Arrange
-        file_content = "const x = req.query.id;\ndb.query(x);"
         file_path = "src/routes/user.js"
         findings = [js_sql_finding]
 
         # Act
-        prompt = agent._build_analysis_prompt(file_content, file_path, findings)
+        prompt = agent._build_analysis_prompt(file_path, findings)
 
         # Assert — rule_id에 'javascript'가 소문자로 있어도 통과하지 않도록
         # '다음 JavaScript 코드에서' 정확한 한국어 구문을 확인한다
@@ -371,12 +370,11 @@ class TestLLMAgentMultilangPrompt:
         현재 구현은 'Python'이 하드코딩되어 있으므로 이 테스트는 FAIL이어야 한다.
         """
         # Arrange
-        file_content = 'String query = "SELECT * FROM users WHERE id=" + id;'
         file_path = "src/UserService.java"
         findings = [java_xss_finding]
 
         # Act
-        prompt = agent._build_analysis_prompt(file_content, file_path, findings)
+        prompt = agent._build_analysis_prompt(file_path, findings)
 
         # Assert — '다음 Java 코드에서' 정확한 한국어 구문을 확인한다
         assert "다음 Java 코드에서" in prompt
@@ -384,12 +382,11 @@ class TestLLMAgentMultilangPrompt:
     def test_llm_agent_prompt_contains_go_language(self, agent, go_command_injection_finding):
         """Go 파일 분석 시 프롬프트에 'Go'가 포함된다."""
         # Arrange
-        file_content = 'password := "hardcoded_secret"'
         file_path = "internal/auth/auth.go"
         findings = [go_command_injection_finding]
 
         # Act
-        prompt = agent._build_analysis_prompt(file_content, file_path, findings)
+        prompt = agent._build_analysis_prompt(file_path, findings)
 
         # Assert — 정확히 "Go"가 포함되어야 함 (대소문자 구분)
         assert "Go" in prompt
@@ -409,12 +406,11 @@ class TestLLMAgentMultilangPrompt:
             message="SQL Injection 탐지",
             cwe=["CWE-89"],
         )
-        file_content = 'query = f"SELECT * FROM users WHERE id={user_id}"'
         file_path = "app/views.py"
         findings = [finding]
 
         # Act
-        prompt = agent._build_analysis_prompt(file_content, file_path, findings)
+        prompt = agent._build_analysis_prompt(file_path, findings)
 
         # Assert
         assert "Python" in prompt
@@ -422,12 +418,11 @@ class TestLLMAgentMultilangPrompt:
     def test_llm_agent_prompt_js_contains_korean_prefix(self, agent, js_sql_finding):
         """JavaScript 파일 프롬프트에 '다음 JavaScript 코드에서' 구문이 포함된다."""
         # Arrange
-        file_content = "const x = req.query.id;\ndb.query(x);"
         file_path = "src/routes/user.js"
         findings = [js_sql_finding]
 
         # Act
-        prompt = agent._build_analysis_prompt(file_content, file_path, findings)
+        prompt = agent._build_analysis_prompt(file_path, findings)
 
         # Assert
         assert "다음 JavaScript 코드에서" in prompt
@@ -435,12 +430,11 @@ class TestLLMAgentMultilangPrompt:
     def test_llm_agent_prompt_java_contains_korean_prefix(self, agent, java_xss_finding):
         """Java 파일 프롬프트에 '다음 Java 코드에서' 구문이 포함된다."""
         # Arrange
-        file_content = 'response.getWriter().print(request.getParameter("name"));'
         file_path = "src/Main.java"
         findings = [java_xss_finding]
 
         # Act
-        prompt = agent._build_analysis_prompt(file_content, file_path, findings)
+        prompt = agent._build_analysis_prompt(file_path, findings)
 
         # Assert
         assert "다음 Java 코드에서" in prompt
@@ -448,12 +442,11 @@ class TestLLMAgentMultilangPrompt:
     def test_llm_agent_prompt_go_contains_korean_prefix(self, agent, go_command_injection_finding):
         """Go 파일 프롬프트에 '다음 Go 코드에서' 구문이 포함된다."""
         # Arrange
-        file_content = 'exec.Command("bash", "-c", userInput)'
         file_path = "main.go"
         findings = [go_command_injection_finding]
 
         # Act
-        prompt = agent._build_analysis_prompt(file_content, file_path, findings)
+        prompt = agent._build_analysis_prompt(file_path, findings)
 
         # Assert
         assert "다음 Go 코드에서" in prompt
@@ -473,12 +466,11 @@ class TestLLMAgentMultilangPrompt:
             message="SQL Injection: 템플릿 리터럴 쿼리 조합",
             cwe=["CWE-89"],
         )
-        file_content = "const userId = req.params.id;\ndb.query(`SELECT * FROM users WHERE id=${userId}`);"
         file_path = "src/routes/user.ts"
         findings = [finding]
 
         # Act
-        prompt = agent._build_analysis_prompt(file_content, file_path, findings)
+        prompt = agent._build_analysis_prompt(file_path, findings)
 
         # Assert
         assert "TypeScript" in prompt
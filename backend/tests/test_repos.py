@@ -356,3 +356,57 @@ def test_register_repo_missing_required_fields_returns_400(test_client):
 
     # Assert
     assert response.status_code in (400, 422)
+
+
+# ---------------------------------------------------------------------------
+# 7. 저장소 스캔 제외 경로 패턴 변경
+# ---------------------------------------------------------------------------
+
+def test_update_scan_ignore_patterns(test_client, sample_repo):
+    """owner/admin은 스캔 제외 패턴을 변경할 수 있고, 빈 패턴 / 중복은 버린다.
+
+    Given: admin 역할의 사용자
+    When: PATCH /api/v1/repos/{repo_id}/scan-ignore
+    Then: 200 OK, 정리된 패턴이 저장소에 저장되어 응답에 포함
+    """
+    # Arrange
+    repo_id = str(sample_repo.id)
+
+    with (
+        patch("src.api.v1.repos.get_repo_by_id") as mock_get_repo,
+        patch("src.api.v1.repos.get_user_team_role") as mock_get_role,
+    ):
+        mock_get_repo.return_value = sample_repo
+        mock_get_role.return_value = "admin"
+
+        # Act
+        response = test_client.patch(
+            f"/api/v1/repos/{repo_id}/scan-ignore",
+            json={"patterns": [" docs/ ", "", "legacy/**/*.js", "docs/"]},
+        )
+
+    # Assert
+    assert response.status_code == 200
+    assert sample_repo.scan_ignore_patterns == ["docs/", "legacy/**/*.js"]
+    assert response.json()["data"]["scan_ignore_patterns"] == ["docs/", "legacy/**/*.js"]
+
+
+def test_update_scan_ignore_patterns_member_role_returns_403(test_client, sample_repo):
+    """member 권한 사용자는 스캔 제외 패턴을 변경할 수 없다."""
+    # Arrange
+    repo_id = str(sample_repo.id)
+
+    with (
+        patch("src.api.v1.repos.get_repo_by_id") as mock_get_repo,
+        patch("src.api.v1.repos.get_user_team_role") as mock_get_role,
+    ):
+        mock_get_repo.return_value = sample_repo
+        mock_get_role.return_value = "member"
+
+        # Act
+        response = test_client.patch(
+            f"/api/v1/repos/{repo_id}/scan-ignore", json={"patterns": ["docs/"]}
+        )
+
+    # Assert
+    assert response.status_code == 403
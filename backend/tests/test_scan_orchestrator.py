@@ -9,7 +9,7 @@
 """
 
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -66,11 +66,11 @@ async def test_enqueue_scan_creates_job(mock_db, mock_scan_job):
     repo_id = uuid.UUID("bbbbbbbb-bbbb-bbbb-bbbb-bbbbbbbbbbbb")
 
     with (
-        patch("src.services.scan_orchestrator.redis") as mock_redis_mod,
+        patch("src.services.scan_orchestrator.get_sync_redis") as mock_get_redis,
         patch("src.services.scan_orchestrator.Queue") as mock_queue_cls,
         patch("src.services.scan_orchestrator.ScanJob") as mock_scanjob_cls,
     ):
-        mock_redis_mod.from_url.return_value = MagicMock()
+        mock_get_redis.return_value = MagicMock()
         mock_queue = MagicMock()
         mock_queue_cls.return_value = mock_queue
         mock_queue.enqueue.return_value = MagicMock(id=str(mock_scan_job.id))
@@ -110,11 +110,11 @@ async def test_enqueue_scan_returns_job_id(mock_db):
     repo_id = uuid.UUID("bbbbbbbb-bbbb-bbbb-bbbb-bbbbbbbbbbbb")
 
     with (
-        patch("src.services.scan_orchestrator.redis") as mock_redis_mod,
+        patch("src.services.scan_orchestrator.get_sync_redis") as mock_get_redis,
         patch("src.services.scan_orchestrator.Queue"),
         patch("src.services.scan_orchestrator.ScanJob") as mock_scanjob_cls,
     ):
-        mock_redis_mod.from_url.return_value = MagicMock()
+        mock_get_redis.return_value = MagicMock()
         mock_job = MagicMock()
         mock_job.id = uuid.UUID("cccccccc-cccc-cccc-cccc-cccccccccccc")
         mock_scanjob_cls.return_value = mock_job
@@ -158,10 +158,10 @@ async def test_retry_logic_max_3_attempts(mock_db, mock_scan_job):
     mock_scan_job.retry_count = 0
 
     with (
-        patch("src.services.scan_orchestrator.redis") as mock_redis_mod,
+        patch("src.services.scan_orchestrator.get_sync_redis") as mock_get_redis,
         patch("src.services.scan_orchestrator.Queue"),
     ):
-        mock_redis_mod.from_url.return_value = MagicMock()
+        mock_get_redis.return_value = MagicMock()
         mock_result = MagicMock()
         mock_result.scalar_one_or_none.return_value = mock_scan_job
         mock_db.execute = AsyncMock(return_value=mock_result)
@@ -198,10 +198,10 @@ async def test_has_active_scan_prevents_duplicate(mock_db, mock_scan_job):
     repo_id = uuid.UUID("bbbbbbbb-bbbb-bbbb-bbbb-bbbbbbbbbbbb")
 
     with (
-        patch("src.services.scan_orchestrator.redis") as mock_redis_mod,
+        patch("src.services.scan_orchestrator.get_sync_redis") as mock_get_redis,
         patch("src.services.scan_orchestrator.Queue"),
     ):
-        mock_redis_mod.from_url.return_value = MagicMock()
+        mock_get_redis.return_value = MagicMock()
         mock_result = MagicMock()
         mock_result.scalar_one_or_none.return_value = mock_scan_job  # 존재함
         mock_db.execute = AsyncMock(return_value=mock_result)
@@ -228,10 +228,10 @@ async def test_has_active_scan_returns_false_when_no_active(mock_db):
     repo_id = uuid.UUID("bbbbbbbb-bbbb-bbbb-bbbb-bbbbbbbbbbbb")
 
     with (
-        patch("src.services.scan_orchestrator.redis") as mock_redis_mod,
+        patch("src.services.scan_orchestrator.get_sync_redis") as mock_get_redis,
         patch("src.services.scan_orchestrator.Queue"),
     ):
-        mock_redis_mod.from_url.return_value = MagicMock()
+        mock_get_redis.return_value = MagicMock()
         mock_result = MagicMock()
         mock_result.scalar_one_or_none.return_value = None  # 없음
         mock_db.execute = AsyncMock(return_value=mock_result)
@@ -264,10 +264,10 @@ async def test_update_scan_status_queued_to_running(mock_db, mock_scan_job):
     mock_scan_job.started_at = None
 
     with (
-        patch("src.services.scan_orchestrator.redis") as mock_redis_mod,
+        patch("src.services.scan_orchestrator.get_sync_redis") as mock_get_redis,
         patch("src.services.scan_orchestrator.Queue"),
     ):
-        mock_redis_mod.from_url.return_value = MagicMock()
+        mock_get_redis.return_value = MagicMock()
         mock_result = MagicMock()
         mock_result.scalar_one_or_none.return_value = mock_scan_job
         mock_db.execute = AsyncMock(return_value=mock_result)
@@ -299,10 +299,10 @@ async def test_update_scan_status_running_to_completed(mock_db, mock_scan_job):
     mock_scan_job.duration_seconds = None
 
     with (
-        patch("src.services.scan_orchestrator.redis") as mock_redis_mod,
+        patch("src.services.scan_orchestrator.get_sync_redis") as mock_get_redis,
         patch("src.services.scan_orchestrator.Queue"),
     ):
-        mock_redis_mod.from_url.return_value = MagicMock()
+        mock_get_redis.return_value = MagicMock()
         mock_result = MagicMock()
         mock_result.scalar_one_or_none.return_value = mock_scan_job
         mock_db.execute = AsyncMock(return_value=mock_result)
@@ -334,10 +334,10 @@ async def test_update_scan_status_failed_saves_error_message(mock_db, mock_scan_
     mock_scan_job.retry_count = 0
 
     with (
-        patch("src.services.scan_orchestrator.redis") as mock_redis_mod,
+        patch("src.services.scan_orchestrator.get_sync_redis") as mock_get_redis,
         patch("src.services.scan_orchestrator.Queue"),
     ):
-        mock_redis_mod.from_url.return_value = MagicMock()
+        mock_get_redis.return_value = MagicMock()
         mock_result = MagicMock()
         mock_result.scalar_one_or_none.return_value = mock_scan_job
         mock_db.execute = AsyncMock(return_value=mock_result)
@@ -380,11 +380,11 @@ async def test_enqueue_scan_with_scan_type_and_changed_files(mock_db):
     created_job.changed_files = None
 
     with (
-        patch("src.services.scan_orchestrator.redis") as mock_redis_mod,
+        patch("src.services.scan_orchestrator.get_sync_redis") as mock_get_redis,
         patch("src.services.scan_orchestrator.Queue"),
         patch("src.services.scan_orchestrator.ScanJob") as mock_scanjob_cls,
     ):
-        mock_redis_mod.from_url.return_value = MagicMock()
+        mock_get_redis.return_value = MagicMock()
         mock_scanjob_cls.return_value = created_job
 
         from src.services.scan_orchestrator import ScanOrchestrator
@@ -428,10 +428,10 @@ def test_orchestrator_requires_db_session():
     mock_db_session = AsyncMock()
 
     with (
-        patch("src.services.scan_orchestrator.redis") as mock_redis_mod,
+        patch("src.services.scan_orchestrator.get_sync_redis") as mock_get_redis,
         patch("src.services.scan_orchestrator.Queue"),
     ):
-        mock_redis_mod.from_url.return_value = MagicMock()
+        mock_get_redis.return_value = MagicMock()
 
         from src.services.scan_orchestrator import ScanOrchestrator
 
@@ -460,10 +460,10 @@ async def test_cancel_active_scans_for_pr(mock_db, mock_scan_job):
     mock_scan_job.status = "queued"
 
     with (
-        patch("src.services.scan_orchestrator.redis") as mock_redis_mod,
+        patch("src.services.scan_orchestrator.get_sync_redis") as mock_get_redis,
         patch("src.services.scan_orchestrator.Queue"),
     ):
-        mock_redis_mod.from_url.return_value = MagicMock()
+        mock_get_redis.return_value = MagicMock()
         mock_result = MagicMock()
         mock_result.scalars.return_value.all.return_value = [mock_scan_job]
         mock_db.execute = AsyncMock(return_value=mock_result)
@@ -480,3 +480,313 @@ async def test_cancel_active_scans_for_pr(mock_db, mock_scan_job):
     # Assert
     assert cancelled_count == 1
     assert mock_scan_job.status == "cancelled"
+
+
+@pytest.mark.asyncio
+async def test_cancel_active_scans_sets_flag_and_cancels_queued_rq_job(mock_db, mock_scan_job):
+    """PR 스캔 취소 시 Redis 취소 플래그를 설정하고 대기 중인 RQ 잡을 큐에서 뺀다."""
+    # Arrange
+    mock_scan_job.pr_number = 42
+    mock_scan_job.status = "queued"
+    redis_conn = MagicMock()
+
+    with (
+        patch("src.services.scan_orchestrator.get_sync_redis") as mock_get_redis,
+        patch("src.services.scan_orchestrator.Queue"),
+        patch("src.services.scan_orchestrator.Job") as mock_job_cls,
+        patch("src.services.scan_orchestrator.JobStatus") as mock_job_status,
+    ):
+        mock_get_redis.return_value = redis_conn
+        rq_job = MagicMock()
+        rq_job.get_status.return_value = mock_job_status.QUEUED
+        mock_job_cls.fetch.return_value = rq_job
+        mock_result = MagicMock()
+        mock_result.scalars.return_value.all.return_value = [mock_scan_job]
+        mock_db.execute = AsyncMock(return_value=mock_result)
+
+        from src.services.scan_cancellation import cancel_key
+        from src.services.scan_orchestrator import ScanOrchestrator
+        orchestrator = ScanOrchestrator(db=mock_db)
+
+        # Act
+        await orchestrator.cancel_active_scans_for_pr(repo_id=mock_scan_job.repo_id, pr_number=42)
+
+    # Assert
+    job_id = str(mock_scan_job.id)
+    assert redis_conn.set.call_args.args[0] == cancel_key(job_id)
+    mock_job_cls.fetch.assert_called_once_with(job_id, connection=redis_conn)
+    rq_job.cancel.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_update_job_status_keeps_cancelled_status(mock_db, mock_scan_job):
+    """취소된 스캔은 워커의 completed 업데이트로 덮어쓰지 않는다."""
+    # Arrange
+    mock_scan_job.status = "cancelled"
+
+    with (
+        patch("src.services.scan_orchestrator.get_sync_redis") as mock_get_redis,
+        patch("src.services.scan_orchestrator.Queue"),
+    ):
+        mock_get_redis.return_value = MagicMock()
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = mock_scan_job
+        mock_db.execute = AsyncMock(return_value=mock_result)
+
+        from src.services.scan_orchestrator import ScanOrchestrator
+        orchestrator = ScanOrchestrator(db=mock_db)
+
+        # Act
+        await orchestrator.update_job_status(job_id=str(mock_scan_job.id), status="completed")
+
+    # Assert
+    assert mock_scan_job.status == "cancelled"
+    assert mock_scan_job.completed_at is None
+
+
+# ---------------------------------------------------------------------------
+# 8. 우선순위 레인 + 팀별 공정 스케줄링
+# ---------------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_enqueue_scan_submits_to_fair_scheduler_with_team_weight(mock_db, mock_scan_job):
+    """enqueue_scan은 RQ 큐에 바로 넣지 않고 팀 ID / 플랜 가중치와 함께 스케줄러에 등록한다."""
+    repo_id = uuid.UUID("bbbbbbbb-bbbb-bbbb-bbbb-bbbbbbbbbbbb")
+    team_id = uuid.UUID("dddddddd-dddd-dddd-dddd-dddddddddddd")
+
+    with (
+        patch("src.services.scan_orchestrator.get_sync_redis") as mock_get_redis,
+        patch("src.services.scan_orchestrator.FairScanScheduler") as mock_scheduler_cls,
+        patch("src.services.scan_orchestrator.ScanJob") as mock_scanjob_cls,
+    ):
+        mock_get_redis.return_value = MagicMock()
+        mock_scanjob_cls.return_value = mock_scan_job
+        mock_result = MagicMock()
+        mock_result.one_or_none.return_value = (team_id, "scale")
+        mock_db.execute = AsyncMock(return_value=mock_result)
+
+        from src.services.scan_orchestrator import ScanOrchestrator
+        orchestrator = ScanOrchestrator(db=mock_db)
+
+        await orchestrator.enqueue_scan(repo_id=repo_id, trigger="webhook", scan_type="initial")
+
+    submit = mock_scheduler_cls.return_value.submit
+    submit.assert_called_once()
+    message = submit.call_args.args[0]
+    assert message.team_id == str(team_id)
+    assert submit.call_args.kwargs["team_id"] == str(team_id)
+    assert submit.call_args.kwargs["weight"] == 4
+
+
+# ---------------------------------------------------------------------------
+# 9. push 스캔 병합 (enqueue_push_scan)
+# ---------------------------------------------------------------------------
+
+def _scalars_result(job):
+    result = MagicMock()
+    result.scalars.return_value.first.return_value = job
+    return result
+
+
+@pytest.mark.asyncio
+async def test_enqueue_push_scan_coalesces_into_queued_scan(mock_db, mock_scan_job):
+    """시작 전 push 스캔이 있으면 최신 commit_sha로 바꾸고 changed_files를 합친다 (새 스캔 없음)."""
+    mock_scan_job.changed_files = ["app/a.py", "app/b.py"]
+    mock_db.execute = AsyncMock(side_effect=[
+        _scalars_result(mock_scan_job),   # queued push 스캔 (이미 등록됨)
+        _scalars_result(None),            # running push 스캔 없음
+    ])
+
+    with (
+        patch("src.services.scan_orchestrator.get_sync_redis") as mock_get_redis,
+        patch("src.services.scan_orchestrator.FairScanScheduler") as mock_scheduler_cls,
+    ):
+        mock_get_redis.return_value = MagicMock()
+        from src.services.scan_orchestrator import ScanOrchestrator
+        orchestrator = ScanOrchestrator(db=mock_db)
+
+        job_id = await orchestrator.enqueue_push_scan(
+            repo_id=mock_scan_job.repo_id,
+            branch="main",
+            commit_sha="f" * 40,
+            changed_files=["app/b.py", "app/c.py"],
+        )
+
+    assert job_id == str(mock_scan_job.id)
+    assert mock_scan_job.commit_sha == "f" * 40
+    assert mock_scan_job.changed_files == ["app/a.py", "app/b.py", "app/c.py"]
+    mock_db.add.assert_not_called()
+    mock_scheduler_cls.return_value.submit.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_enqueue_push_scan_defers_followup_while_running(mock_db, mock_scan_job):
+    """실행 중인 push 스캔이 있으면 후속 ScanJob만 만들고 큐 등록은 미룬다."""
+    mock_scan_job.status = "running"
+    mock_scan_job.started_at = datetime.now(timezone.utc)
+    status_result = MagicMock()
+    status_result.scalar_one_or_none.return_value = "running"
+    mock_db.execute = AsyncMock(side_effect=[
+        _scalars_result(None),            # queued push 스캔 없음
+        _scalars_result(mock_scan_job),   # running push 스캔 있음
+        status_result,                    # 재확인: 아직 running
+    ])
+    redis_conn = MagicMock()
+
+    with (
+        patch("src.services.scan_orchestrator.get_sync_redis") as mock_get_redis,
+        patch("src.services.scan_orchestrator.FairScanScheduler") as mock_scheduler_cls,
+    ):
+        mock_get_redis.return_value = redis_conn
+        from src.services.scan_orchestrator import ScanOrchestrator
+        orchestrator = ScanOrchestrator(db=mock_db)
+
+        job_id = await orchestrator.enqueue_push_scan(
+            repo_id=mock_scan_job.repo_id,
+            branch="main",
+            commit_sha="f" * 40,
+            changed_files=["app/c.py"],
+        )
+
+    followup = mock_db.add.call_args.args[0]
+    assert followup.status == "queued"
+    assert followup.commit_sha == "f" * 40
+    key, value = redis_conn.set.call_args.args
+    assert key == f"vulnix:push-followup:{mock_scan_job.repo_id}:main"
+    assert value == job_id
+    mock_scheduler_cls.return_value.submit.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_submit_push_followup_enqueues_once(mock_db, mock_scan_job):
+    """스캔 종료 시 후속 ScanJob을 한 번만 큐에 넣는다 (GETDEL로 키를 가져간 쪽만 등록)."""
+    redis_conn = MagicMock()
+    redis_conn.getdel.side_effect = [str(mock_scan_job.id).encode(), None]
+    job_result = MagicMock()
+    job_result.scalar_one_or_none.return_value = mock_scan_job
+    team_result = MagicMock()
+    team_result.one_or_none.return_value = None
+    mock_db.execute = AsyncMock(side_effect=[job_result, team_result])
+
+    with (
+        patch("src.services.scan_orchestrator.get_sync_redis") as mock_get_redis,
+        patch("src.services.scan_orchestrator.FairScanScheduler") as mock_scheduler_cls,
+    ):
+        mock_get_redis.return_value = redis_conn
+        from src.services.scan_orchestrator import ScanOrchestrator
+        orchestrator = ScanOrchestrator(db=mock_db)
+
+        first = await orchestrator.submit_push_followup(mock_scan_job.repo_id, "main")
+        second = await orchestrator.submit_push_followup(mock_scan_job.repo_id, "main")
+
+    assert first == str(mock_scan_job.id)
+    assert second is None
+    message = mock_scheduler_cls.return_value.submit.call_args.args[0]
+    assert message.commit_sha == mock_scan_job.commit_sha
+
+
+def _stale_running_job():
+    job = MagicMock()
+    job.id = uuid.uuid4()
+    job.status = "running"
+    job.branch = "main"
+    job.started_at = datetime.now(timezone.utc) - timedelta(days=1)
+    return job
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("key_expired", [False, True])
+async def test_enqueue_push_scan_submits_followup_of_dead_scan(mock_db, mock_scan_job, key_expired):
+    """실행 중이던 스캔의 워커가 죽어 큐에 들어가지 못한 후속 스캔은 다음 push에서 등록한다."""
+    stale = _stale_running_job()
+    team_result = MagicMock()
+    team_result.one_or_none.return_value = None
+    results = [_scalars_result(mock_scan_job), _scalars_result(stale)]
+    if not key_expired:
+        job_result = MagicMock()
+        job_result.scalar_one_or_none.return_value = mock_scan_job
+        results.append(job_result)        # submit_push_followup의 ScanJob 조회
+    mock_db.execute = AsyncMock(side_effect=[*results, team_result])
+    followup_id = str(mock_scan_job.id).encode()
+    redis_conn = MagicMock()
+    redis_conn.get.return_value = None if key_expired else followup_id
+    redis_conn.getdel.return_value = followup_id
+
+    with (
+        patch("src.services.scan_orchestrator.get_sync_redis") as mock_get_redis,
+        patch("src.services.scan_orchestrator.FairScanScheduler") as mock_scheduler_cls,
+    ):
+        mock_get_redis.return_value = redis_conn
+        from src.services.scan_orchestrator import ScanOrchestrator
+        orchestrator = ScanOrchestrator(db=mock_db)
+
+        job_id = await orchestrator.enqueue_push_scan(
+            repo_id=mock_scan_job.repo_id,
+            branch="main",
+            commit_sha="f" * 40,
+            changed_files=None,
+        )
+
+    assert job_id == str(mock_scan_job.id)
+    assert stale.status == "failed"
+    message = mock_scheduler_cls.return_value.submit.call_args.args[0]
+    assert message.job_id == job_id
+    assert message.commit_sha == "f" * 40
+    assert redis_conn.getdel.called is not key_expired
+
+
+@pytest.mark.asyncio
+async def test_enqueue_push_scan_keeps_followup_while_predecessor_runs(mock_db, mock_scan_job):
+    """실행 중인 스캔이 살아 있으면 후속 스캔은 그 스캔이 끝날 때까지 등록하지 않는다."""
+    running = _stale_running_job()
+    running.started_at = datetime.now(timezone.utc)
+    mock_db.execute = AsyncMock(side_effect=[_scalars_result(mock_scan_job), _scalars_result(running)])
+    redis_conn = MagicMock()
+    redis_conn.get.return_value = str(mock_scan_job.id).encode()
+
+    with (
+        patch("src.services.scan_orchestrator.get_sync_redis") as mock_get_redis,
+        patch("src.services.scan_orchestrator.FairScanScheduler") as mock_scheduler_cls,
+    ):
+        mock_get_redis.return_value = redis_conn
+        from src.services.scan_orchestrator import ScanOrchestrator
+        orchestrator = ScanOrchestrator(db=mock_db)
+
+        await orchestrator.enqueue_push_scan(
+            repo_id=mock_scan_job.repo_id,
+            branch="main",
+            commit_sha="f" * 40,
+            changed_files=None,
+        )
+
+    assert running.status == "running"
+    redis_conn.getdel.assert_not_called()
+    mock_scheduler_cls.return_value.submit.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_enqueue_push_scan_ignores_dead_running_scan(mock_db, mock_scan_job):
+    """응답 없는 running 스캔만 있으면 failed로 바꾸고 후속 스캔 대신 바로 등록한다."""
+    stale = _stale_running_job()
+    team_result = MagicMock()
+    team_result.one_or_none.return_value = None
+    mock_db.execute = AsyncMock(side_effect=[_scalars_result(None), _scalars_result(stale), team_result])
+
+    with (
+        patch("src.services.scan_orchestrator.get_sync_redis") as mock_get_redis,
+        patch("src.services.scan_orchestrator.FairScanScheduler") as mock_scheduler_cls,
+    ):
+        mock_get_redis.return_value = MagicMock()
+        from src.services.scan_orchestrator import ScanOrchestrator
+        orchestrator = ScanOrchestrator(db=mock_db)
+
+        job_id = await orchestrator.enqueue_push_scan(
+            repo_id=mock_scan_job.repo_id,
+            branch="main",
+            commit_sha="f" * 40,
+            changed_files=None,
+        )
+
+    assert stale.status == "failed"
+    message = mock_scheduler_cls.return_value.submit.call_args.args[0]
+    assert message.job_id == job_id
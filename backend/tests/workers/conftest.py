@@ -25,8 +25,16 @@ for _key, _val in _TEST_ENV.items():
     os.environ.setdefault(_key, _val)
 
 # redis, rq가 설치되어 있지 않은 환경을 대비해 mock 모듈 등록
-if "redis" not in sys.modules:
+# (설치되어 있으면 실제 패키지 사용 — redis.asyncio 등 하위 모듈 임포트 필요)
+try:
+    import redis  # noqa: F401
+    import redis.asyncio  # noqa: F401
+except ImportError:
     sys.modules["redis"] = MagicMock()
+try:
+    import rq  # noqa: F401
+except ImportError:
+    pass
 if "rq" not in sys.modules:
     _rq_mock = MagicMock()
     _rq_mock.Queue = MagicMock()
@@ -3,8 +3,10 @@
 구현이 완료되지 않은 상태에서 실행하면 모두 FAIL이어야 한다.
 """
 
+import asyncio
 import json
 import uuid
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -164,10 +166,10 @@ async def test_process_scan_job_full_pipeline(
     mock_semgrep.scan.return_value = [sql_injection_finding, xss_finding]
 
     mock_llm = AsyncMock()
-    mock_llm.analyze_findings = AsyncMock(side_effect=[
-        [true_positive_result],
-        [false_positive_result],
-    ])
+    mock_llm.analyze_files = AsyncMock(return_value={
+        "app/db.py": [true_positive_result],
+        "app/views.py": [false_positive_result],
+    })
 
     mock_github = AsyncMock()
     mock_github.clone_repository = AsyncMock()
@@ -213,7 +215,7 @@ async def test_process_scan_job_saves_vulnerabilities(
     mock_semgrep.scan.return_value = [sql_injection_finding]
 
     mock_llm = AsyncMock()
-    mock_llm.analyze_findings = AsyncMock(return_value=[true_positive_result])
+    mock_llm.analyze_files = AsyncMock(return_value={"app/db.py": [true_positive_result]})
 
     mock_github = AsyncMock()
     mock_github.clone_repository = AsyncMock()
@@ -257,7 +259,7 @@ async def test_process_scan_job_no_findings_skips_llm(
     mock_semgrep.scan.return_value = []  # 0건
 
     mock_llm = AsyncMock()
-    mock_llm.analyze_findings = AsyncMock()
+    mock_llm.analyze_files = AsyncMock()
 
     mock_github = AsyncMock()
     mock_github.clone_repository = AsyncMock()
@@ -279,7 +281,7 @@ async def test_process_scan_job_no_findings_skips_llm(
     # Assert
     assert result["status"] == "completed"
     # LLM이 호출되지 않아야 함
-    mock_llm.analyze_findings.assert_not_called()
+    mock_llm.analyze_files.assert_not_called()
 
 
 async def test_process_scan_job_updates_job_status(
@@ -304,7 +306,7 @@ async def test_process_scan_job_updates_job_status(
     mock_semgrep.scan.return_value = [sql_injection_finding]
 
     mock_llm = AsyncMock()
-    mock_llm.analyze_findings = AsyncMock(return_value=[true_positive_result])
+    mock_llm.analyze_files = AsyncMock(return_value={"app/db.py": [true_positive_result]})
 
     mock_github = AsyncMock()
     mock_github.clone_repository = AsyncMock()
@@ -395,7 +397,7 @@ async def test_process_scan_job_cleans_temp_dir(
     mock_semgrep.scan.return_value = [sql_injection_finding]
 
     mock_llm = AsyncMock()
-    mock_llm.analyze_findings = AsyncMock(return_value=[true_positive_result])
+    mock_llm.analyze_files = AsyncMock(return_value={"app/db.py": [true_positive_result]})
 
     mock_github = AsyncMock()
     mock_github.clone_repository = AsyncMock()
@@ -421,6 +423,54 @@ async def test_process_scan_job_cleans_temp_dir(
     mock_cleanup.assert_called_once_with(job_id)
 
 
+async def test_cancelled_scan_stops_before_triage_and_saves_nothing(
+    scan_job_message,
+    mock_repo,
+    sql_injection_finding,
+):
+    """Semgrep 이후 취소 플래그가 켜지면 LLM 분석 / 저장 없이 cancelled로 끝난다."""
+    from src.services.scan_cancellation import ScanCancelledError
+
+    # Arrange
+    mock_db = AsyncMock()
+    mock_db.execute = AsyncMock()
+    mock_db.execute.return_value.scalar_one.return_value = mock_repo
+    mock_db.add = MagicMock()
+    mock_db.commit = AsyncMock()
+
+    mock_orchestrator = AsyncMock()
+    mock_semgrep = MagicMock()
+    mock_semgrep.scan.return_value = [sql_injection_finding]
+    mock_llm = AsyncMock()
+    mock_github = AsyncMock()
+
+    # clone 전후 확인은 통과하고, LLM 분석 직전 확인에서 취소된다
+    cancellation = MagicMock()
+    cancellation.raise_if_cancelled.side_effect = [None, None, ScanCancelledError("취소")]
+
+    with (
+        patch("src.workers.scan_worker.SemgrepEngine", return_value=mock_semgrep),
+        patch("src.workers.scan_worker.LLMAgent", return_value=mock_llm),
+        patch("src.workers.scan_worker.GitHubAppService", return_value=mock_github),
+        patch("src.workers.scan_worker.get_async_session", create=True) as mock_session,
+        patch("src.workers.scan_worker.ScanOrchestrator", create=True, return_value=mock_orchestrator),
+        patch("src.workers.scan_worker._create_cancellation", return_value=cancellation),
+        patch("src.workers.scan_worker._save_vulnerabilities") as mock_save,
+        patch("src.services.semgrep_engine.SemgrepEngine.cleanup_temp_dir"),
+    ):
+        mock_session.return_value.__aenter__ = AsyncMock(return_value=mock_db)
+        mock_session.return_value.__aexit__ = AsyncMock(return_value=None)
+
+        # Act
+        result = await _run_scan_async(scan_job_message)
+
+    # Assert
+    assert result["status"] == "cancelled"
+    mock_llm.analyze_files.assert_not_called()
+    mock_save.assert_not_called()
+    mock_orchestrator.update_job_status.assert_any_call(scan_job_message.job_id, "cancelled")
+
+
 async def test_vulnerability_deduplication(
     scan_job_message,
     mock_repo,
@@ -479,7 +529,7 @@ async def test_vulnerability_deduplication(
     mock_semgrep.scan.return_value = [duplicate_finding_1, duplicate_finding_2]
 
     mock_llm = AsyncMock()
-    mock_llm.analyze_findings = AsyncMock(return_value=[tp_result_1])
+    mock_llm.analyze_files = AsyncMock(return_value={"app/db.py": [tp_result_1]})
 
     mock_github = AsyncMock()
     mock_github.clone_repository = AsyncMock()
@@ -503,3 +553,619 @@ async def test_vulnerability_deduplication(
     from src.models.vulnerability import Vulnerability
     vuln_records = [c for c in add_calls if hasattr(c, "vulnerability_type")]
     assert len(vuln_records) == 1
+
+
+# ──────────────────────────────────────────────────────────────
+# 증분 스캔 대상 결정 테스트
+# ──────────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize(
+    ("scan_type", "changed_files", "expected"),
+    [
+        ("pr", ["app/db.py"], ["app/db.py"]),
+        ("incremental", ["app/db.py", "app/views.py"], ["app/db.py", "app/views.py"]),
+        ("incremental", None, None),
+        ("initial", ["app/db.py"], None),
+        ("full", ["app/db.py"], None),
+    ],
+)
+def test_resolve_scan_targets_by_scan_type(job_id, repo_id, scan_type, changed_files, expected):
+    """incremental / pr 스캔만 변경 파일 목록을 Semgrep 대상으로 사용한다."""
+    from src.workers.scan_worker import _resolve_scan_targets
+
+    message = ScanJobMessage(
+        job_id=job_id,
+        repo_id=repo_id,
+        scan_type=scan_type,
+        changed_files=changed_files,
+    )
+
+    assert _resolve_scan_targets(message) == expected
+
+
+async def test_pr_scan_passes_changed_files_to_semgrep(mock_repo, job_id, repo_id):
+    """PR 스캔은 changed_files만 SemgrepEngine.scan()에 전달한다."""
+    message = ScanJobMessage(
+        job_id=job_id,
+        repo_id=repo_id,
+        scan_type="pr",
+        pr_number=7,
+        changed_files=["app/db.py"],
+    )
+
+    mock_db = AsyncMock()
+    mock_db.execute = AsyncMock()
+    mock_db.execute.return_value.scalar_one.return_value = mock_repo
+
+    mock_semgrep = MagicMock()
+    mock_semgrep.scan.return_value = []
+
+    with (
+        patch("src.workers.scan_worker.SemgrepEngine", return_value=mock_semgrep),
+        patch("src.workers.scan_worker.LLMAgent", return_value=AsyncMock()),
+        patch("src.workers.scan_worker.GitHubAppService", return_value=AsyncMock()),
+        patch("src.workers.scan_worker.get_async_session", create=True) as mock_session,
+        patch("src.workers.scan_worker.ScanOrchestrator", create=True, return_value=AsyncMock()),
+        patch("src.services.semgrep_engine.SemgrepEngine.cleanup_temp_dir"),
+    ):
+        mock_session.return_value.__aenter__ = AsyncMock(return_value=mock_db)
+        mock_session.return_value.__aexit__ = AsyncMock(return_value=None)
+
+        await _run_scan_async(message)
+
+    assert mock_semgrep.scan.call_args.kwargs["target_files"] == ["app/db.py"]
+
+
+async def test_scan_records_stage_telemetry(
+    scan_job_message,
+    mock_repo,
+    sql_injection_finding,
+    true_positive_result,
+):
+    """단계별 소요 시간, 다운로드 바이트, 스캔 파일 수, Claude 사용량을 ScanJob에 기록한다."""
+    from src.services.github_app import CloneStats
+    from src.services.llm_agent import LLMUsage
+
+    mock_db = AsyncMock()
+    mock_db.execute = AsyncMock()
+    mock_db.execute.return_value.scalar_one.return_value = mock_repo
+
+    mock_semgrep = MagicMock()
+    mock_semgrep.scan.return_value = [sql_injection_finding]
+
+    mock_llm = AsyncMock()
+    mock_llm.analyze_files = AsyncMock(return_value={"app/db.py": [true_positive_result]})
+    mock_llm.usage = LLMUsage(requests=2, input_tokens=900, output_tokens=300, retries=1)
+
+    mock_github = AsyncMock()
+    mock_github.clone_repository = AsyncMock(
+        return_value=CloneStats(downloaded_bytes=4096, extracted_files=3, skipped_files=1)
+    )
+
+    with (
+        patch("src.workers.scan_worker.SemgrepEngine", return_value=mock_semgrep),
+        patch("src.workers.scan_worker.LLMAgent", return_value=mock_llm),
+        patch("src.workers.scan_worker.GitHubAppService", return_value=mock_github),
+        patch("src.workers.scan_worker.get_async_session", create=True) as mock_session,
+        patch("src.workers.scan_worker.ScanOrchestrator", create=True, return_value=AsyncMock()),
+        patch("src.workers.scan_worker._update_scan_stats", new_callable=AsyncMock) as mock_stats,
+        patch("src.services.semgrep_engine.SemgrepEngine.cleanup_temp_dir"),
+    ):
+        mock_session.return_value.__aenter__ = AsyncMock(return_value=mock_db)
+        mock_session.return_value.__aexit__ = AsyncMock(return_value=None)
+
+        await _run_scan_async(scan_job_message)
+
+    telemetry = mock_stats.await_args.kwargs["telemetry"].to_dict()
+    assert {"clone", "semgrep", "llm", "save", "patch_pr"} <= set(telemetry["stages"])
+    assert telemetry["downloaded_bytes"] == 4096
+    assert telemetry["files_scanned"] == 3
+    assert telemetry["llm"]["requests"] == 2
+    assert telemetry["llm"]["input_tokens"] == 900
+    assert telemetry["llm"]["retries"] == 1
+
+
+async def test_retry_resumes_from_checkpoint_and_analyzes_only_pending_files(
+    scan_job_message,
+    mock_repo,
+    sql_injection_finding,
+    xss_finding,
+    true_positive_result,
+    false_positive_result,
+):
+    """재시도는 체크포인트의 findings로 Semgrep을 건너뛰고, LLM 결과가 없는 파일만 내려받아 분석한다."""
+    from src.services.scan_checkpoint import DetectionCheckpoint
+
+    mock_db = AsyncMock()
+    mock_db.execute = AsyncMock()
+    mock_db.execute.return_value.scalar_one.return_value = mock_repo
+
+    checkpoint = AsyncMock()
+    checkpoint.load_detection.return_value = DetectionCheckpoint(
+        commit_sha=scan_job_message.commit_sha,
+        findings=[sql_injection_finding, xss_finding],
+        auto_filtered_count=1,
+        files_scanned=12,
+    )
+    checkpoint.load_llm_results.return_value = {"app/db.py": [true_positive_result]}
+
+    mock_semgrep = MagicMock()
+    mock_llm = AsyncMock()
+    mock_llm.analyze_files = AsyncMock(return_value={"app/views.py": [false_positive_result]})
+
+    async def _clone(full_name, installation_id, commit_sha, target_dir, include=None):
+        (target_dir / "app").mkdir(parents=True, exist_ok=True)
+        (target_dir / "app" / "views.py").write_text("return make_response(user_input)\n")
+
+    mock_github = AsyncMock()
+    mock_github.clone_repository = AsyncMock(side_effect=_clone)
+
+    with (
+        patch("src.workers.scan_worker.SemgrepEngine", return_value=mock_semgrep),
+        patch("src.workers.scan_worker.LLMAgent", return_value=mock_llm),
+        patch("src.workers.scan_worker.GitHubAppService", return_value=mock_github),
+        patch("src.workers.scan_worker.get_async_session", create=True) as mock_session,
+        patch("src.workers.scan_worker.ScanOrchestrator", create=True, return_value=AsyncMock()),
+        patch("src.workers.scan_worker.create_scan_checkpoint", return_value=checkpoint),
+        patch("src.workers.scan_worker._update_scan_stats", new_callable=AsyncMock) as mock_stats,
+        patch("src.workers.scan_worker._save_vulnerabilities", new_callable=AsyncMock),
+    ):
+        mock_session.return_value.__aenter__ = AsyncMock(return_value=mock_db)
+        mock_session.return_value.__aexit__ = AsyncMock(return_value=None)
+
+        result = await _run_scan_async(scan_job_message)
+
+    assert result["status"] == "completed"
+    assert result["true_positives"] == 1
+    assert result["false_positives"] == 1
+    mock_semgrep.scan.assert_not_called()
+    # 코드 조각 / 패치 재생성을 위해 LLM 결과가 있는 파일도 내려받는다
+    assert mock_github.clone_repository.await_args.kwargs["include"] == {"app/db.py", "app/views.py"}
+    inputs = mock_llm.analyze_files.await_args.args[0]
+    assert [item.file_path for item in inputs] == ["app/views.py"]
+    assert mock_llm.analyze_files.await_args.kwargs["on_file_done"] == checkpoint.save_file_results
+    telemetry = mock_stats.await_args.kwargs["telemetry"]
+    assert telemetry.resumed_from == "detect"
+    assert telemetry.files_scanned == 12
+    checkpoint.clear.assert_awaited_once()
+
+
+async def test_resumed_true_positive_results_get_patches_regenerated(
+    job_id, sql_injection_finding, true_positive_result, tmp_path
+):
+    """체크포인트는 패치를 저장하지 않으므로 재개한 true_positive 결과의 패치를 다시 만든다."""
+    from src.workers.scan_worker import _run_llm_analysis_batch
+
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / "db.py").write_text("cursor.execute(query)\n")
+    true_positive_result.patch_diff = None
+    mock_llm = AsyncMock()
+
+    results = await _run_llm_analysis_batch(
+        llm=mock_llm,
+        findings=[sql_injection_finding],
+        temp_dir=tmp_path,
+        job_id=job_id,
+        resumed_results={"app/db.py": [true_positive_result]},
+    )
+
+    assert results == [true_positive_result]
+    mock_llm.restore_patches.assert_awaited_once_with(
+        "cursor.execute(query)\n", [sql_injection_finding], [true_positive_result]
+    )
+    mock_llm.analyze_files.assert_not_called()
+
+
+@pytest.mark.parametrize(("retries_left", "cleared"), [(0, True), (2, False)])
+async def test_failed_scan_clears_checkpoint_only_on_final_attempt(
+    scan_job_message, mock_repo, retries_left, cleared
+):
+    """마지막 재시도까지 실패하면 체크포인트를 지운다 (재시도가 남았으면 이어받도록 유지)."""
+    mock_db = AsyncMock()
+    mock_db.execute.return_value.scalar_one.return_value = mock_repo
+    mock_semgrep = MagicMock()
+    mock_semgrep.scan.side_effect = RuntimeError("Semgrep 실행 에러")
+    checkpoint = AsyncMock()
+    checkpoint.load_detection.return_value = None
+    current_job = MagicMock(retries_left=retries_left)
+
+    with (
+        patch("src.workers.scan_worker.SemgrepEngine", return_value=mock_semgrep),
+        patch("src.workers.scan_worker.GitHubAppService", return_value=AsyncMock()),
+        patch("src.workers.scan_worker.get_async_session", create=True) as mock_session,
+        patch("src.workers.scan_worker.ScanOrchestrator", create=True, return_value=AsyncMock()),
+        patch("src.workers.scan_worker.create_scan_checkpoint", return_value=checkpoint),
+        patch("src.workers.scan_worker.get_current_job", return_value=current_job),
+        patch("src.services.semgrep_engine.SemgrepEngine.cleanup_temp_dir"),
+    ):
+        mock_session.return_value.__aenter__ = AsyncMock(return_value=mock_db)
+        mock_session.return_value.__aexit__ = AsyncMock(return_value=None)
+
+        with pytest.raises(RuntimeError):
+            await _run_scan_async(scan_job_message)
+
+    assert checkpoint.clear.await_count == (1 if cleared else 0)
+    checkpoint.close.assert_awaited_once()
+
+
+# ──────────────────────────────────────────────────────────────
+# 상주 워커 모드
+# ──────────────────────────────────────────────────────────────
+
+def test_persistent_runtime_reuses_event_loop_across_jobs(scan_job_message):
+    """상주 모드에서는 잡마다 새 이벤트 루프를 만들지 않고 같은 루프에서 실행한다."""
+    from src.workers import scan_worker
+
+    loops = []
+
+    async def fake_scan(message):
+        loops.append(asyncio.get_running_loop())
+        return {"job_id": message.job_id, "status": "completed"}
+
+    runtime = scan_worker._WorkerRuntime()
+    try:
+        with (
+            patch.object(scan_worker, "_runtime", runtime),
+            patch.object(scan_worker, "_run_scan_async", side_effect=fake_scan),
+        ):
+            scan_worker.run_scan(scan_job_message)
+            scan_worker.run_scan(scan_job_message)
+    finally:
+        runtime.close()
+
+    assert loops[0] is loops[1] is runtime.loop
+    assert runtime.jobs_run == 2
+
+
+@pytest.mark.parametrize(("jobs_before_stop", "recycled"), [(2, False), (4, True)])
+def test_push_followups_do_not_count_toward_max_jobs(scan_job_message, jobs_before_stop, recycled):
+    """push 후속 스캔 등록은 처리 건수에 포함하지 않는다 — 상한 전에 종료되면 재시작하지 않는다."""
+    from src.workers import scan_worker
+
+    scan_job_message.trigger = "webhook"
+    scan_job_message.scan_type = "incremental"
+
+    async def fake_scan(message):
+        return {"job_id": message.job_id, "status": "completed"}
+
+    def fake_work(with_scheduler, max_jobs):
+        # RQ가 push 스캔 잡을 처리하다가 (SIGTERM 등으로) 멈춘 상황
+        for _ in range(jobs_before_stop):
+            scan_worker.run_scan(scan_job_message)
+
+    with (
+        patch.object(scan_worker.settings, "SCAN_WORKER_PERSISTENT", True),
+        patch.object(scan_worker.settings, "SCAN_WORKER_MAX_JOBS", 4),
+        patch.object(scan_worker.redis, "from_url"),
+        patch.object(scan_worker, "Queue"),
+        patch.object(scan_worker, "_get_scheduler"),
+        patch.object(scan_worker, "_preload_modules"),
+        patch.object(scan_worker, "SimpleWorker") as mock_worker_cls,
+        patch.object(scan_worker, "_run_scan_async", side_effect=fake_scan),
+        patch.object(scan_worker, "_release_scan_slot"),
+        patch.object(scan_worker, "_submit_push_followup", new_callable=AsyncMock) as mock_followup,
+    ):
+        mock_worker_cls.return_value.work.side_effect = fake_work
+        assert scan_worker._run_worker_process() is recycled
+
+    assert mock_followup.await_count == jobs_before_stop
+
+
+async def test_persistent_runtime_shares_clients_and_db_pool(mock_repo, scan_job_message):
+    """상주 모드에서는 공유 HTTP / Anthropic 클라이언트를 주입하고 DB 엔진을 잡마다 폐기하지 않는다."""
+    from src.workers import scan_worker
+
+    mock_db = AsyncMock()
+    mock_db.execute = AsyncMock()
+    mock_db.execute.return_value.scalar_one.return_value = mock_repo
+    session_ctx = MagicMock()
+    session_ctx.__aenter__ = AsyncMock(return_value=mock_db)
+    session_ctx.__aexit__ = AsyncMock(return_value=None)
+
+    runtime = MagicMock()
+    runtime.session_factory = MagicMock(return_value=session_ctx)
+
+    mock_semgrep = MagicMock()
+    mock_semgrep.scan.return_value = []
+
+    with (
+        patch.object(scan_worker, "_runtime", runtime),
+        patch("src.workers.scan_worker.create_async_engine") as mock_engine,
+        patch("src.workers.scan_worker.SemgrepEngine", return_value=mock_semgrep),
+        patch("src.workers.scan_worker.LLMAgent") as mock_llm_cls,
+        patch("src.workers.scan_worker.GitHubAppService") as mock_github_cls,
+        patch("src.workers.scan_worker.ScanOrchestrator", create=True, return_value=AsyncMock()),
+        patch("src.services.semgrep_engine.SemgrepEngine.cleanup_temp_dir"),
+    ):
+        mock_github_cls.return_value.clone_repository = AsyncMock()
+        await _run_scan_async(scan_job_message)
+
+    mock_engine.assert_not_called()
+    runtime.session_factory.assert_called_once()
+    assert mock_github_cls.call_args.kwargs["http_client"] is runtime.http_client
+    assert mock_llm_cls.call_args.kwargs["client"] is runtime.anthropic_client
+
+
+# ──────────────────────────────────────────────────────────────
+# map-reduce 스캔 (대형 모노레포)
+# ──────────────────────────────────────────────────────────────
+
+async def test_mapreduce_coordinator_enqueues_shards_and_fan_in(
+    scan_job_message,
+    mock_repo,
+    tmp_path,
+):
+    """mapreduce 스캔은 코디네이터가 파일을 샤드로 나눠 샤드 잡과 fan-in 잡을 등록하고 끝난다."""
+    from src.workers import scan_worker
+
+    for i in range(5):
+        (tmp_path / f"mod_{i}.py").write_text("x = 1\n" * (i + 1))
+    scan_job_message.scan_type = "mapreduce"
+
+    mock_db = AsyncMock()
+    mock_db.execute = AsyncMock()
+    mock_db.execute.return_value.scalar_one.return_value = mock_repo
+
+    mock_semgrep_cls = MagicMock()
+    mock_semgrep_cls.prepare_temp_dir.return_value = tmp_path
+    mock_orchestrator = AsyncMock()
+    mock_orchestrator.enqueue_shard_scans = MagicMock(return_value=["c-0", "c-1", "c-2"])
+    mock_orchestrator.enqueue_fan_in = MagicMock()
+
+    with (
+        patch("src.workers.scan_worker.SemgrepEngine", mock_semgrep_cls),
+        patch("src.workers.scan_worker.LLMAgent"),
+        patch("src.workers.scan_worker.GitHubAppService") as mock_github_cls,
+        patch("src.workers.scan_worker.get_async_session", create=True) as mock_session,
+        patch("src.workers.scan_worker.ScanOrchestrator", create=True, return_value=mock_orchestrator),
+        patch.object(scan_worker.settings, "SCAN_MAPREDUCE_SHARD_FILES", 2),
+        patch("src.services.semgrep_engine.SemgrepEngine.cleanup_temp_dir"),
+    ):
+        mock_github_cls.return_value.clone_repository = AsyncMock()
+        mock_session.return_value.__aenter__ = AsyncMock(return_value=mock_db)
+        mock_session.return_value.__aexit__ = AsyncMock(return_value=None)
+
+        result = await _run_scan_async(scan_job_message)
+
+    assert result["status"] == "running"
+    assert result["shards"] == 3
+    shards = mock_orchestrator.enqueue_shard_scans.call_args.args[1]
+    assert sorted(f for shard in shards for f in shard) == [f"mod_{i}.py" for i in range(5)]
+    mock_orchestrator.enqueue_fan_in.assert_called_once_with(scan_job_message, ["c-0", "c-1", "c-2"])
+    mock_semgrep_cls.return_value.scan.assert_not_called()
+    mock_orchestrator.update_job_status.assert_awaited_once_with(scan_job_message.job_id, "running")
+
+
+async def test_mapreduce_fan_in_dedups_shard_results(
+    scan_job_message,
+    mock_repo,
+    sql_injection_finding,
+    xss_finding,
+    true_positive_result,
+):
+    """fan-in 잡은 샤드 결과를 중복 제거해 합치고, 실패한 샤드 수를 텔레메트리에 남긴다."""
+    from dataclasses import asdict
+
+    from src.workers.scan_worker import _finalize_mapreduce_async
+
+    def shard_output(findings, results):
+        return {
+            "findings": [asdict(f) for f in findings],
+            "results": [asdict(r) for r in results],
+            "auto_filtered": 1,
+            "telemetry": {"stages": {"semgrep": 1.5}, "files_scanned": 10, "llm": {"requests": 2}},
+        }
+
+    mock_db = AsyncMock()
+    mock_db.execute = AsyncMock()
+    mock_db.execute.return_value.scalar_one.return_value = mock_repo
+    mock_orchestrator = AsyncMock()
+    mock_orchestrator.fetch_shard_results = MagicMock(return_value=[
+        shard_output([sql_injection_finding], [true_positive_result]),
+        shard_output([sql_injection_finding, xss_finding], []),
+        None,
+    ])
+    mock_orchestrator.delete_shard_jobs = MagicMock()
+
+    with (
+        patch("src.workers.scan_worker.GitHubAppService"),
+        patch("src.workers.scan_worker.get_async_session", create=True) as mock_session,
+        patch("src.workers.scan_worker.ScanOrchestrator", create=True, return_value=mock_orchestrator),
+        patch("src.workers.scan_worker._finalize_scan", new_callable=AsyncMock) as mock_finalize,
+    ):
+        mock_session.return_value.__aenter__ = AsyncMock(return_value=mock_db)
+        mock_session.return_value.__aexit__ = AsyncMock(return_value=None)
+
+        await _finalize_mapreduce_async(scan_job_message, ["c-0", "c-1", "c-2"])
+
+    args = mock_finalize.await_args.args
+    findings, results, auto_filtered, telemetry = args[5], args[6], args[7], args[8]
+    assert [f.rule_id for f in findings] == [sql_injection_finding.rule_id, xss_finding.rule_id]
+    assert results == [true_positive_result]
+    assert auto_filtered == 2
+    assert telemetry.files_scanned == 20
+    assert telemetry.stages["semgrep"] == 3.0
+    assert telemetry.llm["requests"] == 4
+    assert telemetry.mapreduce_shards == 3
+    assert telemetry.mapreduce_failed_shards == 1
+    # 샤드 결과(코드 조각, 패치 diff)는 fan-in이 읽은 뒤 Redis에서 삭제
+    mock_orchestrator.delete_shard_jobs.assert_called_once_with(["c-0", "c-1", "c-2"])
+
+
+async def test_mapreduce_fan_in_fails_when_all_shards_fail(scan_job_message):
+    """모든 샤드 잡이 실패하면 ScanJob을 failed로 표시한다."""
+    from src.workers.scan_worker import _finalize_mapreduce_async
+
+    mock_orchestrator = AsyncMock()
+    mock_orchestrator.fetch_shard_results = MagicMock(return_value=[None, None])
+    mock_orchestrator.delete_shard_jobs = MagicMock()
+
+    with (
+        patch("src.workers.scan_worker.GitHubAppService"),
+        patch("src.workers.scan_worker.get_async_session", create=True) as mock_session,
+        patch("src.workers.scan_worker.ScanOrchestrator", create=True, return_value=mock_orchestrator),
+        patch("src.workers.scan_worker.get_current_job", return_value=None),
+    ):
+        mock_session.return_value.__aenter__ = AsyncMock(return_value=AsyncMock())
+        mock_session.return_value.__aexit__ = AsyncMock(return_value=None)
+
+        with pytest.raises(RuntimeError):
+            await _finalize_mapreduce_async(scan_job_message, ["c-0", "c-1"])
+
+    status_call = mock_orchestrator.update_job_status.await_args
+    assert status_call.args[1] == "failed"
+    mock_orchestrator.delete_shard_jobs.assert_called_once_with(["c-0", "c-1"])
+
+
+def test_mapreduce_coordinator_keeps_team_slot_until_fan_in(scan_job_message):
+    """map-reduce로 전환된 스캔은 샤드가 끝날 때까지 슬롯을 유지하고, fan-in 잡이 반납한다."""
+    from src.workers import scan_worker
+
+    message = _team_message(scan_job_message)
+    scheduler = MagicMock()
+    with (
+        patch.object(
+            scan_worker, "_run_scan_async", new_callable=AsyncMock,
+            return_value={"job_id": message.job_id, "status": "running", "shards": 3},
+        ),
+        patch.object(scan_worker, "_finalize_mapreduce_async", new_callable=AsyncMock, return_value={}),
+        patch.object(scan_worker, "_get_scheduler", return_value=scheduler),
+    ):
+        scan_worker.run_scan(message)
+        scheduler.release.assert_not_called()
+
+        scan_worker.finalize_mapreduce_scan(message, ["c-0", "c-1", "c-2"])
+
+    scheduler.release.assert_called_once_with(message.job_id, team_id="team-a", lane="standard")
+
+
+# ──────────────────────────────────────────────────────────────
+# 팀 스캔 슬롯 반납
+# ──────────────────────────────────────────────────────────────
+
+def _team_message(scan_job_message):
+    from src.services.scan_orchestrator import ScanJobMessage as RealMessage
+
+    return RealMessage(**{**scan_job_message.__dict__, "team_id": "team-a"})
+
+
+def test_run_scan_releases_team_slot_on_success(scan_job_message):
+    """스캔이 끝나면 팀 슬롯을 반납해 대기 중인 다음 스캔이 디스패치되게 한다."""
+    from src.workers import scan_worker
+
+    message = _team_message(scan_job_message)
+    scheduler = MagicMock()
+    with (
+        patch.object(scan_worker, "_run_scan_async", new_callable=AsyncMock, return_value={}),
+        patch.object(scan_worker, "_get_scheduler", return_value=scheduler),
+    ):
+        scan_worker.run_scan(message)
+
+    scheduler.release.assert_called_once_with(message.job_id, team_id="team-a", lane="standard")
+
+
+def test_run_scan_loads_message_for_envelope(scan_job_message):
+    """봉투 JSON으로 받은 잡은 ScanJob 행에서 스캔 메시지를 읽어 실행하고, 봉투로 슬롯을 반납한다."""
+    from src.services.scan_job_envelope import ScanJobEnvelope
+    from src.workers import scan_worker
+
+    message = _team_message(scan_job_message)
+    envelope = ScanJobEnvelope(message.job_id, "team-a", "interactive")
+    scheduler = MagicMock()
+    with (
+        patch.object(scan_worker, "_load_scan_message", new_callable=AsyncMock, return_value=message) as mock_load,
+        patch.object(scan_worker, "_run_scan_async", new_callable=AsyncMock, return_value={}) as mock_scan,
+        patch.object(scan_worker, "_get_scheduler", return_value=scheduler),
+    ):
+        scan_worker.run_scan(envelope.encode())
+
+    mock_load.assert_awaited_once_with(envelope)
+    mock_scan.assert_awaited_once_with(message)
+    scheduler.release.assert_called_once_with(message.job_id, team_id="team-a", lane="interactive")
+
+
+async def test_load_scan_message_builds_message_from_scan_job_row():
+    """ScanJob 행 하나로 스캔 대상(커밋, 변경 파일 등)을 복원한다."""
+    from datetime import datetime, timezone
+
+    from src.services.scan_job_envelope import ScanJobEnvelope
+    from src.workers import scan_worker
+
+    job_id = str(uuid.uuid4())
+    scan_job = MagicMock(
+        repo_id=uuid.UUID("bbbbbbbb-bbbb-bbbb-bbbb-bbbbbbbbbbbb"),
+        trigger_type="webhook",
+        commit_sha="c" * 40,
+        branch="main",
+        pr_number=None,
+        scan_type="incremental",
+        changed_files=["app/a.py"],
+        created_at=datetime(2026, 2, 25, tzinfo=timezone.utc),
+    )
+
+    @asynccontextmanager
+    async def fake_session():
+        yield AsyncMock()
+
+    with (
+        patch.object(scan_worker, "get_async_session", fake_session),
+        patch.object(scan_worker, "_get_scan_job", new_callable=AsyncMock, return_value=scan_job),
+    ):
+        message = await scan_worker._load_scan_message(ScanJobEnvelope(job_id, "team-a", "standard"))
+
+    assert message.job_id == job_id
+    assert message.repo_id == "bbbbbbbb-bbbb-bbbb-bbbb-bbbbbbbbbbbb"
+    assert message.trigger == "webhook"
+    assert message.commit_sha == "c" * 40
+    assert message.changed_files == ["app/a.py"]
+    assert message.team_id == "team-a"
+
+
+@pytest.mark.parametrize(("retries_left", "released"), [(2, False), (0, True)])
+def test_run_scan_keeps_team_slot_while_rq_retries(scan_job_message, retries_left, released):
+    """RQ가 재시도할 실패는 슬롯을 유지하고, 마지막 실패에서만 반납한다."""
+    from src.workers import scan_worker
+
+    message = _team_message(scan_job_message)
+    scheduler = MagicMock()
+    with (
+        patch.object(scan_worker, "_run_scan_async", new_callable=AsyncMock, side_effect=RuntimeError("boom")),
+        patch.object(scan_worker, "_get_scheduler", return_value=scheduler),
+        patch.object(scan_worker, "get_current_job", return_value=MagicMock(retries_left=retries_left)),
+    ):
+        with pytest.raises(RuntimeError):
+            scan_worker.run_scan(message)
+
+    assert scheduler.release.called is released
+
+
+async def test_refresh_scan_target_uses_coalesced_commit(scan_job_message):
+    """대기 중에 병합된 push의 최신 commit_sha / changed_files로 스캔한다."""
+    from src.workers.scan_worker import _refresh_scan_target
+
+    scan_job = MagicMock()
+    scan_job.commit_sha = "f" * 40
+    scan_job.changed_files = ["app/a.py", "app/c.py"]
+    mock_db = AsyncMock()
+    mock_db.execute.return_value = MagicMock(scalar_one_or_none=MagicMock(return_value=scan_job))
+
+    refreshed = await _refresh_scan_target(mock_db, scan_job_message)
+
+    assert refreshed.commit_sha == "f" * 40
+    assert refreshed.changed_files == ["app/a.py", "app/c.py"]
+    assert refreshed.job_id == scan_job_message.job_id
+
+
+def test_finish_push_scan_submits_followup(scan_job_message):
+    """push 스캔이 끝나면 실행 중 들어온 push의 후속 스캔을 등록한다."""
+    from src.workers import scan_worker
+
+    scan_job_message.trigger = "webhook"
+    scan_job_message.scan_type = "incremental"
+    with (
+        patch.object(scan_worker, "_release_scan_slot"),
+        patch.object(scan_worker, "_submit_push_followup", new_callable=AsyncMock) as mock_followup,
+    ):
+        scan_worker._finish_scan(MagicMock(), scan_job_message)
+
+    mock_followup.assert_awaited_once_with(scan_job_message)